@@ -4,39 +4,55 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core import security
-from app.core.database import get_db, SessionLocal
+from app.core.auth_cache import AuthUser, auth_cache
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.player import Player
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get current authenticated user from JWT token (for HTTP endpoints)."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def decode_token(token: str) -> Optional[dict]:
+    """The claims of a token we signed and that has not expired, else None."""
     try:
         payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
+        return None
+    return payload if payload.get("sub") is not None else None
+
+def verify_token(db: Session, token: str) -> Optional[AuthUser]:
+    """
+    Check a token against the database and cache what it resolves to.
+
+    Session first, so the WebSocket endpoint can ``db_executor.run`` it.
+    Callers try ``auth_cache.get(token)`` first.
+    """
+    if auth_cache.is_revoked(token):
+        return None
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    version = auth_cache.version
+    row = (db.query(User.id, User.username, User.is_active, Player.id)
+           .outerjoin(Player, Player.user_id == User.id)
+           .filter(User.username == payload["sub"]).first())
+    if row is None or not row[2]:
+        return None
+    return auth_cache.put(token, AuthUser(row[0], row[1], row[3]), payload.get("exp", 0), version)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> AuthUser:
+    """Get current authenticated user from JWT token (for HTTP endpoints)."""
+    user = auth_cache.get(token) or verify_token(db, token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-def get_user_from_token(token: str) -> Optional[User]:
-    """Get user from JWT token (for WebSocket authentication)."""
-    try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        with SessionLocal() as db:
-            user = db.query(User).filter(User.username == username).first()
-            return user
-    except JWTError:
-        return None
+def get_current_admin(user: AuthUser = Depends(get_current_user)) -> AuthUser:
+    """The current user, if listed in settings.ADMIN_USERNAMES (for admin-only HTTP endpoints)."""
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user
@@ -0,0 +1,136 @@
+"""
+Admin-only operations endpoints: Prometheus metrics, the slow-command profiler and bans.
+
+The handlers are ``async`` on purpose: they read state the event loop owns
+(histograms, connections, the profiler) and must run on the loop, not on
+the thread pool FastAPI uses for plain functions.
+"""
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.api import deps
+from app.core.auth_cache import AuthUser, auth_cache
+from app.core.database import db_executor
+from app.core.metrics import PrometheusText
+from app.core.profiler import profiler
+from app.core.security import password_hasher
+from app.game.commands import commands
+from app.game.reload import content_reloader
+from app.game.tick import tick_scheduler
+from app.models.player import Player
+from app.models.user import User
+from app.websockets.connection_manager import manager
+
+router = APIRouter()
+
+
+def render_metrics(engine) -> str:
+    """Every timing and counter of this process, in the Prometheus text format."""
+    out = PrometheusText()
+    out.histogram("mud_command_duration_seconds", "Game command handling time, by command.",
+                  (({"command": name}, hist) for name, hist in commands.latency.items()))
+    out.histogram("mud_refresh_ui_duration_seconds", "Building a player's UI state in refresh_ui.",
+                  [(None, engine.refresh_time)])
+
+    out.histogram("mud_db_wait_seconds", "Database jobs queued before a thread picked them up.",
+                  [(None, db_executor.wait)])
+    out.histogram("mud_db_query_duration_seconds", "Database jobs running on the threads, by function.",
+                  (({"query": name}, hist) for name, hist in db_executor.queries.items()))
+    out.gauge("mud_db_in_flight", "Database jobs queued or running.", [(None, db_executor.in_flight)])
+    out.counter("mud_db_errors_total", "Database jobs that raised.", [(None, db_executor.errors)])
+
+    manager = engine.manager
+    out.histogram("mud_ws_send_duration_seconds", "Outbound message handling, by stage: fan-out to the "
+                  "queues (publish), closing a command batch (batch) and socket writes (socket).", [
+                      ({"stage": "publish"}, manager.publish_time),
+                      ({"stage": "batch"}, manager.batch_time),
+                      ({"stage": "socket"}, manager.socket_time),
+                  ])
+    stats = manager.get_stats()
+    out.gauge("mud_ws_connections", "Open WebSocket connections.", [(None, stats["connections"])])
+    out.gauge("mud_ws_queued_frames", "Frames waiting in outbound queues.", [(None, stats["queued_messages"])])
+    out.counter("mud_ws_frames_total", "Frames queued for clients.", [(None, stats["frames_queued"])])
+    out.counter("mud_ws_dropped_messages_total", "Frames dropped for slow or dead clients.",
+                [(None, stats["dropped_messages"])])
+    out.counter("mud_ws_slow_consumer_disconnects_total", "Clients cut off for a full outbound queue.",
+                [(None, stats["slow_consumer_disconnects"])])
+    out.counter("mud_ws_send_errors_total", "Failed socket writes.", [(None, stats["send_errors"])])
+
+    out.histogram("mud_tick_duration_seconds", "World tick time.", [(None, tick_scheduler.tick_duration)])
+    out.histogram("mud_tick_system_duration_seconds", "World tick time, by system.",
+                  (({"system": name}, hist) for name, hist in tick_scheduler.system_duration.items()))
+    out.counter("mud_tick_overruns_total", "Ticks that took longer than the tick interval.",
+                [(None, tick_scheduler.overruns)])
+    out.histogram("mud_content_reload_pause_seconds", "Game pause while reloaded content is swapped in.",
+                  [(None, content_reloader.pause)])
+
+    store = engine.store.get_stats()
+    out.gauge("mud_players_cached", "Players held in the state store.", [(None, store["cached_players"])])
+    out.gauge("mud_players_dirty", "Players waiting for the write-behind flush.", [(None, store["dirty_players"])])
+    out.counter("mud_player_flush_errors_total", "Failed write-behind flushes.", [(None, store["flush_errors"])])
+
+    auth = auth_cache.get_stats()
+    out.gauge("mud_auth_cache_tokens", "Verified tokens cached.", [(None, auth["size"])])
+    out.counter("mud_auth_cache_lookups_total", "Token cache lookups, by result.",
+                [({"result": "hit"}, auth["hits"]), ({"result": "miss"}, auth["misses"])])
+    out.histogram("mud_auth_hash_duration_seconds", "Password hashing time, by operation.",
+                  (({"op": op}, hist) for op, hist in password_hasher.latency.items()))
+    out.histogram("mud_auth_hash_wait_seconds", "Password hashes queued before a thread picked them up.",
+                  [(None, password_hasher.wait)])
+    out.gauge("mud_auth_hash_queue_depth", "Password hashes waiting for a thread.", [(None, password_hasher.queued)])
+    out.counter("mud_auth_hash_rejected_total", "Auth requests refused (503) for a full hashing queue.",
+                [(None, password_hasher.rejected)])
+    return out.render()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request, admin: AuthUser = Depends(deps.get_current_admin)):
+    """Scrape target for Prometheus (send the admin's token as a bearer token)."""
+    return PlainTextResponse(render_metrics(request.app.state.engine), media_type=PrometheusText.CONTENT_TYPE)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(admin: AuthUser = Depends(deps.get_current_admin)):
+    """Collapsed stacks of the slowest commands, for flamegraph.pl or speedscope."""
+    return PlainTextResponse(profiler.folded())
+
+
+@router.post("/profile")
+async def configure_profile(slowest: int = Query(..., ge=0, description="Commands to keep (0: profiler off)"),
+                            interval_ms: Optional[float] = Query(None, gt=0, description="Sampling period"),
+                            admin: AuthUser = Depends(deps.get_current_admin)):
+    """Switch the profiler on or off; starts over with no stacks kept."""
+    profiler.configure(slowest, interval_ms)
+    return profiler.get_stats()
+
+
+def _set_active(db, username: str, active: bool) -> Optional[Tuple[int, Optional[int]]]:
+    """Enable or disable an account; returns its user and player ids."""
+    user = db.query(User).filter(User.username == username).first()
+    if user is None:
+        return None
+    user.is_active = active
+    db.commit()
+    return user.id, db.query(Player.id).filter(Player.user_id == user.id).scalar()
+
+
+@router.post("/users/{username}/ban")
+async def ban_user(username: str, admin: AuthUser = Depends(deps.get_current_admin)):
+    """Disable an account: its tokens stop working at once and an online player is disconnected."""
+    found = await db_executor.run(_set_active, username, False)
+    if found is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id, player_id = found
+    auth_cache.invalidate_user(user_id)
+    kicked = player_id is not None and manager.kick(player_id)
+    return {"username": username, "is_active": False, "disconnected": kicked}
+
+
+@router.post("/users/{username}/unban")
+async def unban_user(username: str, admin: AuthUser = Depends(deps.get_current_admin)):
+    """Enable an account again (disabled accounts are never cached, so there is nothing to drop)."""
+    if await db_executor.run(_set_active, username, True) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"username": username, "is_active": True}
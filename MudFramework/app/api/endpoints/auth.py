@@ -1,17 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from app.api import deps
+from app.core.auth_cache import auth_cache
+from app.core.database import db_executor
 from app.core import security
+from app.core.security import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, UserSignupResponse, UserRecover
 import secrets
 
 router = APIRouter()
 
+# The endpoints run on the event loop: queries go through db_executor and
+# bcrypt through password_hasher, which refuses work (503) when it is swamped.
+# Its capacity is checked before the queries, so refused requests cost none.
+
+def _find_user(db, username: str) -> Optional[User]:
+    return db.query(User).filter(User.username == username).first()
+
+def _add_user(db, username: str, hashed_password: str, hashed_recovery_code: str) -> User:
+    user = User(
+        username=username,
+        hashed_password=hashed_password,
+        hashed_recovery_code=hashed_recovery_code,
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def _set_password(db, user_id: int, hashed_password: str) -> None:
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+    db.commit()
+
 @router.post("/signup", response_model=UserSignupResponse)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == user_in.username).first()
-    if user:
+async def signup(user_in: UserCreate):
+    password_hasher.ensure_capacity()
+    if await db_executor.run(_find_user, user_in.username):
         raise HTTPException(
             status_code=400,
             detail="The username with this username already exists in the system.",
@@ -19,17 +45,9 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
     
     # Generate Recovery Code
     recovery_code = secrets.token_urlsafe(16)
-    hashed_recovery_code = security.get_password_hash(recovery_code)
-    
-    new_user = User(
-        username=user_in.username,
-        hashed_password=security.get_password_hash(user_in.password),
-        hashed_recovery_code=hashed_recovery_code,
-        is_active=True
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    hashed_recovery_code = await password_hasher.hash(recovery_code)
+    hashed_password = await password_hasher.hash(user_in.password)
+    new_user = await db_executor.run(_add_user, user_in.username, hashed_password, hashed_recovery_code)
     
     # Return user with the recovery code in the response
     return UserSignupResponse(
@@ -40,35 +58,54 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=Token)
-def login(user_in: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == user_in.username).first()
-    if not user or not security.verify_password(user_in.password, user.hashed_password):
+async def login(user_in: UserLogin):
+    password_hasher.ensure_capacity()
+    user = await db_executor.run(_find_user, user_in.username)
+    if not user or not await password_hasher.verify(user_in.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled")
     access_token = security.create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/recover", response_model=Token)
-def recover_password(recover_in: UserRecover, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == recover_in.username).first()
+async def recover_password(recover_in: UserRecover):
+    password_hasher.ensure_capacity()
+    user = await db_executor.run(_find_user, recover_in.username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        # Banned: the password stays as it is
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account disabled")
         
-    if not security.verify_password(recover_in.recovery_code, user.hashed_recovery_code):
+    if not await password_hasher.verify(recover_in.recovery_code, user.hashed_recovery_code):
         raise HTTPException(status_code=400, detail="Invalid recovery code")
         
     # Reset Password
-    user.hashed_password = security.get_password_hash(recover_in.new_password)
+    hashed_password = await password_hasher.hash(recover_in.new_password)
     # Generate NEW recovery code? Or keep old? "One time use"... 
     # Usually you'd assume the code is burn on use or persistent. 
     # "one time use" suggests burn. Let's start with just resetting password.
     
-    db.commit()
+    await db_executor.run(_set_password, user.id, hashed_password)
     
     # Return login token immediately
     access_token = security.create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(token: str = Depends(deps.oauth2_scheme)):
+    """Revoke the caller's token: it stops working here until it would have expired anyway."""
+    payload = deps.decode_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    auth_cache.revoke(token, payload.get("exp", 0))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
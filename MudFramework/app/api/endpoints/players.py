@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api import deps
-from app.models.user import User
+from app.core.auth_cache import AuthUser, auth_cache
 from app.models.player import Player
 from app.models.race import Race
 from app.schemas.player import PlayerCreate, PlayerResponse
@@ -11,7 +11,7 @@ from app.core.constants import BASE_FLUX, FLUX_PER_INT
 router = APIRouter()
 
 @router.post("/", response_model=PlayerResponse)
-def create_player(player_in: PlayerCreate, current_user: User = Depends(deps.get_current_user), db: Session = Depends(get_db)):
+def create_player(player_in: PlayerCreate, current_user: AuthUser = Depends(deps.get_current_user), db: Session = Depends(get_db)):
     if db.query(Player).filter(Player.user_id == current_user.id).first():
         raise HTTPException(status_code=400, detail="User already has a player character.")
     
@@ -45,10 +45,11 @@ def create_player(player_in: PlayerCreate, current_user: User = Depends(deps.get
     db.add(player)
     db.commit()
     db.refresh(player)
+    auth_cache.set_player(current_user.id, player.id)  # The game connects with the same token
     return player
 
 @router.get("/me", response_model=PlayerResponse)
-def get_my_player(current_user: User = Depends(deps.get_current_user), db: Session = Depends(get_db)):
+def get_my_player(current_user: AuthUser = Depends(deps.get_current_user), db: Session = Depends(get_db)):
     player = db.query(Player).filter(Player.user_id == current_user.id).first()
     if not player:
         raise HTTPException(status_code=404, detail="Player not found for this user.")
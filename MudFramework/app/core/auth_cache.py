@@ -0,0 +1,143 @@
+"""
+Verified access tokens, cached.
+
+Every HTTP call and every WebSocket connect used to decode the JWT and look
+the user (and then their player) up in the database. ``auth_cache`` keeps
+what a verified token resolved to for ``AUTH_CACHE_TTL`` seconds (never past
+the token's own expiry), so reconnect storms after a deploy cost no queries.
+
+Entries are dropped when their user logs out (the token is also revoked
+until it expires: a JWT stays valid until then otherwise) or is banned
+(every token of the user). The cache is per process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+
+
+class AuthUser:
+    """What a verified token stands for. Has the ``id`` and ``username`` endpoints read off a ``User``."""
+
+    __slots__ = ("id", "username", "player_id", "expires")
+
+    def __init__(self, user_id: int, username: str, player_id: Optional[int] = None):
+        self.id = user_id
+        self.username = username
+        self.player_id = player_id  # None until the user has a character
+        self.expires = 0.0
+
+
+class TokenCache:
+    """Bounded LRU of token -> ``AuthUser`` with a TTL. ``max_size`` 0 disables it."""
+
+    def __init__(self, max_size: int = None, ttl: float = None):
+        self.max_size = settings.AUTH_CACHE_SIZE if max_size is None else max_size
+        self.ttl = settings.AUTH_CACHE_TTL if ttl is None else ttl
+        self._entries: "OrderedDict[str, AuthUser]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._revoked: Dict[str, float] = {}  # Logged-out token -> its expiry
+        # Bumped by every invalidation: a lookup that started before one must not cache its result
+        self.version = 0
+        # HTTP dependencies and database jobs run on threads, the WebSocket endpoint on the loop
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[AuthUser]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= time.time():
+                self._drop(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, user: AuthUser, token_expires: float, version: int) -> AuthUser:
+        """Cache a user verified against the database, unless anything was invalidated since ``version``."""
+        with self._lock:
+            if not self.max_size or version != self.version:
+                return user
+            user.expires = min(time.time() + self.ttl, token_expires)
+            self._drop(token)
+            self._entries[token] = user
+            self._by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return user
+
+    def is_revoked(self, token: str) -> bool:
+        return token in self._revoked
+
+    def revoke(self, token: str, token_expires: float) -> None:
+        """Logout: refuse ``token`` from now until it expires."""
+        with self._lock:
+            now = time.time()
+            for old in [t for t, expires in self._revoked.items() if expires <= now]:
+                del self._revoked[old]
+            self._revoked[token] = token_expires
+            self._drop(token)
+            self._invalidated()
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget every token of a user (ban, deleted account): the next use checks the database."""
+        with self._lock:
+            for token in list(self._by_user.get(user_id, ())):
+                self._drop(token)
+            self._invalidated()
+
+    def set_player(self, user_id: int, player_id: int) -> None:
+        """The user just created their character."""
+        with self._lock:
+            for token in self._by_user.get(user_id, ()):
+                self._entries[token].player_id = player_id
+
+    def clear(self) -> None:
+        """Forget everything, revocations included (tests and benchmarks)."""
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._revoked.clear()
+            self._invalidated()
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._by_user[entry.id]
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[entry.id]
+
+    def _invalidated(self) -> None:
+        self.version += 1
+        self.invalidations += 1
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "revoked_tokens": len(self._revoked),
+        }
+
+
+# Singleton instance
+auth_cache = TokenCache()
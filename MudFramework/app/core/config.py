@@ -16,6 +16,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)  # Generate random key if not set
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
+    AUTH_CACHE_SIZE: int = 10000  # Verified tokens kept (0: check every token against the database)
+    AUTH_CACHE_TTL: float = 60.0  # Seconds before a cached token is checked against the database again
+    AUTH_HASH_WORKERS: int = 2  # Threads hashing passwords (0: hash on the event loop)
+    AUTH_HASH_QUEUE: int = 16  # Hashes waiting for a thread before auth endpoints answer 503
+    AUTH_HASH_NICE: int = 19  # Niceness of the hashing threads: they only get CPU the game leaves (Linux)
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:8000", "http://localhost:3000"]
@@ -26,6 +31,24 @@ class Settings(BaseSettings):
     # Database
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    PLAYER_FLUSH_INTERVAL: float = 5.0  # Seconds between write-behind flushes of player state
+    
+    # World tick
+    TICK_INTERVAL: float = 1.0  # Seconds per world tick
+    
+    # World zones
+    WORLD_ZONES: str = ""  # Comma-separated zones this process loads (empty: the whole world)
+    GAME_WORKERS: int = 0  # Zone worker processes behind the WebSocket server (0: run the game in-process)
+    
+    # WebSockets
+    OUTBOUND_QUEUE_SIZE: int = 256  # Frames buffered per client before it is dropped as a slow consumer
+    
+    # Administration
+    ADMIN_USERNAMES: List[str] = []  # Users allowed to run admin commands (e.g. reload) and endpoints
+    
+    # Profiling
+    PROFILE_SLOWEST_COMMANDS: int = 0  # Keep sampled stacks of this many slowest commands (0: profiler off)
+    PROFILE_INTERVAL_MS: float = 1.0  # Stack sampling period while a command runs
     
     # Debug/Development
     DEBUG_MODE: bool = False
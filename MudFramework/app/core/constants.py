@@ -16,6 +16,13 @@ FLUX_REGEN_PERCENT = 0.10  # 10% of max flux regenerated per combat round
 BASE_FLUX = 100  # Base flux for races without specific base_flux
 FLUX_PER_INT = 5  # Flux = base_flux + (INT * FLUX_PER_INT)
 
+# World Tick Constants (periods are in ticks, see settings.TICK_INTERVAL)
+REGEN_INTERVAL_TICKS = 5  # Out-of-combat regen runs every 5 ticks
+OUT_OF_COMBAT_HP_REGEN_PERCENT = 0.05  # 5% of max HP per regen pulse
+OUT_OF_COMBAT_FLUX_REGEN_PERCENT = 0.10  # 10% of max flux per regen pulse
+COOLDOWN_DECAY_TICKS = 3  # Out of combat, skill cooldowns drop one round every 3 ticks
+MOB_RESPAWN_TICKS = 30  # A killed mob is back in its room 30 ticks later
+
 # Experience Constants
 EXP_PER_LEVEL = 100  # Experience required per level (level * EXP_PER_LEVEL)
 
@@ -29,3 +36,11 @@ DAMAGE_VARIANCE_MAX = 1.1  # Maximum damage variance (110%)
 # Level Up Rewards
 WISH_LEVEL_BONUS = 5  # Levels gained from using wish command
 
+# Inventory
+MAX_STACK = 99  # Most of one item a player can carry, unless the item sets its own "stack"
+
+
+# World Graph Constants
+ALL_PAIRS_MAX_ROOMS = 1024  # Up to this many rooms, distances are precomputed for every pair
+WORLD_GRAPH_LANDMARKS = 8  # Landmarks for A* lower bounds on larger worlds
+PATH_CACHE_SIZE = 4096  # Shortest paths kept per world graph (LRU)
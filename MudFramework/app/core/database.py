@@ -1,7 +1,19 @@
+"""
+Database engine, sessions and the offload pool for the event loop.
+
+The game runs on one event loop, and SQLAlchemy sessions block. Code on the
+loop (the WebSocket handler, the game engine, the player store) never opens
+a session itself: it hands the work to ``db_executor``, which runs it on a
+small thread pool and awaits the result, so a slow query only delays the
+command that made it.
+"""
+from typing import Callable, Dict, Optional
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import Histogram, TimedPool
 
 engine_kwargs = {}
 if settings.DATABASE_URL.startswith("sqlite"):
@@ -25,3 +37,64 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class DatabaseExecutor(TimedPool):
+    """Runs blocking database work on a thread pool and awaits it from the event loop."""
+
+    def __init__(self, session_factory=SessionLocal, threads: Optional[int] = None):
+        """
+        Args:
+            session_factory: Sessions handed to ``run`` callbacks
+            threads: Worker threads (default: one per pooled connection, so
+                a job never waits for a connection). 0 runs every job inline
+                on the event loop, blocking it, as the game did before.
+        """
+        super().__init__(settings.DB_POOL_SIZE if threads is None else threads, "db")
+        self.session_factory = session_factory
+        self.latency = Histogram()  # Running on the thread (ms)
+        self.queries: Dict[str, Histogram] = {}  # Running on the thread, by function (ms)
+
+        # Counters
+        self.errors = 0
+
+    async def run(self, fn: Callable, *args):
+        """``fn(session, *args)`` with a fresh session, closed afterwards."""
+        return await self._submit(fn.__qualname__, self._with_session, (fn, args))
+
+    async def call(self, fn: Callable, *args):
+        """``fn(*args)`` on a database thread."""
+        return await self._submit(fn.__qualname__, fn, args)
+
+    async def _submit(self, name: str, fn: Callable, args: tuple):
+        try:
+            result, run_ms = await self._offload(fn, args)
+        except Exception:
+            self.errors += 1
+            raise
+        self.latency.observe(run_ms)
+        query = self.queries.get(name)
+        if query is None:
+            query = self.queries[name] = Histogram()
+        query.observe(run_ms)
+        return result
+
+    def _with_session(self, fn: Callable, args: tuple):
+        with self.session_factory() as session:
+            return fn(session, *args)
+
+    def get_stats(self) -> Dict:
+        return {
+            "threads": self.threads,
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "wait_ms": self.wait.to_dict(),
+            "latency_ms": self.latency.to_dict(),
+            "queries_ms": {name: hist.to_dict() for name, hist in self.queries.items()},
+        }
+
+
+# Singleton instance
+db_executor = DatabaseExecutor()
@@ -14,10 +14,13 @@ class GameMessages:
     CANNOT_MOVE = "You cannot go that way."
     MOVED = "You move {direction}..."
     LOST_IN_VOID = "You were lost in the void and returned to reality."
+    PLAYER_LEAVES = "{name} leaves {direction}."
+    PLAYER_ARRIVES = "{name} arrives."
     
     # Combat
     IN_COMBAT = "You are in combat! Valid commands: attack, flee, use, skill"
     NOTHING_TO_HUNT = "There is nothing to hunt here."
+    ROOM_CLEARED = "Nothing left to hunt here. Come back later."
     FOUND_MOB = "You found a {mob_name}! Combat started!"
     FLEE_SUCCESS = "You fled successfully!"
     FLEE_FAILED = "Failed to flee!"
@@ -26,6 +29,7 @@ class GameMessages:
     # Inventory
     INVENTORY_EMPTY = "Inventory is empty."
     ITEM_NOT_FOUND = "You don't have that item."
+    INVENTORY_FULL = "You cannot carry any more {item_name}."
     ITEM_ALREADY_FULL_HP = "Your Health is already full!"
     ITEM_ALREADY_FULL_FLUX = "Your Flux is already full!"
     ITEM_USED = "You used {item_name} and recovered {amount} HP."
@@ -52,6 +56,8 @@ class GameMessages:
     CANNOT_TRANSFORM = "You cannot transform into that."
     TRANSFORMED = "You scream in power and transform into {form}!"
     POWER_MULTIPLIED = "Your power has multiplied!"
+    REVERTED = "Your aura fades as you return to your base form."
+    ALREADY_BASE_FORM = "You are already in your base form."
     
     # Quests
     NO_ACTIVE_QUESTS = "No active quests."
@@ -87,6 +93,13 @@ class GameMessages:
     FLUX_REGEN = "⚡ Regenerated {regen} Flux ({current}/{max})"
     FLUX_USED = "⚡ Used {cost} Flux ({current}/{max} remaining)"
     
+    # Admin
+    RELOAD_STARTED = "{source}Reloading game content..."
+    RELOAD_DONE = ("{source}Content reloaded: {records} records, {rooms} rooms, {mobs} mobs. "
+                   "Loaded in {load_ms} ms, swapped in {swap_ms} ms.")
+    RELOAD_REJECTED = "{source}Content reload rejected, nothing changed. {count} error(s): {errors}"
+    RELOAD_BUSY = "{source}A content reload is already running."
+    
     # System
     NEURAL_LINK_ESTABLISHED = "Neural Link Established."
     CONNECTION_LOST = "Connection Lost. Retrying..."
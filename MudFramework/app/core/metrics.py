@@ -0,0 +1,170 @@
+"""
+Lightweight in-process metrics.
+Fixed-bucket histograms cheap enough to record on every command, the timed
+thread pool behind the event loop's offloads, and their rendering in the
+Prometheus text format for scrapers.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Upper bounds in milliseconds; the last bucket catches everything above
+DEFAULT_LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Cumulative-free bucket histogram with count, sum and max."""
+
+    __slots__ = ("buckets", "_bounds", "counts", "count", "total", "max")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._bounds = tuple(map(float, self.buckets))  # bisect compares float to float faster than to int
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: upper bound of the bucket holding the q-th sample."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class TimedPool:
+    """
+    Thread pool awaited from the event loop, timing every job: the base of
+    the database and password hashing offloads.
+
+    ``wait`` records how long jobs queued before a thread picked them up;
+    subclasses record the run time ``_offload`` returns as they see fit.
+    With no threads, jobs run inline on the event loop, blocking it.
+    """
+
+    def __init__(self, threads: int, thread_name_prefix: str, initializer: Optional[Callable] = None):
+        self.threads = threads
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix=thread_name_prefix,
+                                        initializer=initializer) if threads else None
+        self.wait = Histogram()  # Queued before a thread picked the job up (ms)
+        self.in_flight = 0
+
+        # Counters
+        self.calls = 0
+        self.max_in_flight = 0
+
+    async def _offload(self, fn: Callable, args: tuple) -> Tuple[Any, float]:
+        """``fn(*args)`` on a thread: its result and how long it ran (ms)."""
+        queued = time.perf_counter()
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self._pool is None:
+                started, result, done = _timed(fn, args)
+            else:
+                loop = asyncio.get_running_loop()
+                started, result, done = await loop.run_in_executor(self._pool, _timed, fn, args)
+        finally:
+            self.in_flight -= 1
+        self.wait.observe((started - queued) * 1000)
+        return result, (done - started) * 1000
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and stop the threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+def _timed(fn: Callable, args: tuple):
+    started = time.perf_counter()
+    result = fn(*args)
+    return started, result, time.perf_counter()
+
+
+Labels = Dict[str, str]
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _number(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _series(name: str, labels: Optional[Labels]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class PrometheusText:
+    """
+    One scrape in the Prometheus text exposition format (version 0.0.4).
+
+    Histograms record milliseconds; they are exported in seconds, the
+    Prometheus base unit, so name them ``*_seconds``.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette adds the charset
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {_escape(help_text, quotes=False)}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], float]]) -> None:
+        self._family(name, "counter", help_text)
+        for labels, value in samples:
+            self.lines.append(f"{_series(name, labels)} {_number(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], float]]) -> None:
+        self._family(name, "gauge", help_text)
+        for labels, value in samples:
+            self.lines.append(f"{_series(name, labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], Histogram]]) -> None:
+        """Millisecond histograms as cumulative ``_bucket``, ``_sum`` and ``_count`` series in seconds."""
+        self._family(name, "histogram", help_text)
+        for labels, hist in samples:
+            labels = labels or {}
+            cumulative = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                self.lines.append(f"{_series(name + '_bucket', {**labels, 'le': f'{bound / 1000:g}'})} {cumulative}")
+            self.lines.append(f"{_series(name + '_bucket', {**labels, 'le': '+Inf'})} {hist.count}")
+            self.lines.append(f"{_series(name + '_sum', labels)} {_number(hist.total / 1000)}")
+            self.lines.append(f"{_series(name + '_count', labels)} {hist.count}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
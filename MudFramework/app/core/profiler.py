@@ -0,0 +1,190 @@
+"""
+Sampling profiler for the slowest commands.
+
+While it is on, a background thread looks at the event loop thread's stack
+every ``interval_ms`` and credits the sample to the command running there:
+the one whose ``CommandRegistry.dispatch`` frame is on the stack. The
+sampler needs the GIL to look, so profiling cuts the interpreter's switch
+interval to the sampling period until it is switched off; each sample still
+weighs the microseconds since the previous one rather than a fixed period.
+When a command finishes, its stacks are kept if it is one of the ``keep``
+slowest seen so far. ``folded()`` dumps them in the collapsed format
+flamegraph.pl, speedscope and inferno read, one root per kept command.
+
+Only time on the CPU is sampled: while a command awaits (a query on the
+database threads, another command holding the loop) its frames are off the
+stack. That time, and commands too short for a sample to land in, show up
+as an ``(unsampled)`` leaf, so each root is as wide as the command's wall
+time.
+"""
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+UNSAMPLED = "(unsampled)"
+
+
+class Probe:
+    """One command being profiled and the stacks sampled while it ran."""
+
+    __slots__ = ("name", "player_id", "frame", "start", "samples", "elapsed_ms")
+
+    def __init__(self, name: str, player_id: int, frame: FrameType):
+        self.name = name
+        self.player_id = player_id
+        self.frame: Optional[FrameType] = frame  # The dispatch frame, until the command ends
+        self.start = time.perf_counter()
+        self.samples: Counter = Counter()  # Folded stack -> microseconds
+        self.elapsed_ms = 0.0
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SlowCommandProfiler:
+    """Keeps sampled stacks of the ``keep`` slowest commands. Off while ``keep`` is 0."""
+
+    def __init__(self, keep: int = 0, interval_ms: float = 1.0):
+        self.keep = 0
+        self.interval_ms = interval_ms
+        self._probes: Dict[FrameType, Probe] = {}  # Running commands by their dispatch frame
+        self._slowest: List[Tuple[float, int, Probe]] = []  # Min-heap on elapsed ms
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._last_sample = 0.0
+        self._switch_interval: Optional[float] = None  # The interpreter's own, while profiling
+
+        # Counters
+        self.profiled = 0
+        self.samples = 0
+        self.sample_ms = 0.0  # Spent taking samples, holding the GIL
+
+        self.configure(keep, interval_ms)
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep > 0
+
+    def configure(self, keep: int, interval_ms: Optional[float] = None) -> None:
+        """Switch profiling on (``keep`` > 0) or off, dropping the stacks kept so far."""
+        if keep < 0:
+            raise ValueError("keep must be 0 or more.")
+        if interval_ms is not None:
+            if interval_ms <= 0:
+                raise ValueError("interval_ms must be positive.")
+            self.interval_ms = interval_ms
+        self._halt()
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+        if keep:
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.interval_ms / 1000))
+        with self._lock:
+            self.keep = keep
+            self._slowest = []
+            self.profiled = self.samples = 0
+            self.sample_ms = 0.0
+
+    def begin(self, name: str, player_id: int) -> Probe:
+        """Start profiling the command dispatched by the calling frame."""
+        probe = Probe(name, player_id, sys._getframe(1))
+        self._probes[probe.frame] = probe
+        if self._thread is None:
+            self._loop_thread = threading.get_ident()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._thread.start()
+        return probe
+
+    def end(self, probe: Probe, elapsed_ms: float) -> None:
+        """The command is done: keep its stacks if it is among the slowest."""
+        self._probes.pop(probe.frame, None)
+        probe.frame = None
+        with self._lock:
+            if not self.enabled:
+                return
+            self.profiled += 1
+            probe.elapsed_ms = elapsed_ms
+            entry = (elapsed_ms, next(self._order), probe)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif elapsed_ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def _halt(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._probes.clear()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval_ms / 1000):
+            if self._probes:
+                self.sample()
+
+    def sample(self) -> None:
+        """Credit the loop thread's current stack to the command running on it, if any."""
+        start = time.perf_counter()
+        since, self._last_sample = self._last_sample, start
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = []
+        while frame is not None:
+            probe = self._probes.get(frame)
+            if probe is not None:
+                weight = int((start - max(since, probe.start)) * 1e6)
+                with self._lock:
+                    probe.samples[";".join(reversed(stack))] += weight
+                    self.samples += 1
+                break
+            stack.append(frame_label(frame))
+            frame = frame.f_back
+        self.sample_ms += (time.perf_counter() - start) * 1000
+
+    def slowest(self) -> List[Probe]:
+        """The kept commands, slowest first."""
+        with self._lock:
+            return [probe for _, _, probe in sorted(self._slowest, reverse=True)]
+
+    def folded(self) -> str:
+        """Collapsed stacks (``frame;frame;... microseconds``) of the kept commands, slowest first."""
+        lines = []
+        for rank, probe in enumerate(self.slowest(), 1):
+            root = f"#{rank} {probe.name} [player {probe.player_id}, {probe.elapsed_ms:.1f} ms]"
+            with self._lock:
+                samples = list(probe.samples.items())
+            for stack, n in samples:
+                lines.append(f"{root};{stack} {n}" if stack else f"{root} {n}")
+            unsampled = int(probe.elapsed_ms * 1000) - sum(n for _, n in samples)
+            if unsampled > 0:
+                lines.append(f"{root};{UNSAMPLED} {unsampled}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "keep": self.keep,
+            "interval_ms": self.interval_ms,
+            "profiled_commands": self.profiled,
+            "samples": self.samples,
+            "sample_ms": round(self.sample_ms, 3),
+            "slowest_ms": [round(probe.elapsed_ms, 3) for probe in self.slowest()],
+        }
+
+
+# Singleton instance
+profiler = SlowCommandProfiler(settings.PROFILE_SLOWEST_COMMANDS, settings.PROFILE_INTERVAL_MS)
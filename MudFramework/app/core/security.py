@@ -1,11 +1,21 @@
 """
 Security utilities for password hashing and JWT token management.
+
+bcrypt is slow on purpose (a few hundred ms per hash at the default cost).
+The auth endpoints run on the event loop that also serves the game, so they
+never hash inline: ``password_hasher`` runs the hashes on a few low-priority
+threads (bcrypt releases the GIL) and refuses new work with ``HasherBusy``
+once its queue is full, which the app answers with a 503.
 """
+import os
+import sys
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Dict, Optional
 from passlib.context import CryptContext
 from jose import jwt
 from app.core.config import settings
+from app.core.metrics import Histogram, TimedPool
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -32,3 +42,81 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+class HasherBusy(Exception):
+    """Every hashing thread is busy and the queue is full: the client should retry later."""
+
+
+class PasswordHasher(TimedPool):
+    """Runs bcrypt on a bounded pool of threads and awaits it from the event loop."""
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 nice: Optional[int] = None):
+        """
+        Args:
+            workers: Hashing threads. 0 hashes inline on the event loop,
+                blocking it, as the endpoints did before.
+            queue_size: Jobs waiting for a thread before new ones are refused
+            nice: Niceness added to the hashing threads (Linux schedules
+                threads separately), so the event loop wins the CPU from them
+        """
+        self.queue_size = settings.AUTH_HASH_QUEUE if queue_size is None else queue_size
+        self.nice = settings.AUTH_HASH_NICE if nice is None else nice
+        super().__init__(settings.AUTH_HASH_WORKERS if workers is None else workers, "bcrypt",
+                         initializer=self._lower_priority)
+        self.latency: Dict[str, Histogram] = {"hash": Histogram(), "verify": Histogram()}  # Hashing (ms)
+
+        # Counters
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting for a thread."""
+        return max(0, self.in_flight - self.threads)
+
+    def is_full(self) -> bool:
+        return self._pool is not None and self.in_flight >= self.threads + self.queue_size
+
+    def ensure_capacity(self) -> None:
+        """Raise ``HasherBusy`` now if a job would be refused: lets endpoints skip their queries."""
+        if self.is_full():
+            self.rejected += 1
+            raise HasherBusy()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", get_password_hash, (password,))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit("verify", verify_password, (plain_password, hashed_password))
+
+    async def _submit(self, op: str, fn: Callable, args: tuple):
+        self.ensure_capacity()
+        result, run_ms = await self._offload(fn, args)
+        self.latency[op].observe(run_ms)
+        return result
+
+    def _lower_priority(self) -> None:
+        if self.nice and sys.platform.startswith("linux"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        return {
+            "workers": self.threads,
+            "queue_size": self.queue_size,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "wait_ms": self.wait.to_dict(),
+            "hash_ms": self.latency["hash"].to_dict(),
+            "verify_ms": self.latency["verify"].to_dict(),
+        }
+
+
+# Singleton instance
+password_hasher = PasswordHasher()
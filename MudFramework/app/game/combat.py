@@ -1,55 +1,161 @@
-import json
-import os
 import random
-from typing import Dict, Optional
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Union
+from app.game.content import load_table
 from app.game.skills_manager import skills_manager, Skill
 from app.core.constants import VITALIS_REGEN_PERCENT, GLACIAL_ICE_ARMOR_REDUCTION
 import logging
 
 logger = logging.getLogger(__name__)
 
-class Mob:
+def new_combat_seed() -> int:
+    """Seed for a new fight, recorded in combat_state so it can be replayed."""
+    return random.getrandbits(63)
+
+def combat_rng(seed: int, round_no: int) -> random.Random:
+    """RNG for one round of a fight: the same (seed, round) always rolls the same.
+
+    Round 0 is the hunt itself (mob selection); combat rounds count from 1.
+    """
+    return random.Random(f"{seed}:{round_no}")
+
+class MobTemplate:
+    """Immutable definition shared by every instance of a mob."""
+
+    __slots__ = ("id", "name", "description", "stats", "drops")
+
     def __init__(self, data: Dict):
         self.id = data["id"]
         self.name = data["name"]
         self.description = data["description"]
-        self.stats = data["stats"].copy() # Copy so instances don't share HP
-        self.drops = data.get("drops", [])
+        self.stats: Mapping = MappingProxyType(dict(data["stats"]))
+        self.drops = tuple(data.get("drops", ()))
+
+    def __deepcopy__(self, memo):
+        return self  # Immutable: copies of a mob keep sharing it
+
+    def __reduce__(self):
+        return MobTemplate, ({"id": self.id, "name": self.name, "description": self.description,
+                              "stats": dict(self.stats), "drops": list(self.drops)},)
+
+class MobStats(MutableMapping):
+    """A mob's stats: its own HP and buffs laid over the template's.
+
+    Writes never reach the template: ``hp`` goes to the instance, anything
+    else to its buff layer.
+    """
+
+    __slots__ = ("mob",)
+
+    def __init__(self, mob: "Mob"):
+        self.mob = mob
+
+    def __getitem__(self, key):
+        mob = self.mob
+        if key == "hp":
+            return mob.hp
+        if mob.buffs and key in mob.buffs:
+            return mob.buffs[key]
+        return mob.template.stats[key]
+
+    def __setitem__(self, key, value):
+        mob = self.mob
+        if key == "hp":
+            mob.hp = value
+        else:
+            if mob.buffs is None:
+                mob.buffs = {}
+            mob.buffs[key] = value
+
+    def __delitem__(self, key):
+        mob = self.mob
+        if not mob.buffs or key not in mob.buffs:
+            raise KeyError(key)  # HP and template stats can't be removed
+        del mob.buffs[key]
+
+    def __iter__(self):
+        mob = self.mob
+        yield from mob.template.stats
+        if mob.buffs:
+            yield from (key for key in mob.buffs if key not in mob.template.stats)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict:
+        return dict(self)
+
+class Mob:
+    """A live mob: a flyweight over its ``MobTemplate`` holding only HP and buffs."""
+
+    __slots__ = ("template", "hp", "buffs")
+
+    def __init__(self, data: Union[MobTemplate, Dict]):
+        self.template = data if isinstance(data, MobTemplate) else MobTemplate(data)
+        self.hp = self.template.stats["hp"]
+        self.buffs: Optional[Dict] = None  # Stats changed for this instance only
+
+    @property
+    def id(self) -> str:
+        return self.template.id
+
+    @property
+    def name(self) -> str:
+        return self.template.name
+
+    @property
+    def description(self) -> str:
+        return self.template.description
+
+    @property
+    def drops(self):
+        return self.template.drops
+
+    @property
+    def stats(self) -> MobStats:
+        return MobStats(self)
+
+    @stats.setter
+    def stats(self, values: Dict):
+        """Restore saved stats (e.g. from ``combat_state``): keeps only what differs from the template."""
+        base = self.template.stats
+        self.hp = values.get("hp", base["hp"])
+        self.buffs = {k: v for k, v in values.items() if k != "hp" and base.get(k) != v} or None
 
 class CombatSystem:
     def __init__(self, manager):
         self.manager = manager
         self.mobs_data: Dict[str, Dict] = {}
+        self.templates: Dict[str, MobTemplate] = {}  # Shared by every spawned instance
         self.load_mobs()
 
     def load_mobs(self):
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(base_path, "data", "mobs.json")
         try:
-            with open(data_path, "r") as f:
-                self.mobs_data = json.load(f)
+            self.mobs_data = load_table("mobs")
+            self.templates = {mob_id: MobTemplate(data) for mob_id, data in self.mobs_data.items()}
             logger.info(f"Loaded {len(self.mobs_data)} mobs.")
         except Exception as e:
             logger.error(f"Error loading mobs: {e}", exc_info=True)
 
     def spawn_mob(self, mob_id: str) -> Optional[Mob]:
-        data = self.mobs_data.get(mob_id)
-        if data:
-            return Mob(data)
+        template = self.templates.get(mob_id)
+        if template:
+            return Mob(template)
         return None
 
-    def calculate_damage(self, attacker_stats: Dict, defender_stats: Dict, defense_pierce: int = 0) -> int:
+    def calculate_damage(self, attacker_stats: Dict, defender_stats: Dict, defense_pierce: int = 0, rng=random) -> int:
         # Simple formula: Damage = STR * 2 - VIT
         vit = defender_stats.get("vit", 0)
         if defense_pierce > 0:
             vit = int(vit * (1 - defense_pierce / 100))
         dmg = (attacker_stats.get("str", 0) * 2) - vit
         # Random variance +/- 10%
-        variance = random.uniform(0.9, 1.1)
+        variance = rng.uniform(0.9, 1.1)
         final_dmg = int(max(1, dmg) * variance)
         return final_dmg
 
-    def calculate_skill_damage(self, player_stats: Dict, skill: Skill) -> int:
+    def calculate_skill_damage(self, player_stats: Dict, skill: Skill, rng=random) -> int:
         """Calculate damage for a skill."""
         if skill.stat_type == "str":
             base = player_stats.get("str", 0)
@@ -61,10 +167,13 @@ class CombatSystem:
             base = player_stats.get("str", 0)
         
         dmg = int(base * skill.damage_multiplier)
-        variance = random.uniform(0.9, 1.1)
+        variance = rng.uniform(0.9, 1.1)
         return int(dmg * variance)
 
-    async def combat_round(self, player, mob: Mob, action: str, skill: Optional[Skill] = None):
+    async def combat_round(self, player, mob: Mob, action: str, skill: Optional[Skill] = None, rng=None):
+        # rng: random.Random stream for this fight (defaults to the global one)
+        rng = rng or random
+
         # Apply passive abilities at start of round
         results = []
         player_race = getattr(player, 'race', None)
@@ -89,9 +198,9 @@ class CombatSystem:
             
             if skill.damage_multiplier > 0 and not skill.skip_attack:
                 if skill.ignores_defense:
-                    player_dmg = self.calculate_skill_damage(player.stats, skill)
+                    player_dmg = self.calculate_skill_damage(player.stats, skill, rng)
                 else:
-                    player_dmg = self.calculate_skill_damage(player.stats, skill)
+                    player_dmg = self.calculate_skill_damage(player.stats, skill, rng)
                     if skill.defense_pierce_percent > 0:
                         # Reduce effectiveness of mob VIT
                         vit_mod = mob.stats.get("vit", 0) * (skill.defense_pierce_percent / 100)
@@ -112,7 +221,7 @@ class CombatSystem:
             if skill.damage_reduction > 0:
                 results.append(f"You activate {skill.name}! Damage reduced this round.")
         elif action == "attack":
-            player_dmg = self.calculate_damage(player.stats, mob.stats)
+            player_dmg = self.calculate_damage(player.stats, mob.stats, rng=rng)
             
             # Terran: Tactical Mind - track defeated mobs for bonus damage
             # (Would need mob tracking in player stats - simplified for now)
@@ -129,14 +238,14 @@ class CombatSystem:
             
             loot = []
             for drop in mob.drops:
-                if random.random() < drop["rate"]:
+                if rng.random() < drop["rate"]:
                     loot.append(drop["item_id"])
                     
             return {"status": "win", "log": results, "exp": mob.stats["exp"], "loot": loot}
 
         # 2. Mob Action (if not skipped)
         if not skip_mob_attack:
-            mob_dmg = self.calculate_damage(mob.stats, player.stats)
+            mob_dmg = self.calculate_damage(mob.stats, player.stats, rng=rng)
             
             # Apply damage reduction if skill used
             if skill and skill.damage_reduction > 0:
@@ -0,0 +1,270 @@
+"""
+Vectorized combat resolution.
+
+``CombatBatch`` takes N pending fights (player, mob, action/skill) and
+resolves their rounds in one pass over NumPy arrays: damage, variance, the
+Vitalis and Glacial passives, deaths and loot rolls. It follows
+``CombatSystem.combat_round`` step for step, so a round resolved here has
+exactly the same outcome, HP changes and log as the scalar path given the
+same random stream.
+
+Each fight draws from its own ``random.Random`` in the same order as the
+scalar path: the player's damage variance first, then either the loot rolls
+(mob died) or the mob's damage variance. Fights that share one stream (e.g.
+the module-level ``random``) still resolve correctly but draw in a different
+order than N sequential ``combat_round`` calls.
+
+State lives in the arrays between rounds; ``write_back`` copies HP to the
+players' and mobs' ``stats`` dicts. ``resolve_batch`` is the one-round
+convenience wrapper.
+"""
+import random
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.constants import VITALIS_REGEN_PERCENT, GLACIAL_ICE_ARMOR_REDUCTION
+from app.game.skills_manager import Skill
+
+# Fight outcomes in CombatBatch.status
+CONTINUE, WIN, LOSS = 0, 1, 2
+
+
+class PendingRound:
+    """One player-vs-mob fight waiting to be resolved."""
+
+    __slots__ = ("player", "mob", "action", "skill", "rng")
+
+    def __init__(self, player, mob, action: str = "attack", skill: Optional[Skill] = None, rng=None):
+        self.player = player
+        self.mob = mob
+        self.action = action
+        self.skill = skill
+        self.rng = rng or random
+
+
+def _trunc(values: np.ndarray) -> np.ndarray:
+    """int() for arrays: truncate toward zero."""
+    return np.trunc(values).astype(np.int64)
+
+
+class CombatBatch:
+    """Struct-of-arrays state for N fights, stepped one round at a time."""
+
+    def __init__(self, rounds: Sequence[PendingRound]):
+        self.rounds = list(rounds)
+        n = len(self.rounds)
+
+        # One pass per side to pull the stats into columns
+        p_cols = np.array(
+            [(s["hp"], s.get("max_hp", 100), s.get("str", 0), s.get("dex", 0), s.get("int", 0), s.get("vit", 0))
+             for s in (r.player.stats for r in self.rounds)], dtype=np.int64).reshape(n, 6).T
+        m_cols = np.array(
+            [(s["hp"], s.get("str", 0), s.get("vit", 0))
+             for s in (r.mob.stats for r in self.rounds)], dtype=np.int64).reshape(n, 3).T
+        self.p_hp, self.p_max_hp, self.p_str, self.p_dex, self.p_int, self.p_vit = (c.copy() for c in p_cols)
+        self.m_hp, self.m_str, self.m_vit = (c.copy() for c in m_cols)
+
+        races = [getattr(r.player, "race", None) for r in self.rounds]
+        self.vitalis = np.array([race == "Vitalis" for race in races], dtype=bool)
+        self.glacial = np.array([race == "Glacial" for race in races], dtype=bool)
+
+        # Skills: one table row per distinct skill (row 0 = no skill), gathered per fight
+        table: Dict[int, int] = {}
+        skill_rows: List[Optional[Skill]] = [None]
+        index = []
+        for r in self.rounds:
+            if r.skill is None:
+                index.append(0)
+                continue
+            row = table.get(id(r.skill))
+            if row is None:
+                row = table[id(r.skill)] = len(skill_rows)
+                skill_rows.append(r.skill)
+            index.append(row)
+        index = np.array(index, dtype=np.int64)
+
+        def skill_column(attr, dtype=np.float64):
+            return np.array([getattr(s, attr) if s else 0 for s in skill_rows], dtype=dtype)[index]
+
+        self.has_skill = index > 0
+        self.heal_percent = skill_column("heal_percent")
+        self.damage_multiplier = skill_column("damage_multiplier")
+        self.pierce_percent = skill_column("defense_pierce_percent")
+        self.hp_cost_percent = skill_column("hp_cost_percent")
+        self.damage_reduction = skill_column("damage_reduction")
+        self.skip_attack = skill_column("skip_attack", bool)
+        self.ignores_defense = skill_column("ignores_defense", bool)
+        self.skip_enemy = skill_column("skip_enemy_turn", bool)
+        self.stat_type = np.array([s.stat_type if s else "" for s in skill_rows])[index]
+        self.is_attack = ~self.has_skill & np.array([r.action == "attack" for r in self.rounds], dtype=bool)
+
+        self.status = np.zeros(n, dtype=np.int8)
+        self.rounds_fought = np.zeros(n, dtype=np.int64)
+        self.loot: List[List[str]] = [[] for _ in range(n)]
+
+    def _variance(self, rows: np.ndarray) -> np.ndarray:
+        """Draw ``uniform(0.9, 1.1)`` for each row from its own stream."""
+        rounds = self.rounds
+        u = np.array([rounds[i].rng.random() for i in rows.tolist()], dtype=np.float64)
+        # Same expression as random.uniform so the doubles match bit for bit
+        return 0.9 + (1.1 - 0.9) * u
+
+    def step(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Resolve one round for ``rows`` (fight indexes) and update the HP arrays.
+
+        Returns the per-row intermediate columns (damage dealt, regen, ...)
+        used to build the round logs.
+        """
+        p_hp, m_hp = self.p_hp[rows], self.m_hp[rows]
+        p_max_hp, m_vit = self.p_max_hp[rows], self.m_vit[rows]
+        has_skill, is_attack = self.has_skill[rows], self.is_attack[rows]
+
+        # Vitalis regeneration at the start of the round
+        vitalis = self.vitalis[rows]
+        regen = _trunc(p_max_hp * VITALIS_REGEN_PERCENT)
+        p_hp = np.where(vitalis, np.minimum(p_max_hp, p_hp + regen), p_hp)
+
+        # 1. Player action: skill heal, then skill damage or a basic attack
+        heals = has_skill & (self.heal_percent[rows] > 0)
+        heal = _trunc(p_max_hp * self.heal_percent[rows] / 100)
+        p_hp = np.where(heals, np.minimum(p_max_hp, p_hp + heal), p_hp)
+
+        damage_multiplier = self.damage_multiplier[rows]
+        skill_hits = has_skill & (damage_multiplier > 0) & ~self.skip_attack[rows]
+        hits = skill_hits | is_attack
+        variance = np.ones(len(rows))
+        variance[hits] = self._variance(rows[hits])
+
+        p_str, stat_type = self.p_str[rows], self.stat_type[rows]
+        base = np.select(
+            [stat_type == "int", stat_type == "str_dex"],
+            [self.p_int[rows], p_str + self.p_dex[rows]],
+            default=p_str,
+        )
+        skill_dmg = _trunc(_trunc(base * damage_multiplier) * variance)
+        pierce_percent = self.pierce_percent[rows]
+        pierces = ~self.ignores_defense[rows] & (pierce_percent > 0)
+        skill_dmg -= np.where(pierces, _trunc(m_vit * (pierce_percent / 100)), 0)
+        attack_dmg = _trunc(np.maximum(1, p_str * 2 - m_vit) * variance)
+        player_dmg = np.select([skill_hits, is_attack], [skill_dmg, attack_dmg], default=0)
+
+        hp_cost_percent = self.hp_cost_percent[rows]
+        pays_hp = skill_hits & (hp_cost_percent > 0)
+        hp_cost = np.where(pays_hp, _trunc(p_hp * hp_cost_percent / 100), 0)
+        p_hp -= hp_cost
+        m_hp -= player_dmg
+
+        # Mob death, otherwise the mob's counterattack
+        dead = m_hp <= 0
+        mob_attacks = ~dead & ~(has_skill & self.skip_enemy[rows])
+        mob_variance = np.ones(len(rows))
+        mob_variance[mob_attacks] = self._variance(rows[mob_attacks])
+
+        mob_dmg = _trunc(np.maximum(1, self.m_str[rows] * 2 - self.p_vit[rows]) * mob_variance)
+        damage_reduction = self.damage_reduction[rows]
+        shielded = has_skill & (damage_reduction > 0)
+        mob_dmg = np.where(shielded, _trunc(mob_dmg * (1 - damage_reduction)), mob_dmg)
+        glacial = self.glacial[rows]
+        ice = np.where(glacial, _trunc(mob_dmg * GLACIAL_ICE_ARMOR_REDUCTION), 0)
+        mob_dmg -= ice
+        p_hp = np.where(mob_attacks, p_hp - mob_dmg, p_hp)
+        lost = mob_attacks & (p_hp <= 0)
+
+        self.p_hp[rows], self.m_hp[rows] = p_hp, m_hp
+        self.rounds_fought[rows] += 1
+        self.status[rows[dead]] = WIN
+        self.status[rows[lost]] = LOSS
+        for i in rows[dead].tolist():
+            r = self.rounds[i]
+            self.loot[i] = [drop["item_id"] for drop in r.mob.drops if r.rng.random() < drop["rate"]]
+
+        return {
+            "vitalis": vitalis, "regen": regen, "heals": heals, "heal": heal,
+            "skill_hits": skill_hits, "pays_hp": pays_hp, "hp_cost": hp_cost,
+            "player_dmg": player_dmg, "dead": dead, "mob_attacks": mob_attacks,
+            "shielded": shielded, "glacial": glacial, "ice": ice,
+            "mob_dmg": mob_dmg, "lost": lost,
+        }
+
+    def run(self, max_rounds: int = 100) -> None:
+        """Fight every battle to a win or loss (or ``max_rounds``) without logs."""
+        active = np.flatnonzero(self.status == CONTINUE)
+        for _ in range(max_rounds):
+            if not len(active):
+                break
+            self.step(active)
+            active = active[self.status[active] == CONTINUE]
+
+    def write_back(self) -> None:
+        """Copy HP from the arrays back into the players' and mobs' stats."""
+        for r, p_hp, m_hp in zip(self.rounds, self.p_hp.tolist(), self.m_hp.tolist()):
+            r.player.stats["hp"] = p_hp
+            r.mob.stats["hp"] = m_hp
+
+    def results(self, columns: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+        """``combat_round``-style results for the last round of every fight."""
+        if columns is not None:
+            columns = {name: values.tolist() for name, values in columns.items()}
+        results = []
+        for i, (r, status, p_hp, m_hp) in enumerate(
+                zip(self.rounds, self.status.tolist(), self.p_hp.tolist(), self.m_hp.tolist())):
+            log = _round_log(r, i, columns) if columns is not None else []
+            if status == WIN:
+                results.append({"status": "win", "log": log, "exp": r.mob.stats["exp"], "loot": self.loot[i]})
+            elif status == LOSS:
+                results.append({"status": "loss", "log": log})
+            else:
+                results.append({"status": "continue", "log": log, "mob_hp": m_hp, "player_hp": p_hp})
+        return results
+
+
+def resolve_batch(rounds: Sequence[PendingRound], with_log: bool = True) -> List[Dict]:
+    """Resolve one round of every fight, like N ``combat_round`` calls.
+
+    Player and mob HP are written back to their ``stats`` dicts. Pass
+    ``with_log=False`` to skip building the log lines.
+    """
+    if not rounds:
+        return []
+    batch = CombatBatch(rounds)
+    columns = batch.step(np.arange(len(batch.rounds)))
+    batch.write_back()
+    return batch.results(columns if with_log else None)
+
+
+def _round_log(r: PendingRound, i: int, v: Dict[str, list]) -> List[str]:
+    """Rebuild the scalar log for row ``i`` from the step columns in ``v``."""
+    log = []
+    skill, mob = r.skill, r.mob
+    if v["vitalis"][i]:
+        log.append(f"[Regeneration] You recover {v['regen'][i]} HP!")
+
+    if skill:
+        if v["heals"][i]:
+            log.append(f"You used {skill.name} and recovered {v['heal'][i]} HP!")
+        if v["skill_hits"][i]:
+            if v["pays_hp"][i]:
+                log.append(f"You sacrificed {v['hp_cost'][i]} HP!")
+            log.append(f"You used {skill.name} and dealt {v['player_dmg'][i]} damage!")
+        if skill.skip_enemy_turn:
+            log.append(f"{mob.name} is frozen in time!")
+        if skill.damage_reduction > 0:
+            log.append(f"You activate {skill.name}! Damage reduced this round.")
+    elif r.action == "attack":
+        log.append(f"You hit {mob.name} for {v['player_dmg'][i]} damage!")
+    else:
+        log.append(f"You perform {r.action}...")
+
+    if v["dead"][i]:
+        log.append(f"{mob.name} is defeated!")
+        log.append(f"You gain {mob.stats['exp']} EXP.")
+    elif v["mob_attacks"][i]:
+        if v["shielded"][i]:
+            log.append("Your shield absorbs some damage!")
+        if v["glacial"][i]:
+            log.append(f"[Ice Armor] Reduced damage by {v['ice'][i]}!")
+        log.append(f"{mob.name} attacks you for {v['mob_dmg'][i]} damage!")
+        if v["lost"][i]:
+            log.append("You have been defeated...")
+    return log
@@ -0,0 +1,127 @@
+"""
+Command registry and router for the game engine.
+
+Handlers register themselves with the ``command`` decorator and are looked
+up by verb or alias in O(1). Each command declares whether it is usable in
+combat, out of combat or both; the router keeps one table per state so the
+same alias (e.g. ``sk``) can mean different commands in and out of combat.
+
+Handlers share one signature: ``async def handler(engine, player, cmd, db)``,
+so ``GameEngine`` methods and plain functions from other modules register
+the same way. ``db`` is a ``DatabaseExecutor``, never a session: handlers
+``await db.run(query)`` so their queries do not block the event loop.
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.metrics import Histogram
+from app.core.profiler import profiler
+
+# Combat gating
+OUT_OF_COMBAT = "out_of_combat"
+IN_COMBAT = "in_combat"
+ANY_STATE = "any"
+
+
+class ParsedCommand:
+    """A command split once into verb and arguments."""
+
+    __slots__ = ("verb", "args", "text")
+
+    def __init__(self, verb: str, args: List[str]):
+        self.verb = verb
+        self.args = args
+        self.text = " ".join(args)  # Arguments re-joined, for name lookups
+
+    @classmethod
+    def parse(cls, raw: str) -> Optional["ParsedCommand"]:
+        parts = raw.strip().split()
+        if not parts:
+            return None
+        return cls(parts[0].lower(), parts[1:])
+
+
+class Command:
+    """A registered command and its dispatch policy."""
+
+    __slots__ = ("name", "handler", "verbs", "combat", "debug_only", "admin_only")
+
+    def __init__(self, name: str, handler: Callable, verbs: tuple, combat: str, debug_only: bool,
+                 admin_only: bool = False):
+        self.name = name
+        self.handler = handler
+        self.verbs = verbs
+        self.combat = combat
+        self.debug_only = debug_only
+        self.admin_only = admin_only
+
+
+class CommandRegistry:
+    """Verb -> command tables plus per-command latency metrics."""
+
+    def __init__(self):
+        self._normal: Dict[str, Command] = {}
+        self._combat: Dict[str, Command] = {}
+        self.commands: Dict[str, Command] = {}
+        self.latency: Dict[str, Histogram] = {}
+
+    def register(self, *verbs: str, combat: str = OUT_OF_COMBAT, debug_only: bool = False,
+                 admin_only: bool = False):
+        """
+        Decorator registering a handler for one or more verbs.
+
+        Args:
+            verbs: Canonical verb first, then aliases
+            combat: OUT_OF_COMBAT, IN_COMBAT or ANY_STATE
+            debug_only: Only dispatch when settings.DEBUG_MODE is on
+            admin_only: Only dispatch for users listed in settings.ADMIN_USERNAMES
+        """
+        if not verbs:
+            raise ValueError("A command needs at least one verb.")
+        if combat not in (OUT_OF_COMBAT, IN_COMBAT, ANY_STATE):
+            raise ValueError(f"Unknown combat policy '{combat}'.")
+
+        def decorator(handler: Callable) -> Callable:
+            name = verbs[0]
+            entry = Command(name, handler, verbs, combat, debug_only, admin_only)
+            tables = []
+            if combat in (OUT_OF_COMBAT, ANY_STATE):
+                tables.append(self._normal)
+            if combat in (IN_COMBAT, ANY_STATE):
+                tables.append(self._combat)
+            for table in tables:
+                for verb in verbs:
+                    if verb in table:
+                        raise ValueError(f"Verb '{verb}' is already registered to '{table[verb].name}'.")
+                    table[verb] = entry
+            self.commands[name] = entry
+            self.latency[name] = Histogram()
+            return handler
+
+        return decorator
+
+    def resolve(self, verb: str, in_combat: bool) -> Optional[Command]:
+        table = self._combat if in_combat else self._normal
+        return table.get(verb)
+
+    async def dispatch(self, entry: Command, engine, player, cmd: ParsedCommand, db) -> None:
+        """Run a resolved command, recording its latency (and its stacks, while the profiler is on)."""
+        probe = profiler.begin(entry.name, player.id) if profiler.enabled else None
+        start = time.perf_counter()
+        try:
+            await entry.handler(engine, player, cmd, db)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.latency[entry.name].observe(elapsed_ms)
+            if probe is not None:
+                profiler.end(probe, elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-command call counts and latency histograms (ms), busiest first."""
+        stats = {name: hist.to_dict() for name, hist in self.latency.items() if hist.count}
+        return dict(sorted(stats.items(), key=lambda kv: kv[1]["count"] * kv[1]["avg"], reverse=True))
+
+
+# Singleton registry; other modules can add commands with @command(...)
+commands = CommandRegistry()
+command = commands.register
@@ -0,0 +1,364 @@
+"""
+Game content: validation and the precompiled content bundle.
+
+The JSON files in ``app/game/data`` are the source of truth. ``validate_content``
+checks every table (required fields and their types) and resolves the
+references between them: room exits and mobs, mob drops, shop stock, NPC rooms
+and quests, quest targets and rewards, skill races and race transformations.
+
+``build_bundle`` writes the validated tables into one binary file that the
+game singletons load at startup instead of parsing JSON::
+
+    header      magic, format version, marshal version, Python version, table count
+    manifest    name, size and mtime of every source file
+    directory   name, offset and length of every table
+    payload     one marshal blob per table
+
+The file is memory-mapped and each table is unmarshalled straight from the
+mapping when it is first asked for. ``load_table`` uses the bundle only when
+it was built by this Python and its manifest still matches the JSON files;
+otherwise it falls back to the JSON, so a stale or missing bundle never
+changes what the game loads.
+
+    python -m app.game.content check
+    python -m app.game.content build
+"""
+import argparse
+import json
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.game.transformations import TRANSFORMATIONS
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BUNDLE_PATH = os.path.join(DATA_DIR, "content.bundle")
+
+TABLES = ("rooms", "mobs", "items", "shops", "npcs", "quests", "skills", "races")
+
+MAGIC = b"MUDC"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHBBH")  # magic, format, marshal version, python major/minor, tables
+_ENTRY = struct.Struct("<16sQQ")     # name, size/offset, mtime_ns/length
+
+# Required fields per table: field -> accepted types
+SCHEMAS = {
+    "rooms": {"id": str, "name": str, "description": str, "exits": dict, "mobs": list},
+    "mobs": {"id": str, "name": str, "description": str, "stats": dict, "drops": list},
+    "items": {"id": str, "name": str, "type": str, "description": str},
+    "shops": {"name": str, "inventory": list},
+    "npcs": {"id": str, "name": str, "room_id": str, "dialogue": dict},
+    "quests": {"id": str, "title": str, "type": str, "count": int, "reward": dict},
+    "skills": {"id": str, "name": str, "type": str, "description": str, "level_required": int},
+    "races": {"name": str, "base_stats": dict, "scaling_stats": dict, "transformations": list},
+}
+# Tables whose records repeat their key in a field (NPCs are found by room, their keys are free)
+KEY_FIELDS = {"rooms": "id", "mobs": "id", "items": "id", "quests": "id", "skills": "id", "races": "name"}
+
+
+class ContentError(ValueError):
+    """Game content failed validation."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        more = f" (and {len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} content error(s): " + "; ".join(errors[:10]) + more)
+
+
+class ContentReport:
+    """What validation looked at and what it found."""
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self.records = 0
+        self.fields = 0
+        self.references = 0
+
+    def field(self, where: str, record: Dict, name: str, types) -> bool:
+        self.fields += 1
+        if name not in record:
+            self.errors.append(f"{where}: missing '{name}'")
+            return False
+        if not isinstance(record[name], types) or isinstance(record[name], bool) and types is int:
+            expected = " or ".join(t.__name__ for t in types) if isinstance(types, tuple) else types.__name__
+            self.errors.append(f"{where}: '{name}' should be {expected}")
+            return False
+        return True
+
+    def reference(self, where: str, target: str, value, table: Dict) -> None:
+        self.references += 1
+        if value not in table:
+            self.errors.append(f"{where}: unknown {target} '{value}'")
+
+    def get_stats(self) -> Dict:
+        return {"records": self.records, "fields": self.fields, "references": self.references,
+                "errors": len(self.errors)}
+
+
+def json_path(name: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, f"{name}.json")
+
+
+def load_json_content(data_dir: str = DATA_DIR) -> Dict[str, Dict]:
+    content = {}
+    for name in TABLES:
+        with open(json_path(name, data_dir), "r") as f:
+            content[name] = json.load(f)
+    return content
+
+
+def validate_content(content: Dict[str, Dict]) -> ContentReport:
+    """Check every record's fields and every cross-table reference."""
+    report = ContentReport()
+    for name in TABLES:
+        table = content.get(name)
+        if not isinstance(table, dict):
+            report.errors.append(f"{name}: expected an object keyed by id")
+            content[name] = {}
+            continue
+        for key, record in table.items():
+            report.records += 1
+            where = f"{name}.{key}"
+            if not isinstance(record, dict):
+                report.errors.append(f"{where}: expected an object")
+                continue
+            for field, types in SCHEMAS[name].items():
+                if field in ("mobs", "drops") and field not in record:
+                    continue  # Optional lists
+                report.field(where, record, field, types)
+            key_field = KEY_FIELDS.get(name)
+            if key_field and record.get(key_field, key) != key:
+                report.errors.append(f"{where}: {key_field} '{record.get(key_field)}' does not match its key")
+
+    rooms, mobs, items = content["rooms"], content["mobs"], content["items"]
+    shops, quests, races = content["shops"], content["quests"], content["races"]
+
+    room_shops = set()
+    for room_id, room in rooms.items():
+        if not isinstance(room, dict):
+            continue
+        for direction, target in _items(room.get("exits")):
+            report.reference(f"rooms.{room_id}.exits.{direction}", "room", target, rooms)
+        for mob_id in _values(room.get("mobs")):
+            report.reference(f"rooms.{room_id}.mobs", "mob", mob_id, mobs)
+        if room.get("shop_id") is not None:
+            report.reference(f"rooms.{room_id}.shop_id", "shop", room["shop_id"], shops)
+            room_shops.add(room["shop_id"])
+
+    for mob_id, mob in mobs.items():
+        if not isinstance(mob, dict):
+            continue
+        stats = mob.get("stats")
+        if isinstance(stats, dict):
+            report.field(f"mobs.{mob_id}.stats", stats, "hp", int)
+        for drop in _values(mob.get("drops")):
+            where = f"mobs.{mob_id}.drops"
+            if not isinstance(drop, dict) or not report.field(where, drop, "item_id", str):
+                continue
+            report.reference(where, "item", drop["item_id"], items)
+            if report.field(where, drop, "rate", (int, float)) and not 0 <= drop["rate"] <= 1:
+                report.errors.append(f"{where}: rate {drop['rate']} is not between 0 and 1")
+
+    for item_id, item in items.items():
+        if isinstance(item, dict) and "stack" in item:
+            where = f"items.{item_id}"
+            if report.field(where, item, "stack", int) and item["stack"] < 1:
+                report.errors.append(f"{where}: stack {item['stack']} is not a positive count")
+
+    for shop_id, shop in shops.items():
+        if not isinstance(shop, dict):
+            continue
+        if shop_id not in room_shops:
+            # Shops are keyed by their room, or named by a room's shop_id
+            report.reference(f"shops.{shop_id}", "room", shop_id, rooms)
+        for item_id in _values(shop.get("inventory")):
+            report.reference(f"shops.{shop_id}.inventory", "item", item_id, items)
+
+    for npc_id, npc in content["npcs"].items():
+        if not isinstance(npc, dict):
+            continue
+        if "room_id" in npc:
+            report.reference(f"npcs.{npc_id}.room_id", "room", npc["room_id"], rooms)
+        if npc.get("quest_id") is not None:
+            report.reference(f"npcs.{npc_id}.quest_id", "quest", npc["quest_id"], quests)
+
+    for quest_id, quest in quests.items():
+        if not isinstance(quest, dict):
+            continue
+        if quest.get("type") == "kill":
+            report.reference(f"quests.{quest_id}.target", "mob", quest.get("target"), mobs)
+        reward = quest.get("reward")
+        if isinstance(reward, dict) and reward.get("item") is not None:
+            report.reference(f"quests.{quest_id}.reward.item", "item", reward["item"], items)
+
+    for skill_id, skill in content["skills"].items():
+        if isinstance(skill, dict) and skill.get("race_required") is not None:
+            report.reference(f"skills.{skill_id}.race_required", "race", skill["race_required"], races)
+
+    for race_id, race in races.items():
+        if not isinstance(race, dict):
+            continue
+        for form in _values(race.get("transformations")):
+            report.reference(f"races.{race_id}.transformations", "transformation", form, TRANSFORMATIONS)
+
+    return report
+
+
+def _items(value):
+    return value.items() if isinstance(value, dict) else ()
+
+
+def _values(value):
+    return value if isinstance(value, list) else ()
+
+
+# --- Bundle ---
+
+def _manifest(data_dir: str) -> List[Tuple[str, int, int]]:
+    entries = []
+    for name in TABLES:
+        st = os.stat(json_path(name, data_dir))
+        entries.append((name, st.st_size, st.st_mtime_ns))
+    return entries
+
+
+def build_bundle(data_dir: str = DATA_DIR, path: Optional[str] = None) -> ContentReport:
+    """Validate the JSON content and write the bundle; raises ContentError when invalid."""
+    path = path or os.path.join(data_dir, "content.bundle")
+    manifest = _manifest(data_dir)
+    content = load_json_content(data_dir)
+    report = validate_content(content)
+    if report.errors:
+        raise ContentError(report.errors)
+
+    blobs = [(name, marshal.dumps(_interned(content[name]))) for name in TABLES]
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, *sys.version_info[:2], len(TABLES))
+    offset = _HEADER.size + 2 * _ENTRY.size * len(TABLES)
+    parts = [header]
+    parts += [_ENTRY.pack(name.encode(), size, mtime) for name, size, mtime in manifest]
+    for name, blob in blobs:
+        parts.append(_ENTRY.pack(name.encode(), offset, len(blob)))
+        offset += len(blob)
+    parts += [blob for _, blob in blobs]
+
+    # Write next to the target and rename, so a running server never maps a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+    return report
+
+
+def _interned(value):
+    """Intern strings, so marshal writes repeats (ids, stat names) once and loading shares them."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(k) if isinstance(k, str) else k: _interned(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_interned(v) for v in value]
+    return value
+
+
+class ContentBundle:
+    """A memory-mapped content bundle; tables are unmarshalled on first use."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, marshal_version, major, minor, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} content bundle")
+        self.compatible = marshal_version == marshal.version and (major, minor) == sys.version_info[:2]
+
+        pos = _HEADER.size
+        self.manifest: List[Tuple[str, int, int]] = []
+        for _ in range(count):
+            name, size, mtime = _ENTRY.unpack_from(self._map, pos)
+            self.manifest.append((name.rstrip(b"\0").decode(), size, mtime))
+            pos += _ENTRY.size
+        self.directory: Dict[str, Tuple[int, int]] = {}
+        for _ in range(count):
+            name, offset, length = _ENTRY.unpack_from(self._map, pos)
+            self.directory[name.rstrip(b"\0").decode()] = (offset, length)
+            pos += _ENTRY.size
+
+    def is_current(self, data_dir: str = DATA_DIR) -> bool:
+        """Built by this Python from the JSON files as they are now."""
+        try:
+            return self.compatible and self.manifest == _manifest(data_dir)
+        except OSError:
+            return False
+
+    def table(self, name: str) -> Dict:
+        offset, length = self.directory[name]
+        with memoryview(self._map) as view:
+            return marshal.loads(view[offset:offset + length])
+
+
+_bundle: Optional[ContentBundle] = None
+_bundle_checked = False
+
+
+def _current_bundle() -> Optional[ContentBundle]:
+    global _bundle, _bundle_checked
+    if not _bundle_checked:
+        _bundle_checked = True
+        if os.path.exists(BUNDLE_PATH):
+            try:
+                bundle = ContentBundle(BUNDLE_PATH)
+                if bundle.is_current():
+                    _bundle = bundle
+                else:
+                    logger.warning("Content bundle is out of date, loading JSON (run: python -m app.game.content build)")
+            except Exception as e:
+                logger.error(f"Error opening content bundle: {e}", exc_info=True)
+    return _bundle
+
+
+def load_table(name: str) -> Dict:
+    """One content table: from the bundle when it is current, else from its JSON file."""
+    bundle = _current_bundle()
+    if bundle is not None:
+        return bundle.table(name)
+    with open(json_path(name), "r") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=["check", "build"])
+    parser.add_argument("--data", default=DATA_DIR, help="Directory with the JSON content")
+    parser.add_argument("--out", default=None, help="Bundle path (default: <data>/content.bundle)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        if args.action == "build":
+            report = build_bundle(args.data, args.out)
+        else:
+            report = validate_content(load_json_content(args.data))
+    except ContentError as e:
+        for error in e.errors:
+            print(f"error: {error}")
+        sys.exit(1)
+    stats = report.get_stats()
+    print(f"{stats['records']} records, {stats['fields']} fields, {stats['references']} references checked "
+          f"in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    for error in report.errors:
+        print(f"error: {error}")
+    if report.errors:
+        sys.exit(1)
+    if args.action == "build":
+        print(f"Wrote {args.out or os.path.join(args.data, 'content.bundle')}")
+
+
+if __name__ == "__main__":
+    main()
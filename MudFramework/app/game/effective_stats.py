@@ -0,0 +1,93 @@
+"""
+Cached effective stats.
+
+Effective stats (transformation multipliers plus the Battle Hardened bonus)
+only change when base stats, the transformation or a passive counter change,
+so each online player keeps one frozen snapshot keyed by
+(stats version, transformation). Code that changes base stats or passive
+counters bumps the version with ``invalidate``; switching transformation
+misses the cache on its own.
+
+HP, flux and cooldowns move every round, so they are kept out of the
+snapshot and scaled on read: ``view`` lays them over the snapshot for
+combat without copying it, ``to_dict`` builds the full dict for the client.
+"""
+from collections import ChainMap
+from types import MappingProxyType
+from typing import Dict, Mapping
+
+from app.game.transformations import calculate_effective_stats, get_transformation, scale_stat
+
+# Stats that change during play and are never cached
+VOLATILE_STATS = ("hp", "flux", "skill_cooldowns")
+
+
+class StatsSnapshot:
+    """Immutable effective stats for one (stats version, transformation)."""
+
+    __slots__ = ("key", "stats", "_transformation")
+
+    def __init__(self, key: tuple, base_stats: Dict, transformation_name: str):
+        self.key = key
+        fixed = {k: v for k, v in base_stats.items() if k not in VOLATILE_STATS}
+        self.stats: Mapping = MappingProxyType(calculate_effective_stats(fixed, transformation_name))
+        # Same rule as calculate_effective_stats: Base and unknown forms are unscaled
+        self._transformation = get_transformation(transformation_name) if transformation_name != "Base" else None
+
+    def volatile(self, base_stats: Dict) -> Dict:
+        """Effective HP/flux/cooldowns from the player's current base stats."""
+        transformation = self._transformation
+        values = {}
+        for stat in VOLATILE_STATS:
+            if stat in base_stats:
+                value = base_stats[stat]
+                values[stat] = scale_stat(stat, value, transformation) if transformation else value
+        return values
+
+    def view(self, base_stats: Dict) -> ChainMap:
+        """Stats for a combat round: writes land in a small volatile layer, never in the snapshot."""
+        return ChainMap(self.volatile(base_stats), self.stats)
+
+    def to_dict(self, base_stats: Dict) -> Dict:
+        return {**self.stats, **self.volatile(base_stats)}
+
+
+class EffectiveStatsCache:
+    """One effective-stats snapshot per player, rebuilt only when invalidated."""
+
+    def __init__(self):
+        self._snapshots: Dict[int, StatsSnapshot] = {}
+        self._versions: Dict[int, int] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, player) -> StatsSnapshot:
+        key = (self._versions.get(player.id, 0), player.transformation)
+        snapshot = self._snapshots.get(player.id)
+        if snapshot is not None and snapshot.key == key:
+            self.hits += 1
+            return snapshot
+        self.misses += 1
+        snapshot = StatsSnapshot(key, player.stats, player.transformation)
+        self._snapshots[player.id] = snapshot
+        return snapshot
+
+    def invalidate(self, player_id: int) -> None:
+        """Base stats or passive counters changed: the next read rebuilds."""
+        self._versions[player_id] = self._versions.get(player_id, 0) + 1
+        self.invalidations += 1
+
+    def discard(self, player_id: int) -> None:
+        self._snapshots.pop(player_id, None)
+        self._versions.pop(player_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -1,167 +1,186 @@
-from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 from typing import Dict, List, Optional, Any
 from app.models.player import Player
+from app.models.user import User
 from app.game.world import world
-from app.game.transformations import get_transformation, get_available_transformations, calculate_effective_stats
+from app.game.transformations import get_transformation, get_available_transformations
 from app.models.race import Race
 from app.game.quest_manager import quest_manager
-from app.game.combat import CombatSystem, Mob
+from app.game.combat import CombatSystem, Mob, combat_rng, new_combat_seed
+from app.game.population import RoomPopulation
 from app.game.inventory_manager import inventory_manager
 from app.game.skills_manager import skills_manager
+from app.game.player_store import player_store
+from app.game.content import ContentError
+from app.game.reload import ReloadInProgress, content_reloader
+from app.game.commands import commands, command, ParsedCommand, IN_COMBAT, ANY_STATE
+from app.websockets.connection_manager import room_channel
 from app.core.config import settings
+from app.core.database import DatabaseExecutor
+from app.core.metrics import Histogram
 from app.core.constants import (
     REVIVE_HP_PERCENT, FLEE_SUCCESS_CHANCE, VITALIS_REGEN_PERCENT,
     GLACIAL_ICE_ARMOR_REDUCTION, ZENKAI_BATTLE_HARDENED_MAX,
     ZENKAI_BATTLE_HARDENED_INCREMENT, FLUX_REGEN_PERCENT, BASE_FLUX,
-    FLUX_PER_INT, EXP_PER_LEVEL, WISH_LEVEL_BONUS, MAX_COMMAND_LENGTH
+    FLUX_PER_INT, EXP_PER_LEVEL, WISH_LEVEL_BONUS, MAX_COMMAND_LENGTH,
+    REGEN_INTERVAL_TICKS, OUT_OF_COMBAT_HP_REGEN_PERCENT,
+    OUT_OF_COMBAT_FLUX_REGEN_PERCENT, COOLDOWN_DECAY_TICKS, MAX_STACK
 )
 from app.core.messages import GameMessages
-import random
+import asyncio
 import copy
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+
+# Queries, run on the database threads (see DatabaseExecutor)
+def _username(db, user_id: int) -> Optional[str]:
+    return db.query(User.username).filter(User.id == user_id).scalar()
+
+
+def _race(db, name: str) -> Optional[Race]:
+    return db.query(Race).filter(Race.name == name).first()
+
+
 class GameEngine:
     """Main game engine that processes player commands and manages game state."""
     
-    def __init__(self, connection_manager):
-        """Initialize the game engine with a connection manager."""
+    def __init__(self, connection_manager, store=None):
+        """Initialize the game engine with a connection manager and player state store."""
         self.manager = connection_manager
+        self.store = store or player_store  # Handlers mutate cached players and mark them dirty
         self.combat_system = CombatSystem(self.manager)
         self.active_mobs = {}  # In-memory storage of active combat mobs
-
-    async def process_command(self, player_id: int, command: str, db: Session) -> None:
+        # Live mob instances per room; hunts engage them and kills start their respawn timers
+        self.population = RoomPopulation(world.rooms, self.combat_system.mobs_data)
+        # Zone workers only load their own zones: called when a move leaves them (see zone_worker.py)
+        self.on_zone_exit = None
+        # Zone workers: an admin reload must reach every worker (see zone_worker.py)
+        self.on_reload = None
+        # refresh_ui: building the UI state and handing it to the sync (ms). Inside a
+        # command batch the state diff and encoding happen at flush, in the manager's batch_time
+        self.refresh_time = Histogram()
+
+    async def process_command(self, player_id: int, command: str, db: DatabaseExecutor) -> None:
         """
         Process a game command from a player.
         
         Args:
             player_id: The ID of the player issuing the command
             command: The command string to process
-            db: Database session
+            db: Database executor for the handlers' queries
         """
-        player = db.query(Player).filter(Player.id == player_id).first()
+        # Connections pin their player in the store before any command arrives
+        player = self.store.get(player_id)
         if not player:
             return
 
-        cmd = command.strip().split()
+        cmd = ParsedCommand.parse(command)
         if not cmd:
             return
-        
-        verb = cmd[0].lower()
-        args = cmd[1:]
 
-        # COMBAT HANDLING
-        if player.combat_state:
-            if verb in ["attack", "a"]:
-                await self.cmd_attack_round(player, db)
-            elif verb in ["flee", "run"]:
-                await self.cmd_flee(player, db)
-            elif verb in ["use", "item"]: 
-                await self.cmd_use(player, " ".join(args), db)
-            elif verb in ["skill", "sk"]:
-                await self.cmd_use_skill(player, " ".join(args), db)
-            else:
-                await self.msg_system(player.id, GameMessages.IN_COMBAT)
+        in_combat = bool(player.combat_state)
+        entry = commands.resolve(cmd.verb, in_combat)
+        # Everything the command sends this player goes out as one frame
+        with self.manager.batch(player.id):
+            if (not entry or (entry.debug_only and not settings.DEBUG_MODE)
+                    or (entry.admin_only and not await self._is_admin(player, db))):
+                # In combat only combat commands are accepted
+                await self.msg_system(player.id, GameMessages.IN_COMBAT if in_combat else GameMessages.UNKNOWN_COMMAND)
+                return
+
+            await commands.dispatch(entry, self, player, cmd, db)
+
+    async def _is_admin(self, player: Player, db: DatabaseExecutor) -> bool:
+        """Admins are the users listed in settings.ADMIN_USERNAMES."""
+        if not settings.ADMIN_USERNAMES:
+            return False
+        username = await db.run(_username, player.user_id)
+        return username in settings.ADMIN_USERNAMES
+
+    @command("reload", combat=ANY_STATE, admin_only=True)
+    async def cmd_reload(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Admin: reload the game content from the JSON files without a restart."""
+        if self.on_reload is not None:
+            self.on_reload(player.id)
             return
+        await self.reload_content(player.id)
+
+    async def reload_content(self, player_id: int, source: str = "") -> None:
+        """Reload the content (see reload.py) and report the outcome to ``player_id``."""
+        await self.msg_system(player_id, GameMessages.RELOAD_STARTED.format(source=source))
+        try:
+            result = await content_reloader.reload(self)
+        except ContentError as e:
+            logger.warning(f"Content reload rejected: {e}")
+            await self.msg_system(player_id, GameMessages.RELOAD_REJECTED.format(
+                source=source, count=len(e.errors), errors="; ".join(e.errors[:5])))
+            return
+        except ReloadInProgress:
+            await self.msg_system(player_id, GameMessages.RELOAD_BUSY.format(source=source))
+            return
+        except Exception as e:
+            logger.error(f"Error reloading content: {e}", exc_info=True)
+            await self.msg_system(player_id, "An error occurred.")
+            return
+        await self.msg_system(player_id, GameMessages.RELOAD_DONE.format(source=source, **result))
+
+    @command("cheat_shards", debug_only=True)
+    async def cmd_cheat_shards(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Dev helper: grant all seven Cosmic Shards."""
+        logger.warning(f"DEBUG: cheat_shards used by player {player.id}")
+        for i in range(1, 8):
+            player.inventory.add(f"cosmic_shard_{i}")
+        self.store.mark_dirty(player)
+        await self.msg_system(player.id, "Cheater! You have the Shards.")
+
+    @command("cheat_exp", debug_only=True)
+    async def cmd_cheat_exp(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Dev helper: grant EXP."""
+        try:
+            amount = int(cmd.args[0])
+            logger.warning(f"DEBUG: cheat_exp used by player {player.id}: {amount}")
+            await self.grant_exp(player, amount, db)
+            await self.msg_system(player.id, f"Cheater! Gained {amount} EXP.")
+        except (ValueError, IndexError):
+            await self.msg_system(player.id, "Usage: cheat_exp <amount>")
+        except Exception as e:
+            logger.error(f"Error in cheat_exp for player {player.id}: {e}", exc_info=True)
+            await self.msg_system(player.id, "An error occurred.")
+
+    @command("cheat_defeat", combat=ANY_STATE, debug_only=True)
+    async def cmd_cheat_defeat(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Dev helper: be defeated, in a fight or not, and revive at the start."""
+        logger.warning(f"DEBUG: cheat_defeat used by player {player.id}")
+        if await self._handle_combat_loss(player, db):
+            await self.refresh_ui(player)
 
-        # NORMAL HANDLING
-        if verb in ["look", "l"]:
-            await self.cmd_look(player, args)
-        elif verb in ["north", "south", "east", "west", "up", "down", "n", "s", "e", "w", "u", "d", "enter", "exit"]:
-            await self.cmd_move(player, verb, db)
-        elif verb == "move":
-            if args:
-                await self.cmd_move(player, args[0], db)
-        elif verb == "say":
-            await self.cmd_say(player, " ".join(args))
-        elif verb == "hunt":
-            await self.cmd_hunt(player, db)
-        elif verb == "transform":
-            await self.cmd_transform(player, " ".join(args), db)
-        elif verb == "revert":
-            await self.cmd_revert(player, db)
-        elif verb in ["inventory", "i", "inv"]:
-            await self.cmd_inventory(player)
-        elif verb == "shop":
-            await self.cmd_shop(player, db)
-        elif verb == "buy":
-            await self.cmd_buy(player, " ".join(args), db)
-        elif verb == "use":
-            await self.cmd_use(player, " ".join(args), db)
-        elif verb == "talk":
-            await self.cmd_talk(player, " ".join(args), db)
-        elif verb in ["quests", "q"]:
-            await self.cmd_quests(player)
-        elif verb == "wish":
-            await self.cmd_wish(player, db)
-        elif verb in ["skills", "sk"]:
-            await self.cmd_skills(player, db)
-        elif verb in ["skillinfo", "si"]:
-            await self.cmd_skill_info(player, " ".join(args), db)
-        elif verb == "passive":
-            await self.cmd_passive(player)
-        elif verb == "cheat_shards":
-             # Dev Helper - Only available in DEBUG_MODE
-             if not settings.DEBUG_MODE:
-                 await self.msg_system(player.id, GameMessages.UNKNOWN_COMMAND)
-                 return
-             logger.warning(f"DEBUG: cheat_shards used by player {player_id}")
-             inv = list(player.inventory) if player.inventory else []
-             for i in range(1, 8):
-                 inv.append({"item_id": f"cosmic_shard_{i}", "qty": 1})
-             player.inventory = inv
-             flag_modified(player, "inventory")
-             db.commit()
-             await self.msg_system(player.id, "Cheater! You have the Shards.")
-        elif verb == "cheat_exp":
-             if not settings.DEBUG_MODE:
-                 await self.msg_system(player.id, GameMessages.UNKNOWN_COMMAND)
-                 return
-             try:
-                 amount = int(args[0])
-                 logger.warning(f"DEBUG: cheat_exp used by player {player_id}: {amount}")
-                 await self.grant_exp(player, amount, db)
-                 await self.msg_system(player.id, f"Cheater! Gained {amount} EXP.")
-             except (ValueError, IndexError):
-                 await self.msg_system(player.id, "Usage: cheat_exp <amount>")
-             except Exception as e:
-                 logger.error(f"Error in cheat_exp for player {player_id}: {e}", exc_info=True)
-                 await self.msg_system(player.id, "An error occurred.")
-        elif verb == "cheat_item":
-             if not settings.DEBUG_MODE:
-                 await self.msg_system(player.id, GameMessages.UNKNOWN_COMMAND)
-                 return
-             try:
-                 i_id = args[0]
-                 item = inventory_manager.get_item(i_id)
-                 if item:
-                     logger.warning(f"DEBUG: cheat_item used by player {player_id}: {i_id}")
-                     inv = list(player.inventory) if player.inventory else []
-                     found = False
-                     for slot in inv:
-                         if slot["item_id"] == i_id:
-                             slot["qty"] += 1
-                             found = True
-                             break
-                     if not found:
-                         inv.append({"item_id": i_id, "qty": 1})
-                     player.inventory = inv
-                     flag_modified(player, "inventory")
-                     db.commit()
-                     await self.msg_system(player.id, f"Cheater! Obtained {item.name}.")
-                 else:
-                     await self.msg_system(player.id, "Invalid Item ID.")
-             except IndexError:
-                 await self.msg_system(player.id, "Usage: cheat_item <item_id>")
-             except Exception as e:
-                 logger.error(f"Error in cheat_item for player {player_id}: {e}", exc_info=True)
-                 await self.msg_system(player.id, "An error occurred.")
-        else:
-            await self.msg_system(player.id, GameMessages.UNKNOWN_COMMAND)
-
-    async def cmd_transform(self, player: Player, form_name: str, db: Session):
+    @command("cheat_item", debug_only=True)
+    async def cmd_cheat_item(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Dev helper: grant one of any item."""
+        try:
+            i_id = cmd.args[0]
+            item = inventory_manager.get_item(i_id)
+            if item:
+                logger.warning(f"DEBUG: cheat_item used by player {player.id}: {i_id}")
+                if not player.inventory.add(i_id, limit=item.stack):
+                    await self.msg_system(player.id, GameMessages.INVENTORY_FULL.format(item_name=item.name))
+                    return
+                self.store.mark_dirty(player)
+                await self.msg_system(player.id, f"Cheater! Obtained {item.name}.")
+            else:
+                await self.msg_system(player.id, "Invalid Item ID.")
+        except IndexError:
+            await self.msg_system(player.id, "Usage: cheat_item <item_id>")
+        except Exception as e:
+            logger.error(f"Error in cheat_item for player {player.id}: {e}", exc_info=True)
+            await self.msg_system(player.id, "An error occurred.")
+
+    @command("transform")
+    async def cmd_transform(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        form_name = cmd.text
         avail = get_available_transformations(player.race, player.level)
         if not form_name:
              await self.msg_system(player.id, f"Available forms: {', '.join(avail)}")
@@ -175,7 +194,7 @@ class GameEngine:
         
         if target_form:
             player.transformation = target_form
-            db.commit()
+            self.store.mark_dirty(player)
             await self.msg_system(player.id, GameMessages.TRANSFORMED.format(form=target_form))
             await self.manager.send_personal_message({
                  "type": "chat", "sender": "System", "content": "Your power has multiplied!", "channel": "channel-info"
@@ -183,31 +202,50 @@ class GameEngine:
         else:
             await self.msg_system(player.id, GameMessages.CANNOT_TRANSFORM)
 
-    async def cmd_hunt(self, player: Player, db: Session):
+    @command("revert")
+    async def cmd_revert(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        """Return to base form."""
+        if player.transformation == "Base":
+            await self.msg_system(player.id, GameMessages.ALREADY_BASE_FORM)
+            return
+        player.transformation = "Base"
+        self.store.mark_dirty(player)
+        await self.msg_system(player.id, GameMessages.REVERTED)
+        await self.refresh_ui(player)
+
+    @command("hunt")
+    async def cmd_hunt(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         room = world.get_room(player.current_map)
         if not room: 
              # Auto-fix
-            start_room = world.get_start_room()
-            player.current_map = start_room.id
-            db.commit()
-            room = start_room
             await self.msg_system(player.id, GameMessages.LOST_IN_VOID)
+            if not await self._relocate(player, world.get_start_room_id()):
+                return
+            room = world.get_room(player.current_map)
 
-        if not room.mobs:
+        if not self.population.slots(room.id):
             await self.msg_system(player.id, GameMessages.NOTHING_TO_HUNT)
             return
+        if not self.population.alive_count(room.id):
+            await self.msg_system(player.id, GameMessages.ROOM_CLEARED)
+            return
 
-        mob_id = random.choice(room.mobs)
-        mob = self.combat_system.spawn_mob(mob_id)
+        seed = new_combat_seed()
+        slot = self.population.engage(room.id, player.id, combat_rng(seed, 0))
+        mob = self.combat_system.spawn_mob(self.population.mob_id(slot))
         
         if mob:
+            mob.stats["hp"] = self.population.hp[slot]  # May be wounded from an earlier fight
             # Store full mob state in combat_state for persistence
             player.combat_state = {
                 "mob_id": mob.id,
                 "mob_name": mob.name,
                 "mob_hp": mob.stats["hp"],
                 "mob_max_hp": mob.stats["max_hp"],
-                "mob_stats": mob.stats.copy()  # Full mob stats for recovery
+                "mob_stats": mob.stats.copy(),  # Full mob stats for recovery
+                "seed": seed,  # Per-fight RNG seed: rounds replay from (seed, round)
+                "round": 0,
+                "slot": slot,  # Mob instance in the room population
             }
             flag_modified(player, "combat_state")
             
@@ -215,24 +253,26 @@ class GameEngine:
                  player.stats["hp"] = player.stats["vit"] * 10
                  player.stats["max_hp"] = player.stats["vit"] * 10
                  flag_modified(player, "stats")
+                 self.store.invalidate_stats(player)
             
-            db.commit()
+            self.store.mark_dirty(player)
             self.active_mobs[player.id] = mob
             
             await self.msg_system(player.id, GameMessages.FOUND_MOB.format(mob_name=mob.name))
             await self.manager.send_personal_message({
                  "type": "chat", "sender": "Combat", "content": f"{mob.name} engages you!", "channel": "channel-combat"
             }, player.id)
+            await self._refresh_rooms([room.id], exclude=player.id)
         else:
             await self.msg_system(player.id, "You found nothing (Error spawning mob).")
 
-    def _get_or_recover_mob(self, player: Player, db: Session) -> Optional[Mob]:
+    def _get_or_recover_mob(self, player: Player, db: DatabaseExecutor) -> Optional[Mob]:
         """
         Get mob from memory or recover from database combat_state.
         
         Args:
             player: The player in combat
-            db: Database session
+            db: Database executor
             
         Returns:
             Mob instance or None if combat state is invalid
@@ -248,24 +288,84 @@ class GameEngine:
                     mob.stats = player.combat_state["mob_stats"].copy()
                     mob.stats["hp"] = player.combat_state.get("mob_hp", mob.stats["hp"])
                     self.active_mobs[player.id] = mob
+                    slot = player.combat_state.get("slot")
+                    if slot is not None and not self.population.reengage(slot, mob_id, player.id):
+                        # Killed or taken while the player was away: finish the fight against the saved copy
+                        del player.combat_state["slot"]
+                        flag_modified(player, "combat_state")
                     logger.info(f"Recovered mob {mob_id} for player {player.id} from combat_state")
         
         if not mob:
             # Clear invalid combat state
             player.combat_state = None
             flag_modified(player, "combat_state")
-            db.commit()
+            self.store.mark_dirty(player)
             return None
         
         return mob
 
-    async def cmd_attack_round(self, player: Player, db: Session) -> None:
+    def _end_fight(self, player: Player, killed: bool = False) -> Optional[str]:
+        """Settle the fight's mob instance: start its respawn, or put it back in its room.
+
+        Call before clearing ``combat_state``. Returns the room whose population changed.
+        """
+        mob = self.active_mobs.pop(player.id, None)
+        slot = (player.combat_state or {}).get("slot")
+        if slot is None:
+            return None
+        if killed:
+            changed = self.population.kill(slot, player.id)
+        else:
+            if mob:
+                self.population.set_hp(slot, mob.stats["hp"])
+            changed = self.population.release(slot, player.id)
+        return self.population.room_of(slot) if changed else None
+
+    def replace_population(self, population: RoomPopulation, moved: Optional[Dict[int, int]] = None) -> int:
+        """Switch to a population rebuilt for reloaded content, keeping the instances that still exist.
+
+        ``moved`` is ``population.slot_map(self.population)``, if already computed.
+        A fight whose instance is gone goes on against the player's own copy of
+        the mob, like a resumed fight whose mob was taken. Returns how many did.
+        """
+        if moved is None:
+            moved = population.slot_map(self.population)
+        population.carry_over(self.population, moved)
+        detached = 0
+        for player in self.store.players.values():
+            slot = (player.combat_state or {}).get("slot")
+            if slot is None or moved.get(slot) == slot:
+                continue
+            if slot in moved:
+                player.combat_state["slot"] = moved[slot]
+            else:
+                del player.combat_state["slot"]
+                detached += 1
+            flag_modified(player, "combat_state")
+            self.store.mark_dirty(player)
+        self.population = population
+        return detached
+
+    def _next_round_rng(self, player: Player):
+        """Advance the fight's round counter and return that round's RNG."""
+        state = player.combat_state
+        if "seed" not in state:
+            # Fight started before seeds were recorded
+            state["seed"] = new_combat_seed()
+        state["round"] = state.get("round", 0) + 1
+        flag_modified(player, "combat_state")
+        self.store.mark_dirty(player)
+        return combat_rng(state["seed"], state["round"])
+
+    @command("attack", "a", combat=IN_COMBAT)
+    async def cmd_attack_round(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor) -> None:
         """Process an attack round in combat."""
         mob = self._get_or_recover_mob(player, db)
         if not mob:
             return
 
-        eff_stats = calculate_effective_stats(player.stats, player.transformation)
+        # Combat reads the cached snapshot; HP writes go to the view's own layer
+        eff_stats = self.store.effective_stats(player).view(player.stats)
         
         class TempPlayer:
             def __init__(self, stats: Dict[str, Any]): 
@@ -273,7 +373,8 @@ class GameEngine:
         
         temp_player = TempPlayer(eff_stats)
 
-        outcome = await self.combat_system.combat_round(temp_player, mob, "attack")
+        rng = self._next_round_rng(player)
+        outcome = await self.combat_system.combat_round(temp_player, mob, "attack", rng=rng)
         
         for line in outcome["log"]:
              await self.manager.send_personal_message({
@@ -283,14 +384,15 @@ class GameEngine:
         if outcome["status"] == "win":
             await self._handle_combat_win(player, outcome, db)
         elif outcome["status"] == "loss":
-            await self._handle_combat_loss(player, db)
+            if not await self._handle_combat_loss(player, db):
+                return  # Revived in another zone worker's start room
         elif outcome["status"] == "continue":
             await self._handle_combat_continue(player, outcome, temp_player, mob, db)
         
         # Update UI
         await self.refresh_ui(player)
 
-    async def _handle_combat_win(self, player: Player, outcome: Dict[str, Any], db: Session) -> None:
+    async def _handle_combat_win(self, player: Player, outcome: Dict[str, Any], db: DatabaseExecutor) -> None:
         """Handle combat victory: grant exp, loot, quest updates."""
         await self.grant_exp(player, outcome["exp"], db)
         
@@ -303,6 +405,7 @@ class GameEngine:
                 battle_bonus = min(ZENKAI_BATTLE_HARDENED_MAX, battle_bonus + ZENKAI_BATTLE_HARDENED_INCREMENT)
                 player.stats["battle_hardened_bonus"] = battle_bonus
                 flag_modified(player, "stats")
+                self.store.invalidate_stats(player)
                 logs.append(GameMessages.BATTLE_HARDENED.format(bonus=battle_bonus))
         
         # Process loot
@@ -322,18 +425,20 @@ class GameEngine:
         player.stats["flux"] = player.stats.get("max_flux", BASE_FLUX)
         
         # Clear combat state
+        room_id = self._end_fight(player, killed=True)
         player.combat_state = None
         flag_modified(player, "combat_state")
-        if player.id in self.active_mobs:
-            del self.active_mobs[player.id]
-        db.commit()
+        self.store.mark_dirty(player)
+        if room_id:
+            await self._refresh_rooms([room_id], exclude=player.id)
 
-    async def _handle_combat_loss(self, player: Player, db: Session) -> None:
-        """Handle combat defeat: revive player, reset state."""
+    async def _handle_combat_loss(self, player: Player, db: DatabaseExecutor) -> bool:
+        """Handle combat defeat: revive player, reset state. Returns False if the player was handed off."""
+        room_id = self._end_fight(player)
         player.combat_state = None
         flag_modified(player, "combat_state")
-        if player.id in self.active_mobs:
-            del self.active_mobs[player.id]
+        if room_id:
+            await self._refresh_rooms([room_id], exclude=player.id)
         
         player.stats["hp"] = int(player.stats["max_hp"] * REVIVE_HP_PERCENT)
         player.stats["flux"] = player.stats.get("max_flux", BASE_FLUX)
@@ -341,15 +446,17 @@ class GameEngine:
         # Zenkai: Reset Battle Hardened bonus on death
         if player.race == "Zenkai" and "battle_hardened_bonus" in player.stats:
             player.stats["battle_hardened_bonus"] = 0
+            self.store.invalidate_stats(player)
             
         flag_modified(player, "stats")
-        player.current_map = "start_area"
         player.transformation = "Base"
-        db.commit()
+        self.store.mark_dirty(player)
         await self.msg_system(player.id, GameMessages.FATAL_DAMAGE.format(hp=player.stats["hp"]))
+        # Last: with zone workers the start room may be another worker's, which takes the player over
+        return await self._relocate(player, world.get_start_room_id())
 
     async def _handle_combat_continue(self, player: Player, outcome: Dict[str, Any], 
-                                     temp_player: Any, mob: Mob, db: Session) -> None:
+                                     temp_player: Any, mob: Mob, db: DatabaseExecutor) -> None:
         """Handle combat continuation: update HP, regen flux, reduce cooldowns."""
         # Update combat state with mob HP (for persistence)
         if player.combat_state:
@@ -359,6 +466,8 @@ class GameEngine:
             # Also update in-memory mob
             if player.id in self.active_mobs:
                 self.active_mobs[player.id].stats["hp"] = outcome["mob_hp"]
+            if player.combat_state.get("slot") is not None:
+                self.population.set_hp(player.combat_state["slot"], outcome["mob_hp"])
             flag_modified(player, "combat_state")
         
         player.stats["hp"] = temp_player.stats["hp"]
@@ -383,36 +492,24 @@ class GameEngine:
         await self._reduce_skill_cooldowns(player)
         
         flag_modified(player, "stats")
-        db.commit()
+        self.store.mark_dirty(player)
 
-    async def _process_loot(self, player: Player, loot_item_ids: List[str], db: Session) -> List[str]:
+    async def _process_loot(self, player: Player, loot_item_ids: List[str], db: DatabaseExecutor) -> List[str]:
         """Process loot items and add to inventory. Returns list of item names."""
         if not loot_item_ids:
             return []
         
-        inv = list(player.inventory) if player.inventory else []
         new_items = []
         
         for item_id in loot_item_ids:
             item = inventory_manager.get_item(item_id)
-            if item:
-                found = False
-                for slot in inv:
-                    if slot["item_id"] == item_id:
-                        slot["qty"] += 1
-                        found = True
-                        break
-                if not found:
-                    inv.append({"item_id": item_id, "qty": 1})
+            # A full stack leaves the drop behind
+            if item and player.inventory.add(item_id, limit=item.stack):
                 new_items.append(item.name)
         
-        if new_items:
-            player.inventory = inv
-            flag_modified(player, "inventory")
-        
         return new_items
 
-    async def _update_quest_progress(self, player: Player, mob_id: str, db: Session) -> List[str]:
+    async def _update_quest_progress(self, player: Player, mob_id: str, db: DatabaseExecutor) -> List[str]:
         """Update quest progress for kill quests. Returns list of update messages."""
         if not player.active_quests:
             return []
@@ -463,44 +560,145 @@ class GameEngine:
         
         player.stats["skill_cooldowns"] = cooldowns
 
-    async def cmd_flee(self, player: Player, db: Session):
-        if random.random() > (1 - FLEE_SUCCESS_CHANCE):
+    def register_tick_systems(self, scheduler) -> None:
+        """Attach the engine's world systems to a tick scheduler."""
+        scheduler.add_system("regen", self.tick_regen, every=REGEN_INTERVAL_TICKS)
+        scheduler.add_system("cooldowns", self.tick_cooldowns, every=COOLDOWN_DECAY_TICKS)
+        scheduler.add_system("respawn", self.tick_respawn)
+
+    def _idle_online_players(self) -> List[Player]:
+        """Connected players that are not in combat (combat has its own per-round rules)."""
+        return [
+            player for player_id, player in self.store.players.items()
+            if player_id in self.manager.active_connections and not player.combat_state
+        ]
+
+    async def tick_regen(self, tick: int) -> None:
+        """Regenerate HP and Flux for every idle online player."""
+        changed = []
+        for player in self._idle_online_players():
+            stats = player.stats
+            max_hp = stats.get("max_hp", 0)
+            max_flux = stats.get("max_flux", 0)
+            hp = stats.get("hp", max_hp)
+            flux = stats.get("flux", max_flux)
+            if hp >= max_hp and flux >= max_flux:
+                continue
+            if hp < max_hp:
+                stats["hp"] = min(max_hp, hp + max(1, int(max_hp * OUT_OF_COMBAT_HP_REGEN_PERCENT)))
+            if flux < max_flux:
+                stats["flux"] = min(max_flux, flux + max(1, int(max_flux * OUT_OF_COMBAT_FLUX_REGEN_PERCENT)))
+            changed.append(player)
+
+        for player in changed:
+            self.store.mark_dirty(player)
+            await self.refresh_ui(player)
+
+    async def tick_cooldowns(self, tick: int) -> None:
+        """Let skill cooldowns run down outside combat."""
+        for player in self._idle_online_players():
+            if player.stats.get("skill_cooldowns"):
+                await self._reduce_skill_cooldowns(player)
+                self.store.mark_dirty(player)
+
+    async def tick_respawn(self, tick: int) -> None:
+        """Bring back mobs whose respawn timer ran out and show them to the rooms."""
+        rooms = self.population.respawn(tick)
+        if rooms:
+            await self._refresh_rooms(rooms)
+
+    async def _refresh_rooms(self, room_ids: List[str], exclude: Optional[int] = None) -> None:
+        """Resend the UI state of every online player in these rooms (e.g. after the mobs changed)."""
+        rooms = set(room_ids)
+        for player_id, player in list(self.store.players.items()):
+            if player_id != exclude and player.current_map in rooms and player_id in self.manager.active_connections:
+                await self.refresh_ui(player)
+
+    @command("flee", "run", combat=IN_COMBAT)
+    async def cmd_flee(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        if self._next_round_rng(player).random() > (1 - FLEE_SUCCESS_CHANCE):
+            room_id = self._end_fight(player)
             player.combat_state = None
-            if player.id in self.active_mobs:
-                del self.active_mobs[player.id]
-            db.commit()
+            self.store.mark_dirty(player)
             await self.msg_system(player.id, GameMessages.FLEE_SUCCESS)
+            if room_id:
+                await self._refresh_rooms([room_id])
         else:
             await self.msg_system(player.id, GameMessages.FLEE_FAILED)
 
+    async def on_connect(self, player: Player) -> None:
+        """Subscribe a freshly connected player to its room and send the initial state."""
+        room = world.get_room(player.current_map)
+        if room:
+            self.manager.set_room(player.id, room.id, room.zone)
+        elif not await self._relocate(player, world.get_start_room_id()):
+            return  # The worker owning the start room takes the player
+        await self.refresh_ui(player)
+
+    async def on_disconnect(self, player_id: int) -> None:
+        """The player's last socket closed: a fight in progress gives its mob back to the room.
+
+        ``combat_state`` is kept, so the fight resumes on reconnect if the mob is still there.
+        """
+        player = self.store.players.get(player_id)
+        if not player or not player.combat_state:
+            self.active_mobs.pop(player_id, None)
+            return
+        room_id = self._end_fight(player)
+        if room_id:
+            await self._refresh_rooms([room_id], exclude=player_id)
+
+    async def refresh_online(self) -> None:
+        """Resend every online player's UI state, moving anyone whose room no longer exists to the start."""
+        online = [player for player_id, player in list(self.store.players.items())
+                  if player_id in self.manager.active_connections]
+        for player in online:
+            if not world.get_room(player.current_map):
+                await self._relocate(player, world.get_start_room_id())
+        for player in online:
+            if player.id not in self.manager.active_connections:
+                continue  # Handed off to the worker owning the start room, or gone
+            await self.refresh_ui(player)
+            await asyncio.sleep(0)  # Let commands run between refreshes
+
     async def refresh_ui(self, player: Player):
         """Internal method to refresh client UI state (stats, inventory, etc.)"""
+        start = time.perf_counter()
         room = world.get_room(player.current_map)
         if not room: 
-            room = world.get_start_room()
+            # The room is gone: the start room may be another zone worker's, which then sends the state
+            if not await self._relocate(player, world.get_start_room_id()):
+                return
+            room = world.get_room(player.current_map)
         
-        eff_stats = calculate_effective_stats(player.stats, player.transformation)
+        eff_stats = self.store.effective_stats(player).to_dict(player.stats)
 
         # Hydrate inventory with names
         gui_inventory = []
-        if player.inventory:
-            for slot in player.inventory:
-                item = inventory_manager.get_item(slot["item_id"])
-                if item:
-                    gui_inventory.append({
-                        "item_id": slot["item_id"],
-                        "name": item.name,
-                        "qty": slot["qty"]
-                    })
+        for item_id, qty in player.inventory.items():
+            item = inventory_manager.get_item(item_id)
+            if item:
+                gui_inventory.append({
+                    "item_id": item_id,
+                    "name": item.name,
+                    "qty": qty
+                })
 
-        await self.manager.send_personal_message({
-            "type": "gamestate",
+        if "skill_cooldowns" in eff_stats:
+            # The sync keeps this state to diff against; don't share the live dict
+            eff_stats["skill_cooldowns"] = dict(eff_stats["skill_cooldowns"])
+
+        await self.manager.send_state({
             "room": {
                 "id": room.id,
                 "name": room.name,
                 "description": room.description,
                 "exits": room.exits,
-                "mobs": room.mobs
+                # Huntable mobs right now, from the room population
+                "mobs": [
+                    {"id": mob_id, "name": self.combat_system.mobs_data[mob_id]["name"], "count": count}
+                    for mob_id, count in self.population.counts(room.id).items()
+                ]
             },
             "player": {
                 "id": player.id, 
@@ -514,12 +712,16 @@ class GameEngine:
                 "inventory": gui_inventory
             }
         }, player.id)
+        self.refresh_time.observe((time.perf_counter() - start) * 1000)
 
-    async def cmd_look(self, player: Player, args):
+    @command("look", "l")
+    async def cmd_look(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Look at the current room and refresh UI"""
         room = world.get_room(player.current_map)
         if not room: 
-            room = world.get_start_room()
+            if not await self._relocate(player, world.get_start_room_id()):
+                return
+            room = world.get_room(player.current_map)
         
         # Build exits list with directional arrows
         exits_html = ""
@@ -563,30 +765,66 @@ class GameEngine:
         # Refresh UI panels
         await self.refresh_ui(player)
 
-    async def cmd_move(self, player: Player, direction: str, db: Session):
+    @command("move", "north", "south", "east", "west", "up", "down",
+             "n", "s", "e", "w", "u", "d", "enter", "exit")
+    async def cmd_move(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        if cmd.verb == "move":
+            if not cmd.args:
+                return
+            direction = cmd.args[0]
+        else:
+            direction = cmd.verb
         short_dir = { "n": "north", "s": "south", "e": "east", "w": "west" }
         direction = short_dir.get(direction, direction)
         current_room = world.get_room(player.current_map)
         
         # Auto-fix if room doesn't exist (e.g. after map update)
         if not current_room:
-            start_room = world.get_start_room()
-            player.current_map = start_room.id
-            db.commit()
-            current_room = start_room
             await self.msg_system(player.id, GameMessages.LOST_IN_VOID)
+            if not await self._relocate(player, world.get_start_room_id()):
+                return
+            current_room = world.get_room(player.current_map)
 
         if direction in current_room.exits:
-            player.current_map = current_room.exits[direction]
-            db.commit()
+            target = current_room.exits[direction]
+            await self.manager.publish(room_channel(current_room.id), {
+                "type": "chat", "sender": "System", "channel": "channel-info",
+                "content": GameMessages.PLAYER_LEAVES.format(name=player.name, direction=direction),
+            }, exclude=(player.id,))
+            await self.manager.publish(room_channel(target), {
+                "type": "chat", "sender": "System", "channel": "channel-info",
+                "content": GameMessages.PLAYER_ARRIVES.format(name=player.name),
+            }, exclude=(player.id,))
             await self.msg_system(player.id, f"You move {direction}...")
-            await self.refresh_ui(player)
+            if await self._relocate(player, target):
+                await self.refresh_ui(player)
         else:
             await self.msg_system(player.id, "You cannot go that way.")
 
-    async def cmd_say(self, player: Player, message: str):
-        await self.manager.broadcast({
-            "type": "chat", "sender": player.name, "content": message, "channel": "channel-say"
+    def _set_location(self, player: Player, room_id: str) -> None:
+        """Move a player and keep the room/zone channel indexes in sync."""
+        player.current_map = room_id
+        self.store.mark_dirty(player)
+        room = world.get_room(room_id)
+        self.manager.set_room(player.id, room_id, room.zone if room else None)
+
+    async def _relocate(self, player: Player, room_id: str) -> bool:
+        """``_set_location``, handing the player off if the room belongs to another zone worker.
+
+        Returns whether the room is here. If not, the player is gone from
+        this worker (the new one sends their state): change nothing more.
+        """
+        self._set_location(player, room_id)
+        if self.on_zone_exit and not world.get_room(room_id):
+            await self.on_zone_exit(player)
+            return False
+        return True
+
+    @command("say")
+    async def cmd_say(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        # Only players in the same room hear it
+        await self.manager.publish(room_channel(player.current_map), {
+            "type": "chat", "sender": player.name, "content": cmd.text, "channel": "channel-say"
         })
 
     async def msg_system(self, player_id: int, text: str):
@@ -594,13 +832,13 @@ class GameEngine:
             "type": "chat", "sender": "System", "content": text, "channel": "channel-system"
         }, player_id)
 
-    async def cmd_inventory(self, player: Player):
+    @command("inventory", "i", "inv")
+    async def cmd_inventory(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         inv_list = []
-        if player.inventory:
-            for item_data in player.inventory:
-                item = inventory_manager.get_item(item_data["item_id"])
-                if item:
-                    inv_list.append(f"{item.name} x{item_data['qty']}")
+        for item_id, qty in player.inventory.items():
+            item = inventory_manager.get_item(item_id)
+            if item:
+                inv_list.append(f"{item.name} x{qty}")
         
         msg = f"Credits: {player.zeni}\n"
         if inv_list:
@@ -610,7 +848,8 @@ class GameEngine:
             
         await self.msg_system(player.id, msg)
 
-    async def cmd_shop(self, player: Player, db: Session):
+    @command("shop")
+    async def cmd_shop(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Display the shop interface"""
         room_id = player.current_map
         shop = inventory_manager.get_shop(room_id)
@@ -670,8 +909,10 @@ class GameEngine:
         """
         await self.msg_system(player.id, html)
 
-    async def cmd_buy(self, player: Player, item_name: str, db: Session):
+    @command("buy")
+    async def cmd_buy(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Purchase an item from the current shop"""
+        item_name = cmd.text
         if not item_name:
             await self.msg_system(player.id, "Usage: buy <item name>")
             return
@@ -698,41 +939,32 @@ class GameEngine:
             await self.msg_system(player.id, "You cannot afford that.")
             return
 
+        if not player.inventory.add(target_item.id, limit=target_item.stack):
+            await self.msg_system(player.id, GameMessages.INVENTORY_FULL.format(item_name=target_item.name))
+            return
         player.zeni -= target_item.price
-        
-        inv = list(player.inventory) if player.inventory else []
-        found = False
-        for slot in inv:
-            if slot["item_id"] == target_item.id:
-                slot["qty"] += 1
-                found = True
-                break
-        if not found:
-            inv.append({"item_id": target_item.id, "qty": 1})
-            
-        player.inventory = inv
-        flag_modified(player, "inventory")
-        db.commit()
+        self.store.mark_dirty(player)
         
         await self.msg_system(player.id, f"You bought {target_item.name} for {target_item.price} Credits.")
         await self.refresh_ui(player)
 
-    async def cmd_use(self, player: Player, item_name: str, db: Session):
+    @command("use", combat=ANY_STATE)
+    @command("item", combat=IN_COMBAT)  # Out of combat "item" was never a command
+    async def cmd_use(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
+        item_name = cmd.text
         if not player.inventory:
              await self.msg_system(player.id, "You have nothing to use.")
              return
 
-        target_slot = None
         target_item = None
         
-        for slot in player.inventory:
-            item = inventory_manager.get_item(slot["item_id"])
+        for item_id in player.inventory:
+            item = inventory_manager.get_item(item_id)
             if item and item.name.lower() == item_name.lower():
-                target_slot = slot
                 target_item = item
                 break
         
-        if not target_slot:
+        if not target_item:
             await self.msg_system(player.id, "You don't have that item.")
             return
 
@@ -764,13 +996,8 @@ class GameEngine:
                 
                 await self.msg_system(player.id, f"You used {target_item.name} and recovered {heal} HP.")
                 
-            inv = list(player.inventory)
-            target_slot["qty"] -= 1
-            if target_slot["qty"] <= 0:
-                inv.remove(target_slot)
-            player.inventory = inv
-            flag_modified(player, "inventory")
-            db.commit()
+            player.inventory.remove(target_item.id)
+            self.store.mark_dirty(player)
             
             await self.refresh_ui(player)
             
@@ -779,7 +1006,8 @@ class GameEngine:
         else:
              await self.msg_system(player.id, "You cannot use that.")
 
-    async def cmd_talk(self, player: Player, args: str, db: Session):
+    @command("talk")
+    async def cmd_talk(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         room_id = player.current_map
         npc = quest_manager.get_npc_by_room(room_id)
         
@@ -798,6 +1026,15 @@ class GameEngine:
             quest = quest_manager.get_quest(q_id)
             
             if progress["progress"] >= quest["count"]:
+                item_id = quest["reward"].get("item")
+                item = inventory_manager.get_item(item_id) if item_id else None
+                item_limit = item.stack if item else MAX_STACK
+                if item_id and player.inventory.count(item_id) >= item_limit:
+                    # The quest stays open until the reward fits
+                    await self.msg_system(player.id, GameMessages.INVENTORY_FULL.format(
+                        item_name=item.name if item else item_id))
+                    return
+
                 await self.msg_system(player.id, f"{npc['name']}: {npc['dialogue']['quest_complete']}")
                 
                 rewards = []
@@ -807,13 +1044,9 @@ class GameEngine:
                 if "exp" in quest["reward"]:
                     player.exp += quest["reward"]["exp"]
                     rewards.append(f"{quest['reward']['exp']} EXP")
-                if "item" in quest["reward"]:
-                    item_id = quest["reward"]["item"]
-                    inv = list(player.inventory) if player.inventory else []
-                    inv.append({"item_id": item_id, "qty": 1})
-                    player.inventory = inv
-                    flag_modified(player, "inventory")
-                    rewards.append(f"Item: {item_id}")
+                if item_id:
+                    player.inventory.add(item_id, limit=item_limit)
+                    rewards.append(f"Item: {item.name if item else item_id}")
 
                 active = copy.deepcopy(player.active_quests)
                 del active[q_id]
@@ -825,7 +1058,7 @@ class GameEngine:
                 player.completed_quests = completed
                 flag_modified(player, "completed_quests")
                 
-                db.commit()
+                self.store.mark_dirty(player)
                 await self.msg_system(player.id, f"Quest Completed! Received: {', '.join(rewards)}")
             else:
                 await self.msg_system(player.id, f"{npc['name']}: {npc['dialogue']['quest_pending']}")
@@ -838,13 +1071,14 @@ class GameEngine:
                  active[q_id] = {"progress": 0}
                  player.active_quests = active
                  flag_modified(player, "active_quests")
-                 db.commit()
+                 self.store.mark_dirty(player)
                  
                  await self.msg_system(player.id, "Quest Started! Check 'quests' for details.")
             else:
                  await self.msg_system(player.id, f"{npc['name']}: {npc['dialogue']['default']}")
 
-    async def cmd_quests(self, player: Player):
+    @command("quests", "q")
+    async def cmd_quests(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         if not player.active_quests:
             await self.msg_system(player.id, "No active quests.")
             return
@@ -856,23 +1090,12 @@ class GameEngine:
                 msg += f"\n- {quest['title']}: {data['progress']}/{quest['count']} ({quest['description']})"
         await self.msg_system(player.id, msg)
 
-    async def cmd_wish(self, player: Player, db: Session):
+    @command("wish")
+    async def cmd_wish(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         # Check for Cosmic Shards 1-7
         required = [f"cosmic_shard_{i}" for i in range(1, 8)]
-        has_all = True
-        
-        # Build inventory lookup
-        inv_counts = {}
-        if player.inventory:
-            for slot in player.inventory:
-                inv_counts[slot["item_id"]] = slot["qty"]
-        
-        for r in required:
-            if inv_counts.get(r, 0) < 1:
-                has_all = False
-                break
         
-        if not has_all:
+        if not player.inventory.has_all(required):
              await self.msg_system(player.id, "You do not have all 7 Cosmic Shards.")
              return
 
@@ -889,7 +1112,7 @@ class GameEngine:
         player.exp = 0 
         
         # Scaling stats
-        race = db.query(Race).filter(Race.name == player.race).first()
+        race = await db.run(_race, player.race)
         if race and race.scaling_stats:
             for _ in range(WISH_LEVEL_BONUS):  # Apply growth WISH_LEVEL_BONUS times
                 for k, v in race.scaling_stats.items():
@@ -899,24 +1122,16 @@ class GameEngine:
         player.stats["max_hp"] = player.stats["vit"] * 10
         player.stats["hp"] = player.stats["max_hp"]
         flag_modified(player, "stats") # Important!
+        self.store.invalidate_stats(player)
 
         # Remove Balls
-        inv = list(player.inventory)
-        for r in required:
-            for slot in inv:
-                if slot["item_id"] == r:
-                    slot["qty"] -= 1
-                    if slot["qty"] <= 0:
-                        inv.remove(slot)
-                    break
-        player.inventory = inv
-        flag_modified(player, "inventory")
-        db.commit()
+        player.inventory.remove_each(required)
+        self.store.mark_dirty(player)
 
         await self.msg_system(player.id, f"You have gained {WISH_LEVEL_BONUS} levels! (Level {old_level} -> {player.level})")
         await self.msg_system(player.id, "ARCHON: 'IT IS DONE.' (The shards dissipate into the void).")
 
-    async def grant_exp(self, player: Player, amount: int, db: Session):
+    async def grant_exp(self, player: Player, amount: int, db: DatabaseExecutor):
         player.exp += amount
         
         while True:
@@ -930,7 +1145,7 @@ class GameEngine:
                     "type": "chat", "sender": "System", "content": f"{player.name} has reached Level {player.level}!", "channel": "channel-info"
                 })
                 
-                race = db.query(Race).filter(Race.name == player.race).first()
+                race = await db.run(_race, player.race)
                 if race and race.scaling_stats:
                     for k, v in race.scaling_stats.items():
                         if k in player.stats:
@@ -944,14 +1159,16 @@ class GameEngine:
                     base_flux = race.base_flux if race.base_flux else BASE_FLUX
                     player.stats["max_flux"] = base_flux + (player.stats.get("int", 0) * FLUX_PER_INT)
                     player.stats["flux"] = player.stats["max_flux"]  # Restore to full on level up
+                    self.store.invalidate_stats(player)
                     
                 # Auto-learn skills
                 available = skills_manager.get_available_skills(player.race, player.level)
                 current_skills = list(player.learned_skills) if player.learned_skills else []
+                known = set(current_skills)
                 new_skills_names = []
                 
                 for skill in available:
-                    if skill.id not in current_skills:
+                    if skill.id not in known:
                         current_skills.append(skill.id)
                         new_skills_names.append(skill.name)
                 
@@ -967,9 +1184,10 @@ class GameEngine:
             else:
                 break
         
-        db.commit()
+        self.store.mark_dirty(player)
 
-    async def cmd_skills(self, player: Player, db: Session):
+    @command("skills", "sk")
+    async def cmd_skills(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """List available and learned skills."""
         
         all_skills = skills_manager.get_all_race_skills(player.race)
@@ -1046,8 +1264,10 @@ class GameEngine:
         
         await self.msg_system(player.id, html)
     
-    async def cmd_skill_info(self, player: Player, skill_name: str, db: Session):
+    @command("skillinfo", "si")
+    async def cmd_skill_info(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Show detailed information about a specific skill."""
+        skill_name = cmd.text
         if not skill_name:
             await self.msg_system(player.id, "Usage: skillinfo <skill_name>")
             return
@@ -1169,14 +1389,17 @@ class GameEngine:
         
         await self.msg_system(player.id, html)
     
-    async def cmd_passive(self, player: Player):
+    @command("passive")
+    async def cmd_passive(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Show race passive ability."""
         passive = skills_manager.get_race_passive(player.race)
         msg = f"**Race Passive: {passive['name']}**\n{passive['description']}"
         await self.msg_system(player.id, msg)
 
-    async def cmd_use_skill(self, player: Player, skill_name: str, db: Session):
+    @command("skill", "sk", combat=IN_COMBAT)
+    async def cmd_use_skill(self, player: Player, cmd: ParsedCommand, db: DatabaseExecutor):
         """Use a skill in combat."""
+        skill_name = cmd.text
         if not player.combat_state:
             await self.msg_system(player.id, GameMessages.SKILLS_ONLY_IN_COMBAT)
             return
@@ -1231,7 +1454,7 @@ class GameEngine:
         # Deduct Flux and log it
         player.stats["flux"] = current_flux - flux_cost
         flag_modified(player, "stats")
-        db.commit()
+        self.store.mark_dirty(player)
         
         max_flux = player.stats.get("max_flux", BASE_FLUX)
         # Send Flux change notification
@@ -1255,14 +1478,14 @@ class GameEngine:
                 player.stats["skill_cooldowns"] = {}
             player.stats["skill_cooldowns"][target_skill.id] = target_skill.cooldown
             flag_modified(player, "stats")
-            db.commit()
+            self.store.mark_dirty(player)
         
         # Execute skill in combat
         mob = self._get_or_recover_mob(player, db)
         if not mob:
             return
 
-        eff_stats = calculate_effective_stats(player.stats, player.transformation)
+        eff_stats = self.store.effective_stats(player).view(player.stats)
         
         class TempPlayer:
             def __init__(self, stats):
@@ -1270,8 +1493,9 @@ class GameEngine:
         
         temp_player = TempPlayer(eff_stats)
 
+        rng = self._next_round_rng(player)
         outcome = await self.combat_system.combat_round(
-            temp_player, mob, "skill", skill=target_skill
+            temp_player, mob, "skill", skill=target_skill, rng=rng
         )
         
         for line in outcome["log"]:
@@ -1289,7 +1513,8 @@ class GameEngine:
         if outcome["status"] == "win":
             await self._handle_combat_win(player, outcome, db)
         elif outcome["status"] == "loss":
-            await self._handle_combat_loss(player, db)
+            if not await self._handle_combat_loss(player, db):
+                return  # Revived in another zone worker's start room
         elif outcome["status"] == "continue":
             await self._handle_combat_continue(player, outcome, temp_player, mob, db)
         
@@ -0,0 +1,119 @@
+"""
+Player inventories.
+
+An ``Inventory`` holds one stack per item id, in the order the items were
+first picked up, as a single ``item_id -> quantity`` dict: adding, removing
+and counting an item are one lookup each, with no list to copy or scan.
+Stacks stop at the item's ``stack`` limit.
+
+It is stored in the ``players.inventory`` JSON column in the compact form
+``{"item_id": qty}`` (the old ``[{"item_id": ..., "qty": ...}]`` lists are
+still read). Every change bumps ``version``, which the player store compares
+with the version it last wrote: only inventories that changed since the
+previous flush are serialized and written back.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.types import JSON, TypeDecorator
+
+from app.core.constants import MAX_STACK
+
+
+class Inventory:
+    """One player's items: ``item_id -> quantity``, with a change counter."""
+
+    __slots__ = ("_stacks", "version")
+
+    def __init__(self, stacks: Optional[Dict[str, int]] = None):
+        self._stacks: Dict[str, int] = {item_id: qty for item_id, qty in stacks.items() if qty > 0} if stacks else {}
+        self.version = 0
+
+    @classmethod
+    def from_json(cls, value) -> "Inventory":
+        """Build from a column value: the compact dict, an old slot list, or nothing."""
+        if isinstance(value, Inventory):
+            return value
+        if isinstance(value, dict):
+            return cls(value)
+        stacks: Dict[str, int] = {}
+        for slot in value or ():
+            # Old lists could hold the same item twice (quest rewards were appended)
+            stacks[slot["item_id"]] = stacks.get(slot["item_id"], 0) + slot["qty"]
+        return cls(stacks)
+
+    def to_json(self) -> Dict[str, int]:
+        """The compact column form (a copy: safe to write while the game goes on)."""
+        return dict(self._stacks)
+
+    def to_slots(self) -> List[Dict]:
+        """``[{"item_id": ..., "qty": ...}]``, the shape the API has always returned."""
+        return [{"item_id": item_id, "qty": qty} for item_id, qty in self._stacks.items()]
+
+    def count(self, item_id: str) -> int:
+        return self._stacks.get(item_id, 0)
+
+    def add(self, item_id: str, qty: int = 1, limit: int = MAX_STACK) -> int:
+        """Add up to ``qty`` without taking the stack past ``limit``; returns how many were added."""
+        held = self._stacks.get(item_id, 0)
+        added = min(qty, limit - held)
+        if added <= 0:
+            return 0
+        self._stacks[item_id] = held + added
+        self.version += 1
+        return added
+
+    def remove(self, item_id: str, qty: int = 1) -> bool:
+        """Take ``qty`` of an item; takes nothing and returns False if there are fewer."""
+        held = self._stacks.get(item_id, 0)
+        if held < qty or qty <= 0:
+            return False
+        if held == qty:
+            del self._stacks[item_id]
+        else:
+            self._stacks[item_id] = held - qty
+        self.version += 1
+        return True
+
+    def has_all(self, item_ids: Iterable[str]) -> bool:
+        """At least one of each item."""
+        return all(item_id in self._stacks for item_id in item_ids)
+
+    def remove_each(self, item_ids: Iterable[str]) -> bool:
+        """Take one of each item, or nothing if one is missing."""
+        item_ids = list(item_ids)
+        if not self.has_all(item_ids):
+            return False
+        for item_id in item_ids:
+            self.remove(item_id)
+        return True
+
+    def items(self) -> Iterable[Tuple[str, int]]:
+        """``(item_id, qty)`` in pickup order."""
+        return self._stacks.items()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._stacks)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._stacks
+
+    def __len__(self) -> int:
+        return len(self._stacks)
+
+    def __repr__(self) -> str:
+        return f"Inventory({self._stacks!r})"
+
+
+class InventoryType(TypeDecorator):
+    """JSON column holding an ``Inventory``, written in the compact form."""
+
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return Inventory.from_json(value).to_json()
+
+    def process_result_value(self, value, dialect):
+        return Inventory.from_json(value)
@@ -1,11 +1,14 @@
-import json
-import os
 from typing import Dict, Optional, List
 import logging
 
+from app.core.constants import MAX_STACK
+from app.game.content import load_table
+
 logger = logging.getLogger(__name__)
 
 class Item:
+    __slots__ = ("id", "name", "type", "description", "price", "effect", "stats", "stack")
+
     def __init__(self, data: Dict):
         self.id = data["id"]
         self.name = data["name"]
@@ -14,6 +17,7 @@ class Item:
         self.price = data.get("price", 0)
         self.effect = data.get("effect", {}) # For consumables
         self.stats = data.get("stats", {}) # For equipment
+        self.stack = data.get("stack", MAX_STACK) # Most a player can carry
 
 class InventoryManager:
     def __init__(self):
@@ -22,22 +26,17 @@ class InventoryManager:
         self.load_data()
 
     def load_data(self):
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        
         # Load Items
         try:
-            with open(os.path.join(base_path, "data", "items.json"), "r") as f:
-                data = json.load(f)
-                for k, v in data.items():
-                    self.items[k] = Item(v)
+            for k, v in load_table("items").items():
+                self.items[k] = Item(v)
             logger.info(f"Loaded {len(self.items)} items.")
         except Exception as e:
             logger.error(f"Error loading items: {e}", exc_info=True)
 
         # Load Shops
         try:
-            with open(os.path.join(base_path, "data", "shops.json"), "r") as f:
-                self.shops = json.load(f)
+            self.shops = load_table("shops")
             logger.info(f"Loaded {len(self.shops)} shops.")
         except Exception as e:
             logger.error(f"Error loading shops: {e}", exc_info=True)
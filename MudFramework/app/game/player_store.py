@@ -0,0 +1,306 @@
+"""
+In-process player state store with write-behind persistence.
+
+Online players are loaded once on connect and kept as detached ``Player``
+instances. Command handlers mutate them in memory and call ``mark_dirty``;
+dirty players are written back to the ``players`` table in one batched
+update per flush, so several mutations between flushes cost a single write. An inventory
+goes into the row only if it changed since it was loaded or last written
+(see ``Inventory.version``), so picking up loot doesn't rewrite it on every
+flush after that.
+
+The server uses the ``*_async`` variants: loads and writes run on the
+database threads (see ``DatabaseExecutor``) while the event loop goes on.
+The write works on a copy of the rows, so players keep playing during it.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import DatabaseExecutor, SessionLocal, db_executor
+from app.game.effective_stats import EffectiveStatsCache, StatsSnapshot
+from app.game.inventory import Inventory
+from app.models.player import Player
+
+logger = logging.getLogger(__name__)
+
+# Columns the game engine mutates and that are written back on flush (and the inventory, when it changed)
+PERSISTED_FIELDS = (
+    "level", "exp", "stats", "current_map", "position",
+    "combat_state", "transformation", "zeni", "equipment",
+    "learned_skills", "active_quests", "completed_quests",
+)
+
+
+def _copy_json(value: Any) -> Any:
+    """Copy of a JSON column value: handlers keep mutating the live one during a write."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+class PlayerStateStore:
+    """Authoritative in-memory player state keyed by player_id."""
+
+    def __init__(self, session_factory=SessionLocal, flush_interval: float = None,
+                 db: Optional[DatabaseExecutor] = None):
+        self.session_factory = session_factory
+        self.db = db or db_executor
+        self.flush_interval = flush_interval if flush_interval is not None else settings.PLAYER_FLUSH_INTERVAL
+        self.players: Dict[int, Player] = {}
+        self._refs: Dict[int, int] = {}  # Open connections per player
+        self._released: Set[int] = set()  # Last connection gone, evicted once written
+        self._dirty: Set[int] = set()
+        # Per player, the inventory in the database and its version then: unchanged ones are not rewritten
+        self._stored_inventory: Dict[int, Tuple[Inventory, int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()  # One write at a time, so an eviction never passes a write
+        self.stats_cache = EffectiveStatsCache()
+
+        # Counters
+        self.flush_count = 0
+        self.flushed_rows = 0
+        self.flushed_inventories = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def load(self, player_id: int, db: Optional[Session] = None) -> Optional[Player]:
+        """Return the cached player, loading it from the database if needed."""
+        player = self.players.get(player_id)
+        if player is not None:
+            return player
+
+        if db is not None:
+            player = self._load_from(db, player_id)
+        else:
+            with self.session_factory() as session:
+                player = self._load_from(session, player_id)
+
+        if player is not None:
+            self.players[player_id] = player
+            self._stored(player)
+        return player
+
+    def _load(self, player_id: int) -> Optional[Player]:
+        with self.session_factory() as session:
+            return self._load_from(session, player_id)
+
+    def _load_from(self, db: Session, player_id: int) -> Optional[Player]:
+        player = db.query(Player).filter(Player.id == player_id).first()
+        if player is not None:
+            # Detach so later commits on this session never expire our copy
+            db.expunge(player)
+        return player
+
+    def get(self, player_id: int) -> Optional[Player]:
+        return self.players.get(player_id)
+
+    def acquire(self, player_id: int, db: Optional[Session] = None) -> Optional[Player]:
+        """Load a player for a new connection and pin it in the store."""
+        player = self.load(player_id, db)
+        if player is not None:
+            self._refs[player_id] = self._refs.get(player_id, 0) + 1
+            self._released.discard(player_id)
+        return player
+
+    async def acquire_async(self, player_id: int) -> Optional[Player]:
+        """``acquire`` with the database load on the database threads."""
+        player = self.players.get(player_id)
+        if player is None:
+            player = await self.db.call(self._load, player_id)
+            if player is None:
+                return None
+            # Another connection may have loaded the player meanwhile: keep the first copy
+            if player_id not in self.players:
+                self.players[player_id] = player
+                self._stored(player)
+            player = self.players[player_id]
+        self._refs[player_id] = self._refs.get(player_id, 0) + 1
+        self._released.discard(player_id)
+        return player
+
+    def release(self, player_id: int) -> None:
+        """Drop a connection's pin; the last one flushes and evicts the player."""
+        refs = self._refs.get(player_id, 0) - 1
+        if refs > 0:
+            self._refs[player_id] = refs
+            return
+        self._refs.pop(player_id, None)
+        self._released.add(player_id)
+        self.flush([player_id])
+        self._evict_released()
+
+    async def release_async(self, player_id: int) -> None:
+        """``release`` with the final write on the database threads."""
+        refs = self._refs.get(player_id, 0) - 1
+        if refs > 0:
+            self._refs[player_id] = refs
+            return
+        self._refs.pop(player_id, None)
+        self._released.add(player_id)
+        await self.flush_async([player_id])
+        # Changed during the write: write again, unless the player reconnected meanwhile
+        while player_id in self._dirty and player_id in self._released:
+            if not await self.flush_async([player_id]):
+                break  # The write failed: the flush loop retries it and evicts then
+        self._evict_released()
+
+    def _evict_released(self) -> None:
+        """Evict the released players that are written back (a reconnect takes them off the list)."""
+        if self._flush_lock.locked():
+            return  # A write in flight may still fail and need them: the next release or flush evicts
+        for player_id in [pid for pid in self._released if pid not in self._dirty]:
+            self._released.discard(player_id)
+            self._evict(player_id)
+
+    def _stored(self, player: Player) -> None:
+        """The player's inventory is as in the database."""
+        self._stored_inventory[player.id] = (player.inventory, player.inventory.version)
+
+    def _evict(self, player_id: int) -> None:
+        self.players.pop(player_id, None)
+        self._stored_inventory.pop(player_id, None)
+        self.stats_cache.discard(player_id)
+
+    def effective_stats(self, player: Player) -> StatsSnapshot:
+        """Cached effective stats (transformation and passives applied)."""
+        return self.stats_cache.get(player)
+
+    def invalidate_stats(self, player: Player) -> None:
+        """Call after changing base stats or passive counters (not HP/flux)."""
+        self.stats_cache.invalidate(player.id)
+
+    def mark_dirty(self, player: Player) -> None:
+        """Schedule a player for the next batched write."""
+        self._dirty.add(player.id)
+
+    def flush(self, player_ids=None) -> int:
+        """
+        Write dirty players to the database in a single batched update.
+
+        Args:
+            player_ids: Restrict the flush to these players (default: all dirty)
+
+        Returns:
+            Number of rows written
+        """
+        pending, mappings, inventories = self._collect(player_ids)
+        if not pending:
+            return 0
+        try:
+            elapsed_ms = self._write(mappings)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Error flushing {len(mappings)} players: {e}", exc_info=True)
+            return 0
+        self._dirty -= pending
+        self._record(len(mappings), elapsed_ms, inventories)
+        return len(mappings)
+
+    async def flush_async(self, player_ids=None) -> int:
+        """``flush`` with the write on the database threads."""
+        async with self._flush_lock:
+            pending, mappings, inventories = self._collect(player_ids)
+            if not pending:
+                return 0
+            # Players marked dirty while the write runs go out with the next flush
+            self._dirty -= pending
+            try:
+                elapsed_ms = await self.db.call(self._write, mappings)
+            except Exception as e:
+                self._dirty |= pending
+                self.flush_errors += 1
+                logger.error(f"Error flushing {len(mappings)} players: {e}", exc_info=True)
+                return 0
+            self._record(len(mappings), elapsed_ms, inventories)
+            return len(mappings)
+
+    def _collect(self, player_ids) -> Tuple[Set[int], List[Dict], Dict[int, Tuple[Inventory, int]]]:
+        """The dirty players to write, a copy of their rows and the inventories in them."""
+        if player_ids is None:
+            pending = set(self._dirty)
+        else:
+            pending = self._dirty.intersection(player_ids)
+        mappings = []
+        inventories = {}
+        for pid in pending:
+            player = self.players.get(pid)
+            if player is None:
+                continue
+            row = {"id": pid}
+            for field in PERSISTED_FIELDS:
+                row[field] = _copy_json(getattr(player, field))
+            inventory = player.inventory
+            if (inventory, inventory.version) != self._stored_inventory.get(pid):
+                row["inventory"] = inventory.to_json()
+                inventories[pid] = (inventory, inventory.version)
+            mappings.append(row)
+        # One UPDATE statement per column set: rows with an inventory together
+        mappings.sort(key=lambda row: "inventory" in row)
+        return pending, mappings, inventories
+
+    def _write(self, mappings: List[Dict]) -> float:
+        """One batched update; returns its duration (ms)."""
+        start = time.perf_counter()
+        with self.session_factory() as db:
+            db.bulk_update_mappings(Player, mappings)
+            db.commit()
+        return (time.perf_counter() - start) * 1000
+
+    def _record(self, rows: int, elapsed_ms: float, inventories: Dict[int, Tuple[Inventory, int]]) -> None:
+        # Only players still loaded: an evicted one must not come back as "stored"
+        self._stored_inventory.update((pid, stored) for pid, stored in inventories.items() if pid in self.players)
+        self.flush_count += 1
+        self.flushed_rows += rows
+        self.flushed_inventories += len(inventories)
+        self.last_flush_ms = elapsed_ms
+        self.total_flush_ms += elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    async def run_flush_loop(self) -> None:
+        """Flush dirty players every ``flush_interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_async()
+            self._evict_released()
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self.run_flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write out everything still dirty."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_async()
+
+    def get_stats(self) -> Dict:
+        return {
+            "cached_players": len(self.players),
+            "dirty_players": len(self._dirty),
+            "flushes": self.flush_count,
+            "flushed_rows": self.flushed_rows,
+            "flushed_inventories": self.flushed_inventories,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flush_count, 3) if self.flush_count else 0.0,
+            "stats_cache": self.stats_cache.get_stats(),
+        }
+
+
+# Singleton instance
+player_store = PlayerStateStore()
@@ -0,0 +1,234 @@
+"""
+Room population: the live mob instances of the world.
+
+Every entry of a room's ``mobs`` list in ``rooms.json`` is a spawn point with
+one mob instance. Instances are stored as parallel arrays (struct of arrays)
+indexed by slot, and the slots of a room are contiguous, so a room's mobs are
+``range(room_start[r], room_start[r + 1])``. Looking up a room's mobs or its
+live count is O(1) and the whole population costs a few bytes per mob.
+
+A hunt engages a free instance, and a kill starts its respawn timer. Timers
+are a heap of ``(tick, slot)`` that the tick scheduler drains (see
+``GameEngine.tick_respawn``). Fled or lost fights put the instance back with
+whatever HP it had left.
+"""
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from app.core.constants import MOB_RESPAWN_TICKS
+
+# Instance states
+ALIVE = 0     # In its room, can be hunted
+ENGAGED = 1   # Fighting a player
+DEAD = 2      # Waiting for its respawn tick
+
+NO_PLAYER = -1
+
+
+class RoomPopulation:
+    """Live mob instances per room, in compact arrays."""
+
+    def __init__(self, rooms: Dict, mobs_data: Dict[str, Dict], respawn_ticks: int = MOB_RESPAWN_TICKS):
+        self.respawn_ticks = respawn_ticks
+        self.mobs_data = mobs_data
+        self.now = 0  # Last tick seen
+
+        # Mob kinds: interned ids, so every instance stores a small index
+        self.kinds: List[str] = []
+        kind_index: Dict[str, int] = {}
+
+        self.room_ids: List[str] = []
+        self.room_index: Dict[str, int] = {}
+        self.room_start = array("i", [0])
+        kinds = array("H")
+        slot_rooms = array("i")
+        for room_id, room in rooms.items():
+            for mob_id in room.mobs:
+                if mob_id not in mobs_data:
+                    continue  # Unknown mob ids are ignored, like spawn_mob does
+                if mob_id not in kind_index:
+                    kind_index[mob_id] = len(self.kinds)
+                    self.kinds.append(mob_id)
+                kinds.append(kind_index[mob_id])
+                slot_rooms.append(len(self.room_ids))
+            self.room_index[room_id] = len(self.room_ids)
+            self.room_ids.append(room_id)
+            self.room_start.append(len(kinds))
+
+        size = len(kinds)
+        self.kind = kinds
+        self.room = slot_rooms
+        self.max_hp = array("i", (self._max_hp(self.kinds[k]) for k in kinds))
+        self.hp = array("i", self.max_hp)
+        self.state = array("b", bytes(size))  # All ALIVE
+        self.engaged_by = array("i", [NO_PLAYER]) * size
+        self.alive = array("i", (self.room_start[r + 1] - self.room_start[r] for r in range(len(self.room_ids))))
+        self._respawns: List[Tuple[int, int]] = []  # (tick, slot) heap
+
+        # Counters
+        self.kills = 0
+        self.respawned = 0
+
+    def _max_hp(self, mob_id: str) -> int:
+        stats = self.mobs_data[mob_id]["stats"]
+        return stats.get("max_hp", stats["hp"])
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def slots(self, room_id: str) -> range:
+        r = self.room_index.get(room_id)
+        if r is None:
+            return range(0)
+        return range(self.room_start[r], self.room_start[r + 1])
+
+    def room_of(self, slot: int) -> str:
+        return self.room_ids[self.room[slot]]
+
+    def mob_id(self, slot: int) -> str:
+        return self.kinds[self.kind[slot]]
+
+    def alive_count(self, room_id: str) -> int:
+        """Mobs in the room that can be hunted right now."""
+        r = self.room_index.get(room_id)
+        return self.alive[r] if r is not None else 0
+
+    def available(self, room_id: str) -> List[int]:
+        state = self.state
+        return [slot for slot in self.slots(room_id) if state[slot] == ALIVE]
+
+    def counts(self, room_id: str) -> Dict[str, int]:
+        """Huntable mobs in a room by mob id, in spawn order."""
+        counts: Dict[str, int] = {}
+        if not self.alive_count(room_id):
+            return counts
+        for slot in self.available(room_id):
+            mob_id = self.mob_id(slot)
+            counts[mob_id] = counts.get(mob_id, 0) + 1
+        return counts
+
+    # --- Lifecycle ---
+
+    def engage(self, room_id: str, player_id: int, rng) -> Optional[int]:
+        """Pick a huntable mob in the room (with ``rng``) and bind it to the player."""
+        free = self.available(room_id)
+        if not free:
+            return None
+        slot = rng.choice(free)
+        self._engage(slot, player_id)
+        return slot
+
+    def reengage(self, slot: int, mob_id: str, player_id: int) -> bool:
+        """Bind a fight restored from a saved combat state back to its instance, if it is still free."""
+        if not (0 <= slot < len(self)) or self.mob_id(slot) != mob_id:
+            return False  # The world changed since the fight was saved
+        if self.state[slot] == ENGAGED and self.engaged_by[slot] == player_id:
+            return True
+        if self.state[slot] != ALIVE:
+            return False
+        self._engage(slot, player_id)
+        return True
+
+    def _engage(self, slot: int, player_id: int) -> None:
+        self.state[slot] = ENGAGED
+        self.engaged_by[slot] = player_id
+        self.alive[self.room[slot]] -= 1
+
+    def set_hp(self, slot: int, hp: int) -> None:
+        self.hp[slot] = max(0, hp)
+
+    def release(self, slot: int, player_id: int) -> bool:
+        """The fight ended without a kill (flee, loss, logout): the mob is huntable again."""
+        if self.state[slot] != ENGAGED or self.engaged_by[slot] != player_id:
+            return False
+        self.state[slot] = ALIVE
+        self.engaged_by[slot] = NO_PLAYER
+        self.alive[self.room[slot]] += 1
+        return True
+
+    def kill(self, slot: int, player_id: int) -> bool:
+        """The player killed the mob: it respawns ``respawn_ticks`` from now."""
+        if self.state[slot] != ENGAGED or self.engaged_by[slot] != player_id:
+            return False
+        self.state[slot] = DEAD
+        self.engaged_by[slot] = NO_PLAYER
+        self.kills += 1
+        heapq.heappush(self._respawns, (self.now + self.respawn_ticks, slot))
+        return True
+
+    def respawn(self, tick: int) -> List[str]:
+        """Bring back every mob due by ``tick``; returns the rooms that changed."""
+        self.now = tick
+        rooms: Dict[str, None] = {}  # Ordered set
+        heap = self._respawns
+        while heap and heap[0][0] <= tick:
+            _, slot = heapq.heappop(heap)
+            self.state[slot] = ALIVE
+            self.hp[slot] = self.max_hp[slot]
+            self.alive[self.room[slot]] += 1
+            self.respawned += 1
+            rooms[self.room_ids[self.room[slot]]] = None
+        return list(rooms)
+
+    def slot_map(self, old: "RoomPopulation") -> Dict[int, int]:
+        """Old slot -> slot here of every instance of ``old`` that still exists (after a content reload).
+
+        An instance is the same when its room, its mob and its spawn point (the
+        n-th of that mob in the room) are. Only reads the layout, which never
+        changes, so it can run while ``old`` is in use.
+        """
+        moved: Dict[int, int] = {}
+        for r, room_id in enumerate(old.room_ids):
+            new_r = self.room_index.get(room_id)
+            if new_r is None:
+                continue
+            spawn_points: Dict[str, List[int]] = {}
+            for slot in range(self.room_start[new_r], self.room_start[new_r + 1]):
+                spawn_points.setdefault(self.mob_id(slot), []).append(slot)
+            seen: Dict[str, int] = {}
+            for old_slot in range(old.room_start[r], old.room_start[r + 1]):
+                mob_id = old.mob_id(old_slot)
+                n = seen.get(mob_id, 0)
+                seen[mob_id] = n + 1
+                candidates = spawn_points.get(mob_id, ())
+                if n < len(candidates):
+                    moved[old_slot] = candidates[n]
+        return moved
+
+    def carry_over(self, old: "RoomPopulation", moved: Dict[int, int]) -> None:
+        """Take over the state of the instances in ``moved`` (see ``slot_map``).
+
+        Fights, wounds and respawn timers move with them; HP is capped at the new max.
+        """
+        for old_slot, slot in moved.items():
+            if old.hp[old_slot] < old.max_hp[old_slot]:
+                self.hp[slot] = min(old.hp[old_slot], self.max_hp[slot])
+            state = old.state[old_slot]
+            if state != ALIVE:
+                self.state[slot] = state
+                self.engaged_by[slot] = old.engaged_by[old_slot]
+                self.alive[self.room[slot]] -= 1
+        self._respawns = [(tick, moved[slot]) for tick, slot in old._respawns if slot in moved]
+        heapq.heapify(self._respawns)
+        self.now = old.now
+        self.kills = old.kills
+        self.respawned = old.respawned
+
+    def nbytes(self) -> int:
+        """Size of the per-instance arrays."""
+        columns = (self.kind, self.room, self.max_hp, self.hp, self.state, self.engaged_by)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def get_stats(self) -> Dict:
+        state = self.state
+        return {
+            "mobs": len(self),
+            "rooms": sum(1 for r in range(len(self.room_ids)) if self.room_start[r + 1] > self.room_start[r]),
+            "alive": state.count(ALIVE),
+            "engaged": state.count(ENGAGED),
+            "dead": state.count(DEAD),
+            "kills": self.kills,
+            "respawned": self.respawned,
+            "bytes": self.nbytes(),
+        }
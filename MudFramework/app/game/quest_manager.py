@@ -1,40 +1,42 @@
-import json
-import os
 from typing import Dict, Optional
 import logging
 
+from app.game.content import load_table
+
 logger = logging.getLogger(__name__)
 
+def index_npcs_by_room(npcs: Dict) -> Dict[str, Dict]:
+    """Room id -> the NPC found there (the first one, in table order)."""
+    by_room: Dict[str, Dict] = {}
+    for npc in npcs.values():
+        by_room.setdefault(npc["room_id"], npc)
+    return by_room
+
 class QuestManager:
     def __init__(self):
         self.npcs: Dict = {}
+        self.npcs_by_room: Dict[str, Dict] = {}
         self.quests: Dict = {}
         self.load_data()
 
     def load_data(self):
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        
         # Load NPCs
         try:
-            with open(os.path.join(base_path, "data", "npcs.json"), "r") as f:
-                self.npcs = json.load(f)
+            self.npcs = load_table("npcs")
+            self.npcs_by_room = index_npcs_by_room(self.npcs)
             logger.info(f"Loaded {len(self.npcs)} NPCs.")
         except Exception as e:
             logger.error(f"Error loading NPCs: {e}", exc_info=True)
 
         # Load Quests
         try:
-            with open(os.path.join(base_path, "data", "quests.json"), "r") as f:
-                self.quests = json.load(f)
+            self.quests = load_table("quests")
             logger.info(f"Loaded {len(self.quests)} quests.")
         except Exception as e:
             logger.error(f"Error loading Quests: {e}", exc_info=True)
 
     def get_npc_by_room(self, room_id: str) -> Optional[Dict]:
-        for npc in self.npcs.values():
-            if npc["room_id"] == room_id:
-                return npc
-        return None
+        return self.npcs_by_room.get(room_id)
 
     def get_quest(self, quest_id: str) -> Optional[Dict]:
         return self.quests.get(quest_id)
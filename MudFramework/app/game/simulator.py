@@ -0,0 +1,269 @@
+"""
+Offline combat simulator for balance work.
+
+Fights simulated players (race, level, transformation) against mobs using
+the live ``CombatSystem.combat_round`` and the same per-round seeded RNG
+streams as the server, so any single fight can be replayed from its seed.
+Fights are spread over worker processes and summarized per race, level and
+mob as win rate, time-to-kill and EXP per minute.
+
+    python -m app.game.simulator --levels 1,5,10 --fights 20000
+    python -m app.game.simulator --races Zenkai --levels 5 --mobs saibaman --replay 1234
+
+The simulator mirrors the engine's round handling: effective stats are
+recomputed from base stats every round, flux regenerates and cooldowns tick
+down between rounds, and (like the server) race passives are off unless
+``--passives`` is given. Each fight starts at full HP and flux.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.constants import BASE_FLUX, FLUX_PER_INT, FLUX_REGEN_PERCENT
+from app.game.combat import CombatSystem, combat_rng
+from app.game.skills_manager import skills_manager
+from app.game.transformations import TRANSFORMATIONS, calculate_effective_stats, get_available_transformations
+
+RACES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "races.json")
+
+POLICIES = ("attack", "greedy")
+
+
+def load_races() -> Dict[str, Dict]:
+    with open(RACES_PATH, "r") as f:
+        return json.load(f)
+
+
+def stats_at_level(race: Dict, level: int) -> Dict:
+    """Base stats of a fresh character of ``race`` levelled to ``level``.
+
+    Follows player creation and ``GameEngine.grant_exp`` level-ups.
+    """
+    stats = dict(race["base_stats"])
+    for _ in range(level - 1):
+        for k, v in race["scaling_stats"].items():
+            if k in stats:
+                stats[k] = int(stats[k] + v)
+    base_flux = race.get("base_flux") or BASE_FLUX
+    stats["max_hp"] = stats["hp"] = stats["vit"] * 10
+    stats["max_flux"] = stats["flux"] = base_flux + stats.get("int", 0) * FLUX_PER_INT
+    return stats
+
+
+def best_transformation(race: str, level: int) -> str:
+    forms = get_available_transformations(race, level)
+    return max(forms, key=lambda name: TRANSFORMATIONS[name]["mult"], default="Base")
+
+
+class Combatant:
+    """What ``combat_round`` sees of a player (like the engine's TempPlayer)."""
+
+    __slots__ = ("stats", "race")
+
+    def __init__(self, stats: Dict, race: Optional[str]):
+        self.stats = stats
+        self.race = race
+
+
+class FightSpec:
+    """One simulated matchup; fights of the same spec differ only by seed."""
+
+    def __init__(self, race: str, level: int, mob_id: str, policy: str = "attack",
+                 form: str = "best", passives: bool = False, max_rounds: int = 100):
+        self.race = race
+        self.level = level
+        self.mob_id = mob_id
+        self.policy = policy
+        self.passives = passives
+        self.max_rounds = max_rounds
+        self.transformation = best_transformation(race, level) if form == "best" else "Base"
+        self.stats = stats_at_level(load_races()[race], level)
+        self.skills = sorted(
+            (s for s in skills_manager.get_available_skills(race, level)
+             if s.damage_multiplier > 0
+             and skills_manager.can_use_skill(s.id, race, level, self.transformation)[0]),
+            key=lambda s: s.damage_multiplier, reverse=True,
+        )
+
+
+async def simulate_fight(combat: CombatSystem, spec: FightSpec, seed: int, log: Optional[List[str]] = None) -> Tuple[str, int, int]:
+    """Fight one battle to the end. Returns (status, rounds, exp)."""
+    mob = combat.spawn_mob(spec.mob_id)
+    stats = dict(spec.stats)
+    cooldowns: Dict[str, int] = {}
+    race = spec.race if spec.passives else None
+
+    for round_no in range(1, spec.max_rounds + 1):
+        skill = None
+        if spec.policy == "greedy":
+            skill = next((s for s in spec.skills
+                          if not cooldowns.get(s.id) and stats.get("flux", 0) >= s.flux_cost), None)
+            if skill:
+                stats["flux"] -= skill.flux_cost
+                if skill.cooldown > 0:
+                    cooldowns[skill.id] = skill.cooldown
+
+        player = Combatant(calculate_effective_stats(stats, spec.transformation), race)
+        outcome = await combat.combat_round(player, mob, "skill" if skill else "attack", skill=skill,
+                                            rng=combat_rng(seed, round_no))
+        if log is not None:
+            log.extend(outcome["log"])
+
+        if outcome["status"] == "win":
+            return "win", round_no, outcome["exp"]
+        if outcome["status"] == "loss":
+            return "loss", round_no, 0
+
+        # Between rounds, as in GameEngine._handle_combat_continue
+        stats["hp"] = player.stats["hp"]
+        max_flux = stats.get("max_flux", BASE_FLUX)
+        stats["flux"] = min(max_flux, stats.get("flux", 0) + int(max_flux * FLUX_REGEN_PERCENT))
+        for skill_id in list(cooldowns):
+            cooldowns[skill_id] -= 1
+            if cooldowns[skill_id] <= 0:
+                del cooldowns[skill_id]
+
+    return "timeout", spec.max_rounds, 0
+
+
+def _simulate_chunk(job: Tuple) -> Tuple[Tuple, Dict[str, int]]:
+    """Worker entry point: run ``count`` fights of one cell from ``first_seed``."""
+    key, spec_kwargs, first_seed, count = job
+    spec = FightSpec(**spec_kwargs)
+    combat = CombatSystem(None)
+    totals = {"fights": 0, "wins": 0, "losses": 0, "timeouts": 0, "rounds": 0, "win_rounds": 0, "exp": 0}
+
+    async def run():
+        for i in range(count):
+            status, rounds, exp = await simulate_fight(combat, spec, first_seed + i)
+            totals["fights"] += 1
+            totals["rounds"] += rounds
+            totals["exp"] += exp
+            if status == "win":
+                totals["wins"] += 1
+                totals["win_rounds"] += rounds
+            elif status == "loss":
+                totals["losses"] += 1
+            else:
+                totals["timeouts"] += 1
+
+    asyncio.run(run())
+    return key, totals
+
+
+def cell_seed(base_seed: int, race: str, level: int, mob_id: str) -> int:
+    """First fight seed of a (race, level, mob) cell; fights use consecutive seeds."""
+    return random.Random(f"{base_seed}:{race}:{level}:{mob_id}").getrandbits(62)
+
+
+def summarize(totals: Dict[str, int], round_seconds: float) -> Dict:
+    """Win rate, time-to-kill and EXP/min for one cell.
+
+    Every fight costs one ``hunt`` plus one command per round, each taking
+    ``round_seconds`` of play time.
+    """
+    fights = totals["fights"]
+    play_minutes = (totals["rounds"] + fights) * round_seconds / 60
+    return {
+        **totals,
+        "win_rate": totals["wins"] / fights if fights else 0.0,
+        "ttk_rounds": totals["win_rounds"] / totals["wins"] if totals["wins"] else None,
+        "exp_per_min": totals["exp"] / play_minutes if play_minutes else 0.0,
+    }
+
+
+def run_simulation(races: List[str], levels: List[int], mobs: List[str], fights: int,
+                   workers: int = 1, seed: int = 0, chunk_size: int = 5000, round_seconds: float = 2.0,
+                   **spec_options) -> Dict[Tuple[str, int, str], Dict]:
+    """Simulate ``fights`` battles per (race, level, mob) across ``workers`` processes."""
+    jobs = []
+    for race in races:
+        for level in levels:
+            for mob_id in mobs:
+                key = (race, level, mob_id)
+                spec_kwargs = dict(race=race, level=level, mob_id=mob_id, **spec_options)
+                first = cell_seed(seed, race, level, mob_id)
+                for start in range(0, fights, chunk_size):
+                    jobs.append((key, spec_kwargs, first + start, min(chunk_size, fights - start)))
+
+    totals: Dict[Tuple, Dict[str, int]] = {}
+
+    def merge(key, chunk):
+        cell = totals.setdefault(key, dict.fromkeys(chunk, 0))
+        for k, v in chunk.items():
+            cell[k] += v
+
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for key, chunk in pool.imap_unordered(_simulate_chunk, jobs):
+                merge(key, chunk)
+    else:
+        for job in jobs:
+            merge(*_simulate_chunk(job))
+
+    return {key: summarize(cell, round_seconds) for key, cell in sorted(totals.items())}
+
+
+def print_table(results: Dict[Tuple[str, int, str], Dict]) -> None:
+    print(f"{'race':<9} {'lvl':>4} {'mob':<16} {'fights':>9} {'win %':>7} {'ttk':>6} {'exp/min':>9} {'timeouts':>9}")
+    for (race, level, mob_id), r in results.items():
+        ttk = f"{r['ttk_rounds']:.1f}" if r["ttk_rounds"] is not None else "-"
+        print(f"{race:<9} {level:>4} {mob_id:<16} {r['fights']:>9} {r['win_rate'] * 100:>6.1f}% "
+              f"{ttk:>6} {r['exp_per_min']:>9.1f} {r['timeouts']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    races = load_races()
+    mobs = sorted(CombatSystem(None).mobs_data)
+    parser.add_argument("--races", default=",".join(races), help="Comma-separated races")
+    parser.add_argument("--levels", default="1,5,10,20", help="Comma-separated levels")
+    parser.add_argument("--mobs", default=",".join(mobs), help="Comma-separated mob ids")
+    parser.add_argument("--fights", type=int, default=1000, help="Fights per race/level/mob")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; same seed, same results")
+    parser.add_argument("--policy", choices=POLICIES, default="attack",
+                        help="attack: basic attacks only; greedy: strongest usable damage skill")
+    parser.add_argument("--form", choices=("best", "base"), default="best", help="Transformation to fight in")
+    parser.add_argument("--passives", action="store_true", help="Apply race passives in combat")
+    parser.add_argument("--max-rounds", type=int, default=100)
+    parser.add_argument("--round-seconds", type=float, default=2.0, help="Play time per command")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    parser.add_argument("--replay", type=int, metavar="SEED", help="Print the log of one fight seed")
+    args = parser.parse_args()
+
+    race_list = args.races.split(",")
+    level_list = [int(level) for level in args.levels.split(",")]
+    mob_list = args.mobs.split(",")
+    spec_options = dict(policy=args.policy, form=args.form, passives=args.passives, max_rounds=args.max_rounds)
+
+    if args.replay is not None:
+        spec = FightSpec(race_list[0], level_list[0], mob_list[0], **spec_options)
+        log: List[str] = []
+        status, rounds, exp = asyncio.run(simulate_fight(CombatSystem(None), spec, args.replay, log))
+        print(f"{spec.race} L{spec.level} ({spec.transformation}) vs {spec.mob_id}, seed {args.replay}")
+        print("\n".join(log))
+        print(f"=> {status} after {rounds} rounds, {exp} EXP")
+        return
+
+    start = time.perf_counter()
+    results = run_simulation(race_list, level_list, mob_list, args.fights, workers=args.workers,
+                             seed=args.seed, round_seconds=args.round_seconds, **spec_options)
+    elapsed = time.perf_counter() - start
+    print_table(results)
+    total = sum(r["fights"] for r in results.values())
+    print(f"{total} fights in {elapsed:.1f}s on {args.workers} worker(s) ({total / elapsed:,.0f} fights/s)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([{"race": race, "level": level, "mob": mob_id, **r}
+                       for (race, level, mob_id), r in results.items()], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
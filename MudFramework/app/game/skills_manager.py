@@ -1,11 +1,20 @@
-import json
-import os
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from app.game.content import load_table
+
 logger = logging.getLogger(__name__)
 
 class Skill:
+    __slots__ = (
+        "id", "name", "type", "race_required", "description", "level_required", "flux_cost", "cooldown",
+        "damage_multiplier", "stat_type", "heal_percent",
+        "ignores_defense", "defense_pierce_percent", "skip_enemy_turn", "guaranteed_hit", "dodge_chance",
+        "self_debuff", "hp_cost_percent", "damage_reduction", "buff_stat", "buff_percent", "buff_duration",
+        "transformation_required", "skip_attack",
+    )
+
     def __init__(self, data: Dict):
         self.id = data["id"]
         self.name = data["name"]
@@ -40,20 +49,47 @@ class Skill:
         self.transformation_required = data.get("transformation_required")
         self.skip_attack = data.get("skip_attack", False)
 
+class SkillIndex:
+    """Lookups over a skill table, built once per load.
+
+    * ``by_name``: case-folded name -> skill (the first one, in table order);
+    * per race: the skills that race can learn (general ones included), sorted
+      by level with their levels alongside, so "unlocked by level L" is a
+      bisect and a slice. Races no skill names get the general list.
+    """
+
+    __slots__ = ("by_name", "by_race")
+
+    def __init__(self, skills: Dict[str, Skill]):
+        self.by_name: Dict[str, Skill] = {}
+        for skill in skills.values():
+            self.by_name.setdefault(skill.name.casefold(), skill)
+
+        races = {skill.race_required for skill in skills.values() if skill.race_required}
+        self.by_race: Dict[Optional[str], Tuple[List[int], List[Skill]]] = {}
+        for race in [None, *races]:
+            # Stable sort: equal levels stay in table order
+            ladder = sorted(
+                (skill for skill in skills.values() if not skill.race_required or skill.race_required == race),
+                key=lambda skill: skill.level_required,
+            )
+            self.by_race[race] = ([skill.level_required for skill in ladder], ladder)
+
+    def ladder(self, race: str) -> Tuple[List[int], List[Skill]]:
+        return self.by_race.get(race) or self.by_race[None]
+
+
 class SkillsManager:
     def __init__(self):
         self.skills: Dict[str, Skill] = {}
+        self.index = SkillIndex(self.skills)
         self.load_skills()
 
     def load_skills(self):
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(base_path, "data", "skills.json")
-        
         try:
-            with open(data_path, "r") as f:
-                data = json.load(f)
-                for skill_id, skill_data in data.items():
-                    self.skills[skill_id] = Skill(skill_data)
+            for skill_id, skill_data in load_table("skills").items():
+                self.skills[skill_id] = Skill(skill_data)
+            self.index = SkillIndex(self.skills)
             logger.info(f"Loaded {len(self.skills)} skills.")
         except Exception as e:
             logger.error(f"Error loading skills: {e}", exc_info=True)
@@ -63,35 +99,21 @@ class SkillsManager:
 
     def get_skill_by_name(self, name: str) -> Optional[Skill]:
         """Get skill by name (case-insensitive)."""
-        for skill in self.skills.values():
-            if skill.name.lower() == name.lower():
-                return skill
-        return None
+        return self.index.by_name.get(name.casefold())
 
     def get_available_skills(self, race: str, level: int) -> List[Skill]:
-        """Get all skills that a player can learn based on race and level."""
-        available = []
-        for skill in self.skills.values():
-            # Check level requirement
-            if level < skill.level_required:
-                continue
-            
-            # Check race requirement (None means general skill)
-            if skill.race_required and skill.race_required != race:
-                continue
-                
-            available.append(skill)
-        
-        return available
+        """Get all skills that a player can learn based on race and level, by level."""
+        levels, ladder = self.index.ladder(race)
+        return ladder[:bisect_right(levels, level)]
+
+    def get_unlocked_skills(self, race: str, old_level: int, new_level: int) -> List[Skill]:
+        """Skills that become learnable going from ``old_level`` to ``new_level``, by level."""
+        levels, ladder = self.index.ladder(race)
+        return ladder[bisect_right(levels, old_level):bisect_right(levels, new_level)]
 
     def get_all_race_skills(self, race: str) -> List[Skill]:
         """Get ALL skills for a race, regardless of level."""
-        relevant = []
-        for skill in self.skills.values():
-            if skill.race_required and skill.race_required != race:
-                continue
-            relevant.append(skill)
-        return sorted(relevant, key=lambda x: x.level_required)
+        return list(self.index.ladder(race)[1])
 
     def get_race_passive(self, race: str) -> Dict:
         """Get passive ability for a race."""
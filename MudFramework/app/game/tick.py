@@ -0,0 +1,110 @@
+"""
+Fixed-timestep world tick scheduler.
+
+Game systems (regen, cooldown decay, respawns...) register with a period in
+ticks and run in batches over all online players on the server event loop,
+independent of player commands. The scheduler keeps a steady cadence: when a
+tick overruns its budget the missed ticks are skipped rather than replayed,
+and both overruns and skipped ticks are counted.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+TickSystem = Callable[[int], Awaitable[None]]
+
+
+class TickScheduler:
+    """Runs registered systems every N ticks at a fixed interval."""
+
+    def __init__(self, tick_interval: float = None):
+        self.tick_interval = tick_interval if tick_interval is not None else settings.TICK_INTERVAL
+        self.systems: List[tuple] = []  # (name, every_n_ticks, fn)
+        self.tick = 0
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.tick_duration = Histogram()
+        self.system_duration: Dict[str, Histogram] = {}
+        self.overruns = 0
+        self.skipped_ticks = 0
+
+    def add_system(self, name: str, fn: TickSystem, every: int = 1) -> None:
+        """Run ``fn(tick)`` on every ``every``-th tick."""
+        if every < 1:
+            raise ValueError("Tick period must be at least 1.")
+        self.systems.append((name, every, fn))
+        self.system_duration[name] = Histogram()
+
+    async def run_tick(self) -> float:
+        """Run one tick of every due system. Returns its duration in ms."""
+        self.tick += 1
+        start = time.perf_counter()
+        for name, every, fn in self.systems:
+            if self.tick % every:
+                continue
+            sys_start = time.perf_counter()
+            try:
+                await fn(self.tick)
+            except Exception as e:
+                logger.error(f"Tick system '{name}' failed on tick {self.tick}: {e}", exc_info=True)
+            self.system_duration[name].observe((time.perf_counter() - sys_start) * 1000)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.tick_duration.observe(elapsed_ms)
+        return elapsed_ms
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick_interval
+        while True:
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            elapsed_ms = await self.run_tick()
+            next_tick += self.tick_interval
+
+            now = loop.time()
+            if now > next_tick:
+                # Overran the budget: drop the ticks we are behind on
+                missed = int((now - next_tick) // self.tick_interval) + 1
+                self.overruns += 1
+                self.skipped_ticks += missed
+                next_tick += missed * self.tick_interval
+                logger.warning(
+                    f"Tick {self.tick} took {elapsed_ms:.1f}ms "
+                    f"(budget {self.tick_interval * 1000:.0f}ms), skipped {missed} tick(s)"
+                )
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "tick": self.tick,
+            "tick_interval_ms": self.tick_interval * 1000,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "tick_ms": self.tick_duration.to_dict(),
+            "systems_ms": {name: hist.to_dict() for name, hist in self.system_duration.items()},
+        }
+
+
+# Singleton instance
+tick_scheduler = TickScheduler()
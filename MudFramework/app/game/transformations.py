@@ -30,6 +30,17 @@ def get_available_transformations(race: str, level: int) -> list:
     return [name for name, data in TRANSFORMATIONS.items() 
             if data["race"] == race and level >= data["req_level"]]
 
+def scale_stat(stat, value, transformation: Dict, general_mult: float = None):
+    """Apply a transformation's multiplier to a single stat value."""
+    # Check if there's a specific multiplier for this stat
+    if "multipliers" in transformation and stat in transformation["multipliers"]:
+        return int(value * transformation["multipliers"][stat])
+    if isinstance(value, (int, float)): # Apply general multiplier if it's a numeric stat
+        if general_mult is None:
+            general_mult = transformation.get("mult", 1.0)
+        return int(value * general_mult)
+    return value
+
 def calculate_effective_stats(base_stats, transformation_name="Base"):
     """Apply transformation multipliers to base stats and passives."""
     if transformation_name == "Base":
@@ -49,13 +60,7 @@ def calculate_effective_stats(base_stats, transformation_name="Base"):
     general_mult = transformation.get("mult", 1.0) # Default to 1.0 if no general multiplier
     
     for stat, value in base_stats.items():
-        # Check if there's a specific multiplier for this stat
-        if "multipliers" in transformation and stat in transformation["multipliers"]:
-            effective[stat] = int(value * transformation["multipliers"][stat])
-        elif isinstance(value, (int, float)): # Apply general multiplier if it's a numeric stat
-            effective[stat] = int(value * general_mult)
-        else:
-            effective[stat] = value
+        effective[stat] = scale_stat(stat, value, transformation, general_mult)
     
     # Apply Zenkai: Battle Hardened passive (STR bonus)
     if "battle_hardened_bonus" in base_stats:
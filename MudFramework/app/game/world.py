@@ -1,43 +1,59 @@
-import json
-import os
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
 import logging
 
+from app.core.config import settings
+from app.game.content import load_table
+from app.game.world_graph import WorldGraph
+from app.game.zones import DEFAULT_ZONE, START_ROOM
+
 logger = logging.getLogger(__name__)
 
 class Room:
+    __slots__ = ("id", "name", "zone", "description", "long_description", "exits", "mobs")
+
     def __init__(self, data):
         self.id = data["id"]
         self.name = data["name"]
+        self.zone = data.get("zone", DEFAULT_ZONE)
         self.description = data["description"]
         self.long_description = data.get("long_description", data["description"])  # Fallback to description if not set
         self.exits: Dict[str, str] = data.get("exits", {}) # dir -> room_id
         self.mobs: List[str] = data.get("mobs", []) # mob_ids
 
 class World:
-    def __init__(self):
+    def __init__(self, zones: Optional[Iterable[str]] = None):
+        # Zone workers load only the zones they own (see zones.py); None loads everything
+        self.zones = set(zones) if zones else None
         self.rooms: Dict[str, Room] = {}
         self.load_rooms()
+        # Adjacency, distances and cached paths (see world_graph.py)
+        self.graph = WorldGraph(self.rooms, partial=self.zones is not None)
 
     def load_rooms(self):
-        # Path relative to this file
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(base_path, "data", "rooms.json")
-        
         try:
-            with open(data_path, "r") as f:
-                data = json.load(f)
-                for room_id, room_data in data.items():
+            data = load_table("rooms")
+            for room_id, room_data in data.items():
+                if self.zones is None or room_data.get("zone", DEFAULT_ZONE) in self.zones:
                     self.rooms[room_id] = Room(room_data)
-            logger.info(f"Loaded {len(self.rooms)} rooms.")
+            if self.zones is None:
+                logger.info(f"Loaded {len(self.rooms)} rooms.")
+            else:
+                logger.info(f"Loaded {len(self.rooms)} rooms in zones {sorted(self.zones)}.")
         except Exception as e:
             logger.error(f"Error loading rooms: {e}", exc_info=True)
 
     def get_room(self, room_id: str) -> Optional[Room]:
         return self.rooms.get(room_id)
 
-    def get_start_room(self) -> Room:
-        return self.rooms.get("start_area") or list(self.rooms.values())[0]
+    def get_start_room_id(self) -> str:
+        """Where players start and revive. A zone worker gets it even when another worker owns it."""
+        if START_ROOM in self.rooms or self.zones is not None:
+            return START_ROOM
+        return next(iter(self.rooms))  # Content without a start_area: its first room
+
+    def get_start_room(self) -> Optional[Room]:
+        """The start room, or None on a zone worker that does not own it."""
+        return self.rooms.get(self.get_start_room_id())
 
 # Singleton instance
-world = World()
+world = World(zones=[zone for zone in settings.WORLD_ZONES.split(",") if zone] or None)
@@ -0,0 +1,355 @@
+"""
+World graph index and pathfinding.
+
+Built once from ``World.rooms`` at load time. Rooms get dense integer ids
+and exits are stored as CSR adjacency arrays (``offsets``/``targets``, with
+the exit direction of every edge), plus the same for reverse edges so
+"which rooms lead here" is a lookup too. Rooms are grouped into connected
+components (ignoring exit direction) so paths between separate areas are
+rejected without a search.
+
+Distances come from one of two precomputed tables:
+
+* small worlds (up to ``ALL_PAIRS_MAX_ROOMS``): a BFS from every room gives
+  exact distances for every pair, and paths are read off the table;
+* larger worlds: BFS distances to and from a few far-apart landmarks give
+  A* a lower bound (ALT: A*, landmarks, triangle inequality), so a search
+  only expands rooms close to the shortest path.
+
+Shortest paths are cached (LRU). Exits are one-way edges of length 1, so
+a path is simply the fewest moves. A zone worker's graph is ``partial``:
+exits into other zones are expected to leave it and are not warned about.
+"""
+import heapq
+import logging
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.constants import ALL_PAIRS_MAX_ROOMS, PATH_CACHE_SIZE, WORLD_GRAPH_LANDMARKS
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE = -1
+
+# Landmark bounds consulted per A* search (the ones tightest at the start room)
+ACTIVE_BOUNDS = 4
+
+
+class WorldGraph:
+    """Immutable adjacency index over a set of rooms with a cached shortest-path API."""
+
+    def __init__(self, rooms: Dict, landmarks: int = WORLD_GRAPH_LANDMARKS,
+                 all_pairs_max: int = ALL_PAIRS_MAX_ROOMS, cache_size: int = PATH_CACHE_SIZE,
+                 partial: bool = False):
+        self.room_ids: List[str] = list(rooms)
+        self.index: Dict[str, int] = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        self.partial = partial
+        self.dangling_exits = 0  # Exits to rooms not in the graph
+        self._build_edges(rooms)
+        self._build_components()
+
+        self.all_pairs: Optional[List[array]] = None
+        self.landmarks: List[int] = []
+        self._from_landmark: List[array] = []  # d(landmark, room)
+        self._to_landmark: List[array] = []  # d(room, landmark)
+        if len(self.room_ids) <= all_pairs_max:
+            self.all_pairs = [self._bfs(i, self.offsets, self.targets) for i in range(len(self.room_ids))]
+        else:
+            self._build_landmarks(landmarks)
+
+        self.cache_size = cache_size
+        self._paths: "OrderedDict[Tuple[int, int], Optional[Tuple[int, ...]]]" = OrderedDict()
+
+        # Counters
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.expanded = 0  # Rooms popped by A* searches
+
+    # --- Construction ---
+
+    def _build_edges(self, rooms: Dict) -> None:
+        n = len(self.room_ids)
+        offsets, targets, directions = array("i", [0]), array("i"), []
+        in_degree = [0] * (n + 1)
+        for room_id in self.room_ids:
+            for direction, target_id in rooms[room_id].exits.items():
+                target = self.index.get(target_id)
+                if target is None:
+                    self.dangling_exits += 1
+                    if not self.partial:
+                        logger.warning(f"Exit '{direction}' from {room_id} leads to unknown room {target_id}")
+                    continue
+                targets.append(target)
+                directions.append(direction)
+                in_degree[target + 1] += 1
+            offsets.append(len(targets))
+        self.offsets, self.targets, self.directions = offsets, targets, directions
+
+        # Reverse CSR: for each room, the edges (by forward edge number) that enter it
+        for i in range(n):
+            in_degree[i + 1] += in_degree[i]
+        rev_offsets = array("i", in_degree)
+        fill = list(in_degree[:n])
+        rev_sources, rev_edges = array("i", [0]) * len(targets), array("i", [0]) * len(targets)
+        for source in range(n):
+            for edge in range(offsets[source], offsets[source + 1]):
+                slot = fill[targets[edge]]
+                rev_sources[slot] = source
+                rev_edges[slot] = edge
+                fill[targets[edge]] = slot + 1
+        self.rev_offsets, self.rev_sources, self.rev_edges = rev_offsets, rev_sources, rev_edges
+
+    def _build_components(self) -> None:
+        """Connected components with exits treated as two-way."""
+        n = len(self.room_ids)
+        component = array("i", [UNREACHABLE]) * n
+        offsets, targets = self.offsets, self.targets
+        rev_offsets, rev_sources = self.rev_offsets, self.rev_sources
+        count = 0
+        for start in range(n):
+            if component[start] != UNREACHABLE:
+                continue
+            component[start] = count
+            stack = [start]
+            while stack:
+                u = stack.pop()
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    if component[v] == UNREACHABLE:
+                        component[v] = count
+                        stack.append(v)
+                for e in range(rev_offsets[u], rev_offsets[u + 1]):
+                    v = rev_sources[e]
+                    if component[v] == UNREACHABLE:
+                        component[v] = count
+                        stack.append(v)
+            count += 1
+        self.component, self.component_count = component, count
+
+    def _bfs(self, start: int, offsets: array, targets: array) -> array:
+        """Hop counts from ``start`` along the given CSR arrays (UNREACHABLE if none)."""
+        dist = array("i", [UNREACHABLE]) * len(self.room_ids)
+        dist[start] = 0
+        frontier = [start]
+        depth = 0
+        while frontier:
+            depth += 1
+            nxt = []
+            for u in frontier:
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    if dist[v] == UNREACHABLE:
+                        dist[v] = depth
+                        nxt.append(v)
+            frontier = nxt
+        return dist
+
+    def _build_landmarks(self, count: int) -> None:
+        """Farthest-point landmarks.
+
+        Every component holding at least a ``1/count`` share of the rooms is
+        seeded with one; small islands get none and are searched without a
+        bound, which is cheap at their size.
+        """
+        n = len(self.room_ids)
+        if n == 0 or count <= 0:
+            return
+        sizes: Dict[int, int] = {}
+        first: Dict[int, int] = {}
+        for i in range(n):
+            c = self.component[i]
+            sizes[c] = sizes.get(c, 0) + 1
+            first.setdefault(c, i)
+        by_size = sorted(sizes, key=sizes.get, reverse=True)
+        seeds = [c for c in by_size[:count] if sizes[c] * count >= n] or by_size[:1]
+
+        nearest = array("i", [UNREACHABLE]) * n  # Hops from the closest landmark so far
+        for c in seeds:
+            self._add_landmark(first[c], nearest)
+        while len(self.landmarks) < count:
+            # Farthest room reached from the landmarks so far
+            best, best_dist = -1, 0
+            for i in range(n):
+                d = nearest[i]
+                if d > best_dist:
+                    best, best_dist = i, d
+            if best < 0:
+                break
+            self._add_landmark(best, nearest)
+
+    def _add_landmark(self, room: int, nearest: array) -> None:
+        from_landmark = self._bfs(room, self.offsets, self.targets)
+        to_landmark = self._bfs(room, self.rev_offsets, self.rev_sources)
+        self.landmarks.append(room)
+        self._from_landmark.append(from_landmark)
+        self._to_landmark.append(to_landmark)
+        for i, d in enumerate(from_landmark):
+            if d != UNREACHABLE and (nearest[i] == UNREACHABLE or d < nearest[i]):
+                nearest[i] = d
+        nearest[room] = 0
+
+    # --- Lookups ---
+
+    def neighbors(self, room_id: str) -> List[Tuple[str, str]]:
+        """(direction, room_id) for every exit out of a room."""
+        u = self.index[room_id]
+        return [(self.directions[e], self.room_ids[self.targets[e]])
+                for e in range(self.offsets[u], self.offsets[u + 1])]
+
+    def entrances(self, room_id: str) -> List[Tuple[str, str]]:
+        """(room_id, direction) for every exit that leads into a room."""
+        v = self.index[room_id]
+        return [(self.room_ids[self.rev_sources[e]], self.directions[self.rev_edges[e]])
+                for e in range(self.rev_offsets[v], self.rev_offsets[v + 1])]
+
+    def same_component(self, src_id: str, dst_id: str) -> bool:
+        return self.component[self.index[src_id]] == self.component[self.index[dst_id]]
+
+    def distance(self, src_id: str, dst_id: str) -> Optional[int]:
+        """Fewest moves from one room to another, or None if it cannot be reached."""
+        src, dst = self.index[src_id], self.index[dst_id]
+        if self.all_pairs is not None:
+            d = self.all_pairs[src][dst]
+            return None if d == UNREACHABLE else d
+        path = self._path(src, dst)
+        return None if path is None else len(path) - 1
+
+    def path(self, src_id: str, dst_id: str) -> Optional[List[str]]:
+        """Room ids along a shortest path, both ends included, or None."""
+        path = self._path(self.index[src_id], self.index[dst_id])
+        return None if path is None else [self.room_ids[i] for i in path]
+
+    def directions_to(self, src_id: str, dst_id: str) -> Optional[List[str]]:
+        """Exit directions to follow along a shortest path, or None."""
+        path = self._path(self.index[src_id], self.index[dst_id])
+        if path is None:
+            return None
+        return [self._direction(u, v) for u, v in zip(path, path[1:])]
+
+    def next_direction(self, src_id: str, dst_id: str) -> Optional[str]:
+        """First exit to take towards ``dst_id`` (None when there or unreachable)."""
+        route = self.directions_to(src_id, dst_id)
+        return route[0] if route else None
+
+    def _direction(self, u: int, v: int) -> str:
+        for e in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[e] == v:
+                return self.directions[e]
+        raise ValueError(f"No exit from {self.room_ids[u]} to {self.room_ids[v]}")
+
+    # --- Search ---
+
+    def _path(self, src: int, dst: int) -> Optional[Tuple[int, ...]]:
+        key = (src, dst)
+        cache = self._paths
+        if key in cache:
+            self.cache_hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        self.cache_misses += 1
+        if self.component[src] != self.component[dst]:
+            path = None
+        elif self.all_pairs is not None:
+            path = self._read_path(src, dst)
+        else:
+            path = self._astar(src, dst)
+        cache[key] = path
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return path
+
+    def _read_path(self, src: int, dst: int) -> Optional[Tuple[int, ...]]:
+        """Walk the all-pairs table: always step to a neighbor one move closer."""
+        table = self.all_pairs
+        remaining = table[src][dst]
+        if remaining == UNREACHABLE:
+            return None
+        path = [src]
+        u = src
+        offsets, targets = self.offsets, self.targets
+        while remaining:
+            remaining -= 1
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if table[v][dst] == remaining:
+                    u = v
+                    break
+            path.append(u)
+        return tuple(path)
+
+    def _bounds(self, src: int, dst: int) -> List[Tuple[array, int, int]]:
+        """Triangle-inequality terms for a search towards ``dst``, strongest at ``src`` first.
+
+        Each term is (distances, constant, sign) giving the lower bound
+        ``sign * (constant - distances[v])`` on d(v, dst):
+        d(L, dst) - d(L, v) from a landmark, d(v, L) - d(dst, L) to it.
+        Only the few terms that bound ``src`` best are used for the search.
+        """
+        terms = []
+        for from_l, to_l in zip(self._from_landmark, self._to_landmark):
+            if from_l[dst] != UNREACHABLE:
+                terms.append((from_l, from_l[dst], 1))
+            if to_l[dst] != UNREACHABLE:
+                terms.append((to_l, to_l[dst], -1))
+        terms.sort(key=lambda term: self._bound(term, src), reverse=True)
+        return terms[:ACTIVE_BOUNDS]
+
+    @staticmethod
+    def _bound(term: Tuple[array, int, int], v: int) -> int:
+        dist, constant, sign = term
+        d = dist[v]
+        return 0 if d == UNREACHABLE else sign * (constant - d)
+
+    def _astar(self, src: int, dst: int) -> Optional[Tuple[int, ...]]:
+        offsets, targets = self.offsets, self.targets
+        bounds = self._bounds(src, dst)
+
+        def heuristic(v: int) -> int:
+            best = 0
+            for dist, constant, sign in bounds:
+                d = dist[v]
+                if d != UNREACHABLE and sign * (constant - d) > best:
+                    best = sign * (constant - d)
+            return best
+
+        g = {src: 0}
+        parent = {src: -1}
+        # (f, -g, room): ties go to the deeper room, which is closer to the goal
+        heap = [(heuristic(src), 0, src)]
+        closed = set()
+        while heap:
+            _, neg_g, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == dst:
+                path = []
+                while u != -1:
+                    path.append(u)
+                    u = parent[u]
+                return tuple(reversed(path))
+            closed.add(u)
+            self.expanded += 1
+            cost = 1 - neg_g
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if v in closed or g.get(v, cost + 1) <= cost:
+                    continue
+                g[v] = cost
+                parent[v] = u
+                heapq.heappush(heap, (cost + heuristic(v), -cost, v))
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "rooms": len(self.room_ids),
+            "exits": len(self.targets),
+            "dangling_exits": self.dangling_exits,
+            "components": self.component_count,
+            "mode": "all_pairs" if self.all_pairs is not None else "landmarks",
+            "landmarks": len(self.landmarks),
+            "cached_paths": len(self._paths),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "expanded": self.expanded,
+        }
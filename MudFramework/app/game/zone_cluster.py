@@ -0,0 +1,198 @@
+"""
+Gateway side of the zone workers.
+
+``ZoneCluster`` starts one process per zone worker, keeps every online player
+routed to the worker owning the zone of their room, and applies what the
+workers send to the local ``ConnectionManager``, which still holds every
+socket and channel subscription. Room chat and broadcasts therefore reach
+players no matter which worker their room runs on.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from typing import Dict, List, Optional
+
+from app.game.zone_worker import run_zone_worker
+from app.game.zones import (
+    ADOPT, BATCH, BOUNCE, BROADCAST, COMMAND, HANDOFF, PUBLISH, READY, RELEASE,
+    RELOAD, SEND, SET_ROOM, STATE, STOP, STOPPED, ZoneMap,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ZoneCluster:
+    """Routes players to zone worker processes and relays their output to the sockets."""
+
+    def __init__(self, manager, zone_map: ZoneMap, env: Optional[Dict[str, str]] = None):
+        self.manager = manager
+        self.zone_map = zone_map
+        self.env = dict(env or {})  # Extra environment for the workers (e.g. DATABASE_URL)
+        self.owner: Dict[int, int] = {}  # player_id -> worker
+        self._sessions: Dict[int, int] = {}  # Open connections per player
+        self._inboxes: List = []
+        self._processes: List[multiprocessing.Process] = []
+        self._outbox = None
+        self._ops: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._ready_workers: Dict[int, Dict] = {}
+        self._stopped_workers = set()
+
+        # Counters
+        self.commands = 0
+        self.handoffs = 0
+        self.bounces = 0
+
+    async def start(self, timeout: float = 60.0) -> None:
+        """Start every worker and wait until each has loaded its zones."""
+        ctx = multiprocessing.get_context("spawn")
+        loop = asyncio.get_running_loop()
+        self._ops = asyncio.Queue()
+        self._ready = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._outbox = ctx.Queue()
+
+        for worker in range(self.zone_map.workers):
+            inbox = ctx.Queue()
+            process = ctx.Process(
+                target=run_zone_worker, name=f"zone-worker-{worker}", daemon=True,
+                args=(worker, self.zone_map.zones_for_worker(worker), inbox, self._outbox, self.env),
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+        def pump():
+            while True:
+                op = self._outbox.get()
+                if op is None:
+                    return
+                loop.call_soon_threadsafe(self._ops.put_nowait, op)
+
+        threading.Thread(target=pump, name="zone-outbox", daemon=True).start()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        logger.info(f"Zone cluster up: {self.zone_map.get_stats()['worker_zones']}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the workers (they flush their players) and the relay."""
+        for inbox in self._inboxes:
+            inbox.put((STOP,))
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Zone workers did not stop in time, terminating")
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self._outbox.put(None)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+
+    # --- Routing ---
+
+    def connect(self, player_id: int, room_id: Optional[str]) -> int:
+        """A socket opened for ``player_id``: the owner of ``room_id`` adopts the player."""
+        sessions = self._sessions.get(player_id, 0)
+        self._sessions[player_id] = sessions + 1
+        if sessions == 0:
+            worker = self.zone_map.worker_for_room(room_id)
+            self.owner[player_id] = worker
+            self._inboxes[worker].put((ADOPT, player_id))
+        return self.owner[player_id]
+
+    def send_command(self, player_id: int, text: str) -> None:
+        worker = self.owner.get(player_id)
+        if worker is None:
+            return
+        self.commands += 1
+        self._inboxes[worker].put((COMMAND, player_id, text))
+
+    def disconnect(self, player_id: int) -> None:
+        """A socket closed: the last one makes the owner flush and evict the player."""
+        sessions = self._sessions.get(player_id, 0) - 1
+        if sessions > 0:
+            self._sessions[player_id] = sessions
+            return
+        self._sessions.pop(player_id, None)
+        worker = self.owner.pop(player_id, None)
+        if worker is not None:
+            self._inboxes[worker].put((RELEASE, player_id))
+
+    # --- Worker output ---
+
+    async def _dispatch(self) -> None:
+        while True:
+            op = await self._ops.get()
+            try:
+                await self._apply(op)
+            except Exception as e:
+                logger.error(f"Failed to apply zone worker op {op[0]}: {e}", exc_info=True)
+
+    async def _apply(self, op: tuple) -> None:
+        kind = op[0]
+        if kind == SEND:
+            await self.manager.send_personal_message(op[2], op[1])
+        elif kind == STATE:
+            await self.manager.send_state(op[2], op[1])
+        elif kind == PUBLISH:
+            await self.manager.publish(op[1], op[2], exclude=op[3])
+        elif kind == BROADCAST:
+            await self.manager.broadcast(op[1])
+        elif kind == SET_ROOM:
+            self.manager.set_room(op[1], op[2], op[3])
+        elif kind == BATCH:
+            with self.manager.batch(op[1]):
+                for inner in op[2]:
+                    await self._apply(inner)
+        elif kind == HANDOFF:
+            self._hand_off(op[1], op[2])
+        elif kind == BOUNCE:
+            worker = self.owner.get(op[1])
+            if worker is not None:
+                self.bounces += 1
+                self._inboxes[worker].put((COMMAND, op[1], op[2]))
+        elif kind == RELOAD:
+            for inbox in self._inboxes:
+                inbox.put((RELOAD, op[1]))
+        elif kind == READY:
+            _, worker, zones, rooms = op
+            self._ready_workers[worker] = {"zones": zones, "rooms": rooms}
+            if len(self._ready_workers) == len(self._processes):
+                self._ready.set()
+        elif kind == STOPPED:
+            self._stopped_workers.add(op[1])
+            if len(self._stopped_workers) == len(self._processes):
+                self._stopped.set()
+        else:
+            logger.warning(f"Unknown zone worker op {kind!r}")
+
+    def _hand_off(self, player_id: int, room_id: str) -> None:
+        """The old worker has flushed the player: route them to the owner of ``room_id``."""
+        if player_id not in self.owner:
+            return  # Disconnected meanwhile; the old worker already saved them
+        worker = self.zone_map.worker_for_room(room_id)
+        self.owner[player_id] = worker
+        self.handoffs += 1
+        self._inboxes[worker].put((ADOPT, player_id))
+
+    def get_stats(self) -> Dict:
+        players: Dict[int, int] = {worker: 0 for worker in range(len(self._processes))}
+        for worker in self.owner.values():
+            players[worker] += 1
+        return {
+            **self.zone_map.get_stats(),
+            "alive": sum(process.is_alive() for process in self._processes),
+            "players": players,
+            "commands": self.commands,
+            "handoffs": self.handoffs,
+            "bounces": self.bounces,
+        }
@@ -0,0 +1,242 @@
+"""
+Zone worker process.
+
+Runs a full ``GameEngine`` over the zones it owns: ``World`` loads only those
+zones' rooms, and the worker has its own player store, combat mobs and tick
+scheduler. It holds no sockets; everything the engine sends goes back to the
+gateway through ``RemoteManager`` (see ``zones.py`` for the protocol and
+``zone_cluster.py`` for the gateway side).
+
+Settings and the world singleton are read at import time, so the process
+entry point sets its environment (zones, database URL) before importing any
+game module. Workers are started with the ``spawn`` method for the same
+reason.
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Set
+
+from app.game.zones import (
+    ADOPT, BATCH, BOUNCE, BROADCAST, COMMAND, HANDOFF, PUBLISH, READY, RELEASE,
+    RELOAD, SEND, SET_ROOM, STATE, STOP, STOPPED,
+)
+
+logger = logging.getLogger(__name__)
+
+# Ops held back by the command running in the current task. Each command runs
+# in its own task, so sends from the tick loop, reloads or other players'
+# commands made while it waits on the database never land in its batch
+_command_batch: ContextVar[Optional[List[tuple]]] = ContextVar("command_batch", default=None)
+
+
+class RemoteManager:
+    """ConnectionManager stand-in: forwards sends to the gateway that owns the sockets."""
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+        self.active_connections: Dict[int, bool] = {}  # Players hosted here (the engine tests membership)
+
+    def _emit(self, op: tuple) -> None:
+        ops = _command_batch.get()
+        if ops is not None:
+            ops.append(op)
+        else:
+            self.outbox.put(op)
+
+    @contextmanager
+    def batch(self, player_id: int):
+        """Ship everything this command's task sends as one op; the gateway replays it as one frame."""
+        if _command_batch.get() is not None:
+            yield
+            return
+        token = _command_batch.set([])
+        try:
+            yield
+        finally:
+            ops = _command_batch.get()
+            _command_batch.reset(token)
+            if ops:
+                self.outbox.put((BATCH, player_id, ops))
+
+    async def send_personal_message(self, message: dict, player_id: int):
+        self._emit((SEND, player_id, message))
+
+    async def send_state(self, state: dict, player_id: int):
+        self._emit((STATE, player_id, state))
+
+    async def publish(self, channel: str, message: dict, exclude=()):
+        self._emit((PUBLISH, channel, message, tuple(exclude)))
+
+    async def broadcast(self, message: dict):
+        self._emit((BROADCAST, message))
+
+    def set_room(self, player_id: int, room_id: str, zone: Optional[str] = None) -> None:
+        self._emit((SET_ROOM, player_id, room_id, zone))
+
+    def hand_off(self, player_id: int, room_id: str) -> None:
+        self._emit((HANDOFF, player_id, room_id))
+
+
+class ZoneWorker:
+    """Applies gateway ops to one zone worker's engine and store."""
+
+    def __init__(self, index: int, zones: List[str], engine, store):
+        self.index = index
+        self.zones = zones
+        self.engine = engine
+        self.store = store
+        self.manager: RemoteManager = engine.manager
+        engine.on_zone_exit = self.hand_off
+        engine.on_reload = self.request_reload
+        self._reloads = set()  # Running reload tasks
+        # Each player's pending ops, run in order by one task per player (see submit)
+        self._player_ops: Dict[int, Deque[tuple]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters
+        self.adopted = 0
+        self.handoffs = 0
+        self.bounced = 0
+
+    def submit(self, op: tuple, db) -> None:
+        """Run a player's op in that player's task, after their earlier ones.
+
+        Commands await the database threads: one player's wait must not hold
+        up the others, as with the gateway's own WebSocket handlers. Adopt,
+        command and release for the same player still run one at a time, in
+        the order the gateway sent them. Reloads run right away.
+        """
+        if op[0] not in (COMMAND, ADOPT, RELEASE):
+            return self._spawn(self._run(op, db))
+        player_id = op[1]
+        pending = self._player_ops.get(player_id)
+        if pending is not None:
+            pending.append(op)
+            return
+        self._player_ops[player_id] = deque([op])
+        self._spawn(self._run_player(player_id, db))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_player(self, player_id: int, db) -> None:
+        pending = self._player_ops[player_id]
+        try:
+            while pending:
+                await self._run(pending.popleft(), db)
+        finally:
+            del self._player_ops[player_id]
+
+    async def _run(self, op: tuple, db) -> None:
+        try:
+            await self.handle(op, db)
+        except Exception as e:
+            logger.error(f"Zone worker {self.index} failed on {op[0]}: {e}", exc_info=True)
+
+    async def drain(self) -> None:
+        """Wait for every op submitted so far."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def handle(self, op: tuple, db) -> None:
+        kind = op[0]
+        if kind == COMMAND:
+            _, player_id, text = op
+            if player_id not in self.manager.active_connections:
+                # Handed off while this command was in flight: the gateway re-routes it
+                self.bounced += 1
+                self.manager.outbox.put((BOUNCE, player_id, text))
+                return
+            await self.engine.process_command(player_id, text, db)
+        elif kind == ADOPT:
+            player_id = op[1]
+            player = await self.store.acquire_async(player_id)
+            if player is None:
+                logger.warning(f"Zone worker {self.index}: no player {player_id} to adopt")
+                return
+            self.adopted += 1
+            self.manager.active_connections[player_id] = True
+            await self.engine.on_connect(player)
+        elif kind == RELEASE:
+            player_id = op[1]
+            if self.manager.active_connections.pop(player_id, None):
+                await self.engine.on_disconnect(player_id)
+                await self.store.release_async(player_id)
+        elif kind == RELOAD:
+            # In the background: this worker keeps serving commands while the content loads
+            task = asyncio.create_task(self.engine.reload_content(op[1], source=f"[Zone worker {self.index}] "))
+            self._reloads.add(task)
+            task.add_done_callback(self._reloads.discard)
+        else:
+            logger.warning(f"Zone worker {self.index}: unknown op {kind!r}")
+
+    def request_reload(self, player_id: int) -> None:
+        """An admin ran ``reload`` here: the gateway sends it on to every worker, this one included."""
+        self.manager.outbox.put((RELOAD, player_id))
+
+    async def hand_off(self, player) -> None:
+        """The player walked out of this worker's zones: persist, evict, tell the gateway."""
+        self.handoffs += 1
+        self.manager.active_connections.pop(player.id, None)
+        # Flush before the gateway hears about it, so the next owner loads fresh state
+        await self.store.release_async(player.id)
+        self.manager.hand_off(player.id, player.current_map)
+
+
+def run_zone_worker(index: int, zones: List[str], inbox, outbox, env: Optional[Dict[str, str]] = None) -> None:
+    """Process entry point."""
+    os.environ.update(env or {})
+    os.environ["WORLD_ZONES"] = ",".join(zones)
+    asyncio.run(_serve(index, zones, inbox, outbox))
+
+
+async def _serve(index: int, zones: List[str], inbox, outbox) -> None:
+    # Imported here: these read WORLD_ZONES / DATABASE_URL at import time
+    from app.core.config import settings
+    from app.core.database import db_executor
+    from app.game.engine import GameEngine
+    from app.game.player_store import player_store
+    from app.game.tick import tick_scheduler
+    from app.game.world import world
+    import app.models.base  # noqa: F401  Registers every model for relationship lookups
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper()),
+        format=f'%(asctime)s - zone-worker-{index} - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    loop = asyncio.get_running_loop()
+    ops: asyncio.Queue = asyncio.Queue()
+
+    def pump():
+        while True:
+            op = inbox.get()
+            loop.call_soon_threadsafe(ops.put_nowait, op)
+            if op[0] == STOP:
+                return
+
+    threading.Thread(target=pump, name=f"zone-inbox-{index}", daemon=True).start()
+
+    worker = ZoneWorker(index, zones, GameEngine(RemoteManager(outbox), store=player_store), player_store)
+    worker.engine.register_tick_systems(tick_scheduler)
+    tick_scheduler.start()
+    player_store.start()
+    outbox.put((READY, index, zones, len(world.rooms)))
+
+    while True:
+        op = await ops.get()
+        if op[0] == STOP:
+            break
+        worker.submit(op, db_executor)
+
+    await worker.drain()
+    await tick_scheduler.stop()
+    await player_store.stop()
+    outbox.put((STOPPED, index))
@@ -0,0 +1,141 @@
+"""
+Zone partitioning and the zone handoff protocol.
+
+The world is split along the ``zone`` field of ``rooms.json``: every zone is
+owned by exactly one worker process, which loads only its zones' rooms and
+runs their players, mobs and tick loop. Zones are spread over workers with a
+largest-first greedy pass weighted by rooms and mob spawns.
+
+A player belongs to the worker that owns the zone of their room. Walking
+through a border exit (one whose rooms are in different zones) is a handoff:
+the old worker flushes and evicts the player, then the gateway that holds the
+sockets re-routes the player and tells the new worker to adopt them from the
+database. Workers and the gateway talk in tuples over multiprocessing queues:
+
+gateway -> worker::
+
+    ("adopt", player_id)            take over the player (connect or handoff)
+    ("command", player_id, text)    one command line
+    ("release", player_id)          the player disconnected: flush and evict
+    ("reload", player_id)           reload the content and report to the (admin) player
+    ("stop",)
+
+worker -> gateway::
+
+    ("ready", worker, zones, rooms)
+    ("send", player_id, message)    ("state", player_id, state)
+    ("publish", channel, message, exclude)    ("broadcast", message)
+    ("set_room", player_id, room_id, zone)
+    ("batch", player_id, ops)       everything one command sent, as one frame
+    ("handoff", player_id, room_id) moved into a room owned elsewhere, already flushed
+    ("bounce", player_id, text)     a command for a player this worker no longer holds
+    ("reload", player_id)           an admin asked for a reload: sent on to every worker
+    ("stopped", worker)
+"""
+import heapq
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.game.content import load_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ZONE = "default"
+START_ROOM = "start_area"
+
+# Gateway -> worker
+ADOPT = "adopt"
+COMMAND = "command"
+RELEASE = "release"
+RELOAD = "reload"  # Both ways
+STOP = "stop"
+
+# Worker -> gateway
+READY = "ready"
+SEND = "send"
+STATE = "state"
+PUBLISH = "publish"
+BROADCAST = "broadcast"
+SET_ROOM = "set_room"
+BATCH = "batch"
+HANDOFF = "handoff"
+BOUNCE = "bounce"
+STOPPED = "stopped"
+
+
+def load_room_data(path: Optional[str] = None) -> Dict[str, Dict]:
+    """Room definitions: the game's content (bundle or JSON, see content.py), or a given rooms file."""
+    if path is None:
+        return load_table("rooms")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def assign_zones(weights: Dict[str, int], workers: int) -> Dict[str, int]:
+    """Zone -> worker index, heaviest zones first onto the least loaded worker."""
+    if workers < 1:
+        raise ValueError("At least one zone worker is required.")
+    loads = [(0, worker) for worker in range(workers)]
+    assignment = {}
+    for zone in sorted(weights, key=lambda z: (-weights[z], z)):
+        load, worker = heapq.heappop(loads)
+        assignment[zone] = worker
+        heapq.heappush(loads, (load + weights[zone], worker))
+    return assignment
+
+
+class ZoneMap:
+    """Which zone every room is in, and which worker owns every zone."""
+
+    def __init__(self, rooms: Dict[str, Dict], workers: int, start_room: str = START_ROOM):
+        self.room_zone: Dict[str, str] = {room_id: room.get("zone", DEFAULT_ZONE) for room_id, room in rooms.items()}
+        self.zones: Dict[str, List[str]] = {}
+        weights: Dict[str, int] = {}
+        for room_id, room in rooms.items():
+            zone = self.room_zone[room_id]
+            self.zones.setdefault(zone, []).append(room_id)
+            weights[zone] = weights.get(zone, 0) + 1 + len(room.get("mobs", ()))
+
+        # Exits that cross a zone boundary: the only places a handoff can happen
+        self.border_exits: List[Tuple[str, str, str]] = [
+            (room_id, direction, target)
+            for room_id, room in rooms.items()
+            for direction, target in room.get("exits", {}).items()
+            if target in self.room_zone and self.room_zone[target] != self.room_zone[room_id]
+        ]
+
+        if workers > len(self.zones):
+            logger.info(f"{workers} zone workers requested for {len(self.zones)} zones, using {len(self.zones)}")
+            workers = max(1, len(self.zones))
+        self.workers = workers
+        self.weights = weights
+        self.assignment = assign_zones(weights, workers)
+        self.start_room = start_room if start_room in self.room_zone else next(iter(rooms), None)
+
+    @classmethod
+    def from_file(cls, workers: int, path: Optional[str] = None) -> "ZoneMap":
+        return cls(load_room_data(path), workers)
+
+    def zone_of(self, room_id: str) -> Optional[str]:
+        return self.room_zone.get(room_id)
+
+    def worker_for_room(self, room_id: Optional[str]) -> int:
+        """Owner of a room; unknown rooms go to the start room's owner, which relocates the player."""
+        zone = self.room_zone.get(room_id) or self.room_zone.get(self.start_room, DEFAULT_ZONE)
+        return self.assignment.get(zone, 0)
+
+    def zones_for_worker(self, worker: int) -> List[str]:
+        return sorted(zone for zone, owner in self.assignment.items() if owner == worker)
+
+    def get_stats(self) -> Dict:
+        return {
+            "zones": len(self.zones),
+            "workers": self.workers,
+            "border_exits": len(self.border_exits),
+            "worker_zones": {worker: self.zones_for_worker(worker) for worker in range(self.workers)},
+            "worker_load": {
+                worker: sum(self.weights[zone] for zone in self.zones_for_worker(worker))
+                for worker in range(self.workers)
+            },
+        }
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, WebSocket, WebSocketException, Request, status
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, WebSocketException, Request, Query, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -8,13 +8,21 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
 from app.api.api import api_router
-from app.api.deps import get_user_from_token
+from app.api.deps import verify_token
 from app.websockets.connection_manager import manager
+from app.websockets.codecs import get_codec
 from app.game.engine import GameEngine
-from app.core.database import SessionLocal 
+from app.game.player_store import player_store
+from app.game.tick import tick_scheduler
+from app.game.zone_cluster import ZoneCluster
+from app.game.zones import ZoneMap
+from app.core.auth_cache import auth_cache
+from app.core.database import db_executor
+from app.core.security import HasherBusy, password_hasher
 from app.models.player import Player
 from app.core.constants import MAX_COMMAND_LENGTH
 from app.core.messages import GameMessages
+from contextlib import asynccontextmanager
 import logging
 import json
 
@@ -25,13 +33,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the world tick and the player state flusher (or the zone workers) for the lifetime of the app."""
+    if cluster is not None:
+        # The workers run the ticks and own player state; this process only routes
+        await cluster.start()
+        yield
+        await cluster.stop()
+        return
+    engine.register_tick_systems(tick_scheduler)
+    tick_scheduler.start()
+    player_store.start()
+    yield
+    await tick_scheduler.stop()
+    # Persist every dirty player before the process exits
+    await player_store.stop()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Rate limiting
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Password hashing backed up (a login storm): shed the request instead of queueing it
+HASHER_BUSY = JSONResponse(status_code=503, content={"detail": "Too many logins right now, try again shortly"},
+                           headers={"Retry-After": "1"})
+
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request: Request, exc: HasherBusy):
+    return HASHER_BUSY
+
+class ShedHashingLoad:
+    """
+    Refuses the endpoints that hash passwords while the hashing queue is
+    full, before FastAPI routes them or reads their bodies: a refused login
+    costs the event loop a fraction of what the endpoint would.
+    """
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.paths and password_hasher.is_full():
+            password_hasher.rejected += 1
+            await HASHER_BUSY(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+# Added before CORS, so the 503 still carries the CORS headers
+app.add_middleware(ShedHashingLoad, paths=[f"{settings.API_V1_STR}/auth/{name}" for name in ("signup", "login", "recover")])
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -65,72 +119,110 @@ async def game_view(request: Request):
     return templates.TemplateResponse("game.html", {"request": request})
 
 engine = GameEngine(manager)
+app.state.engine = engine  # For the admin metrics endpoint
+
+# Multi-process mode: zone worker processes run the game, this process keeps the sockets
+cluster = ZoneCluster(manager, ZoneMap.from_file(settings.GAME_WORKERS)) if settings.GAME_WORKERS > 0 else None
+
+def _player_id(db, user_id: int):
+    return db.query(Player.id).filter(Player.user_id == user_id).scalar()
+
+def _player_map(db, player_id: int):
+    return db.query(Player.current_map).filter(Player.id == player_id).scalar()
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, token: str = None):
+async def websocket_endpoint(websocket: WebSocket, token: str = None,
+                             wire_format: str = Query("json", alias="format")):
     """WebSocket endpoint with authentication. Token must be provided as query parameter."""
     if not token:
         logger.warning("WebSocket connection attempted without token")
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
     
-    # Authenticate user
-    user = get_user_from_token(token)
+    # Authenticate user: a recently verified token costs no query, others are checked on the database threads
+    user = auth_cache.get(token) or await db_executor.run(verify_token, token)
     if not user:
         logger.warning(f"WebSocket connection failed: invalid token")
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
     
-    # Get player for this user
-    with SessionLocal() as db:
-        player = db.query(Player).filter(Player.user_id == user.id).first()
-        if not player:
+    player_id = user.player_id
+    if player_id is None:
+        # No character when the token was verified: it may have been created since
+        player_id = await db_executor.run(_player_id, user.id)
+        if player_id is None:
             logger.warning(f"WebSocket connection failed: no player for user {user.id}")
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
-        
-        player_id = player.id
+        auth_cache.set_player(user.id, player_id)
+    
+    # Load the player's state into the store. With zone workers, the worker
+    # owning the player's room loads them instead: route by the room on record
+    if cluster is not None:
+        player, current_map = None, await db_executor.run(_player_map, player_id)
+        found = current_map is not None
+    else:
+        player = await player_store.acquire_async(player_id)
+        found = player is not None
+    if not found:
+        logger.warning(f"WebSocket connection failed: player {player_id} not found")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     
-    await manager.connect(websocket, player_id)
+    await manager.connect(websocket, player_id, get_codec(wire_format))
     logger.info(f"WebSocket connected: player_id={player_id}, user={user.username}")
     
     try:
-        # Initial UI refresh
-        with SessionLocal() as db:
-            player = db.query(Player).filter(Player.id == player_id).first()
-            if player:
-                await engine.refresh_ui(player)
-
-        # Reuse session for command processing to reduce overhead
-        with SessionLocal() as db:
-            while True:
-                data = await websocket.receive_text()
-                
-                # Input validation
-                if len(data) > MAX_COMMAND_LENGTH:
-                    logger.warning(
-                        f"Command too long from player {player_id}: {len(data)} chars"
-                    )
-                    await manager.send_personal_message(
-                        {
-                            "type": "chat",
-                            "sender": "System",
-                            "content": GameMessages.COMMAND_TOO_LONG.format(
-                                max_length=MAX_COMMAND_LENGTH
-                            ),
-                            "channel": "channel-system",
-                        },
-                        player_id,
-                    )
-                    continue
-                
-                # Process command
-                await engine.process_command(player_id, data, db)
-                
-    except WebSocketException:
+        # Join the player's room channels and send the initial UI state
+        if cluster is not None:
+            cluster.connect(player_id, current_map)
+        else:
+            await engine.on_connect(player)
+
+        while True:
+            data = await websocket.receive_text()
+            
+            # Input validation
+            if len(data) > MAX_COMMAND_LENGTH:
+                logger.warning(
+                    f"Command too long from player {player_id}: {len(data)} chars"
+                )
+                await manager.send_personal_message(
+                    {
+                        "type": "chat",
+                        "sender": "System",
+                        "content": GameMessages.COMMAND_TOO_LONG.format(
+                            max_length=MAX_COMMAND_LENGTH
+                        ),
+                        "channel": "channel-system",
+                    },
+                    player_id,
+                )
+                continue
+            
+            # Client protocol frames (state acks / resync requests)
+            if data.startswith("{"):
+                await manager.handle_control(player_id, data)
+                continue
+
+            # Process command (pinned to the zone worker that owns the player)
+            if cluster is not None:
+                cluster.send_command(player_id, data)
+            else:
+                await engine.process_command(player_id, data, db_executor)
+            
+    except (WebSocketDisconnect, WebSocketException):
         logger.info(f"WebSocket connection closed normally: player_id={player_id}")
-        manager.disconnect(player_id)
+        manager.disconnect(player_id, websocket)
     except Exception as e:
         logger.error(f"WebSocket error for player {player_id}: {e}", exc_info=True)
-        manager.disconnect(player_id)
+        manager.disconnect(player_id, websocket)
+    finally:
+        # Write back this player's state on disconnect
+        if cluster is not None:
+            cluster.disconnect(player_id)
+        else:
+            if player_id not in manager.active_connections:
+                await engine.on_disconnect(player_id)
+            await player_store.release_async(player_id)
 
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.core.database import Base
+from app.game.inventory import Inventory, InventoryType
 
 class Player(Base):
     __tablename__ = "players"
@@ -12,7 +13,7 @@ class Player(Base):
     level = Column(Integer, default=1)
     exp = Column(Integer, default=0)
     stats = Column(JSON, default=dict)
-    inventory = Column(JSON, default=list)
+    inventory = Column(InventoryType, default=dict)  # Inventory, stored as {"item_id": qty}
     current_map = Column(String, default="start_area")
     position = Column(JSON, default=lambda: {"x": 0, "y": 0})
     combat_state = Column(JSON, default=None)  # { "enemy_id": "...", "hp": ... }
@@ -24,3 +25,8 @@ class Player(Base):
     completed_quests = Column(JSON, default=list)  # ["quest_id"]
     
     user = relationship("User", backref="player")
+
+    @validates("inventory")
+    def _inventory(self, key, value):
+        """Whatever is assigned (a list, a dict), the attribute is an Inventory."""
+        return Inventory.from_json(value)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Dict, List, Optional
+from app.game.inventory import Inventory
 
 class PlayerBase(BaseModel):
     name: str
@@ -17,5 +18,11 @@ class PlayerResponse(PlayerBase):
     current_map: str
     position: Dict
 
+    @field_validator("inventory", mode="before")
+    @classmethod
+    def inventory_slots(cls, value):
+        """Inventories still go out as [{"item_id": ..., "qty": ...}]."""
+        return value.to_slots() if isinstance(value, Inventory) else value
+
     class Config:
         from_attributes = True
@@ -0,0 +1,127 @@
+"""
+Wire formats for outbound WebSocket messages.
+
+JSON text frames are the default and what the browser client speaks. A
+client can opt into compact binary frames with ``/ws?format=msgpack``:
+messages of a known type are packed as positional MessagePack arrays with a
+short type code instead of maps repeating ``"type"``, ``"sender"`` and
+``"channel"`` keys, and the common chat channels become small integers::
+
+    {"type": "chat", "sender": "Combat", "content": "...", "channel": "channel-combat"}
+    -> [1, "Combat", "...", 1]
+
+A ``batch`` envelope packs each message inside it the same way.
+
+Top-level fields missing from a message are packed as nil and dropped again
+on decode; keys outside the schema ride along in a trailing map. Unknown
+message types are packed as plain maps. Inbound frames (commands, acks) stay
+text in every format.
+"""
+import json
+import logging
+from typing import Dict, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for format=msgpack clients
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[str, bytes]
+
+# type -> (code, positional fields)
+MESSAGE_SCHEMAS = {
+    "chat": (1, ("sender", "content", "channel")),
+    "gamestate": (2, ("v", "room", "player")),
+    "gamestate_patch": (3, ("v", "base", "patch")),
+    "batch": (4, ("messages",)),
+}
+MESSAGE_TYPES = {code: (kind, fields) for kind, (code, fields) in MESSAGE_SCHEMAS.items()}
+
+CHANNEL_CODES = {
+    "channel-combat": 1,
+    "channel-system": 2,
+    "channel-info": 3,
+    "channel-say": 4,
+}
+CHANNELS = {code: name for name, code in CHANNEL_CODES.items()}
+
+
+class JsonCodec:
+    """JSON text frames, byte-for-byte what ``WebSocket.send_json`` sends."""
+
+    name = "json"
+    binary = False
+
+    def encode(self, message: Dict) -> str:
+        return json.dumps(message, separators=(",", ":"))
+
+    def decode(self, frame: Frame) -> Dict:
+        return json.loads(frame)
+
+
+class MsgpackCodec:
+    """Positional MessagePack arrays with short type and channel codes."""
+
+    name = "msgpack"
+    binary = True
+
+    def encode(self, message: Dict) -> bytes:
+        return msgpack.packb(self._pack(message))
+
+    def decode(self, frame: Frame) -> Dict:
+        return self._unpack(msgpack.unpackb(frame))
+
+    def _pack(self, message: Dict):
+        schema = MESSAGE_SCHEMAS.get(message.get("type"))
+        if schema is None:
+            return message
+        code, fields = schema
+        packed = [code]
+        for field in fields:
+            value = message.get(field)
+            if field == "channel":
+                value = CHANNEL_CODES.get(value, value)
+            elif field == "messages" and value is not None:
+                value = [self._pack(inner) for inner in value]
+            packed.append(value)
+        extras = {k: v for k, v in message.items() if k != "type" and k not in fields}
+        if extras:
+            packed.append(extras)
+        return packed
+
+    def _unpack(self, packed) -> Dict:
+        if isinstance(packed, dict):
+            return packed
+        kind, fields = MESSAGE_TYPES[packed[0]]
+        message = {"type": kind}
+        for field, value in zip(fields, packed[1:]):
+            if value is None:
+                continue
+            if field == "channel":
+                value = CHANNELS.get(value, value)
+            elif field == "messages":
+                value = [self._unpack(inner) for inner in value]
+            message[field] = value
+        if len(packed) > len(fields) + 1:
+            message.update(packed[-1])
+        return message
+
+
+JSON = JsonCodec()
+
+CODECS = {"json": JSON}
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+
+def get_codec(name: Optional[str]):
+    """Codec for a ``format`` query value; unknown or unavailable formats fall back to JSON."""
+    if not name:
+        return JSON
+    codec = CODECS.get(name.lower())
+    if codec is None:
+        logger.warning(f"Unsupported WebSocket format '{name}', falling back to JSON")
+        return JSON
+    return codec
@@ -1,25 +1,357 @@
-from typing import List, Dict
-from fastapi import WebSocket
+from typing import List, Dict, Optional, Set, Iterable
+from fastapi import WebSocket, status
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.websockets.state_sync import StateSync, STATE_TYPE
+from app.websockets.codecs import JSON, Frame
+from contextlib import contextmanager
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_CHANNEL = "global"
+
+# Envelope for everything one command sent to its player: {"type": "batch", "messages": [...]}
+BATCH_TYPE = "batch"
+
+# Reply to {"type": "ping", "id": ...}; it leaves after everything the client's earlier commands sent
+PONG_TYPE = "pong"
+
+def room_channel(room_id: str) -> str:
+    return f"room:{room_id}"
+
+def zone_channel(zone: str) -> str:
+    return f"zone:{zone}"
+
+def party_channel(party_id) -> str:
+    return f"party:{party_id}"
+
+def encode_message(message: dict) -> str:
+    """Serialize a message exactly like WebSocket.send_json does."""
+    return JSON.encode(message)
+
+class Connection:
+    """A client socket with its own bounded outbound queue and writer task."""
+
+    __slots__ = ("player_id", "websocket", "queue", "writer", "sync", "codec",
+                 "batch", "batch_state", "batch_depth")
+
+    def __init__(self, player_id: int, websocket: WebSocket, queue_size: int, codec=JSON):
+        self.player_id = player_id
+        self.websocket = websocket
+        self.codec = codec  # Wire format negotiated at connect (see codecs.py)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.sync = StateSync()  # Fresh per socket: a reconnect always starts with a full snapshot
+        self.batch: Optional[List[dict]] = None  # Messages held back while a command runs
+        self.batch_state: Optional[dict] = None  # Latest state sent during the batch
+        self.batch_depth = 0
 
 class ConnectionManager:
-    def __init__(self):
-        # Store active connections: player_id -> WebSocket
-        self.active_connections: Dict[int, WebSocket] = {}
+    def __init__(self, queue_size: int = None):
+        # Store active connections: player_id -> Connection
+        self.active_connections: Dict[int, Connection] = {}
+        self.queue_size = queue_size or settings.OUTBOUND_QUEUE_SIZE
+
+        # Pub/sub: channel -> subscribed player_ids, and the reverse index
+        self.channels: Dict[str, Set[int]] = {}
+        self.subscriptions: Dict[int, Set[str]] = {}
+        self.player_rooms: Dict[int, str] = {}
+        self.player_zones: Dict[int, str] = {}
+
+        # Counters
+        self.dropped_messages = 0
+        self.slow_consumer_disconnects = 0
+        self.send_errors = 0
+        self.state_snapshots = 0
+        self.state_patches = 0
+        self.state_unchanged = 0
+        self.frames_queued = 0
+        self.command_batches = 0
+        self.batched_messages = 0
+        self.batch_frames = 0
+        self.max_batch_messages = 0
 
-    async def connect(self, websocket: WebSocket, player_id: int):
+        # Timings (ms)
+        self.publish_time = Histogram()  # Fan-out of one broadcast or channel message to the queues
+        self.batch_time = Histogram()    # Closing a command batch: state diff, encoding, enqueue
+        self.socket_time = Histogram()   # Writing one frame to a socket
+
+    async def connect(self, websocket: WebSocket, player_id: int, codec=JSON):
         await websocket.accept()
-        self.active_connections[player_id] = websocket
+        previous = self.active_connections.get(player_id)
+        if previous:
+            # Reconnect: the new socket takes over, stop writing to the old one
+            self._stop_writer(previous)
+        conn = Connection(player_id, websocket, self.queue_size, codec)
+        conn.writer = asyncio.create_task(self._write_loop(conn))
+        self.active_connections[player_id] = conn
+        self.subscribe(player_id, GLOBAL_CHANNEL)
+
+    def disconnect(self, player_id: int, websocket: Optional[WebSocket] = None):
+        """Forget a player's connection (only if it is still ``websocket``, when given)."""
+        conn = self.active_connections.get(player_id)
+        if not conn or (websocket is not None and conn.websocket is not websocket):
+            return
+        del self.active_connections[player_id]
+        self._stop_writer(conn)
+        self.unsubscribe_all(player_id)
+
+    def kick(self, player_id: int, code: int = status.WS_1008_POLICY_VIOLATION) -> bool:
+        """Close a player's socket from the server side (e.g. a ban). Returns whether they were online."""
+        conn = self.active_connections.get(player_id)
+        if conn is None:
+            return False
+        self._evict(conn, code)
+        return True
+
+    def subscribe(self, player_id: int, channel: str) -> None:
+        self.channels.setdefault(channel, set()).add(player_id)
+        self.subscriptions.setdefault(player_id, set()).add(channel)
+
+    def unsubscribe(self, player_id: int, channel: str) -> None:
+        members = self.channels.get(channel)
+        if members is not None:
+            members.discard(player_id)
+            if not members:
+                del self.channels[channel]
+        channels = self.subscriptions.get(player_id)
+        if channels is not None:
+            channels.discard(channel)
+
+    def unsubscribe_all(self, player_id: int) -> None:
+        for channel in list(self.subscriptions.get(player_id, ())):
+            self.unsubscribe(player_id, channel)
+        self.subscriptions.pop(player_id, None)
+        self.player_rooms.pop(player_id, None)
+        self.player_zones.pop(player_id, None)
 
-    def disconnect(self, player_id: int):
-        if player_id in self.active_connections:
-            del self.active_connections[player_id]
+    def set_room(self, player_id: int, room_id: str, zone: Optional[str] = None) -> None:
+        """Move a player's room (and zone) subscriptions after a location change."""
+        old_room = self.player_rooms.get(player_id)
+        if old_room != room_id:
+            if old_room is not None:
+                self.unsubscribe(player_id, room_channel(old_room))
+            self.subscribe(player_id, room_channel(room_id))
+            self.player_rooms[player_id] = room_id
+
+        old_zone = self.player_zones.get(player_id)
+        if zone is not None and old_zone != zone:
+            if old_zone is not None:
+                self.unsubscribe(player_id, zone_channel(old_zone))
+            self.subscribe(player_id, zone_channel(zone))
+            self.player_zones[player_id] = zone
+
+    def get_room_players(self, room_id: str) -> Set[int]:
+        return self.channels.get(room_channel(room_id), set())
+
+    @contextmanager
+    def batch(self, player_id: int):
+        """Hold back everything sent to ``player_id`` and flush it as one frame on exit.
+
+        Chat and system lines keep their order; only the last state sent
+        during the batch is synced, after them. A batch with one message
+        goes out bare, an empty one sends nothing. Nested batches flush
+        with the outermost.
+        """
+        conn = self.active_connections.get(player_id)
+        if conn is None:
+            yield
+            return
+        if conn.batch_depth == 0:
+            conn.batch = []
+        conn.batch_depth += 1
+        try:
+            yield
+        finally:
+            conn.batch_depth -= 1
+            if conn.batch_depth == 0:
+                start = time.perf_counter()
+                self._flush_batch(conn)
+                self.batch_time.observe((time.perf_counter() - start) * 1000)
+
+    def _flush_batch(self, conn: Connection) -> None:
+        messages, state = conn.batch, conn.batch_state
+        conn.batch = conn.batch_state = None
+        if state is not None:
+            message = self._state_message(conn, state)
+            if message is not None:
+                messages.append(message)
+
+        self.command_batches += 1
+        self.batched_messages += len(messages)
+        self.max_batch_messages = max(self.max_batch_messages, len(messages))
+        if not messages or self.active_connections.get(conn.player_id) is not conn:
+            return
+        self.batch_frames += 1
+        envelope = messages[0] if len(messages) == 1 else {"type": BATCH_TYPE, "messages": messages}
+        self._enqueue(conn, conn.codec.encode(envelope))
 
     async def send_personal_message(self, message: dict, player_id: int):
-        if player_id in self.active_connections:
-            await self.active_connections[player_id].send_json(message)
+        conn = self.active_connections.get(player_id)
+        if not conn:
+            return
+        if conn.batch is not None:
+            conn.batch.append(message)
+            return
+        self._enqueue(conn, conn.codec.encode(message))
+
+    async def send_state(self, state: dict, player_id: int):
+        """Sync a player's gamestate: a patch against what the client has, or a full snapshot."""
+        conn = self.active_connections.get(player_id)
+        if not conn:
+            return
+        if conn.batch is not None:
+            conn.batch_state = state
+            return
+        message = self._state_message(conn, state)
+        if message is not None:
+            self._enqueue(conn, conn.codec.encode(message))
+
+    def _state_message(self, conn: Connection, state: dict) -> Optional[dict]:
+        message = conn.sync.message_for(state)
+        if message is None:
+            self.state_unchanged += 1
+            return None
+        self._count_state(message)
+        return message
+
+    async def handle_control(self, player_id: int, text: str) -> None:
+        """Client protocol frames: ``{"type": "ack", "v": N}``, ``{"type": "resync"}`` and ``{"type": "ping", "id": X}``."""
+        conn = self.active_connections.get(player_id)
+        if not conn:
+            return
+        try:
+            message = json.loads(text)
+            kind = message.get("type")
+            if kind == "ack":
+                conn.sync.ack(int(message["v"]))
+            elif kind == "resync":
+                snapshot = conn.sync.resync()
+                if snapshot is not None:
+                    self._count_state(snapshot)
+                    self._enqueue(conn, conn.codec.encode(snapshot))
+            elif kind == "ping":
+                self._enqueue(conn, conn.codec.encode({"type": PONG_TYPE, "id": message.get("id")}))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.info(f"Bad control frame from player {player_id}: {e}")
+
+    def _count_state(self, message: dict) -> None:
+        if message["type"] == STATE_TYPE:
+            self.state_snapshots += 1
+        else:
+            self.state_patches += 1
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections.values():
-            await connection.send_json(message)
+        # Serialize once per wire format, then hand the same frame to every outbound queue
+        start = time.perf_counter()
+        frames: Dict[str, Frame] = {}
+        for conn in list(self.active_connections.values()):
+            self._deliver(conn, message, frames)
+        self.publish_time.observe((time.perf_counter() - start) * 1000)
+
+    async def publish(self, channel: str, message: dict, exclude: Iterable[int] = ()):
+        """Send a message to the subscribers of one channel only."""
+        members = self.channels.get(channel)
+        if not members:
+            return
+        start = time.perf_counter()
+        frames: Dict[str, Frame] = {}
+        for player_id in list(members):
+            if player_id in exclude:
+                continue
+            conn = self.active_connections.get(player_id)
+            if conn:
+                self._deliver(conn, message, frames)
+        self.publish_time.observe((time.perf_counter() - start) * 1000)
+
+    def _deliver(self, conn: Connection, message: dict, frames: Dict[str, Frame]) -> None:
+        """Fan-out to one connection, reusing ``frames`` encoded per format (or joining its batch)."""
+        if conn.batch is not None:
+            conn.batch.append(message)
+            return
+        frame = frames.get(conn.codec.name)
+        if frame is None:
+            frame = frames[conn.codec.name] = conn.codec.encode(message)
+        self._enqueue(conn, frame)
+
+    def _enqueue(self, conn: Connection, frame: Frame) -> None:
+        try:
+            conn.queue.put_nowait(frame)
+            self.frames_queued += 1
+        except asyncio.QueueFull:
+            # Slow consumer: drop the frame and cut the client loose so it
+            # cannot hold back anyone else. It will resync on reconnect.
+            self.dropped_messages += 1
+            self.slow_consumer_disconnects += 1
+            logger.warning(f"Outbound queue full for player {conn.player_id}, disconnecting")
+            self._evict(conn, status.WS_1013_TRY_AGAIN_LATER)
+
+    async def _write_loop(self, conn: Connection) -> None:
+        send = conn.websocket.send_bytes if conn.codec.binary else conn.websocket.send_text
+        try:
+            while True:
+                frame = await conn.queue.get()
+                start = time.perf_counter()
+                await send(frame)
+                self.socket_time.observe((time.perf_counter() - start) * 1000)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Dead socket: stop writing; the receive loop will clean up
+            self.send_errors += 1
+            logger.info(f"Send failed for player {conn.player_id}: {e}")
+            self._evict(conn, None)
+
+    def _evict(self, conn: Connection, close_code: Optional[int]) -> None:
+        if self.active_connections.get(conn.player_id) is conn:
+            del self.active_connections[conn.player_id]
+            self.unsubscribe_all(conn.player_id)
+        self._stop_writer(conn)
+        self.dropped_messages += conn.queue.qsize()
+        if close_code is not None:
+            asyncio.create_task(self._close(conn.websocket, close_code))
+
+    def _stop_writer(self, conn: Connection) -> None:
+        if conn.writer and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    async def _close(self, websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict:
+        depths = [conn.queue.qsize() for conn in self.active_connections.values()]
+        codecs: Dict[str, int] = {}
+        for conn in self.active_connections.values():
+            codecs[conn.codec.name] = codecs.get(conn.codec.name, 0) + 1
+        return {
+            "connections": len(depths),
+            "codecs": codecs,
+            "channels": len(self.channels),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "dropped_messages": self.dropped_messages,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "send_errors": self.send_errors,
+            "state_snapshots": self.state_snapshots,
+            "state_patches": self.state_patches,
+            "state_unchanged": self.state_unchanged,
+            "frames_queued": self.frames_queued,
+            "command_batches": self.command_batches,
+            "batched_messages": self.batched_messages,
+            "batch_frames": self.batch_frames,
+            "frames_per_command": self.batch_frames / self.command_batches if self.command_batches else 0.0,
+            "messages_per_command": self.batched_messages / self.command_batches if self.command_batches else 0.0,
+            "max_batch_messages": self.max_batch_messages,
+            "publish_ms": self.publish_time.to_dict(),
+            "batch_ms": self.batch_time.to_dict(),
+            "socket_ms": self.socket_time.to_dict(),
+        }
 
 manager = ConnectionManager()
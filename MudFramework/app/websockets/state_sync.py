@@ -0,0 +1,97 @@
+"""
+Versioned gamestate sync.
+
+Instead of a full ``gamestate`` after every command, each connection keeps
+the last state it sent and ships only what changed, as a JSON merge patch
+(RFC 7386: nested objects are merged, ``null`` deletes a key, anything else
+replaces the old value)::
+
+    {"type": "gamestate", "v": 1, "room": {...}, "player": {...}}
+    {"type": "gamestate_patch", "v": 2, "base": 1, "patch": {"player": {"stats": {"hp": 62}}}}
+
+The client applies a patch only when it holds version ``base``, and answers
+every state frame with ``{"type": "ack", "v": N}``. A client that finds a
+gap sends ``{"type": "resync"}`` and gets a full snapshot. Until a
+connection has acked once (older clients never do), and whenever it falls
+too far behind on acks, it keeps receiving full snapshots.
+"""
+from typing import Any, Dict, Optional
+
+# Versions a client may lag behind on acks before patches stop
+MAX_UNACKED_STATES = 32
+
+STATE_TYPE = "gamestate"
+PATCH_TYPE = "gamestate_patch"
+
+
+def merge_diff(old: Dict, new: Dict) -> Dict:
+    """Merge patch that turns ``old`` into ``new`` (empty if they are equal)."""
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            patch[key] = merge_diff(previous, value)
+        else:
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+def apply_merge_patch(doc: Dict, patch: Dict) -> Dict:
+    """Apply a merge patch, returning a new document (``doc`` is not modified)."""
+    result = dict(doc)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_merge_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class StateSync:
+    """Per-connection record of the last state sent and acknowledged."""
+
+    __slots__ = ("version", "acked_version", "state")
+
+    def __init__(self):
+        self.version = 0
+        self.acked_version = 0
+        self.state: Optional[Dict] = None  # Last state sent: what the client holds after in-order delivery
+
+    def message_for(self, state: Dict[str, Any]) -> Optional[Dict]:
+        """Frame that brings the client to ``state``, or None if it already has it."""
+        if self.state is not None and self._patching():
+            patch = merge_diff(self.state, state)
+            if not patch:
+                return None
+            self.version += 1
+            self.state = state
+            return {"type": PATCH_TYPE, "v": self.version, "base": self.version - 1, "patch": patch}
+        return self.snapshot(state)
+
+    def snapshot(self, state: Dict[str, Any]) -> Dict:
+        self.version += 1
+        self.state = state
+        return {"type": STATE_TYPE, "v": self.version, **state}
+
+    def _patching(self) -> bool:
+        return self.acked_version > 0 and self.version - self.acked_version < MAX_UNACKED_STATES
+
+    def ack(self, version: int) -> None:
+        if self.acked_version < version <= self.version:
+            self.acked_version = version
+
+    def resync(self) -> Optional[Dict]:
+        """Client lost track: resend the current state in full."""
+        if self.state is None:
+            return None
+        return self.snapshot(self.state)
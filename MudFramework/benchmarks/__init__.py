@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the game server.
+Run from the MudFramework directory, e.g. ``python -m benchmarks.bench_room_chat``.
+"""
@@ -0,0 +1,143 @@
+"""
+Reconnect storm benchmark: WebSocket connects per second, with and without the token cache.
+
+Seeds ``--clients`` accounts with characters in a temporary SQLite database,
+then has every client reconnect at once, ``--rounds`` times in a row,
+through the app's own ``/ws`` endpoint function (sockets are in memory:
+each one takes the greeting and hangs up). Every SQL statement waits
+``--db-latency`` ms first, like the round trip to a database server would.
+
+"off" verifies every token against the database, as before the cache; "on"
+starts each run with an empty cache, so round 1 is the cold storm right
+after a restart and the later rounds are clients reconnecting again.
+
+    python -m benchmarks.bench_auth_cache --clients 5000 --db-latency 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi import WebSocketDisconnect
+
+
+class StormSocket:
+    """Gets accepted and greeted, then hangs up."""
+
+    def __init__(self):
+        self.accepted = False
+        self.closed_with = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, text):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+    async def receive_text(self):
+        raise WebSocketDisconnect(1000)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def seed(clients: int) -> list:
+    from app.core import security
+    from app.core.database import Base, SessionLocal, engine
+    from app.game.simulator import RACES_PATH, stats_at_level
+    from app.models.base import Player, Race, User
+
+    Base.metadata.create_all(bind=engine)
+    with open(RACES_PATH) as f:
+        races = json.load(f)
+    with SessionLocal() as db:
+        db.add_all(Race(**race) for race in races.values())
+        db.add_all(User(id=i, username=f"storm{i}", hashed_password="-", is_active=True)
+                   for i in range(1, clients + 1))
+        db.add_all(Player(id=i, user_id=i, name=f"Storm{i}", race="Zenkai", level=5, exp=0,
+                          stats=stats_at_level(races["Zenkai"], 5), inventory=[], current_map="start_area",
+                          transformation="Base", zeni=100, learned_skills=[], active_quests={})
+                   for i in range(1, clients + 1))
+        db.commit()
+    return [security.create_access_token(data={"sub": f"storm{i}"}) for i in range(1, clients + 1)]
+
+
+async def reconnect(endpoint, token: str, latencies: list) -> None:
+    socket = StormSocket()
+    start = time.perf_counter()
+    await endpoint(socket, token=token, wire_format="json")
+    latencies.append((time.perf_counter() - start) * 1000)
+    if not socket.accepted:
+        raise RuntimeError(f"Connect rejected ({socket.closed_with})")
+
+
+async def storm(endpoint, tokens: list, rounds: int, statements: list) -> list:
+    results = []
+    for _ in range(rounds):
+        latencies = []
+        queries = statements[0]
+        start = time.perf_counter()
+        await asyncio.gather(*(reconnect(endpoint, token, latencies) for token in tokens))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        results.append({
+            "rate": len(tokens) / elapsed,
+            "p50": statistics.median(latencies),
+            "p99": latencies[int(len(latencies) * 0.99)],
+            "queries": (statements[0] - queries) / len(tokens),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=5000, help="Clients reconnecting at once")
+    parser.add_argument("--rounds", type=int, default=3, help="Storms per run")
+    parser.add_argument("--runs", type=int, default=2, help="Runs per mode")
+    parser.add_argument("--db-latency", type=float, default=1.0, help="Round trip per SQL statement (ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # The settings are read once, at import: the environment has to be in place first
+        os.environ.update({"DATABASE_URL": f"sqlite:///{os.path.join(data_dir, 'storm.db')}", "LOG_LEVEL": "WARNING"})
+        from sqlalchemy import event
+        from app.core.auth_cache import auth_cache
+        from app.core.database import db_executor, engine
+        from app.main import websocket_endpoint
+
+        tokens = seed(args.clients)
+        statements = [0]
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def round_trip(conn, cursor, statement, parameters, context, executemany):
+            statements[0] += 1
+            time.sleep(args.db_latency / 1000)
+
+        cache_size = auth_cache.max_size
+        print(f"{args.clients} clients reconnecting at once, {args.db_latency:.1f} ms per SQL statement, "
+              f"{db_executor.threads} database threads, cache of {cache_size} tokens")
+        print(f"{'mode':<5} {'round':>5} {'conn/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'queries/conn':>13}")
+        warm = {"off": [], "on": []}
+        for _ in range(args.runs):
+            for mode in ("off", "on"):  # Interleaved, so both see the same machine noise
+                auth_cache.clear()
+                auth_cache.max_size = cache_size if mode == "on" else 0
+                for n, r in enumerate(asyncio.run(storm(websocket_endpoint, tokens, args.rounds, statements)), 1):
+                    if n > 1:
+                        warm[mode].append(r["rate"])
+                    print(f"{mode:<5} {n:>5} {r['rate']:>8.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['queries']:>13.2f}")
+        if args.rounds > 1:
+            off, on = statistics.median(warm["off"]), statistics.median(warm["on"])
+            print(f"Repeat reconnects: {off:.0f} conn/s without the cache, {on:.0f} with it ({on / off:.1f}x)")
+        db_executor.shutdown()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
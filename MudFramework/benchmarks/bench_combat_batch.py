@@ -0,0 +1,88 @@
+"""
+Combat throughput benchmark: scalar ``combat_round`` vs ``resolve_batch``.
+
+Builds N concurrent hunt fights (mixed races, attacks and skills), fights
+each one to a win or loss both ways with identical per-fight random
+streams, then reports rounds per second and checks the outcomes match.
+
+    python -m benchmarks.bench_combat_batch --fights 5000
+"""
+import argparse
+import asyncio
+import copy
+import random
+import time
+from types import SimpleNamespace
+
+from app.game.combat import CombatSystem
+from app.game.combat_batch import CombatBatch, PendingRound, CONTINUE, WIN, LOSS
+from app.game.skills_manager import skills_manager
+
+
+def make_fights(combat: CombatSystem, fights: int, seed: int):
+    g = random.Random(seed)
+    mob_ids = sorted(combat.mobs_data)
+    damage_skills = [s for s in skills_manager.skills.values() if s.damage_multiplier > 0]
+    result = []
+    for _ in range(fights):
+        stats = {"hp": 400, "max_hp": 400, "str": g.randint(10, 60), "dex": g.randint(5, 30),
+                 "int": g.randint(5, 30), "vit": g.randint(5, 30)}
+        player = SimpleNamespace(race=g.choice(["Vitalis", "Glacial", "Terran"]), stats=stats)
+        skill = g.choice(damage_skills) if g.random() < 0.3 else None
+        result.append((player, combat.spawn_mob(g.choice(mob_ids)), skill, g.getrandbits(32)))
+    return result
+
+
+async def run_scalar(combat, fights, max_rounds):
+    """Fight each battle to the end, one ``combat_round`` at a time."""
+    outcomes = []
+    start = time.perf_counter()
+    for player, mob, skill, stream in fights:
+        rng = random.Random(stream)
+        for rounds in range(1, max_rounds + 1):
+            result = await combat.combat_round(player, mob, "attack", skill, rng=rng)
+            if result["status"] != "continue":
+                break
+        outcomes.append((result["status"], rounds, result.get("loot"), player.stats["hp"], mob.stats["hp"]))
+    return time.perf_counter() - start, outcomes
+
+
+def run_batch(fights, max_rounds):
+    """Fight every battle to the end in array steps."""
+    start = time.perf_counter()
+    batch = CombatBatch([PendingRound(player, mob, "attack", skill, random.Random(stream))
+                         for player, mob, skill, stream in fights])
+    batch.run(max_rounds)
+    batch.write_back()
+    elapsed = time.perf_counter() - start
+
+    names = {CONTINUE: "continue", WIN: "win", LOSS: "loss"}
+    outcomes = [
+        (names[status], rounds, batch.loot[i] if status == WIN else None, player.stats["hp"], mob.stats["hp"])
+        for i, (status, rounds, (player, mob, *_)) in enumerate(
+            zip(batch.status.tolist(), batch.rounds_fought.tolist(), fights))
+    ]
+    return elapsed, outcomes, int(batch.rounds_fought.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fights", type=int, default=5000, help="Concurrent fights per batch")
+    parser.add_argument("--max-rounds", type=int, default=50, help="Round cap per fight")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    combat = CombatSystem(None)
+    fights = make_fights(combat, args.fights, args.seed)
+
+    scalar_s, expected = asyncio.run(run_scalar(combat, copy.deepcopy(fights), args.max_rounds))
+    batch_s, outcomes, total = run_batch(copy.deepcopy(fights), args.max_rounds)
+
+    print(f"{args.fights} fights to the end, {total} rounds")
+    print(f"{'path':<8} {'seconds':>9} {'rounds/s':>12} {'speedup':>8}")
+    for name, seconds in (("scalar", scalar_s), ("batch", batch_s)):
+        print(f"{name:<8} {seconds:>9.3f} {total / seconds:>12,.0f} {scalar_s / seconds:>7.1f}x")
+    print("Outcomes match scalar path:", outcomes == expected)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Content bundle benchmark: cold-start loading and validation coverage.
+
+Scales the shipped content ``--scale`` times (every room, mob, item, shop,
+NPC, quest and skill is copied with its references renamed to the copy),
+then compares loading every table from JSON, from JSON plus validation, and
+from the memory-mapped bundle, each in a fresh interpreter. Finally it
+injects ``--faults`` random errors of every kind the validator knows about
+and reports how many it caught.
+
+    python -m benchmarks.bench_content --scale 100
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.game.content import TABLES, build_bundle, load_json_content, validate_content
+
+SCALED = ("rooms", "mobs", "items", "shops", "npcs", "quests", "skills")  # Races are few and player-facing
+
+
+def scale_content(content: dict, factor: int) -> dict:
+    """``factor`` renamed copies of the scaled tables, each referring only to itself."""
+    if factor == 1:
+        return copy.deepcopy(content)
+    scaled = {name: {} for name in TABLES}
+    scaled["races"] = copy.deepcopy(content["races"])
+    for i in range(factor):
+        def rename(value, table):
+            return f"{value}__{i}" if value in content[table] else value
+
+        for name in SCALED:
+            for key, record in content[name].items():
+                record = copy.deepcopy(record)
+                if "id" in record and record["id"] == key:
+                    record["id"] = f"{key}__{i}"
+                if name == "rooms":
+                    record["exits"] = {d: rename(t, "rooms") for d, t in record.get("exits", {}).items()}
+                    record["mobs"] = [rename(m, "mobs") for m in record.get("mobs", [])]
+                    record["zone"] = f"{record.get('zone', 'default')}__{i}"
+                    if "shop_id" in record:
+                        record["shop_id"] = rename(record["shop_id"], "shops")
+                elif name == "mobs":
+                    for drop in record.get("drops", []):
+                        drop["item_id"] = rename(drop["item_id"], "items")
+                elif name == "shops":
+                    record["inventory"] = [rename(item, "items") for item in record["inventory"]]
+                elif name == "npcs":
+                    record["room_id"] = rename(record["room_id"], "rooms")
+                    if record.get("quest_id"):
+                        record["quest_id"] = rename(record["quest_id"], "quests")
+                elif name == "quests":
+                    if record.get("target"):
+                        record["target"] = rename(record["target"], "mobs")
+                    if record.get("reward", {}).get("item"):
+                        record["reward"]["item"] = rename(record["reward"]["item"], "items")
+                scaled[name][f"{key}__{i}"] = record
+    return scaled
+
+
+def write_content(content: dict, data_dir: str) -> None:
+    for name in TABLES:
+        with open(os.path.join(data_dir, f"{name}.json"), "w") as f:
+            json.dump(content[name], f, indent=4)
+
+
+# Fault kinds the validator must catch: name -> how to break a copy of the content
+def _pick(rng, table):
+    return rng.choice(sorted(table))
+
+FAULTS = {
+    "dangling exit": lambda c, rng: c["rooms"][_pick(rng, c["rooms"])].setdefault("exits", {}).update(warp="void"),
+    "room mob": lambda c, rng: c["rooms"][_pick(rng, c["rooms"])].setdefault("mobs", []).append("ghost"),
+    "drop item": lambda c, rng: c["mobs"][_pick(rng, c["mobs"])].setdefault("drops", []).append(
+        {"item_id": "no_such_item", "rate": 0.1}),
+    "drop rate": lambda c, rng: c["mobs"][_pick(rng, c["mobs"])].setdefault("drops", []).append(
+        {"item_id": _pick(rng, c["items"]), "rate": 2}),
+    "shop item": lambda c, rng: c["shops"][_pick(rng, c["shops"])]["inventory"].append("no_such_item"),
+    "npc room": lambda c, rng: c["npcs"][_pick(rng, c["npcs"])].update(room_id="void"),
+    "npc quest": lambda c, rng: c["npcs"][_pick(rng, c["npcs"])].update(quest_id="no_such_quest"),
+    "quest target": lambda c, rng: c["quests"][_pick(rng, c["quests"])].update(type="kill", target="ghost"),
+    "quest reward": lambda c, rng: c["quests"][_pick(rng, c["quests"])]["reward"].update(item="no_such_item"),
+    "skill race": lambda c, rng: c["skills"][_pick(rng, c["skills"])].update(race_required="Martian"),
+    "missing field": lambda c, rng: c["items"][_pick(rng, c["items"])].pop("name"),
+    "wrong type": lambda c, rng: c["skills"][_pick(rng, c["skills"])].update(level_required="5"),
+    "key mismatch": lambda c, rng: c["mobs"][_pick(rng, c["mobs"])].update(id="renamed"),
+}
+
+
+def cold_start(mode: str, data_dir: str, runs: int) -> float:
+    """Best wall time (ms) to load every table in a fresh interpreter (after the imports)."""
+    code = {
+        "json": "load_json_content(D)",
+        "json+validate": "validate_content(load_json_content(D))",
+        "bundle": "b = ContentBundle(D + '/content.bundle'); b.is_current(D); [b.table(n) for n in TABLES]",
+    }[mode]
+    timer = ("import time; from app.game.content import *; "
+             f"t = time.perf_counter(); D = {data_dir!r}; {code}; print(time.perf_counter() - t)")
+    best = float("inf")
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", timer], capture_output=True, text=True, check=True)
+        best = min(best, float(out.stdout.strip()))
+    return best * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Copies of the shipped content")
+    parser.add_argument("--faults", type=int, default=20, help="Injected faults per kind")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter starts per mode (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    content = scale_content(load_json_content(), args.scale)
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_content(content, data_dir)
+        json_bytes = sum(os.path.getsize(os.path.join(data_dir, f"{name}.json")) for name in TABLES)
+        start = time.perf_counter()
+        report = build_bundle(data_dir)
+        build_ms = (time.perf_counter() - start) * 1e3
+        stats = report.get_stats()
+        bundle_bytes = os.path.getsize(os.path.join(data_dir, "content.bundle"))
+        print(f"{args.scale}x content: {stats['records']} records, {json_bytes / 1024:.0f} KiB JSON, "
+              f"{bundle_bytes / 1024:.0f} KiB bundle (built in {build_ms:.0f} ms)")
+        print(f"Validation: {stats['fields']} fields and {stats['references']} references checked, "
+              f"{stats['errors']} errors")
+
+        print(f"{'cold start':<16} {'ms':>8}")
+        times = {mode: cold_start(mode, data_dir, args.runs) for mode in ("json", "json+validate", "bundle")}
+        for mode, ms in times.items():
+            print(f"{mode:<16} {ms:>8.1f}")
+        print(f"Bundle loads {times['json'] / times['bundle']:.1f}x faster than JSON, "
+              f"{times['json+validate'] / times['bundle']:.1f}x faster than validating at startup.")
+
+    rng = random.Random(args.seed)
+    print(f"{'fault':<14} {'caught':>8}")
+    caught_total = injected_total = 0
+    for kind, inject in FAULTS.items():
+        caught = 0
+        for _ in range(args.faults):
+            broken = copy.deepcopy(content)
+            inject(broken, rng)
+            caught += bool(validate_content(broken).errors)
+        caught_total += caught
+        injected_total += args.faults
+        print(f"{kind:<14} {caught:>4}/{args.faults}")
+    print(f"Validation caught {caught_total}/{injected_total} injected faults "
+          f"({caught_total / injected_total:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
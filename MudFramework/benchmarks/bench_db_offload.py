@@ -0,0 +1,203 @@
+"""
+Database offload benchmark: command latency under load, inline vs thread pool.
+
+Starts ``--clients`` simulated players on one event loop, spread over the
+rooms of the world, each sending a command every ``--think`` ms on average
+(look, hunt, attacks, chat, inventory and a level-up, whose race lookup is
+a query) and reconnecting now and then (a user lookup, a player load and a
+final write). The write-behind flusher runs as on the server. Every SQL statement waits ``--db-latency`` ms first,
+like the round trip to a database server would.
+
+Each run measures command latency from the moment the client sends to the
+moment the engine is done with it, so time spent waiting for the loop
+counts. "inline" runs the queries on the event loop, as the game did before
+``DatabaseExecutor``; "offload" runs them on its threads.
+
+    python -m benchmarks.bench_db_offload --clients 500 --db-latency 2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from jose import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core import security
+from app.core.config import settings
+from app.core.constants import EXP_PER_LEVEL
+from app.core.database import Base, DatabaseExecutor
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.simulator import RACES_PATH, stats_at_level
+from app.game.world import world
+from app.models.base import Player, Race, User
+from app.websockets.connection_manager import ConnectionManager
+
+SCRIPT = ["look", "hunt", "attack", "attack", "say hi", "attack", "inventory", "level up"]
+
+
+class DropSocket:
+    """A client socket that discards everything the server sends."""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_world(path: str, clients: int, threads: int, latency_ms: float):
+    db_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                              pool_size=max(threads, 1), max_overflow=0)
+    Base.metadata.create_all(bind=db_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    with open(RACES_PATH) as f:
+        races = json.load(f)
+    rooms = list(world.rooms)
+    with factory() as db:
+        for race in races.values():
+            db.add(Race(**race))
+        for pid in range(1, clients + 1):
+            db.add(User(id=pid, username=f"bench{pid}", hashed_password="-", is_active=True))
+            db.add(Player(id=pid, user_id=pid, name=f"Bench{pid}", race="Zenkai", level=5, exp=0,
+                          stats=stats_at_level(races["Zenkai"], 5), inventory=[], current_map=rooms[pid % len(rooms)],
+                          transformation="Base", zeni=100, learned_skills=[], active_quests={}))
+        db.commit()
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency_ms / 1000)
+
+    return db_engine, factory
+
+
+async def client(pid: int, engine: GameEngine, store: PlayerStateStore, db: DatabaseExecutor,
+                 manager: ConnectionManager, args, deadline: float, latencies: list, rng) -> None:
+    token = security.create_access_token(data={"sub": f"bench{pid}"})
+    loop = asyncio.get_running_loop()
+    step = rng.randrange(len(SCRIPT))
+    while True:
+        sent = loop.time() + rng.expovariate(1000 / args.think)
+        if sent > deadline:
+            break
+        await asyncio.sleep(sent - loop.time())
+        if rng.random() < args.reconnect:
+            await disconnect(pid, engine, store, manager)
+            await connect(pid, token, engine, store, db, manager)
+            continue
+        line = SCRIPT[step % len(SCRIPT)]
+        step += 1
+        if line == "level up":
+            line = f"cheat_exp {store.get(pid).level * EXP_PER_LEVEL}"
+        await engine.process_command(pid, line, db)
+        latencies.append((loop.time() - sent) * 1000)
+
+
+def user_from_token(session, token: str):
+    """``get_user_from_token`` against the benchmark's database."""
+    payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    return session.query(User).filter(User.username == payload["sub"]).first()
+
+
+async def connect(pid, token, engine, store, db, manager) -> None:
+    """What the WebSocket endpoint does on connect."""
+    user = await db.run(user_from_token, token)
+    player = await store.acquire_async(user.id)
+    await manager.connect(DropSocket(), pid)
+    await engine.on_connect(player)
+
+
+async def disconnect(pid, engine, store, manager) -> None:
+    manager.disconnect(pid)
+    await engine.on_disconnect(pid)
+    await store.release_async(pid)
+
+
+async def run(mode: str, args, data_dir: str) -> dict:
+    threads = 0 if mode == "inline" else args.threads
+    db_engine, factory = make_world(os.path.join(data_dir, f"{mode}.db"), args.clients, threads, args.db_latency)
+    db = DatabaseExecutor(factory, threads=threads)
+    manager = ConnectionManager(queue_size=10000)
+    store = PlayerStateStore(factory, flush_interval=args.flush_interval, db=db)
+    engine = GameEngine(manager, store=store)
+    store.start()
+
+    # Everyone logs in first: the measured part is steady play
+    pids = range(1, args.clients + 1)
+    await asyncio.gather(*(
+        connect(pid, security.create_access_token(data={"sub": f"bench{pid}"}), engine, store, db, manager)
+        for pid in pids
+    ))
+    rng = random.Random(args.seed)
+    latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(
+        client(pid, engine, store, db, manager, args, start + args.seconds, latencies, random.Random(rng.random()))
+        for pid in pids
+    ))
+    elapsed = loop.time() - start
+    await asyncio.gather(*(disconnect(pid, engine, store, manager) for pid in pids))
+    await store.stop()
+    db.shutdown()
+    db_engine.dispose()
+
+    latencies.sort()
+    return {
+        "commands": len(latencies),
+        "rate": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "queries": db.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500, help="Simulated players")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of each run")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode")
+    parser.add_argument("--think", type=float, default=1000.0, help="Mean time between a client's commands (ms)")
+    parser.add_argument("--reconnect", type=float, default=0.01, help="Chance a client reconnects instead")
+    parser.add_argument("--db-latency", type=float, default=2.0, help="Round trip per SQL statement (ms)")
+    parser.add_argument("--threads", type=int, default=settings.DB_POOL_SIZE, help="Offload threads")
+    parser.add_argument("--flush-interval", type=float, default=settings.PLAYER_FLUSH_INTERVAL)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    settings.DEBUG_MODE = True  # The level-ups use cheat_exp
+    logging.disable(logging.WARNING)  # One cheat_exp warning per level-up
+
+    print(f"{args.clients} clients, a command every {args.think:.0f} ms each, "
+          f"{args.db_latency:.1f} ms per SQL statement, {args.runs} x {args.seconds:.0f} s per mode")
+    print(f"{'mode':<8} {'threads':>7} {'commands':>9} {'cmd/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'db calls':>9}")
+    p99s = {"inline": [], "offload": []}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for _ in range(args.runs):
+            for mode in ("inline", "offload"):  # Interleaved, so both see the same machine noise
+                r = asyncio.run(run(mode, args, data_dir))
+                os.remove(os.path.join(data_dir, f"{mode}.db"))
+                p99s[mode].append(r["p99"])
+                threads = 0 if mode == "inline" else args.threads
+                print(f"{mode:<8} {threads:>7} {r['commands']:>9} {r['rate']:>7.0f} {r['p50']:>8.2f} "
+                      f"{r['p95']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.1f} {r['queries']:>9}")
+    inline, offload = statistics.median(p99s["inline"]), statistics.median(p99s["offload"])
+    print(f"Median p99: inline {inline:.1f} ms, offload {offload:.1f} ms ({inline / offload:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Definition memory benchmark: slotted Room/Item/Skill and the Mob flyweight.
+
+Builds ``--count`` instances of every game definition from the shipped data
+files and measures them with tracemalloc against the dict-backed layout they
+used to have: one ``__dict__`` per object, and for mobs a full copy of the
+template's stats per spawn.
+
+    python -m benchmarks.bench_definitions --count 10000
+"""
+import argparse
+import tracemalloc
+from types import SimpleNamespace
+
+from app.game.combat import CombatSystem, Mob
+from app.game.inventory_manager import Item, inventory_manager
+from app.game.skills_manager import Skill, skills_manager
+from app.game.world import Room, world
+
+
+def measure(build):
+    """Bytes still allocated after ``build()``."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def as_dict_object(obj):
+    """The same attributes on a plain ``__dict__`` object (the pre-slots layout)."""
+    return SimpleNamespace(**{name: getattr(obj, name) for name in type(obj).__slots__})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000, help="Instances per definition")
+    args = parser.parse_args()
+    n = args.count
+
+    combat = CombatSystem(manager=None)
+    mob_ids = sorted(combat.mobs_data)
+    rooms = list(world.rooms.values())
+    items = list(inventory_manager.items.values())
+    skills = list(skills_manager.skills.values())
+
+    def old_mob(mob_id):
+        data = combat.mobs_data[mob_id]
+        return SimpleNamespace(id=data["id"], name=data["name"], description=data["description"],
+                               stats=data["stats"].copy(), drops=data.get("drops", []))
+
+    def slotted(cls, sources):
+        """``n`` slotted objects holding the same values as the loaded definitions."""
+        def build():
+            out = []
+            for i in range(n):
+                src, obj = sources[i % len(sources)], cls.__new__(cls)
+                for name in cls.__slots__:
+                    setattr(obj, name, getattr(src, name))
+                out.append(obj)
+            return out
+        return build
+
+    cases = [
+        ("Room", slotted(Room, rooms), lambda: [as_dict_object(rooms[i % len(rooms)]) for i in range(n)]),
+        ("Item", slotted(Item, items), lambda: [as_dict_object(items[i % len(items)]) for i in range(n)]),
+        ("Skill", slotted(Skill, skills), lambda: [as_dict_object(skills[i % len(skills)]) for i in range(n)]),
+        ("Mob", lambda: [combat.spawn_mob(mob_ids[i % len(mob_ids)]) for i in range(n)],
+         lambda: [old_mob(mob_ids[i % len(mob_ids)]) for i in range(n)]),
+    ]
+
+    print(f"{n} instances each")
+    print(f"{'type':<8} {'dict B/obj':>11} {'slots B/obj':>12} {'dict KiB/10k':>13} {'slots KiB/10k':>14} {'saved':>7}")
+    for name, new, old in cases:
+        new_b, old_b = measure(new) / n, measure(old) / n
+        print(f"{name:<8} {old_b:>11.1f} {new_b:>12.1f} {old_b * 10000 / 1024:>13.1f} "
+              f"{new_b * 10000 / 1024:>14.1f} {1 - new_b / old_b:>7.0%}")
+
+    mob = Mob(combat.templates[mob_ids[0]])
+    print(f"A live Mob holds {len(Mob.__slots__)} slots ({', '.join(Mob.__slots__)}); "
+          f"its {len(mob.template.stats)} template stats and drops are shared.")
+
+
+if __name__ == "__main__":
+    main()
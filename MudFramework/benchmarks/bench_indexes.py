@@ -0,0 +1,123 @@
+"""
+Skill and NPC index benchmark: indexed lookups against table scans.
+
+Scales the shipped skill and NPC tables to ``--count`` entries each (copies
+with renamed ids, names and rooms, levels spread over ``--levels``) and times
+every hot lookup both ways: the index (``SkillIndex``, ``npcs_by_room``) and
+the full scan it replaced, kept here as the reference.
+
+    python -m benchmarks.bench_indexes --count 10000
+"""
+import argparse
+import random
+import time
+
+from app.game.content import load_table
+from app.game.quest_manager import QuestManager, index_npcs_by_room
+from app.game.skills_manager import Skill, SkillIndex, SkillsManager
+
+
+# The scans the indexes replaced
+def scan_by_name(skills, name):
+    for skill in skills.values():
+        if skill.name.lower() == name.lower():
+            return skill
+    return None
+
+
+def scan_available(skills, race, level):
+    return [s for s in skills.values()
+            if level >= s.level_required and (not s.race_required or s.race_required == race)]
+
+
+def scan_race_skills(skills, race):
+    return sorted((s for s in skills.values() if not s.race_required or s.race_required == race),
+                  key=lambda s: s.level_required)
+
+
+def scan_unlocked(skills, race, old_level, new_level):
+    known = {s.id for s in scan_available(skills, race, old_level)}
+    return [s for s in scan_available(skills, race, new_level) if s.id not in known]
+
+
+def scan_npc(npcs, room_id):
+    for npc in npcs.values():
+        if npc["room_id"] == room_id:
+            return npc
+    return None
+
+
+def scale_skills(count: int, levels: int, rng) -> dict:
+    base = list(load_table("skills").values())
+    skills = {}
+    for i in range(count):
+        data = dict(base[i % len(base)], id=f"skill_{i}", name=f"{base[i % len(base)]['name']} {i}",
+                    level_required=rng.randint(1, levels))
+        skills[data["id"]] = Skill(data)
+    return skills
+
+
+def scale_npcs(count: int) -> dict:
+    base = list(load_table("npcs").values())
+    return {f"npc_{i}": dict(base[i % len(base)], id=f"npc_{i}", room_id=f"room_{i}") for i in range(count)}
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000, help="Skills and NPCs")
+    parser.add_argument("--levels", type=int, default=100, help="Highest level_required")
+    parser.add_argument("--calls", type=int, default=200, help="Lookups per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    skills = scale_skills(args.count, args.levels, rng)
+    npcs = scale_npcs(args.count)
+    start = time.perf_counter()
+    manager = SkillsManager.__new__(SkillsManager)
+    manager.skills, manager.index = skills, SkillIndex(skills)
+    skill_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    quests = QuestManager.__new__(QuestManager)
+    quests.npcs, quests.npcs_by_room = npcs, index_npcs_by_room(npcs)
+    npc_ms = (time.perf_counter() - start) * 1e3
+    races = sorted({s.race_required for s in skills.values() if s.race_required})
+    print(f"{args.count} skills ({len(races)} races, levels 1-{args.levels}) and {args.count} NPCs; "
+          f"indexes built in {skill_ms:.1f} ms (skills) and {npc_ms:.1f} ms (NPCs)")
+
+    names = [(rng.choice(list(skills.values())).name.upper(),) for _ in range(args.calls)]
+    levels = [(rng.choice(races), rng.randint(1, args.levels)) for _ in range(args.calls)]
+    level_ups = [(race, level, level + 1) for race, level in levels]
+    race_calls = [(rng.choice(races),) for _ in range(args.calls)]
+    rooms = [(f"room_{rng.randrange(args.count)}",) for _ in range(args.calls)]
+    cases = [
+        ("skill by name", lambda name: scan_by_name(skills, name), manager.get_skill_by_name, names),
+        ("available skills", lambda race, level: scan_available(skills, race, level),
+         manager.get_available_skills, levels),
+        ("race skills", lambda race: scan_race_skills(skills, race), manager.get_all_race_skills, race_calls),
+        ("unlocked at level-up", lambda race, old, new: scan_unlocked(skills, race, old, new),
+         manager.get_unlocked_skills, level_ups),
+        ("npc by room", lambda room_id: scan_npc(npcs, room_id), quests.get_npc_by_room, rooms),
+    ]
+
+    print(f"{'lookup':<22} {'scan us':>10} {'index us':>10} {'speedup':>9}")
+    for name, scan, indexed, calls in cases:
+        for call in calls[:20]:
+            expected, got = scan(*call), indexed(*call)
+            if isinstance(expected, list):
+                assert sorted(s.id for s in got) == sorted(s.id for s in expected), name
+            else:
+                assert got is expected, name
+        scan_us, index_us = per_call_us(scan, calls), per_call_us(indexed, calls)
+        print(f"{name:<22} {scan_us:>10.1f} {index_us:>10.2f} {scan_us / index_us:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Instrumentation overhead benchmark: what the timings and the profiler cost.
+
+Drives a real GameEngine through the bench_state_sync play session for one
+player and reports commands per second in three modes, interleaved over
+``--runs``: "bare" with every ``Histogram.observe`` a no-op (the timers
+still read the clock), "timed" as shipped, and "profiled" with the
+slow-command profiler keeping ``--keep`` commands at ``--interval`` ms.
+Also times one observation and one render of the admin metrics scrape.
+
+    python -m benchmarks.bench_instrumentation --sessions 100 --runs 5
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import timeit
+
+from app.api.endpoints.admin import render_metrics
+from app.core.database import DatabaseExecutor
+from app.core.metrics import Histogram
+from app.core.profiler import profiler
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.websockets.connection_manager import ConnectionManager
+from benchmarks.bench_state_sync import SESSION, ClientSocket, make_world
+
+OBSERVE = Histogram.observe
+
+
+async def play(sessions: int) -> tuple:
+    factory = make_world()
+    manager = ConnectionManager(queue_size=10000)
+    store = PlayerStateStore(factory, flush_interval=3600)
+    engine = GameEngine(manager, store=store)
+    await manager.connect(ClientSocket(manager, 1, ack=True), 1)
+    db = DatabaseExecutor(factory, threads=0)
+    await engine.on_connect(store.acquire(1))
+    commands = 0
+    start = time.perf_counter()
+    for _ in range(sessions):
+        for line in SESSION:
+            await engine.process_command(1, line, db)
+            commands += 1
+            while manager.active_connections[1].queue.qsize():
+                await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    manager.disconnect(1)
+    return commands / elapsed, engine
+
+
+def run(mode: str, args) -> tuple:
+    if mode == "bare":
+        Histogram.observe = lambda self, value: None
+    if mode == "profiled":
+        profiler.configure(args.keep, args.interval)
+    try:
+        return asyncio.run(play(args.sessions))
+    finally:
+        Histogram.observe = OBSERVE
+        profiler.configure(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help=f"Repeats of the {len(SESSION)}-command script")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode")
+    parser.add_argument("--keep", type=int, default=20, help="Slowest commands the profiler keeps")
+    parser.add_argument("--interval", type=float, default=1.0, help="Profiler sampling period (ms)")
+    args = parser.parse_args()
+
+    hist = Histogram()
+    observe_ns = min(timeit.repeat(lambda: hist.observe(3.7), number=100000, repeat=5)) / 100000 * 1e9
+    clock_ns = min(timeit.repeat(time.perf_counter, number=100000, repeat=5)) / 100000 * 1e9
+    print(f"Histogram.observe: {observe_ns:.0f} ns; perf_counter: {clock_ns:.0f} ns; "
+          f"switch interval {sys.getswitchinterval() * 1000:.1f} ms")
+
+    rates = {"bare": [], "timed": [], "profiled": []}
+    engine = None
+    for _ in range(args.runs):
+        for mode in rates:  # Interleaved, so every mode sees the same machine noise
+            rate, engine = run(mode, args)
+            rates[mode].append(rate)
+    bare = statistics.median(rates["bare"])
+    print(f"{'mode':<9} {'cmd/s':>8} {'vs bare':>8}")
+    for mode, samples in rates.items():
+        rate = statistics.median(samples)
+        print(f"{mode:<9} {rate:>8.0f} {(rate / bare - 1) * 100:>+7.1f}%")
+
+    start = time.perf_counter()
+    text = render_metrics(engine)
+    render_ms = (time.perf_counter() - start) * 1000
+    series = sum(1 for line in text.splitlines() if not line.startswith("#"))
+    print(f"Metrics scrape: {series} series, {len(text) / 1024:.1f} KB, rendered in {render_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Inventory benchmark: the ``Inventory`` container against the JSON slot list it replaced.
+
+Times the hot operations on an inventory of ``--items`` different items
+(a pickup, using one and picking it back up, the wish check for seven shards), both on the old
+``[{"item_id", "qty"}]`` list (copied and scanned, as the handlers did) and
+on ``Inventory``. Then compares the column's size in both forms, and times
+the write-behind flush of ``--players`` dirty players in a SQLite file when
+only ``--changed`` of them picked something up: "all" writes every
+inventory, as before; "changed" writes only the ones whose version moved.
+
+    python -m benchmarks.bench_inventory --items 50 --players 2000 --changed 0.1
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.game.inventory import Inventory
+from app.game.player_store import PlayerStateStore
+from app.models.base import Player
+
+SHARDS = [f"cosmic_shard_{i}" for i in range(1, 8)]
+
+
+# The list handling Inventory replaced
+def list_pickup(inventory, item_id):
+    inv = list(inventory) if inventory else []
+    for slot in inv:
+        if slot["item_id"] == item_id:
+            slot["qty"] += 1
+            break
+    else:
+        inv.append({"item_id": item_id, "qty": 1})
+    return inv
+
+
+def list_use(inventory, item_id):
+    inv = list(inventory)
+    for slot in inv:
+        if slot["item_id"] == item_id:
+            slot["qty"] -= 1
+            if slot["qty"] <= 0:
+                inv.remove(slot)
+            break
+    return inv
+
+
+def list_has_shards(inventory):
+    counts = {}
+    for slot in inventory:
+        counts[slot["item_id"]] = slot["qty"]
+    return all(counts.get(r, 0) >= 1 for r in SHARDS)
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e9
+
+
+def item_ids(items: int) -> list:
+    return SHARDS[:min(items, 7)] + [f"item_{i}" for i in range(max(0, items - 7))]
+
+
+def flush_ms(store: PlayerStateStore, players, changed: int, everything: bool, rng) -> float:
+    for player in rng.sample(players, changed):
+        player.inventory.add(rng.choice(list(player.inventory)))
+    for player in players:
+        player.exp += 1
+        store.mark_dirty(player)
+    if everything:
+        store._stored_inventory.clear()  # Every inventory counts as changed, as before
+    start = time.perf_counter()
+    store.flush()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="Different items per inventory")
+    parser.add_argument("--players", type=int, default=2000, help="Dirty players per flush")
+    parser.add_argument("--changed", type=float, default=0.1, help="Fraction of them whose inventory changed")
+    parser.add_argument("--runs", type=int, default=5, help="Flushes per mode")
+    parser.add_argument("--calls", type=int, default=20000, help="Calls per operation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    ids = item_ids(args.items)
+    slots = [{"item_id": item_id, "qty": rng.randint(1, 20)} for item_id in ids]
+    inventory = Inventory.from_json(slots)
+    picks = [(rng.choice(ids),) for _ in range(args.calls)]
+    print(f"Inventory of {args.items} items")
+    print(f"{'operation':<16} {'list ns':>10} {'Inventory ns':>13} {'speedup':>8}")
+    held = [[dict(slot) for slot in slots]]
+
+    def list_use_and_pickup(item_id):
+        held[0] = list_pickup(list_use(held[0], item_id), item_id)
+
+    def use_and_pickup(item_id):
+        inventory.remove(item_id)
+        inventory.add(item_id, limit=10**9)
+
+    cases = [
+        ("pickup", lambda item_id: list_pickup(slots, item_id), lambda item_id: inventory.add(item_id, limit=10**9)),
+        ("use + pickup", list_use_and_pickup, use_and_pickup),
+        ("wish check", lambda _: list_has_shards(slots), lambda _: inventory.has_all(SHARDS)),
+    ]
+    for name, old, new in cases:
+        old_ns, new_ns = per_call_ns(old, picks), per_call_ns(new, picks)
+        print(f"{name:<16} {old_ns:>10.0f} {new_ns:>13.0f} {old_ns / new_ns:>7.1f}x")
+    old_bytes = len(json.dumps(Inventory.from_json(slots).to_slots()))
+    new_bytes = len(json.dumps(Inventory.from_json(slots).to_json()))
+    print(f"Column: {old_bytes} bytes as a slot list, {new_bytes} compact ({new_bytes / old_bytes:.0%})")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(data_dir, 'inventory.db')}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with factory() as db:
+            db.add_all(Player(id=i, name=f"P{i}", race="Terran", level=1, exp=0, stats={"hp": 100},
+                              inventory=slots, current_map="start_area")
+                       for i in range(1, args.players + 1))
+            db.commit()
+        store = PlayerStateStore(factory, flush_interval=3600)
+        players = [store.acquire(i) for i in range(1, args.players + 1)]
+        changed = int(args.players * args.changed)
+        times = {"all": [], "changed": []}
+        for _ in range(args.runs):
+            for mode in times:  # Interleaved, so both see the same machine noise
+                times[mode].append(flush_ms(store, players, changed, mode == "all", rng))
+        engine.dispose()
+    old, new = statistics.median(times["all"]), statistics.median(times["changed"])
+    print(f"Flush of {args.players} players, {changed} with a pickup: {old:.1f} ms writing every inventory, "
+          f"{new:.1f} ms writing the changed ones ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Content hot reload benchmark: how long players notice a reload.
+
+Scales the shipped content ``--scale`` times (see bench_content.py), puts
+``--players`` online players into fights all over the world and reloads the
+content ``--runs`` times while a heartbeat coroutine measures how late the
+event loop gets to it. Loading, validation and building run on a worker
+thread, so the only stall should be the swap itself plus the state refresh
+sent to every online player afterwards. Stalls also include the GIL slices
+the loading thread holds and any full garbage collection the reload's
+allocations set off; full collections are counted per run. For comparison
+it also times the same reload done inline on the event loop.
+
+    python -m benchmarks.bench_reload --scale 100 --players 1000
+"""
+import argparse
+import asyncio
+import gc
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from app.game.content import load_json_content
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.reload import content_reloader
+from app.models.base import Player
+from benchmarks.bench_content import scale_content, write_content
+
+
+class NullManager:
+    """Connection manager that drops everything it is asked to send."""
+
+    def __init__(self):
+        self.active_connections = {}
+        self.states = 0
+
+    @contextmanager
+    def batch(self, player_id):
+        yield
+
+    def set_room(self, player_id, room_id, zone=None):
+        pass
+
+    async def send_personal_message(self, message, player_id):
+        pass
+
+    async def send_state(self, state, player_id):
+        self.states += 1
+
+    async def publish(self, channel, message, exclude=()):
+        pass
+
+
+async def heartbeat(lags: list, interval: float, stop: asyncio.Event) -> None:
+    """Record how late every wake-up is (ms): the longest is the longest loop stall."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1e3)
+
+
+async def run(args) -> None:
+    manager = NullManager()
+    store = PlayerStateStore(session_factory=None, flush_interval=3600)
+    engine = GameEngine(manager, store=store)
+    await content_reloader.reload(engine)  # Load the scaled world
+
+    rng = random.Random(args.seed)
+    hunting_grounds = [room_id for room_id in engine.population.room_ids if engine.population.slots(room_id)]
+    for pid in range(1, args.players + 1):
+        stats = {"hp": 500, "max_hp": 500, "flux": 100, "max_flux": 100, "str": 5, "dex": 5, "int": 5, "vit": 50}
+        store.players[pid] = Player(id=pid, user_id=pid, name=f"P{pid}", race="Terran", level=10, exp=0,
+                                    stats=stats, inventory=[], current_map=rng.choice(hunting_grounds),
+                                    active_quests={}, transformation="Base", zeni=0, combat_state=None,
+                                    learned_skills=[])
+        manager.active_connections[pid] = True
+        await engine.process_command(pid, "hunt", None)
+    fighting = sum(1 for player in store.players.values() if player.combat_state)
+    print(f"{args.scale}x content: {len(engine.population)} mobs in {len(engine.population.room_ids)} rooms; "
+          f"{args.players} players online, {fighting} in fights")
+
+    full_collections = []
+    gc.callbacks.append(lambda phase, info: phase == "stop" and info["generation"] == 2
+                        and full_collections.append(info))
+    results = []
+    for _ in range(args.runs):
+        lags, stop = [], asyncio.Event()
+        beat = asyncio.create_task(heartbeat(lags, args.interval / 1e3, stop))
+        await asyncio.sleep(args.interval / 1e3 * 5)
+        states, collections = manager.states, len(full_collections)
+        start = time.perf_counter()
+        result = await content_reloader.reload(engine)
+        total_ms = (time.perf_counter() - start) * 1e3
+        refreshed = manager.states - states
+        stop.set()
+        await beat
+        results.append((result, total_ms, max(lags), refreshed, len(full_collections) - collections))
+
+    # The same reload done inline: the loop is blocked for all of it
+    start = time.perf_counter()
+    snapshot, _ = content_reloader.prepare(None, engine.population)
+    content_reloader.swap(snapshot, engine)
+    inline_ms = (time.perf_counter() - start) * 1e3
+
+    still_fighting = sum(
+        1 for player in store.players.values()
+        if player.combat_state and engine.population.engaged_by[player.combat_state["slot"]] == player.id
+    )
+    print(f"{'run':>4} {'reload ms':>10} {'load ms':>9} {'swap ms':>9} {'max stall ms':>13} "
+          f"{'refreshed':>10} {'full GCs':>9}")
+    for i, (result, total_ms, stall_ms, refreshed, collections) in enumerate(results, 1):
+        print(f"{i:>4} {total_ms:>10.1f} {result['load_ms']:>9.1f} {result['swap_ms']:>9.3f} "
+              f"{stall_ms:>13.2f} {refreshed:>10} {collections:>9}")
+    swaps = [result["swap_ms"] for result, *_ in results]
+    stalls = [stall for _, _, stall, _, collections in results if not collections]
+    print(f"Swap pause: median {statistics.median(swaps):.3f} ms, max {max(swaps):.3f} ms. "
+          f"Inline reload blocks the loop for {inline_ms:.1f} ms.")
+    if stalls:
+        print(f"Longest loop stall without a full GC: {max(stalls):.1f} ms "
+              f"(median {statistics.median(stalls):.1f} ms).")
+    print(f"{still_fighting}/{fighting} fights kept their mob instance across {args.runs + 1} reloads.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Copies of the shipped content")
+    parser.add_argument("--players", type=int, default=1000, help="Online players, each starting a fight")
+    parser.add_argument("--runs", type=int, default=5, help="Reloads to measure")
+    parser.add_argument("--interval", type=float, default=1.0, help="Heartbeat interval (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_content(scale_content(load_json_content(), args.scale), data_dir)
+        content_reloader.data_dir = data_dir
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Chat fan-out benchmark: server-wide broadcast vs room-scoped channels.
+
+Connects N fake sockets spread over R rooms, has every player say a few
+lines, and reports frames and bytes written per second for the old
+``broadcast`` path and the room channel path.
+
+    python -m benchmarks.bench_room_chat --players 2000 --rooms 100
+"""
+import argparse
+import asyncio
+import time
+
+from app.websockets.connection_manager import ConnectionManager, room_channel
+
+
+class CountingWebSocket:
+    """Counts frames and bytes instead of writing to a network."""
+
+    def __init__(self, totals):
+        self.totals = totals
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.totals["frames"] += 1
+        self.totals["bytes"] += len(text.encode("utf-8"))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def run(mode: str, players: int, rooms: int, lines: int) -> dict:
+    totals = {"frames": 0, "bytes": 0}
+    # Queues large enough that nobody is dropped as a slow consumer
+    manager = ConnectionManager(queue_size=players * lines + 1)
+    for pid in range(players):
+        await manager.connect(CountingWebSocket(totals), pid)
+        manager.set_room(pid, f"room_{pid % rooms}")
+
+    start = time.perf_counter()
+    for n in range(lines):
+        for pid in range(players):
+            message = {"type": "chat", "sender": f"Player{pid}", "content": f"line {n}", "channel": "channel-say"}
+            if mode == "broadcast":
+                await manager.broadcast(message)
+            else:
+                await manager.publish(room_channel(f"room_{pid % rooms}"), message)
+    # Let the writer tasks drain every queue
+    while any(conn.queue.qsize() for conn in manager.active_connections.values()):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for pid in range(players):
+        manager.disconnect(pid)
+    return {
+        "mode": mode,
+        "says": players * lines,
+        "frames": totals["frames"],
+        "bytes": totals["bytes"],
+        "seconds": elapsed,
+        "bytes_per_sec": totals["bytes"] / elapsed,
+        "frames_per_say": totals["frames"] / (players * lines),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=2, help="Lines said per player")
+    args = parser.parse_args()
+
+    print(f"{args.players} players in {args.rooms} rooms, {args.lines} lines each")
+    print(f"{'mode':<10} {'frames':>12} {'MB sent':>10} {'seconds':>9} {'MB/s':>9} {'frames/say':>11}")
+    results = [asyncio.run(run(mode, args.players, args.rooms, args.lines)) for mode in ("broadcast", "room")]
+    for r in results:
+        print(f"{r['mode']:<10} {r['frames']:>12} {r['bytes'] / 1e6:>10.2f} {r['seconds']:>9.3f} "
+              f"{r['bytes_per_sec'] / 1e6:>9.2f} {r['frames_per_say']:>11.1f}")
+    before, after = results
+    print(f"Room channels send {before['bytes'] / after['bytes']:.1f}x fewer bytes "
+          f"and finish {before['seconds'] / after['seconds']:.1f}x faster.")
+
+
+if __name__ == "__main__":
+    main()
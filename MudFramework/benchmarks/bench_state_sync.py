@@ -0,0 +1,144 @@
+"""
+Gamestate sync benchmark: full snapshots vs versioned merge patches.
+
+Drives a real GameEngine through a scripted play session (look, hunt,
+attack rounds, moves, chat, inventory) for one player and reports the bytes
+written per command and the server time spent per ``refresh_ui``. The
+"full" client never acks, so it gets a snapshot every time (the old
+protocol); the "delta" client acks every state frame and gets patches.
+
+    python -m benchmarks.bench_state_sync --sessions 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, DatabaseExecutor
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.simulator import RACES_PATH, stats_at_level
+from app.models.base import Player, Race
+from app.websockets.connection_manager import BATCH_TYPE, ConnectionManager, encode_message
+
+SESSION = [
+    "look", "move north", "look", "hunt", "attack", "attack", "attack", "attack",
+    "say anyone around?", "inventory", "move south", "move north", "hunt", "attack", "attack", "look",
+]
+
+
+class ClientSocket:
+    """Counts bytes by frame type and acks state frames like game.js does."""
+
+    def __init__(self, manager, player_id, ack):
+        self.manager, self.player_id, self.ack = manager, player_id, ack
+        self.bytes = {}  # By message type, each message sized as if sent alone
+        self.wire_bytes = 0
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        frame = json.loads(text)
+        self.frames += 1
+        self.wire_bytes += len(text.encode("utf-8"))
+        for message in frame["messages"] if frame["type"] == BATCH_TYPE else [frame]:
+            kind = message["type"]
+            self.bytes[kind] = self.bytes.get(kind, 0) + len(encode_message(message).encode("utf-8"))
+            if self.ack and kind.startswith("gamestate"):
+                await self.manager.handle_control(self.player_id, json.dumps({"type": "ack", "v": message["v"]}))
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_world():
+    db_engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=db_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    with open(RACES_PATH) as f:
+        races = json.load(f)
+    with factory() as db:
+        for race in races.values():
+            db.add(Race(**race))
+        stats = stats_at_level(races["Zenkai"], 12)
+        db.add(Player(id=1, name="Bench", race="Zenkai", level=12, exp=0, stats=stats,
+                      inventory=[{"item_id": "senzu_bean", "qty": 3}], current_map="start_area",
+                      transformation="Base", zeni=100, learned_skills=[]))
+        db.commit()
+    return factory
+
+
+async def run(mode: str, sessions: int) -> dict:
+    factory = make_world()
+    manager = ConnectionManager(queue_size=10000)
+    store = PlayerStateStore(factory, flush_interval=3600)
+    engine = GameEngine(manager, store=store)
+
+    refresh_times = []
+    refresh_ui = engine.refresh_ui
+
+    async def timed_refresh(player):
+        start = time.perf_counter()
+        await refresh_ui(player)
+        refresh_times.append(time.perf_counter() - start)
+
+    engine.refresh_ui = timed_refresh
+
+    socket = ClientSocket(manager, 1, ack=(mode == "delta"))
+    await manager.connect(socket, 1)
+    commands = 0
+    db = DatabaseExecutor(factory, threads=0)  # One player: no need for threads
+    player = store.acquire(1)
+    await engine.on_connect(player)
+    for _ in range(sessions):
+        for line in SESSION:
+            await engine.process_command(1, line, db)
+            commands += 1
+            # Let the writer deliver (and the client ack) before the next command
+            while manager.active_connections[1].queue.qsize():
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+    manager.disconnect(1)
+
+    total = socket.wire_bytes
+    state = socket.bytes.get("gamestate", 0) + socket.bytes.get("gamestate_patch", 0)
+    return {
+        "mode": mode,
+        "commands": commands,
+        "bytes_per_command": total / commands,
+        "frames_per_command": socket.frames / commands,
+        "state_bytes_per_command": state / commands,
+        "refreshes": len(refresh_times),
+        "refresh_us": sum(refresh_times) / len(refresh_times) * 1e6,
+        "stats": manager.get_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200, help=f"Repeats of the {len(SESSION)}-command script")
+    args = parser.parse_args()
+    os.environ.setdefault("DEBUG_MODE", "false")
+
+    results = [asyncio.run(run(mode, args.sessions)) for mode in ("full", "delta")]
+    print(f"{'mode':<6} {'commands':>9} {'frames/cmd':>11} {'B/command':>10} {'state B/cmd':>12} {'refreshes':>10} {'us/refresh':>11} "
+          f"{'snapshots':>10} {'patches':>8} {'unchanged':>10}")
+    for r in results:
+        s = r["stats"]
+        print(f"{r['mode']:<6} {r['commands']:>9} {r['frames_per_command']:>11.2f} {r['bytes_per_command']:>10.0f} {r['state_bytes_per_command']:>12.0f} "
+              f"{r['refreshes']:>10} {r['refresh_us']:>11.1f} {s['state_snapshots']:>10} {s['state_patches']:>8} "
+              f"{s['state_unchanged']:>10}")
+    before, after = results
+    print(f"Gamestate bytes per command: {before['state_bytes_per_command'] / after['state_bytes_per_command']:.1f}x fewer; "
+          f"total bytes per command: {before['bytes_per_command'] / after['bytes_per_command']:.1f}x fewer.")
+
+
+if __name__ == "__main__":
+    main()
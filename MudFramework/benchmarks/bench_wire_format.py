@@ -0,0 +1,120 @@
+"""
+Wire format benchmark: JSON text frames vs MessagePack binary frames.
+
+Plays the gamestate benchmark's scripted session (hunts, attack rounds,
+moves, chat) through a real GameEngine, captures every outbound message
+(unpacked from the per-command batch frames), then reports bytes per
+message type and the encode/decode cost of each codec over that message mix. Both acking (patch) and non-acking (snapshot)
+clients are covered, since they see very different state frames.
+
+    python -m benchmarks.bench_wire_format --sessions 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from app.core.database import DatabaseExecutor
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.websockets.codecs import CODECS
+from app.websockets.connection_manager import BATCH_TYPE, ConnectionManager
+from benchmarks.bench_state_sync import SESSION, make_world
+
+
+class CaptureSocket:
+    """Keeps every message sent; acks state frames when ``ack`` is set."""
+
+    def __init__(self, manager, player_id, ack):
+        self.manager, self.player_id, self.ack = manager, player_id, ack
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        frame = json.loads(text)
+        for message in frame["messages"] if frame["type"] == BATCH_TYPE else [frame]:
+            self.messages.append(message)
+            if self.ack and message["type"].startswith("gamestate"):
+                await self.manager.handle_control(self.player_id, json.dumps({"type": "ack", "v": message["v"]}))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def capture(sessions: int, ack: bool) -> list:
+    factory = make_world()
+    manager = ConnectionManager(queue_size=10000)
+    store = PlayerStateStore(factory, flush_interval=3600)
+    engine = GameEngine(manager, store=store)
+    socket = CaptureSocket(manager, 1, ack)
+    await manager.connect(socket, 1)
+    db = DatabaseExecutor(factory, threads=0)  # One player: no need for threads
+    player = store.acquire(1)
+    await engine.on_connect(player)
+    for _ in range(sessions):
+        for line in SESSION:
+            await engine.process_command(1, line, db)
+            while manager.active_connections[1].queue.qsize():
+                await asyncio.sleep(0)
+            await asyncio.sleep(0)
+    manager.disconnect(1)
+    return socket.messages
+
+
+def measure(codec, messages: list, repeat: int) -> dict:
+    frames = [codec.encode(m) for m in messages]
+    sizes = {}
+    for message, frame in zip(messages, frames):
+        size = len(frame) if codec.binary else len(frame.encode("utf-8"))
+        kind = message["type"]
+        sizes[kind] = sizes.get(kind, 0) + size
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            codec.encode(message)
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            codec.decode(frame)
+    decode_s = time.perf_counter() - start
+
+    count = len(messages) * repeat
+    return {"sizes": sizes, "encode_us": encode_s / count * 1e6, "decode_us": decode_s / count * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help=f"Repeats of the {len(SESSION)}-command script")
+    parser.add_argument("--repeat", type=int, default=20, help="Encode/decode passes over the captured messages")
+    args = parser.parse_args()
+    os.environ.setdefault("DEBUG_MODE", "false")
+
+    if "msgpack" not in CODECS:
+        raise SystemExit("msgpack is not installed (pip install -r requirements.txt)")
+
+    for ack in (False, True):
+        messages = asyncio.run(capture(args.sessions, ack))
+        kinds = sorted({m["type"] for m in messages})
+        print(f"\n{'delta (acking)' if ack else 'full (non-acking)'} client: {len(messages)} messages")
+        print(f"{'format':<8} " + " ".join(f"{kind + ' B/msg':>22}" for kind in kinds)
+              + f" {'total B/msg':>12} {'encode us':>10} {'decode us':>10}")
+        results = {}
+        for name, codec in CODECS.items():
+            r = results[name] = measure(codec, messages, args.repeat)
+            counts = {kind: sum(1 for m in messages if m["type"] == kind) for kind in kinds}
+            print(f"{name:<8} " + " ".join(f"{r['sizes'][kind] / counts[kind]:>22.1f}" for kind in kinds)
+                  + f" {sum(r['sizes'].values()) / len(messages):>12.1f} {r['encode_us']:>10.2f} {r['decode_us']:>10.2f}")
+        json_bytes = sum(results["json"]["sizes"].values())
+        packed_bytes = sum(results["msgpack"]["sizes"].values())
+        print(f"msgpack: {json_bytes / packed_bytes:.2f}x fewer bytes, "
+              f"encode {results['json']['encode_us'] / results['msgpack']['encode_us']:.2f}x JSON speed")
+
+
+if __name__ == "__main__":
+    main()
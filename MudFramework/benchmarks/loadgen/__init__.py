@@ -0,0 +1,23 @@
+"""
+End-to-end load generator: many WebSocket players against one server node.
+
+Starts the app in this process (uvicorn on a free local port, a temporary
+SQLite database, the real lifespan with its tick loop and player flusher),
+creates the accounts and characters through the ``/api/v1`` routes and
+then drives the players from client processes, each running its share as
+asyncio WebSocket clients through scripted play sessions.
+
+Every command is followed by a ``ping`` control frame. The server answers
+it after everything the command sent, so the time to the ``pong`` is the
+command's latency as the player sees it. The run reports throughput,
+per-verb p50/p95/p99 latency and the server's CPU and memory, and saves it
+all as JSON; ``--compare`` checks a run against an earlier one.
+``--logins-per-second`` logs in at that rate for the whole run, to see
+what a login storm does to the game.
+
+Run from the MudFramework directory:
+
+    python -m benchmarks.loadgen --clients 200 --out load.json
+    python -m benchmarks.loadgen --clients 200 --compare load.json
+    python -m benchmarks.loadgen --clients 200 --logins-per-second 500 --compare load.json
+"""
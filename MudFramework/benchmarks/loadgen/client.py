@@ -0,0 +1,191 @@
+"""
+Scripted WebSocket players and the login burst. Runs in the client processes: imports nothing from the app.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import websockets
+
+# One play session: out to the wasteland, a fight, a word in the room and back
+SESSION = [
+    "look", "east", "east", "look", "hunt", "attack", "attack", "attack", "flee",
+    "say anyone else hunting here?", "west", "west",
+]
+DIRECTIONS = {"north", "south", "east", "west", "up", "down", "enter", "exit"}
+CONTENT_LENGTH = re.compile(rb"(?i)content-length: *(\d+)")
+
+
+def verb(line: str) -> str:
+    """The name a command is reported under: directions count as ``move``."""
+    word = line.split(maxsplit=1)[0].lower()
+    return "move" if word in DIRECTIONS else word
+
+
+class Player:
+    """One connected client: sends commands and times each one to its pong."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.pings = 0
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.frames = 0
+        self.bytes = 0
+
+    async def read(self) -> None:
+        """Receive everything; ack state frames like the browser client and resolve pongs."""
+        async for text in self.ws:
+            self.frames += 1
+            self.bytes += len(text)
+            frame = json.loads(text)
+            for message in frame["messages"] if frame.get("type") == "batch" else [frame]:
+                kind = message.get("type")
+                if kind == "pong":
+                    future = self.pending.pop(message["id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(time.perf_counter())
+                elif kind and kind.startswith("gamestate"):
+                    await self.ws.send(json.dumps({"type": "ack", "v": message["v"]}))
+
+    async def command(self, line: str, timeout: float) -> float:
+        """Send a command; returns its latency (ms) once everything it sent has arrived."""
+        self.pings += 1
+        ping = self.pings
+        future = asyncio.get_running_loop().create_future()
+        self.pending[ping] = future
+        start = time.perf_counter()
+        await self.ws.send(line)
+        await self.ws.send(json.dumps({"type": "ping", "id": ping}))
+        done = await asyncio.wait_for(future, timeout)
+        return (done - start) * 1000
+
+
+async def play(base_url: str, token: str, config: Dict, rng: random.Random, results: Dict) -> None:
+    url = base_url.replace("http", "ws", 1) + f"/ws?token={token}"
+    think = config["think_ms"] / 1000
+    try:
+        async with websockets.connect(url, max_size=None, ping_interval=None) as ws:
+            player = Player(ws)
+            reader = asyncio.create_task(player.read())
+            try:
+                await player.command("look", config["timeout"])  # Connected and greeted
+                results["start"] = min(results["start"], time.time())
+                for _ in range(config["sessions"]):
+                    for line in SESSION:
+                        await asyncio.sleep(rng.expovariate(1 / think) if think else 0)
+                        latency = await player.command(line, config["timeout"])
+                        results["latency"].setdefault(verb(line), []).append(latency)
+                results["end"] = max(results["end"], time.time())
+            finally:
+                reader.cancel()
+                results["frames"] += player.frames
+                results["bytes"] += player.bytes
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+        results["errors"] += 1
+        results["error_kinds"][type(e).__name__] = results["error_kinds"].get(type(e).__name__, 0) + 1
+
+
+class LoginConnections:
+    """
+    Keep-alive HTTP/1.1 connections posting logins. Bare asyncio streams
+    cost a fraction of an httpx request, so the burst's own CPU does not
+    crowd the server it measures when both share a small machine.
+    """
+
+    def __init__(self, api_url: str, size: int):
+        url = urlsplit(api_url)
+        self.host, self.port, self.path = url.hostname, url.port or 80, url.path
+        self.idle: List[tuple] = []
+        self.slots = asyncio.Semaphore(size)
+
+    def request(self, credentials: Dict) -> bytes:
+        body = json.dumps(credentials).encode()
+        return (f"POST {self.path}/auth/login HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+
+    async def post(self, request: bytes) -> int:
+        """Send a prepared request; returns the response status."""
+        async with self.slots:
+            while True:
+                reused = bool(self.idle)
+                reader, writer = self.idle.pop() if reused else await asyncio.open_connection(self.host, self.port)
+                try:
+                    writer.write(request)
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    await reader.readexactly(int(CONTENT_LENGTH.search(head).group(1)))
+                except (OSError, EOFError):
+                    writer.close()
+                    if reused:
+                        continue  # The server closed it while it sat idle
+                    raise
+                self.idle.append((reader, writer))
+                return int(head[9:12])
+
+    def close(self) -> None:
+        for _, writer in self.idle:
+            writer.close()
+
+
+async def login(connections: LoginConnections, request: bytes, logins: Dict) -> None:
+    start = time.perf_counter()
+    try:
+        status = await connections.post(request)
+    except (OSError, EOFError, ValueError, AttributeError):
+        logins["errors"] += 1
+        return
+    if status == 200:
+        logins["ok"] += 1
+        logins["latency"].append((time.perf_counter() - start) * 1000)
+    elif status == 503:
+        logins["busy"] += 1
+    else:
+        logins["errors"] += 1
+
+
+async def login_burst(api_url: str, accounts: List[Dict], rate: float, logins: Dict) -> None:
+    """Log in ``rate`` times a second, open loop (not waiting for answers), until cancelled."""
+    connections = LoginConnections(api_url, size=256)
+    requests = [connections.request(credentials) for credentials in accounts]
+    tasks = set()
+    start = time.perf_counter()
+    try:
+        while True:
+            task = asyncio.create_task(login(connections, requests[logins["sent"] % len(requests)], logins))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            logins["sent"] += 1
+            await asyncio.sleep(max(0.0, start + logins["sent"] / rate - time.perf_counter()))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        connections.close()
+
+
+async def _run(base_url: str, tokens: List[str], config: Dict, seed: int) -> Dict:
+    results = {"latency": {}, "frames": 0, "bytes": 0, "errors": 0, "error_kinds": {},
+               "start": float("inf"), "end": 0.0,
+               "logins": {"sent": 0, "ok": 0, "busy": 0, "errors": 0, "latency": []}}
+    rng = random.Random(seed)
+    clients = []
+    for token in tokens:
+        clients.append(play(base_url, token, config, random.Random(rng.random()), results))
+    burst = None
+    if config.get("login_rate"):
+        # For as long as this process's players play
+        burst = asyncio.create_task(login_burst(config["api_url"], config["login_accounts"],
+                                                config["login_rate"], results["logins"]))
+    await asyncio.gather(*clients)
+    if burst is not None:
+        burst.cancel()
+        await asyncio.gather(burst, return_exceptions=True)
+    return results
+
+
+def run_clients(base_url: str, tokens: List[str], config: Dict, seed: int) -> Dict:
+    """Client process entry point: play every account in ``tokens`` concurrently."""
+    return asyncio.run(_run(base_url, tokens, config, seed))
@@ -0,0 +1,85 @@
+"""
+Run results: latency summaries, the JSON file and comparisons between runs.
+"""
+import json
+from typing import Dict, List, Optional
+
+FORMAT_VERSION = 1
+QUANTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+MIN_SAMPLES = 200  # Fewer latencies than this are shown by --compare but never called a regression
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Count, exact (nearest-rank) p50/p95/p99 and max of latencies in ms."""
+    ordered = sorted(samples)
+    summary = {"count": len(ordered)}
+    for name, q in QUANTILES:
+        summary[name] = round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3) if ordered else 0.0
+    summary["max"] = round(ordered[-1], 3) if ordered else 0.0
+    return summary
+
+
+def save(results: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: results format {results.get('version')}, expected {FORMAT_VERSION}.")
+    return results
+
+
+def print_run(results: Dict) -> None:
+    config = results["config"]
+    print(f"{config['clients']} clients x {config['sessions']} sessions, think {config['think_ms']:.0f} ms, "
+          f"{config['procs']} client processes")
+    print(f"{results['commands']} commands in {results['duration_s']:.1f} s: {results['throughput']:.0f} cmd/s, "
+          f"{results['errors']} errors")
+    server = results["server"]
+    print(f"Server CPU {server['cpu_s']:.1f} s ({server['cpu_percent']:.0f}% of a core), "
+          f"max RSS {server['max_rss_mb']:.0f} MB")
+    logins = results.get("logins")
+    if logins and logins["sent"]:
+        answered = logins["ok"] + logins["busy"] + logins["errors"]
+        print(f"Login burst: {logins['sent']} sent ({logins['sent'] / results['duration_s']:.0f}/s), "
+              f"{logins['ok']} logged in (p50 {logins['latency_ms']['p50']:.0f} ms, "
+              f"p99 {logins['latency_ms']['p99']:.0f} ms), {logins['busy']} refused busy (503), "
+              f"{logins['errors']} errors, {logins['sent'] - answered} unanswered at the end")
+    print(f"{'verb':<10} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = dict(results["latency_ms"]["verbs"], all=results["latency_ms"]["all"])
+    for name, s in rows.items():
+        print(f"{name:<10} {s['count']:>7} {s['p50']:>9.2f} {s['p95']:>9.2f} {s['p99']:>9.2f} {s['max']:>9.1f}")
+
+
+def compare(old: Dict, new: Dict, tolerance: float) -> List[str]:
+    """Print old vs new; returns the regressions beyond ``tolerance`` (a fraction)."""
+    regressions = []
+
+    def row(name: str, before: float, after: float, higher_is_worse: bool = True, judge: bool = True) -> None:
+        change = (after - before) / before if before else 0.0
+        worse = judge and (change > tolerance if higher_is_worse else change < -tolerance)
+        flag = "  REGRESSION" if worse else ("" if judge else "  (few samples)")
+        print(f"{name:<20} {before:>10.2f} {after:>10.2f} {change * 100:>+8.1f}%{flag}")
+        if worse:
+            regressions.append(name)
+
+    print(f"{'':<20} {'before':>10} {'after':>10} {'change':>9}")
+    row("throughput cmd/s", old["throughput"], new["throughput"], higher_is_worse=False)
+    row("server cpu s/1k cmd", _cpu_per_1k(old), _cpu_per_1k(new))
+    verbs = dict(new["latency_ms"]["verbs"], all=new["latency_ms"]["all"])
+    before_verbs = dict(old["latency_ms"]["verbs"], all=old["latency_ms"]["all"])
+    for name, after in verbs.items():
+        before: Optional[Dict] = before_verbs.get(name)
+        if before is None:
+            continue
+        judge = min(before["count"], after["count"]) >= MIN_SAMPLES
+        for q in ("p50", "p99"):
+            row(f"{name} {q} ms", before[q], after[q], judge=judge)
+    return regressions
+
+
+def _cpu_per_1k(results: Dict) -> float:
+    return results["server"]["cpu_s"] / results["commands"] * 1000 if results["commands"] else 0.0
@@ -0,0 +1,184 @@
+"""
+Command line entry point: set up the server and the accounts, run the clients, report.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.loadgen import report
+from benchmarks.loadgen.client import run_clients
+from benchmarks.loadgen.server import InProcessServer
+
+API = "/api/v1"
+PASSWORD = "load-test-password"
+
+
+async def create_accounts(base_url: str, count: int, concurrency: int) -> List[str]:
+    """Sign up, log in and create a character for ``count`` players; returns their tokens."""
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url + API, timeout=120) as http:
+        races = [race["name"] for race in (await http.get("/races/")).raise_for_status().json()]
+
+        async def account(i: int) -> str:
+            async with limit:
+                credentials = {"username": f"load{i}", "password": PASSWORD}
+                (await http.post("/auth/signup", json=credentials)).raise_for_status()
+                token = (await http.post("/auth/login", json=credentials)).raise_for_status().json()["access_token"]
+                (await http.post("/players/", json={"name": f"Load{i}", "race": races[i % len(races)]},
+                                 headers={"Authorization": f"Bearer {token}"})).raise_for_status()
+                return token
+
+        return await asyncio.gather(*(account(i) for i in range(count)))
+
+
+async def create_logins(base_url: str, count: int, concurrency: int) -> List[Dict]:
+    """Sign up ``count`` accounts (no characters) for the login burst; returns their credentials."""
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url + API, timeout=120) as http:
+
+        async def account(i: int) -> Dict:
+            async with limit:
+                credentials = {"username": f"rush{i}", "password": PASSWORD}
+                (await http.post("/auth/signup", json=credentials)).raise_for_status()
+                return credentials
+
+        return await asyncio.gather(*(account(i) for i in range(count)))
+
+
+def run_load(base_url: str, tokens: List[str], config: Dict, procs: int, seed: int) -> List[Dict]:
+    """Split the players over ``procs`` client processes and play them all at once."""
+    chunks = [tokens[i::procs] for i in range(procs) if tokens[i::procs]]
+    if config.get("login_rate"):
+        config = dict(config, login_rate=config["login_rate"] / len(chunks))
+    # Spawned, not forked: this process runs the server threads
+    with multiprocessing.get_context("spawn").Pool(len(chunks)) as pool:
+        jobs = [pool.apply_async(run_clients, (base_url, chunk, config, seed + i)) for i, chunk in enumerate(chunks)]
+        return [job.get() for job in jobs]
+
+
+def merge(parts: List[Dict]) -> Dict:
+    merged = {"latency": {}, "frames": 0, "bytes": 0, "errors": 0, "error_kinds": {},
+              "logins": {"sent": 0, "ok": 0, "busy": 0, "errors": 0, "latency": []}}
+    for part in parts:
+        for key, value in part["logins"].items():
+            merged["logins"][key] += value
+        for name, samples in part["latency"].items():
+            merged["latency"].setdefault(name, []).extend(samples)
+        for key in ("frames", "bytes", "errors"):
+            merged[key] += part[key]
+        for kind, n in part["error_kinds"].items():
+            merged["error_kinds"][kind] = merged["error_kinds"].get(kind, 0) + n
+    starts = [part["start"] for part in parts if part["end"]]
+    ends = [part["end"] for part in parts if part["end"]]
+    merged["duration_s"] = max(ends) - min(starts) if ends else 0.0
+    return merged
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    from benchmarks import loadgen
+    parser = argparse.ArgumentParser(description=loadgen.__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent players")
+    parser.add_argument("--sessions", type=int, default=5, help="Scripted play sessions per player")
+    parser.add_argument("--think", type=float, default=500.0, help="Mean pause before each command (ms)")
+    parser.add_argument("--procs", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                        help="Client processes")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Give up on a command after (s)")
+    parser.add_argument("--setup-concurrency", type=int, default=8, help="Accounts created at once")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="Password hashing cost of the players' accounts (0: the app's default). Account "
+                             "setup is not measured; cheap hashes keep it short")
+    parser.add_argument("--logins-per-second", type=float, default=0.0,
+                        help="Log in this often while the players play, at the app's own bcrypt cost (0: no burst)")
+    parser.add_argument("--login-accounts", type=int, default=20, help="Accounts the login burst cycles through")
+    parser.add_argument("--out", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed change before --compare reports a regression (fraction)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    baseline = report.load(args.compare) if args.compare else None
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = InProcessServer(data_dir, bcrypt_rounds=args.bcrypt_rounds)
+        base_url = server.start()
+        try:
+            start = time.perf_counter()
+            tokens = asyncio.run(create_accounts(base_url, args.clients, args.setup_concurrency))
+            setup_s = time.perf_counter() - start
+            print(f"Server at {base_url}; {len(tokens)} accounts and characters created in {setup_s:.1f} s")
+
+            config = {"sessions": args.sessions, "think_ms": args.think, "timeout": args.timeout}
+            if args.logins_per_second:
+                server.real_hash_cost()
+                config.update(login_rate=args.logins_per_second, api_url=base_url + API,
+                              login_accounts=asyncio.run(create_logins(base_url, args.login_accounts,
+                                                                       args.setup_concurrency)))
+            before = resource.getrusage(resource.RUSAGE_SELF)
+            wall = time.perf_counter()
+            parts = run_load(base_url, tokens, config, args.procs, args.seed)
+            wall = time.perf_counter() - wall
+            after = resource.getrusage(resource.RUSAGE_SELF)
+            server_stats = server.stats()
+        finally:
+            server.stop()
+
+    merged = merge(parts)
+    cpu_s = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    commands = sum(len(samples) for samples in merged["latency"].values())
+    results = {
+        "version": report.FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "config": {"clients": args.clients, "sessions": args.sessions, "think_ms": args.think,
+                   "procs": args.procs, "bcrypt_rounds": args.bcrypt_rounds,
+                   "logins_per_second": args.logins_per_second, "seed": args.seed},
+        "setup_s": round(setup_s, 2),
+        "commands": commands,
+        "duration_s": round(merged["duration_s"], 3),
+        "throughput": round(commands / merged["duration_s"], 2) if merged["duration_s"] else 0.0,
+        "errors": merged["errors"],
+        "error_kinds": merged["error_kinds"],
+        "latency_ms": {
+            "all": report.summarize([x for samples in merged["latency"].values() for x in samples]),
+            "verbs": {name: report.summarize(samples) for name, samples in sorted(merged["latency"].items())},
+        },
+        "client": {"frames": merged["frames"], "bytes": merged["bytes"]},
+        "logins": {**{k: v for k, v in merged["logins"].items() if k != "latency"},
+                   "latency_ms": report.summarize(merged["logins"]["latency"])},
+        "server": {
+            # The clients run in other processes: this process's CPU is the server's
+            "cpu_s": round(cpu_s, 3),
+            "cpu_percent": round(cpu_s / wall * 100, 1),
+            "max_rss_mb": round(after.ru_maxrss / 1024, 1),  # KB on Linux
+            **server_stats,
+        },
+    }
+    report.print_run(results)
+    if args.out:
+        report.save(results, args.out)
+        print(f"Saved to {args.out}")
+    if baseline is not None:
+        regressions = report.compare(baseline, results, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,82 @@
+"""
+The app, served in-process on a temporary SQLite database.
+"""
+import json
+import os
+import threading
+import time
+
+import uvicorn
+
+
+class InProcessServer:
+    """uvicorn running ``app.main.app`` on a thread of this process."""
+
+    def __init__(self, data_dir: str, env: dict = None, bcrypt_rounds: int = None):
+        self.db_path = os.path.join(data_dir, "load.db")
+        self.env = {"DATABASE_URL": f"sqlite:///{self.db_path}", "LOG_LEVEL": "WARNING", **(env or {})}
+        self.bcrypt_rounds = bcrypt_rounds
+        self.server = None
+        self.thread = None
+        self.url = None
+
+    def start(self, timeout: float = 30.0) -> str:
+        """Create and seed the database, start serving; returns the base URL."""
+        # The settings are read once, at import: the environment has to be in place first
+        os.environ.update(self.env)
+        from app.core.database import Base, SessionLocal, engine
+        from app.game.simulator import RACES_PATH
+        from app.models.base import Race
+
+        Base.metadata.create_all(bind=engine)
+        with open(RACES_PATH) as f:
+            races = json.load(f)
+        with SessionLocal() as db:
+            for race in races.values():
+                db.add(Race(**race))
+            db.commit()
+
+        from app.core import security
+        self._hash_config = security.pwd_context.to_string()
+        if self.bcrypt_rounds:
+            security.pwd_context.update(bcrypt__rounds=self.bcrypt_rounds)
+
+        from app.main import app
+        config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="loadgen-server", daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("The server did not start.")
+            time.sleep(0.05)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    def real_hash_cost(self) -> None:
+        """Hash new passwords at the app's own bcrypt cost again (after a cheap account setup)."""
+        from app.core import security
+        security.pwd_context.load(self._hash_config)
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.should_exit = True
+            self.thread.join()
+
+    def stats(self) -> dict:
+        """The server's own view of the run."""
+        from app.core.database import db_executor
+        from app.core.security import password_hasher
+        from app.game.commands import commands
+        from app.game.player_store import player_store
+        from app.websockets.connection_manager import manager
+        return {
+            "commands_ms": {name: {k: v for k, v in hist.items() if k != "buckets"}
+                            for name, hist in commands.get_stats().items()},
+            "connections": {k: v for k, v in manager.get_stats().items() if not k.endswith("_ms")},
+            "database": {k: v for k, v in db_executor.get_stats().items() if not k.endswith("_ms")},
+            "password_hasher": {k: v for k, v in password_hasher.get_stats().items() if not k.endswith("_ms")},
+            "player_store": {k: v for k, v in player_store.get_stats().items() if k != "stats_cache"},
+        }
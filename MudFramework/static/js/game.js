@@ -7,6 +7,10 @@ if (!token) window.location.href = '/';
 let socket = null;
 let reconnectTimer = null;
 
+// Last gamestate applied and its version (see app/websockets/state_sync.py)
+let gameState = null;
+let stateVersion = 0;
+
 // --- UI Elements ---
 const els = {
     log: document.getElementById('gameLog'),
@@ -130,6 +134,9 @@ function connectWS(playerId) {
     socket = new WebSocket(`${WS_URL}?token=${token}`);
 
     socket.onopen = () => {
+        // The server starts every connection with a full snapshot
+        gameState = null;
+        stateVersion = 0;
         els.status.textContent = "Connected";
         els.status.className = "text-xs text-green-500 uppercase";
         writeLog("System", "Neural Link Established.");
@@ -157,19 +164,60 @@ function handleMessage(msg) {
     // msg structure: { type: 'chat'|'update'|'error', content: ... }
 
     switch (msg.type) {
+        case 'batch':
+            // Everything one command produced, in order
+            msg.messages.forEach(handleMessage);
+            break;
         case 'chat':
             writeLog(msg.sender, msg.content, msg.channel || 'channel-say');
             break;
-        case 'gamestate':
-            // Full update
-            if (msg.player) updateStats(msg.player);
-            if (msg.room) updateRoom(msg.room);
+        case 'gamestate': {
+            // Full snapshot
+            const { type, v, ...state } = msg;
+            gameState = state;
+            stateVersion = v || 0;
+            if (state.player) updateStats(state.player);
+            if (state.room) updateRoom(state.room);
+            sendControl({ type: 'ack', v: stateVersion });
+            break;
+        }
+        case 'gamestate_patch':
+            // Changed fields only, against the version we hold
+            if (!gameState || msg.base !== stateVersion) {
+                sendControl({ type: 'resync' });
+                break;
+            }
+            gameState = mergePatch(gameState, msg.patch);
+            stateVersion = msg.v;
+            if (msg.patch.player) updateStats(gameState.player);
+            if (msg.patch.room) updateRoom(gameState.room);
+            sendControl({ type: 'ack', v: stateVersion });
             break;
         default:
             console.log("Unknown msg:", msg);
     }
 }
 
+// RFC 7386 JSON merge patch: objects merge, null deletes, anything else replaces
+function mergePatch(target, patch) {
+    const result = Object.assign({}, target);
+    for (const [key, value] of Object.entries(patch)) {
+        if (value === null) {
+            delete result[key];
+        } else if (typeof value === 'object' && !Array.isArray(value)
+                   && typeof result[key] === 'object' && result[key] !== null && !Array.isArray(result[key])) {
+            result[key] = mergePatch(result[key], value);
+        } else {
+            result[key] = value;
+        }
+    }
+    return result;
+}
+
+function sendControl(frame) {
+    if (socket && socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify(frame));
+}
+
 function updateRoom(room) {
     els.roomName.textContent = room.name;
     els.roomDesc.textContent = room.description;
@@ -177,11 +225,11 @@ function updateRoom(room) {
     // Update entities (Mobs)
     els.entities.innerHTML = '';
     if (room.mobs && room.mobs.length > 0) {
-        room.mobs.forEach(mobId => {
+        room.mobs.forEach(mob => {
             const li = document.createElement('li');
             li.className = "text-red-400 font-mono flex items-center space-x-2";
-            // Format Name
-            const name = mobId.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase());
+            // Live population: one line per mob type with its count
+            const name = mob.count > 1 ? `${mob.name} ×${mob.count}` : mob.name;
             li.innerHTML = `<span class="w-2 h-2 rounded-full bg-red-600 animate-pulse"></span><span>${name}</span>`;
             els.entities.appendChild(li);
         });
@@ -312,6 +360,12 @@ els.form.addEventListener('submit', (e) => {
 });
 
 document.getElementById('logoutBtn').addEventListener('click', () => {
+    // Revoke the token on the server too; keepalive lets the request outlive the page
+    fetch(`${API_URL}/auth/logout`, {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${token}` },
+        keepalive: true
+    }).catch(() => {});
     localStorage.removeItem('mud_token');
     window.location.href = '/';
 });
@@ -0,0 +1,134 @@
+"""
+Tests for the verified-token cache, logout and bans
+"""
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api.deps import verify_token
+from app.api.endpoints import auth
+from app.core import security
+from app.core.auth_cache import AuthUser, TokenCache, auth_cache
+from app.core.database import Base, DatabaseExecutor
+from app.core.security import PasswordHasher
+from app.models.base import User, Player
+from app.schemas.user import UserRecover
+
+@pytest.fixture
+def session_factory():
+    """In-memory database with one user and their character, counting queries"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(User(id=7, username="goku", hashed_password="-", is_active=True))
+        db.add(Player(id=3, user_id=7, name="Goku", race="Zenkai", level=1, exp=0, stats={}, inventory=[]))
+        db.commit()
+    factory.queries = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*args):
+        factory.queries += 1
+
+    auth_cache.clear()
+    yield factory
+    auth_cache.clear()
+
+def authenticate(factory, token):
+    """What get_current_user and the WebSocket endpoint do"""
+    with factory() as db:
+        return auth_cache.get(token) or verify_token(db, token)
+
+class TestTokenCache:
+    """Bounded, expiring, invalidated on demand"""
+
+    def test_lru_bound(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        far = time.time() + 3600
+        for i in range(3):
+            cache.put(f"t{i}", AuthUser(i, f"u{i}"), far, cache.version)
+        cache.get("t1")
+        cache.put("t3", AuthUser(3, "u3"), far, cache.version)
+        assert cache.get("t0") is None and cache.get("t2") is None
+        assert cache.get("t1").id == 1 and cache.get("t3").id == 3
+        assert cache.get_stats()["evictions"] == 2
+
+    def test_expiry(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.put("short", AuthUser(1, "a"), time.time() - 1, cache.version)  # The token itself expired
+        assert cache.get("short") is None
+        cache = TokenCache(max_size=10, ttl=0.01)
+        cache.put("t", AuthUser(1, "a"), time.time() + 3600, cache.version)
+        time.sleep(0.02)
+        assert cache.get("t") is None
+
+    def test_invalidation(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        far = time.time() + 3600
+        version = cache.version
+        cache.put("a1", AuthUser(1, "a"), far, version)
+        cache.put("a2", AuthUser(1, "a"), far, version)
+        cache.put("b1", AuthUser(2, "b"), far, version)
+        cache.invalidate_user(1)
+        assert cache.get("a1") is None and cache.get("a2") is None and cache.get("b1") is not None
+        # A lookup that started before the invalidation does not cache its (stale) answer
+        cache.put("a3", AuthUser(1, "a"), far, version)
+        assert cache.get("a3") is None
+
+    def test_disabled(self):
+        cache = TokenCache(max_size=0, ttl=60)
+        cache.put("t", AuthUser(1, "a"), time.time() + 3600, cache.version)
+        assert cache.get("t") is None
+
+class TestVerifyToken:
+    """Tokens are checked against the database once, then served from the cache"""
+
+    def test_cached_after_first_use(self, session_factory):
+        token = security.create_access_token(data={"sub": "goku"})
+        user = authenticate(session_factory, token)
+        assert (user.id, user.username, user.player_id) == (7, "goku", 3)
+        queries = session_factory.queries
+        for _ in range(5):
+            assert authenticate(session_factory, token) is user
+        assert session_factory.queries == queries
+
+    def test_bad_tokens(self, session_factory):
+        assert authenticate(session_factory, "not-a-jwt") is None
+        assert authenticate(session_factory, security.create_access_token(data={"sub": "nobody"})) is None
+
+    def test_logout_revokes(self, session_factory):
+        token = security.create_access_token(data={"sub": "goku"})
+        other = security.create_access_token(data={"sub": "goku", "device": 2})
+        assert authenticate(session_factory, token) and authenticate(session_factory, other)
+        auth_cache.revoke(token, time.time() + 3600)
+        assert authenticate(session_factory, token) is None
+        assert authenticate(session_factory, other) is not None
+
+    def test_ban(self, session_factory):
+        token = security.create_access_token(data={"sub": "goku"})
+        assert authenticate(session_factory, token) is not None
+        with session_factory() as db:
+            db.query(User).filter(User.id == 7).update({"is_active": False})
+            db.commit()
+        auth_cache.invalidate_user(7)
+        assert authenticate(session_factory, token) is None
+        assert auth_cache.get_stats()["size"] == 0
+
+    def test_banned_account_cannot_recover(self, session_factory, monkeypatch):
+        with session_factory() as db:
+            db.query(User).filter(User.id == 7).update({"is_active": False})
+            db.commit()
+        hasher = PasswordHasher(workers=1, queue_size=1)
+        monkeypatch.setattr(auth, "password_hasher", hasher)
+        monkeypatch.setattr(auth, "db_executor", DatabaseExecutor(session_factory, threads=0))
+        with pytest.raises(HTTPException) as refused:
+            asyncio.run(auth.recover_password(UserRecover(username="goku", recovery_code="code", new_password="new")))
+        assert refused.value.status_code == 403
+        assert hasher.calls == 0
+        with session_factory() as db:
+            assert db.get(User, 7).hashed_password == "-"  # Unchanged
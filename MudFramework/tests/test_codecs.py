@@ -0,0 +1,87 @@
+"""
+Tests for negotiated WebSocket wire formats
+"""
+import asyncio
+import json
+import pytest
+from app.websockets.codecs import JSON, get_codec
+from app.websockets.connection_manager import ConnectionManager, room_channel
+
+msgpack = pytest.importorskip("msgpack")
+
+MESSAGES = [
+    {"type": "chat", "sender": "Combat", "content": "You hit Saibaman for 12 damage!", "channel": "channel-combat"},
+    {"type": "chat", "sender": "Bob", "content": "hi", "channel": "channel-whisper"},
+    {"type": "chat", "sender": "System", "content": "no channel"},
+    {"type": "gamestate", "v": 1, "room": {"id": "neon_city", "mobs": []}, "player": {"stats": {"hp": 50}}},
+    {"type": "gamestate_patch", "v": 2, "base": 1, "patch": {"player": {"stats": {"hp": 42}}}},
+    {"type": "chat", "sender": "Info", "content": "x", "channel": "channel-info", "extra": [1, 2]},
+    {"type": "something_new", "value": 3},
+    {"type": "batch", "messages": [
+        {"type": "chat", "sender": "Combat", "content": "hit", "channel": "channel-combat"},
+        {"type": "gamestate_patch", "v": 3, "base": 2, "patch": {"player": {"stats": {"hp": 1}}}},
+    ]},
+]
+
+class RecordingSocket:
+    """Records raw frames in the shape they were written"""
+
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+class TestCodecs:
+    """Test encode/decode round trips"""
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_round_trip(self, message):
+        for codec in (JSON, get_codec("msgpack")):
+            assert codec.decode(codec.encode(message)) == message
+
+    def test_msgpack_is_positional(self):
+        codec = get_codec("msgpack")
+        frame = codec.encode(MESSAGES[0])
+        assert msgpack.unpackb(frame) == [1, "Combat", "You hit Saibaman for 12 damage!", 1]
+        assert len(frame) < len(JSON.encode(MESSAGES[0]))
+
+    def test_unknown_format_falls_back_to_json(self):
+        assert get_codec(None) is JSON
+        assert get_codec("xml") is JSON
+        assert get_codec("MsgPack").name == "msgpack"
+
+class TestMixedConnections:
+    """Test fan-out to clients on different wire formats"""
+
+    def test_broadcast_and_publish_per_codec(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            text, binary = RecordingSocket(), RecordingSocket()
+            await manager.connect(text, 1)
+            await manager.connect(binary, 2, get_codec("msgpack"))
+            manager.set_room(1, "neon_city", "neon_city")
+            manager.set_room(2, "neon_city", "neon_city")
+
+            await manager.broadcast(MESSAGES[0])
+            await manager.publish(room_channel("neon_city"), MESSAGES[1])
+            await manager.send_personal_message(MESSAGES[2], 2)
+            await asyncio.sleep(0.01)
+            return manager, text, binary
+
+        manager, text, binary = asyncio.run(scenario())
+        assert all(isinstance(frame, str) for frame in text.frames)
+        assert all(isinstance(frame, bytes) for frame in binary.frames)
+        assert [json.loads(frame) for frame in text.frames] == MESSAGES[:2]
+        codec = get_codec("msgpack")
+        assert [codec.decode(frame) for frame in binary.frames] == MESSAGES[:3]
+        assert manager.get_stats()["codecs"] == {"json": 1, "msgpack": 1}
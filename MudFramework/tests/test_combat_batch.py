@@ -0,0 +1,77 @@
+"""
+Tests for the vectorized batch combat resolver
+"""
+import asyncio
+import copy
+import random
+from types import SimpleNamespace
+from app.game.combat import CombatSystem, Mob
+from app.game.combat_batch import CombatBatch, PendingRound, resolve_batch, WIN, LOSS
+from app.game.skills_manager import skills_manager
+
+class TestBatchParity:
+    """Batch rounds must match combat_round for the same random streams"""
+
+    def make_rounds(self, combat, seed, count):
+        g = random.Random(seed)
+        skills = list(skills_manager.skills.values()) + [None, None]
+        for k in range(count):
+            race = g.choice(["Vitalis", "Glacial", "Terran"])
+            stats = {"hp": g.randint(1, 300), "max_hp": 300, "str": g.randint(1, 60),
+                     "dex": g.randint(0, 40), "int": g.randint(0, 40), "vit": g.randint(0, 30)}
+            mob = Mob(combat.mobs_data[g.choice(sorted(combat.mobs_data))])
+            mob.stats["hp"] = g.randint(1, mob.stats["max_hp"])
+            yield (race, stats, mob, g.choice(["attack", "attack", "wait"]), g.choice(skills), seed * 1000 + k)
+
+    def test_matches_scalar_rounds(self):
+        combat = CombatSystem(None)
+        scalar, batch = [], []
+        for race, stats, mob, action, skill, stream in self.make_rounds(combat, seed=7, count=500):
+            scalar.append((SimpleNamespace(race=race, stats=dict(stats)), mob, action, skill, random.Random(stream)))
+            batch.append(PendingRound(SimpleNamespace(race=race, stats=dict(stats)), copy.deepcopy(mob),
+                                      action, skill, random.Random(stream)))
+
+        async def run_scalar():
+            return [await combat.combat_round(p, m, a, s, rng=rng) for p, m, a, s, rng in scalar]
+
+        expected = asyncio.run(run_scalar())
+        results = resolve_batch(batch)
+
+        assert {r["status"] for r in results} == {"win", "loss", "continue"}
+        assert results == expected
+        for (player, mob, *_), pending in zip(scalar, batch):
+            assert pending.player.stats == player.stats
+            assert pending.mob.stats == mob.stats
+
+    def test_run_matches_scalar_fights(self):
+        combat = CombatSystem(None)
+        fights = list(self.make_rounds(combat, seed=11, count=200))
+        batch = CombatBatch([PendingRound(SimpleNamespace(race=race, stats=dict(stats)), copy.deepcopy(mob),
+                                          "attack", skill, random.Random(stream))
+                             for race, stats, mob, _, skill, stream in fights])
+        batch.run(max_rounds=30)
+        batch.write_back()
+
+        async def fight(player, mob, skill, rng):
+            for rounds in range(1, 31):
+                result = await combat.combat_round(player, mob, "attack", skill, rng=rng)
+                if result["status"] != "continue":
+                    break
+            return result, rounds
+
+        for i, (race, stats, mob, _, skill, stream) in enumerate(fights):
+            player = SimpleNamespace(race=race, stats=dict(stats))
+            result, rounds = asyncio.run(fight(player, mob, skill, random.Random(stream)))
+            assert batch.rounds_fought[i] == rounds
+            assert batch.status[i] == {"win": WIN, "loss": LOSS}.get(result["status"], 0)
+            assert batch.rounds[i].player.stats["hp"] == player.stats["hp"]
+            if result["status"] == "win":
+                assert batch.loot[i] == result["loot"]
+
+    def test_without_log(self):
+        combat = CombatSystem(None)
+        mob = combat.spawn_mob("saibaman")
+        player = SimpleNamespace(race="Terran", stats={"hp": 50, "max_hp": 50, "str": 100, "vit": 5})
+        [result] = resolve_batch([PendingRound(player, mob, rng=random.Random(1))], with_log=False)
+        assert result["status"] == "win" and result["log"] == []
+        assert mob.stats["hp"] <= 0
@@ -0,0 +1,71 @@
+"""
+Tests for the command registry and router
+"""
+import asyncio
+import pytest
+from app.game.commands import (
+    CommandRegistry, ParsedCommand, IN_COMBAT, ANY_STATE, commands
+)
+from app.game.engine import GameEngine
+
+class TestCommandParsing:
+    """Test command parsing"""
+
+    def test_parse_splits_verb_and_args(self):
+        cmd = ParsedCommand.parse("  BUY Healing   Capacitor ")
+        assert cmd.verb == "buy"
+        assert cmd.args == ["Healing", "Capacitor"]
+        assert cmd.text == "Healing Capacitor"
+
+    def test_parse_empty(self):
+        assert ParsedCommand.parse("   ") is None
+
+class TestCommandRegistry:
+    """Test dispatch tables and combat gating"""
+
+    def test_combat_gating(self):
+        registry = CommandRegistry()
+
+        @registry.register("skills", "sk")
+        async def skills(engine, player, cmd, db): pass
+
+        @registry.register("skill", "sk", combat=IN_COMBAT)
+        async def skill(engine, player, cmd, db): pass
+
+        @registry.register("use", combat=ANY_STATE)
+        async def use(engine, player, cmd, db): pass
+
+        assert registry.resolve("sk", in_combat=False).name == "skills"
+        assert registry.resolve("sk", in_combat=True).name == "skill"
+        assert registry.resolve("skills", in_combat=True) is None
+        assert registry.resolve("use", in_combat=True) is registry.resolve("use", in_combat=False)
+
+    def test_duplicate_verb_rejected(self):
+        registry = CommandRegistry()
+
+        @registry.register("look", "l")
+        async def look(engine, player, cmd, db): pass
+
+        with pytest.raises(ValueError):
+            @registry.register("list", "l")
+            async def listing(engine, player, cmd, db): pass
+
+    def test_dispatch_records_latency(self):
+        registry = CommandRegistry()
+        calls = []
+
+        @registry.register("say")
+        async def say(engine, player, cmd, db):
+            calls.append(cmd.text)
+
+        entry = registry.resolve("say", in_combat=False)
+        for _ in range(3):
+            asyncio.run(registry.dispatch(entry, None, None, ParsedCommand.parse("say hi"), None))
+
+        assert calls == ["hi", "hi", "hi"]
+        assert registry.get_stats()["say"]["count"] == 3
+
+    def test_item_only_in_combat(self):
+        assert commands.resolve("use", in_combat=False).handler is GameEngine.cmd_use
+        assert commands.resolve("item", in_combat=True).handler is GameEngine.cmd_use
+        assert commands.resolve("item", in_combat=False) is None
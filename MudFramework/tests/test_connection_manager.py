@@ -0,0 +1,193 @@
+"""
+Tests for WebSocket fan-out and slow-consumer isolation
+"""
+import asyncio
+import json
+from app.websockets.connection_manager import ConnectionManager, room_channel, zone_channel
+
+class FakeWebSocket:
+    """Records frames; optionally never completes a send (stalled client)"""
+
+    def __init__(self, stalled=False):
+        self.stalled = stalled
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+class TestBroadcast:
+    """Test concurrent fan-out through per-connection queues"""
+
+    def test_broadcast_reaches_everyone(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            sockets = [FakeWebSocket() for _ in range(3)]
+            for pid, ws in enumerate(sockets, start=1):
+                await manager.connect(ws, pid)
+
+            await manager.broadcast({"type": "chat", "content": "hello"})
+            await asyncio.sleep(0.01)
+            return sockets
+
+        sockets = asyncio.run(scenario())
+        assert all(ws.sent == [{"type": "chat", "content": "hello"}] for ws in sockets)
+
+    def test_stalled_client_is_isolated(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=4)
+            healthy, stalled = FakeWebSocket(), FakeWebSocket(stalled=True)
+            await manager.connect(healthy, 1)
+            await manager.connect(stalled, 2)
+
+            for i in range(10):
+                await manager.broadcast({"type": "chat", "content": str(i)})
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.01)
+            return manager, healthy, stalled
+
+        manager, healthy, stalled = asyncio.run(scenario())
+        assert [m["content"] for m in healthy.sent] == [str(i) for i in range(10)]
+        assert 2 not in manager.active_connections
+        assert stalled.closed_with == 1013
+
+        stats = manager.get_stats()
+        assert stats["slow_consumer_disconnects"] == 1
+        assert stats["dropped_messages"] > 0
+
+class TestChannels:
+    """Test room-scoped pub/sub"""
+
+    def test_room_publish_only_reaches_room(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            sockets = {pid: FakeWebSocket() for pid in (1, 2, 3)}
+            for pid, ws in sockets.items():
+                await manager.connect(ws, pid)
+            manager.set_room(1, "neon_city", "neon_city")
+            manager.set_room(2, "neon_city", "neon_city")
+            manager.set_room(3, "wasteland_1", "wasteland")
+
+            await manager.publish(room_channel("neon_city"), {"content": "hi"})
+            manager.set_room(2, "wasteland_1", "wasteland")
+            await manager.publish(room_channel("neon_city"), {"content": "anyone?"})
+            await asyncio.sleep(0.01)
+            return manager, sockets
+
+        manager, sockets = asyncio.run(scenario())
+        assert [m["content"] for m in sockets[1].sent] == ["hi", "anyone?"]
+        assert [m["content"] for m in sockets[2].sent] == ["hi"]
+        assert sockets[3].sent == []
+        assert manager.get_room_players("wasteland_1") == {2, 3}
+        assert manager.channels[zone_channel("wasteland")] == {2, 3}
+
+    def test_disconnect_clears_subscriptions(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            ws = FakeWebSocket()
+            await manager.connect(ws, 1)
+            manager.set_room(1, "neon_city", "neon_city")
+            manager.disconnect(1, ws)
+            return manager
+
+        manager = asyncio.run(scenario())
+        assert manager.channels == {}
+        assert manager.subscriptions == {}
+
+class TestCommandBatch:
+    """Test one outbound frame per command"""
+
+    def test_batch_is_one_frame_with_state_last(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            mine, other = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(mine, 1)
+            await manager.connect(other, 2)
+            manager.set_room(1, "neon_city", "neon_city")
+            manager.set_room(2, "neon_city", "neon_city")
+
+            with manager.batch(1):
+                await manager.send_personal_message({"type": "chat", "content": "hit"}, 1)
+                await manager.send_state({"hp": 10}, 1)
+                await manager.publish(room_channel("neon_city"), {"type": "chat", "content": "room"})
+                await manager.send_state({"hp": 5}, 1)
+                await asyncio.sleep(0.01)
+                assert mine.sent == []  # Held back until the command finishes
+            await asyncio.sleep(0.01)
+            return manager, mine, other
+
+        manager, mine, other = asyncio.run(scenario())
+        assert mine.sent == [{"type": "batch", "messages": [
+            {"type": "chat", "content": "hit"},
+            {"type": "chat", "content": "room"},
+            {"type": "gamestate", "v": 1, "hp": 5},
+        ]}]
+        assert other.sent == [{"type": "chat", "content": "room"}]
+        stats = manager.get_stats()
+        assert stats["command_batches"] == 1 and stats["batch_frames"] == 1
+        assert stats["batched_messages"] == 3 and stats["state_snapshots"] == 1
+
+    def test_small_batches(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            ws = FakeWebSocket()
+            await manager.connect(ws, 1)
+            with manager.batch(1):
+                pass
+            with manager.batch(1):
+                with manager.batch(1):
+                    await manager.send_personal_message({"type": "chat", "content": "only"}, 1)
+            with manager.batch(99):  # Offline player: nothing to hold back
+                await manager.send_personal_message({"type": "chat", "content": "lost"}, 99)
+            await asyncio.sleep(0.01)
+            return manager, ws
+
+        manager, ws = asyncio.run(scenario())
+        assert ws.sent == [{"type": "chat", "content": "only"}]
+        stats = manager.get_stats()
+        assert stats["command_batches"] == 2 and stats["batch_frames"] == 1
+        assert stats["frames_per_command"] == 0.5
+
+class TestPing:
+    """Test the ping control frame clients use to time their commands"""
+
+    def test_pong_follows_earlier_output(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            ws = FakeWebSocket()
+            await manager.connect(ws, 1)
+            with manager.batch(1):
+                await manager.send_personal_message({"type": "chat", "content": "done"}, 1)
+            await manager.handle_control(1, json.dumps({"type": "ping", "id": 7}))
+            await asyncio.sleep(0.01)
+            return ws
+
+        ws = asyncio.run(scenario())
+        assert ws.sent == [{"type": "chat", "content": "done"}, {"type": "pong", "id": 7}]
+
+class TestKick:
+    """Server-side disconnects (bans)"""
+
+    def test_kick_closes_and_forgets(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            ws = FakeWebSocket()
+            await manager.connect(ws, 1)
+            manager.set_room(1, "start_area")
+            kicked, absent = manager.kick(1), manager.kick(2)
+            await asyncio.sleep(0.01)
+            return manager, ws, kicked, absent
+
+        manager, ws, kicked, absent = asyncio.run(scenario())
+        assert kicked and not absent
+        assert ws.closed_with == 1008
+        assert 1 not in manager.active_connections
+        assert 1 not in manager.get_room_players("start_area")
@@ -0,0 +1,99 @@
+"""
+Tests for game content validation and the precompiled content bundle
+"""
+import json
+import os
+import shutil
+import pytest
+from app.game import content as content_module
+from app.game.content import (
+    DATA_DIR, TABLES, ContentBundle, ContentError, build_bundle, load_json_content, validate_content,
+)
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A private copy of the shipped JSON content"""
+    for name in TABLES:
+        shutil.copy(os.path.join(DATA_DIR, f"{name}.json"), tmp_path / f"{name}.json")
+    return tmp_path
+
+def rewrite(data_dir, name, change):
+    path = data_dir / f"{name}.json"
+    table = json.loads(path.read_text())
+    change(table)
+    path.write_text(json.dumps(table))
+
+class TestValidation:
+    """Field checks and cross-references"""
+
+    def test_shipped_content_is_valid(self):
+        report = validate_content(load_json_content())
+        assert report.errors == []
+        assert report.records > 0 and report.references > 0
+
+    def test_broken_references_are_reported(self):
+        content = load_json_content()
+        content["rooms"]["neon_city"]["exits"]["up"] = "nowhere"
+        content["rooms"]["wasteland_1"]["mobs"].append("ghost")
+        content["mobs"]["saibaman"]["drops"].append({"item_id": "sword_of_nothing", "rate": 0.5})
+        content["shops"]["neon_shop"]["inventory"].append("sword_of_nothing")
+        content["npcs"]["bulma_briefs"]["quest_id"] = "quest_missing"
+        content["quests"]["quest_kill_saibamen"]["target"] = "ghost"
+        content["skills"]["zenkai_warrior_strike"]["race_required"] = "Martian"
+        content["races"]["Zenkai"]["transformations"].append("Ultra Zenkai")
+        errors = validate_content(content).errors
+        for fragment in ("unknown room 'nowhere'", "unknown mob 'ghost'", "unknown item 'sword_of_nothing'",
+                         "unknown quest 'quest_missing'", "quests.quest_kill_saibamen.target",
+                         "unknown race 'Martian'", "unknown transformation 'Ultra Zenkai'"):
+            assert any(fragment in error for error in errors), fragment
+        assert len(errors) == 8
+
+    def test_fields_and_types(self):
+        content = load_json_content()
+        del content["items"]["potion_heal"]["name"]
+        content["skills"]["zenkai_warrior_strike"]["level_required"] = "5"
+        content["mobs"]["dino"]["drops"][0]["rate"] = 3
+        content["mobs"]["dino"]["id"] = "trex"
+        errors = validate_content(content).errors
+        assert "items.potion_heal: missing 'name'" in errors
+        assert "skills.zenkai_warrior_strike: 'level_required' should be int" in errors
+        assert any("rate 3 is not between 0 and 1" in error for error in errors)
+        assert "mobs.dino: id 'trex' does not match its key" in errors
+
+class TestBundle:
+    """Build, map and load the binary bundle"""
+
+    def test_round_trip(self, data_dir):
+        build_bundle(str(data_dir))
+        bundle = ContentBundle(str(data_dir / "content.bundle"))
+        assert bundle.is_current(str(data_dir))
+        expected = load_json_content(str(data_dir))
+        assert {name: bundle.table(name) for name in TABLES} == expected
+
+    def test_invalid_content_is_not_built(self, data_dir):
+        rewrite(data_dir, "rooms", lambda rooms: rooms["start_area"]["exits"].update(up="nowhere"))
+        with pytest.raises(ContentError) as excinfo:
+            build_bundle(str(data_dir))
+        assert excinfo.value.errors == ["rooms.start_area.exits.up: unknown room 'nowhere'"]
+        assert not (data_dir / "content.bundle").exists()
+
+    def test_edited_json_makes_the_bundle_stale(self, data_dir):
+        build_bundle(str(data_dir))
+        rewrite(data_dir, "items", lambda items: items["potion_heal"].update(price=25))
+        assert not ContentBundle(str(data_dir / "content.bundle")).is_current(str(data_dir))
+
+    def test_other_python_builds_are_ignored(self, data_dir, monkeypatch):
+        build_bundle(str(data_dir))
+        monkeypatch.setattr(content_module.marshal, "version", content_module.marshal.version + 1)
+        assert not ContentBundle(str(data_dir / "content.bundle")).is_current(str(data_dir))
+
+    def test_load_table_prefers_a_current_bundle(self, data_dir, monkeypatch):
+        rewrite(data_dir, "quests", lambda quests: quests["quest_kill_saibamen"].update(count=4))
+        build_bundle(str(data_dir))
+        bundle = ContentBundle(str(data_dir / "content.bundle"))
+        monkeypatch.setattr(content_module, "_bundle", bundle)
+        monkeypatch.setattr(content_module, "_bundle_checked", True)
+        assert content_module.load_table("quests")["quest_kill_saibamen"]["count"] == 4
+
+        monkeypatch.setattr(content_module, "_bundle", None)
+        assert content_module.load_table("quests")["quest_kill_saibamen"]["count"] == 3  # JSON fallback
@@ -0,0 +1,65 @@
+"""
+Tests for the database offload executor
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.core.database import DatabaseExecutor
+
+class FakeSession:
+    closed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        FakeSession.closed += 1
+
+def slow_query(session, seconds):
+    time.sleep(seconds)
+    return session
+
+class TestDatabaseExecutor:
+    """Blocking work runs on the threads while the event loop goes on"""
+
+    def test_loop_keeps_running(self):
+        db = DatabaseExecutor(FakeSession, threads=2)
+
+        async def scenario():
+            beats = 0
+
+            async def heartbeat():
+                nonlocal beats
+                while True:
+                    await asyncio.sleep(0.005)
+                    beats += 1
+
+            beat = asyncio.create_task(heartbeat())
+            sessions = await asyncio.gather(db.run(slow_query, 0.2), db.run(slow_query, 0.2))
+            beat.cancel()
+            return sessions, beats
+
+        closed = FakeSession.closed
+        (first, second), beats = asyncio.run(scenario())
+        db.shutdown()
+        assert isinstance(first, FakeSession) and first is not second  # A session per job
+        assert FakeSession.closed == closed + 2
+        assert beats >= 10  # The loop was never blocked for the 0.2 s
+        assert db.get_stats()["max_in_flight"] == 2
+
+    def test_inline_runs_on_the_loop(self):
+        db = DatabaseExecutor(FakeSession, threads=0)
+        assert asyncio.run(db.call(threading.get_ident)) == threading.get_ident()
+        assert db.get_stats()["calls"] == 1
+
+    def test_errors_reach_the_caller(self):
+        db = DatabaseExecutor(FakeSession, threads=1)
+
+        def broken(session):
+            raise ValueError("no such table")
+
+        with pytest.raises(ValueError):
+            asyncio.run(db.run(broken))
+        db.shutdown()
+        assert db.errors == 1 and db.in_flight == 0
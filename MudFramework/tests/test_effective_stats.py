@@ -0,0 +1,57 @@
+"""
+Tests for the cached effective-stats snapshots
+"""
+import pytest
+from types import SimpleNamespace
+from app.game.effective_stats import EffectiveStatsCache
+from app.game.transformations import TRANSFORMATIONS, calculate_effective_stats
+
+def make_player(transformation="Base", **stats):
+    base = {"hp": 87, "max_hp": 120, "flux": 33, "max_flux": 110, "str": 17, "dex": 9,
+            "int": 4, "vit": 12, "skill_cooldowns": {"ki_blast": 2}}
+    base.update(stats)
+    return SimpleNamespace(id=1, stats=base, transformation=transformation)
+
+class TestSnapshots:
+    """Snapshots match calculate_effective_stats"""
+
+    @pytest.mark.parametrize("form", ["Base", "Nonexistent"] + sorted(TRANSFORMATIONS))
+    def test_matches_uncached(self, form):
+        player = make_player(form, battle_hardened_bonus=15)
+        snapshot = EffectiveStatsCache().get(player)
+        expected = calculate_effective_stats(player.stats, form)
+        assert snapshot.to_dict(player.stats) == expected
+        assert dict(snapshot.view(player.stats)) == expected
+
+    def test_snapshot_is_read_only(self):
+        snapshot = EffectiveStatsCache().get(make_player("Super Zenkai"))
+        with pytest.raises(TypeError):
+            snapshot.stats["str"] = 1
+
+    def test_combat_writes_stay_in_view(self):
+        player = make_player("Super Zenkai")
+        snapshot = EffectiveStatsCache().get(player)
+        view = snapshot.view(player.stats)
+        view["hp"] -= 10
+        assert view["hp"] == int(87 * 1.5) - 10
+        assert "hp" not in snapshot.stats and player.stats["hp"] == 87
+
+class TestCache:
+    """Rebuilds only on invalidation or a transformation change"""
+
+    def test_hits_until_invalidated(self):
+        cache = EffectiveStatsCache()
+        player = make_player("Super Zenkai")
+        first = cache.get(player)
+        player.stats["hp"] = 10  # Volatile: no rebuild needed
+        assert cache.get(player) is first
+        assert cache.get(player).to_dict(player.stats)["hp"] == 15
+
+        player.stats["str"] = 40
+        cache.invalidate(player.id)
+        rebuilt = cache.get(player)
+        assert rebuilt is not first and rebuilt.stats["str"] == 60
+
+        player.transformation = "Base"
+        assert cache.get(player).stats["str"] == 40
+        assert cache.get_stats() == {"snapshots": 1, "hits": 2, "misses": 3, "invalidations": 1}
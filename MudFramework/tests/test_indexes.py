@@ -0,0 +1,70 @@
+"""
+Tests for the skill and NPC lookup indexes
+"""
+import random
+from app.game.quest_manager import index_npcs_by_room, quest_manager
+from app.game.skills_manager import Skill, SkillIndex, SkillsManager, skills_manager
+
+RACES = ["Zenkai", "Vitalis", "Terran", "Glacial"]
+
+def make_manager(count, seed=0):
+    """A skills manager over ``count`` random skills, with repeated names and levels"""
+    rng = random.Random(seed)
+    manager = SkillsManager.__new__(SkillsManager)
+    manager.skills = {}
+    for i in range(count):
+        manager.skills[f"s{i}"] = Skill({
+            "id": f"s{i}", "name": f"Skill {rng.randrange(count)}", "type": "active", "description": "",
+            "level_required": rng.randint(1, 50), "race_required": rng.choice(RACES + [None, None]),
+        })
+    manager.index = SkillIndex(manager.skills)
+    return manager
+
+def scan_available(skills, race, level):
+    return [s for s in skills.values() if level >= s.level_required and (not s.race_required or s.race_required == race)]
+
+class TestSkillIndex:
+    """The indexed lookups answer exactly what the table scans did"""
+
+    def test_matches_the_scans(self):
+        manager = make_manager(500)
+        skills = manager.skills
+        for race in RACES + ["Martian"]:
+            relevant = [s for s in skills.values() if not s.race_required or s.race_required == race]
+            assert manager.get_all_race_skills(race) == sorted(relevant, key=lambda s: s.level_required)
+            for level in (0, 1, 7, 25, 50, 99):
+                assert manager.get_available_skills(race, level) == sorted(
+                    scan_available(skills, race, level), key=lambda s: s.level_required)
+        for skill in skills.values():
+            first = next(s for s in skills.values() if s.name.lower() == skill.name.lower())
+            assert manager.get_skill_by_name(skill.name.upper()) is first
+
+    def test_unlocked_between_levels(self):
+        manager = make_manager(500)
+        for race in RACES:
+            for old, new in ((0, 1), (4, 5), (10, 20), (30, 30), (49, 99)):
+                unlocked = manager.get_unlocked_skills(race, old, new)
+                before = set(map(id, scan_available(manager.skills, race, old)))
+                expected = [s for s in scan_available(manager.skills, race, new) if id(s) not in before]
+                assert sorted(unlocked, key=id) == sorted(expected, key=id)
+                assert [s.level_required for s in unlocked] == sorted(s.level_required for s in unlocked)
+
+    def test_shipped_skills(self):
+        assert skills_manager.get_skill_by_name("warrior strike").id == "zenkai_warrior_strike"
+        assert skills_manager.get_skill_by_name("No Such Skill") is None
+        unlocked = skills_manager.get_unlocked_skills("Zenkai", 4, 10)
+        assert [(s.race_required, s.level_required) for s in unlocked] == [
+            ("Zenkai", 5), (None, 7), ("Zenkai", 10)]
+
+class TestNpcIndex:
+    """Room -> NPC lookups"""
+
+    def test_first_npc_per_room(self):
+        npcs = {"a": {"room_id": "r1"}, "b": {"room_id": "r2"}, "c": {"room_id": "r1"}}
+        by_room = index_npcs_by_room(npcs)
+        assert by_room["r1"] is npcs["a"] and by_room["r2"] is npcs["b"]
+
+    def test_shipped_npcs(self):
+        for npc in quest_manager.npcs.values():
+            assert quest_manager.get_npc_by_room(npc["room_id"])["room_id"] == npc["room_id"]
+        assert quest_manager.get_npc_by_room("nowhere") is None
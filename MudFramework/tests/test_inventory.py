@@ -0,0 +1,189 @@
+"""
+Tests for the inventory container, its column and its write-back
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.game.commands import ParsedCommand
+from app.game.engine import GameEngine
+from app.game.inventory import Inventory
+from app.game.inventory_manager import inventory_manager
+from app.game.player_store import PlayerStateStore
+from app.models.base import Player
+
+class StubManager:
+    """Connection manager stand-in that records what players are sent"""
+
+    def __init__(self):
+        self.active_connections = {}
+        self.sent = []
+
+    async def send_personal_message(self, message, player_id):
+        self.sent.append(message.get("content"))
+
+    async def send_state(self, state, player_id):
+        pass
+
+@pytest.fixture
+def session_factory():
+    """In-memory database with one player whose inventory is in the old list form"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(Player(id=1, name="Bulma", race="Terran", level=1, exp=0, stats={}, inventory=[]))
+        db.commit()
+        db.execute(text("UPDATE players SET inventory = :inv"),
+                   {"inv": '[{"item_id": "potion_heal", "qty": 2}, {"item_id": "scouter_red", "qty": 1},'
+                           ' {"item_id": "potion_heal", "qty": 1}]'})
+        db.commit()
+    return factory
+
+def raw_inventory(factory):
+    with factory() as db:
+        return db.execute(text("SELECT inventory FROM players WHERE id = 1")).scalar()
+
+class TestInventory:
+    """One stack per item, in pickup order, capped at the stack limit"""
+
+    def test_add_remove_count(self):
+        inventory = Inventory()
+        assert not inventory and inventory.count("potion_heal") == 0
+        assert inventory.add("potion_heal", 2) == 2
+        assert inventory.add("scouter_red") == 1
+        assert inventory.add("potion_heal", 5, limit=4) == 2  # Capped at the limit
+        assert inventory.add("potion_heal", limit=4) == 0
+        assert list(inventory.items()) == [("potion_heal", 4), ("scouter_red", 1)]
+
+        assert not inventory.remove("scouter_red", 2)
+        assert inventory.remove("scouter_red")
+        assert "scouter_red" not in inventory and len(inventory) == 1
+
+    def test_remove_each_is_all_or_nothing(self):
+        inventory = Inventory({"a": 1, "b": 2})
+        assert not inventory.remove_each(["a", "b", "c"])
+        assert inventory.to_json() == {"a": 1, "b": 2}
+        assert inventory.remove_each(["a", "b"])
+        assert inventory.to_json() == {"b": 1}
+
+    def test_version_counts_changes_only(self):
+        inventory = Inventory({"a": 1})
+        inventory.add("a", limit=1)
+        inventory.remove("b")
+        assert inventory.version == 0
+        inventory.add("b")
+        inventory.remove("a")
+        assert inventory.version == 2
+
+class TestInventoryColumn:
+    """Old lists are read, the compact form is written"""
+
+    def test_old_list_loads_merged(self, session_factory):
+        with session_factory() as db:
+            player = db.query(Player).first()
+        assert isinstance(player.inventory, Inventory)
+        assert player.inventory.to_json() == {"potion_heal": 3, "scouter_red": 1}
+
+    def test_assignments_become_inventories(self):
+        player = Player(inventory=[{"item_id": "potion_heal", "qty": 1}])
+        assert player.inventory.count("potion_heal") == 1
+        player.inventory = {"scouter_red": 2}
+        assert player.inventory.count("scouter_red") == 2
+
+class TestInventoryWriteBack:
+    """The store writes an inventory only when it changed"""
+
+    def test_unchanged_inventory_not_written(self, session_factory):
+        store = PlayerStateStore(session_factory, flush_interval=60)
+        player = store.acquire(1)
+        player.exp = 50
+        store.mark_dirty(player)
+        assert store.flush() == 1
+        assert store.get_stats()["flushed_inventories"] == 0
+        assert raw_inventory(session_factory).startswith("[")  # Still the old list
+
+        player.inventory.add("potion_heal")
+        store.mark_dirty(player)
+        store.flush()
+        assert raw_inventory(session_factory) == '{"potion_heal": 4, "scouter_red": 1}'
+        assert store.get_stats()["flushed_inventories"] == 1
+
+        store.mark_dirty(player)
+        store.flush()
+        assert store.get_stats()["flushed_inventories"] == 1
+
+    def test_failed_write_keeps_inventory_pending(self, session_factory):
+        store = PlayerStateStore(session_factory, flush_interval=60)
+        player = store.acquire(1)
+        player.inventory.remove("scouter_red")
+        store.mark_dirty(player)
+        write = store._write
+
+        def broken(mappings):
+            raise RuntimeError("database is down")
+
+        store._write = broken
+        assert store.flush() == 0
+        store._write = write
+        assert store.flush() == 1
+        assert raw_inventory(session_factory) == '{"potion_heal": 3}'
+
+class TestInventoryCommands:
+    """Shops, loot and quest rewards respect the stack limit"""
+
+    def make_engine(self, current_map="neon_shop", **fields):
+        store = PlayerStateStore(session_factory=None, flush_interval=60)
+        player = Player(id=1, name="Bulma", race="Terran", level=1, exp=0, stats={"hp": 10, "max_hp": 100},
+                        current_map=current_map, transformation="Base", combat_state=None, **fields)
+        store.players[1] = player
+        manager = StubManager()
+        return GameEngine(manager, store=store), player, manager
+
+    def test_buy_stops_at_full_stack(self):
+        item = inventory_manager.get_item("potion_heal")
+        engine, player, manager = self.make_engine(zeni=1000, inventory={"potion_heal": item.stack - 1})
+        buy = ParsedCommand.parse(f"buy {item.name}")
+
+        asyncio.run(engine.cmd_buy(player, buy, None))
+        assert player.inventory.count("potion_heal") == item.stack
+        assert player.zeni == 1000 - item.price
+
+        asyncio.run(engine.cmd_buy(player, buy, None))
+        assert player.inventory.count("potion_heal") == item.stack
+        assert player.zeni == 1000 - item.price  # Not charged
+        assert manager.sent[-1] == f"You cannot carry any more {item.name}."
+
+    def test_loot_past_full_stack_left_behind(self):
+        item = inventory_manager.get_item("potion_heal")
+        engine, player, _ = self.make_engine(zeni=0, inventory={"potion_heal": item.stack})
+        names = asyncio.run(engine._process_loot(player, ["potion_heal", "scouter_red"], None))
+        assert names == [inventory_manager.get_item("scouter_red").name]
+        assert player.inventory.count("potion_heal") == item.stack
+
+    def test_use_takes_one(self):
+        engine, player, _ = self.make_engine(zeni=0, inventory={"potion_heal": 2})
+        asyncio.run(engine.cmd_use(player, ParsedCommand.parse("use healing capacitor"), None))
+        assert player.inventory.count("potion_heal") == 1 and player.stats["hp"] == 60
+        assert engine.store.get_stats()["dirty_players"] == 1
+
+    def test_quest_waits_for_room_for_its_reward(self):
+        item = inventory_manager.get_item("potion_heal")
+        engine, player, manager = self.make_engine(
+            current_map="synth_lobby", zeni=0, inventory={"potion_heal": item.stack},
+            active_quests={"quest_kill_saibamen": {"progress": 3}}, completed_quests=[])
+        talk = ParsedCommand.parse("talk")
+
+        asyncio.run(engine.cmd_talk(player, talk, None))
+        assert manager.sent[-1] == f"You cannot carry any more {item.name}."
+        assert "quest_kill_saibamen" in player.active_quests and player.zeni == 0
+
+        player.inventory.remove("potion_heal")
+        asyncio.run(engine.cmd_talk(player, talk, None))
+        assert player.completed_quests == ["quest_kill_saibamen"]
+        assert player.inventory.count("potion_heal") == item.stack
+        assert manager.sent[-1].endswith(f"Item: {item.name}")
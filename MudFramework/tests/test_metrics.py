@@ -0,0 +1,152 @@
+"""
+Tests for the Prometheus exposition, the admin metrics and the slow-command profiler
+"""
+import asyncio
+import sys
+import time
+import pytest
+from fastapi import HTTPException
+from app.api import deps
+from app.api.endpoints.admin import render_metrics
+from app.core.config import settings
+from app.core.database import DatabaseExecutor
+from app.core.metrics import Histogram, PrometheusText
+from app.core.profiler import UNSAMPLED, profiler
+from app.game.commands import CommandRegistry, ParsedCommand
+from app.game.engine import GameEngine
+from app.models.user import User
+from app.websockets.connection_manager import ConnectionManager
+
+class FakePlayer:
+    def __init__(self, player_id):
+        self.id = player_id
+
+def spin(ms):
+    """Busy for ``ms`` milliseconds, holding the event loop."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+def samples(text):
+    """{series: value} of a scrape, checking every family is declared once"""
+    types, values = set(), {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE"):
+            name = line.split()[2]
+            assert name not in types
+            types.add(name)
+        elif not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+class TestPrometheusText:
+    """Millisecond histograms come out cumulative and in seconds"""
+
+    def test_histogram(self):
+        hist = Histogram(buckets=(1, 10))
+        for ms in (0.5, 5, 5, 50):
+            hist.observe(ms)
+        out = PrometheusText()
+        out.histogram("x_seconds", "Test.", [({"command": "say"}, hist)])
+        values = samples(out.render())
+        assert values['x_seconds_bucket{command="say",le="0.001"}'] == 1
+        assert values['x_seconds_bucket{command="say",le="0.01"}'] == 3
+        assert values['x_seconds_bucket{command="say",le="+Inf"}'] == 4
+        assert values['x_seconds_count{command="say"}'] == 4
+        assert values['x_seconds_sum{command="say"}'] == pytest.approx(0.0605)
+
+    def test_labels_escaped_and_counters_exact(self):
+        out = PrometheusText()
+        out.counter("x_total", "Line one\nline two.", [({"query": 'a"b\\c'}, 123456789)])
+        text = out.render()
+        assert "# HELP x_total Line one\\nline two." in text
+        assert 'x_total{query="a\\"b\\\\c"} 123456789\n' in text
+
+class TestRenderMetrics:
+    """The admin scrape covers commands, the database, refresh_ui and sends"""
+
+    def test_families(self):
+        engine = GameEngine(ConnectionManager())
+        engine.refresh_time.observe(2.0)
+        values = samples(render_metrics(engine))
+        assert values["mud_refresh_ui_duration_seconds_count"] >= 1
+        assert 'mud_command_duration_seconds_count{command="look"}' in values
+        assert 'mud_ws_send_duration_seconds_count{stage="socket"}' in values
+        assert "mud_ws_connections" in values and "mud_players_cached" in values
+
+    def test_queries_by_function(self):
+        db = DatabaseExecutor(lambda: None, threads=0)
+
+        def lookup(x):
+            return x
+
+        asyncio.run(db.call(lookup, 1))
+        asyncio.run(db.call(lookup, 2))
+        assert db.get_stats()["queries_ms"][lookup.__qualname__]["count"] == 2
+
+    def test_admin_only(self, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["root"])
+        admin = User(username="root")
+        assert deps.get_current_admin(admin) is admin
+        with pytest.raises(HTTPException) as e:
+            deps.get_current_admin(User(username="guest"))
+        assert e.value.status_code == 403
+
+class TestProfiler:
+    """Sampled stacks are kept for the slowest commands only"""
+
+    @pytest.fixture(autouse=True)
+    def profiling(self):
+        self.switch_interval = sys.getswitchinterval()
+        profiler.configure(2, interval_ms=0.5)
+        yield
+        profiler.configure(0)
+
+    def run(self, registry, verb, player_id):
+        entry = registry.resolve(verb, in_combat=False)
+        asyncio.run(registry.dispatch(entry, None, FakePlayer(player_id), ParsedCommand.parse(verb), None))
+
+    def test_keeps_slowest(self):
+        registry = CommandRegistry()
+
+        @registry.register("work")
+        async def work(engine, player, cmd, db):
+            spin(player.id * 10)
+
+        for player_id in (1, 4, 2, 3):
+            self.run(registry, "work", player_id)
+
+        assert [p.player_id for p in profiler.slowest()] == [4, 3]
+        folded = profiler.folded()
+        roots = [line.split(";")[0] for line in folded.splitlines()]
+        assert roots[0].startswith("#1 work [player 4")
+        assert any("spin (test_metrics.py" in line for line in folded.splitlines())
+        for line in folded.splitlines():
+            assert int(line.rsplit(" ", 1)[1]) > 0
+        assert profiler.get_stats()["profiled_commands"] == 4
+
+    def test_awaiting_is_unsampled(self):
+        registry = CommandRegistry()
+
+        @registry.register("wait")
+        async def wait(engine, player, cmd, db):
+            await asyncio.sleep(0.02)
+
+        self.run(registry, "wait", 1)
+        folded = profiler.folded()
+        unsampled = [line for line in folded.splitlines() if f";{UNSAMPLED} " in line]
+        assert len(unsampled) == 1 and int(unsampled[0].rsplit(" ", 1)[1]) > 15000
+
+    def test_off(self):
+        assert sys.getswitchinterval() <= 0.0005
+        profiler.configure(0)
+        assert sys.getswitchinterval() == self.switch_interval
+        registry = CommandRegistry()
+
+        @registry.register("work")
+        async def work(engine, player, cmd, db):
+            spin(5)
+
+        self.run(registry, "work", 1)
+        assert profiler.folded() == "" and profiler.get_stats()["profiled_commands"] == 0
@@ -0,0 +1,67 @@
+"""
+Tests for the mob flyweight and the slotted game definitions
+"""
+import copy
+import pickle
+import pytest
+from app.game.combat import CombatSystem, Mob, MobTemplate
+from app.game.inventory_manager import inventory_manager
+from app.game.skills_manager import skills_manager
+from app.game.world import world
+
+@pytest.fixture(scope="module")
+def combat():
+    return CombatSystem(None)
+
+class TestMobFlyweight:
+    """Instances share their template and keep only HP and buffs"""
+
+    def test_spawns_share_the_template(self, combat):
+        a, b = combat.spawn_mob("dino"), combat.spawn_mob("dino")
+        assert a.template is b.template is combat.templates["dino"]
+        a.stats["hp"] -= 50
+        assert (a.stats["hp"], b.stats["hp"]) == (150, 200)
+        assert combat.templates["dino"].stats["hp"] == 200
+        with pytest.raises(TypeError):
+            a.template.stats["hp"] = 1  # Read-only
+
+    def test_stats_view_reads_and_writes(self, combat):
+        mob = combat.spawn_mob("saibaman")
+        assert dict(mob.stats) == combat.mobs_data["saibaman"]["stats"]
+        assert mob.buffs is None
+        mob.stats["str"] = 9
+        mob.stats["rage"] = 1
+        assert mob.buffs == {"str": 9, "rage": 1}
+        assert mob.stats.get("str") == 9 and mob.stats["vit"] == 2
+        assert list(mob.stats)[-1] == "rage" and len(mob.stats) == len(combat.mobs_data["saibaman"]["stats"]) + 1
+        del mob.stats["rage"]
+        with pytest.raises(KeyError):
+            del mob.stats["vit"]
+
+    def test_restoring_saved_stats_keeps_only_differences(self, combat):
+        mob = combat.spawn_mob("dino")
+        saved = {**combat.mobs_data["dino"]["stats"], "hp": 12, "str": 25}
+        mob.stats = saved
+        assert mob.hp == 12 and mob.buffs == {"str": 25}
+        assert mob.stats.copy() == saved
+
+    def test_copies_and_pickles(self, combat):
+        mob = combat.spawn_mob("dino")
+        mob.stats["str"] = 30
+        clone = copy.deepcopy(mob)
+        assert clone.template is mob.template and clone.buffs is not mob.buffs
+        restored = pickle.loads(pickle.dumps(mob))
+        assert isinstance(restored.template, MobTemplate)
+        assert restored.stats == mob.stats and restored.name == mob.name
+
+    def test_built_from_raw_data(self, combat):
+        mob = Mob(combat.mobs_data["dino"])
+        assert mob.id == "dino" and mob.drops == tuple(combat.mobs_data["dino"]["drops"])
+
+class TestSlottedDefinitions:
+    """Static definitions carry no per-instance __dict__"""
+
+    def test_no_instance_dicts(self, combat):
+        for obj in (world.get_start_room(), next(iter(inventory_manager.items.values())),
+                    next(iter(skills_manager.skills.values())), combat.templates["dino"], combat.spawn_mob("dino")):
+            assert not hasattr(obj, "__dict__"), type(obj).__name__
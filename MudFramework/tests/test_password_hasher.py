@@ -0,0 +1,83 @@
+"""
+Tests for off-loop password hashing and its back-pressure
+"""
+import asyncio
+import os
+import sys
+import threading
+import pytest
+from passlib.hash import bcrypt
+from app.api.endpoints import auth
+from app.core.database import DatabaseExecutor
+from app.core.security import HasherBusy, PasswordHasher
+from app.schemas.user import UserLogin
+
+CHEAP_HASH = bcrypt.using(rounds=4).hash("secret")
+
+def no_session():
+    raise AssertionError("A refused request must not query the database")
+
+class TestPasswordHasher:
+    """bcrypt runs on the threads while the event loop goes on"""
+
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(workers=2, queue_size=4)
+
+        async def scenario():
+            beats = 0
+
+            async def heartbeat():
+                nonlocal beats
+                while True:
+                    await asyncio.sleep(0.005)
+                    beats += 1
+
+            beat = asyncio.create_task(heartbeat())
+            hashed = await hasher.hash("secret")  # The default cost: a few hundred ms
+            beat.cancel()
+            return hashed, beats, await hasher.verify("secret", hashed), await hasher.verify("wrong", CHEAP_HASH)
+
+        hashed, beats, right, wrong = asyncio.run(scenario())
+        assert right and not wrong
+        assert beats >= 10
+        stats = hasher.get_stats()
+        assert stats["calls"] == 3 and stats["in_flight"] == 0
+        assert stats["hash_ms"]["count"] == 1 and stats["verify_ms"]["count"] == 2
+
+    def test_full_queue_refused(self):
+        hasher = PasswordHasher(workers=1, queue_size=1)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.create_task(hasher._submit("verify", release.wait, ()))
+            waiting = asyncio.create_task(hasher._submit("verify", release.wait, ()))
+            await asyncio.sleep(0.01)
+            assert hasher.queued == 1
+            with pytest.raises(HasherBusy):
+                await hasher.verify("secret", CHEAP_HASH)
+            release.set()
+            await asyncio.gather(running, waiting)
+            return await hasher.verify("secret", CHEAP_HASH)
+
+        assert asyncio.run(scenario())
+        assert hasher.rejected == 1 and hasher.queued == 0
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Per-thread niceness is Linux only")
+    def test_threads_niced(self):
+        hasher = PasswordHasher(workers=1, queue_size=1, nice=5)
+        base = os.getpriority(os.PRIO_PROCESS, 0)
+
+        def priority():
+            return os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+
+        assert asyncio.run(hasher._submit("hash", priority, ())) == min(19, base + 5)
+        assert os.getpriority(os.PRIO_PROCESS, 0) == base
+
+    def test_login_refused_before_querying(self, monkeypatch):
+        hasher = PasswordHasher(workers=1, queue_size=0)
+        hasher.in_flight = 1
+        monkeypatch.setattr(auth, "password_hasher", hasher)
+        monkeypatch.setattr(auth, "db_executor", DatabaseExecutor(no_session, threads=0))
+        with pytest.raises(HasherBusy):
+            asyncio.run(auth.login(UserLogin(username="goku", password="secret")))
+        assert hasher.rejected == 1
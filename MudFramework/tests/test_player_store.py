@@ -0,0 +1,188 @@
+"""
+Tests for the write-behind player state store
+"""
+import asyncio
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base, DatabaseExecutor
+from app.models.base import User, Player, Race
+from app.game.player_store import PlayerStateStore
+
+@pytest.fixture
+def session_factory():
+    """In-memory database with a single player"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add(Player(id=1, name="Cached", race="Zenkai", level=1, exp=0,
+                      stats={"hp": 80, "max_hp": 80}, inventory=[]))
+        db.commit()
+    return factory
+
+def read_player(factory, player_id):
+    with factory() as db:
+        return db.query(Player).filter(Player.id == player_id).first()
+
+class TestPlayerStateStore:
+    """Test caching, coalescing and flushing"""
+
+    def test_mutations_stay_in_memory_until_flush(self, session_factory):
+        store = PlayerStateStore(session_factory, flush_interval=60)
+        player = store.acquire(1)
+        player.level = 5
+        player.stats = {"hp": 10, "max_hp": 80}
+        store.mark_dirty(player)
+
+        assert read_player(session_factory, 1).level == 1
+        assert store.get_stats()["dirty_players"] == 1
+
+        assert store.flush() == 1
+        persisted = read_player(session_factory, 1)
+        assert persisted.level == 5
+        assert persisted.stats["hp"] == 10
+        assert store.get_stats()["dirty_players"] == 0
+
+    def test_repeated_mutations_coalesce(self, session_factory):
+        store = PlayerStateStore(session_factory, flush_interval=60)
+        player = store.acquire(1)
+        for i in range(10):
+            player.exp = i
+            store.mark_dirty(player)
+
+        assert store.flush() == 1
+        assert store.get_stats()["flushed_rows"] == 1
+        assert read_player(session_factory, 1).exp == 9
+
+    def test_release_flushes_and_evicts(self, session_factory):
+        store = PlayerStateStore(session_factory, flush_interval=60)
+        player = store.acquire(1)
+        store.acquire(1)  # Second connection for the same player
+        player.zeni = 999
+        store.mark_dirty(player)
+
+        store.release(1)
+        assert store.get(1) is player
+
+        store.release(1)
+        assert store.get(1) is None
+        assert read_player(session_factory, 1).zeni == 999
+
+class TestAsyncStore:
+    """The server's load and write paths, on the database threads"""
+
+    def test_acquire_and_release(self, session_factory):
+        db = DatabaseExecutor(session_factory, threads=1)
+        store = PlayerStateStore(session_factory, flush_interval=60, db=db)
+
+        async def scenario():
+            player, same = await asyncio.gather(store.acquire_async(1), store.acquire_async(1))
+            assert player is same  # Loaded once, pinned twice
+            player.zeni = 777
+            store.mark_dirty(player)
+            await store.release_async(1)
+            assert store.get(1) is player
+            await store.release_async(1)
+            assert store.get(1) is None
+
+        asyncio.run(scenario())
+        db.shutdown()
+        assert read_player(session_factory, 1).zeni == 777
+
+    def test_changes_during_a_write_stay_dirty(self, session_factory):
+        db = DatabaseExecutor(session_factory, threads=1)
+        store = PlayerStateStore(session_factory, flush_interval=60, db=db)
+        player = store.acquire(1)
+        player.stats["hp"] = 50
+        store.mark_dirty(player)
+        write = store._write
+
+        def slow_write(mappings):
+            time.sleep(0.05)
+            return write(mappings)
+
+        store._write = slow_write
+
+        async def scenario():
+            flush = asyncio.create_task(store.flush_async())
+            await asyncio.sleep(0.01)  # The write is running
+            player.stats["hp"] = 10
+            store.mark_dirty(player)
+            assert await flush == 1
+
+        asyncio.run(scenario())
+        db.shutdown()
+        assert read_player(session_factory, 1).stats["hp"] == 50  # The copy taken when the flush began
+        assert store.get_stats()["dirty_players"] == 1
+        assert store.flush() == 1
+        assert read_player(session_factory, 1).stats["hp"] == 10
+
+    def test_changed_during_release_written_and_evicted(self, session_factory):
+        db = DatabaseExecutor(session_factory, threads=1)
+        store = PlayerStateStore(session_factory, flush_interval=60, db=db)
+        write = store._write
+
+        def slow_write(mappings):
+            time.sleep(0.05)
+            return write(mappings)
+
+        store._write = slow_write
+
+        async def scenario():
+            player = await store.acquire_async(1)
+            player.zeni = 10
+            store.mark_dirty(player)
+            release = asyncio.create_task(store.release_async(1))
+            await asyncio.sleep(0.01)  # The final write is running
+            player.zeni = 20
+            store.mark_dirty(player)  # E.g. a tick system
+            await release
+
+        asyncio.run(scenario())
+        db.shutdown()
+        assert store.get(1) is None and store.get_stats()["dirty_players"] == 0
+        assert read_player(session_factory, 1).zeni == 20
+
+    def test_failed_release_evicted_by_flush_loop(self, session_factory):
+        db = DatabaseExecutor(session_factory, threads=1)
+        store = PlayerStateStore(session_factory, flush_interval=0.01, db=db)
+        write = store._write
+
+        def broken(mappings):
+            raise RuntimeError("database is down")
+
+        async def scenario():
+            player = await store.acquire_async(1)
+            player.zeni = 30
+            store.mark_dirty(player)
+            store._write = broken
+            await store.release_async(1)
+            assert store.get(1) is player  # Kept until written
+            store._write = write
+            store.start()
+            await asyncio.sleep(0.05)
+            await store.stop()
+
+        asyncio.run(scenario())
+        db.shutdown()
+        assert store.get(1) is None
+        assert read_player(session_factory, 1).zeni == 30
+
+    def test_failed_write_stays_dirty(self, session_factory):
+        db = DatabaseExecutor(session_factory, threads=1)
+        store = PlayerStateStore(session_factory, flush_interval=60, db=db)
+        player = store.acquire(1)
+        store.mark_dirty(player)
+
+        def broken(mappings):
+            raise RuntimeError("database is down")
+
+        store._write = broken
+        assert asyncio.run(store.flush_async()) == 0
+        db.shutdown()
+        assert store.get_stats()["dirty_players"] == 1 and store.flush_errors == 1
@@ -0,0 +1,146 @@
+"""
+Tests for the room population (live mob instances and respawn timers)
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.population import ALIVE, DEAD, ENGAGED, RoomPopulation
+from app.game.world import Room
+from app.models.base import Player
+
+MOBS = {
+    "rat": {"id": "rat", "name": "Rat", "description": "", "stats": {"hp": 5, "max_hp": 5, "str": 1, "vit": 1, "exp": 1}},
+    "wolf": {"id": "wolf", "name": "Wolf", "description": "", "stats": {"hp": 30, "str": 6, "vit": 3, "exp": 10}},
+}
+
+def make_rooms():
+    return {
+        room_id: Room({"id": room_id, "name": room_id, "description": "", "mobs": mobs})
+        for room_id, mobs in (("den", ["rat", "rat", "wolf"]), ("road", []), ("cave", ["wolf", "ghost"]))
+    }
+
+class StubManager:
+    """Connection manager stand-in that records what each player was sent"""
+
+    def __init__(self, online):
+        self.active_connections = {pid: object() for pid in online}
+        self.states = {pid: [] for pid in online}
+        self.messages = {pid: [] for pid in online}
+
+    @contextmanager
+    def batch(self, player_id):
+        yield
+
+    def set_room(self, player_id, room_id, zone=None):
+        pass
+
+    async def send_personal_message(self, message, player_id):
+        self.messages[player_id].append(message["content"])
+
+    async def send_state(self, state, player_id):
+        self.states[player_id].append(state)
+
+    def room_mobs(self, player_id):
+        return {mob["id"]: mob["count"] for mob in self.states[player_id][-1]["room"]["mobs"]}
+
+class TestRoomPopulation:
+    """Test the instance arrays, room lookups and the respawn heap"""
+
+    def test_slots_are_grouped_by_room(self):
+        population = RoomPopulation(make_rooms(), MOBS, respawn_ticks=10)
+        assert len(population) == 4  # "ghost" is not a known mob
+        assert [population.mob_id(slot) for slot in population.slots("den")] == ["rat", "rat", "wolf"]
+        assert list(population.slots("road")) == []
+        assert population.room_of(3) == "cave"
+        assert population.counts("den") == {"rat": 2, "wolf": 1}
+        assert population.hp[3] == 30  # max_hp falls back to hp
+
+    def test_engage_kill_respawn(self):
+        population = RoomPopulation(make_rooms(), MOBS, respawn_ticks=10)
+        slots = [population.engage("den", player_id=7, rng=random.Random(i)) for i in range(3)]
+        assert sorted(slots) == [0, 1, 2]
+        assert population.engage("den", player_id=8, rng=random.Random(0)) is None
+        assert population.alive_count("den") == 0
+
+        population.set_hp(slots[0], 1)
+        assert not population.kill(slots[0], player_id=8)  # Not their fight
+        assert population.kill(slots[0], player_id=7)
+        assert population.release(slots[1], player_id=7)
+        assert population.state[slots[0]] == DEAD
+        assert population.state[slots[1]] == ALIVE and population.state[slots[2]] == ENGAGED
+        assert population.alive_count("den") == 1
+
+        assert population.respawn(9) == []
+        assert population.respawn(10) == ["den"]
+        assert population.alive_count("den") == 2
+        assert population.hp[slots[0]] == population.max_hp[slots[0]]
+        assert population.get_stats()["kills"] == 1
+
+    def test_reengage_checks_the_instance(self):
+        population = RoomPopulation(make_rooms(), MOBS)
+        assert not population.reengage(0, "wolf", player_id=1)  # Slot 0 is a rat
+        assert population.reengage(2, "wolf", player_id=1)
+        assert population.reengage(2, "wolf", player_id=1)  # Already theirs
+        assert not population.reengage(2, "wolf", player_id=2)
+        assert not population.reengage(99, "wolf", player_id=1)
+
+class TestEnginePopulation:
+    """Test hunts, kills and respawns through the engine"""
+
+    def make_player(self, player_id):
+        stats = {"hp": 500, "max_hp": 500, "flux": 100, "max_flux": 100, "str": 50, "dex": 5, "int": 5, "vit": 50}
+        # Level 10: no wasteland_1 kill is worth a level-up (which would need the database)
+        return Player(id=player_id, name=f"P{player_id}", race="Terran", level=10, exp=0,
+                      stats=stats, inventory=[], current_map="wasteland_1", active_quests={},
+                      transformation="Base", zeni=0, combat_state=None, learned_skills=[])
+
+    def make_engine(self):
+        manager = StubManager(online=[1, 2])
+        store = PlayerStateStore(session_factory=None, flush_interval=60)
+        for pid in (1, 2):
+            store.players[pid] = self.make_player(pid)
+        return GameEngine(manager, store=store), manager, store
+
+    def test_hunt_kill_and_respawn_update_the_room(self):
+        engine, manager, store = self.make_engine()
+        population = engine.population
+        hunter = store.players[1]
+        for slot in population.slots("wasteland_1"):
+            population.set_hp(slot, 1)  # One hit kills
+
+        async def scenario():
+            await engine.refresh_ui(store.players[2])
+            before = manager.room_mobs(2)
+            await engine.process_command(1, "hunt", None)
+            engaged = hunter.combat_state["slot"]
+            mob_id = population.mob_id(engaged)
+            after_hunt = manager.room_mobs(2)
+            await engine.process_command(1, "attack", None)
+            after_kill = manager.room_mobs(2)
+            await engine.tick_respawn(population.now + population.respawn_ticks)
+            return before, mob_id, after_hunt, after_kill, manager.room_mobs(2)
+
+        before, mob_id, after_hunt, after_kill, respawned = asyncio.run(scenario())
+        assert before == {"saibaman": 1, "dino": 1, "vanguard_scout": 1}
+        assert after_hunt.get(mob_id) is None  # The other player sees it taken
+        assert after_kill == after_hunt and hunter.combat_state is None
+        assert respawned == before
+
+    def test_disconnect_returns_the_mob_and_reconnect_resumes(self):
+        engine, manager, store = self.make_engine()
+        population = engine.population
+
+        async def scenario():
+            await engine.process_command(1, "hunt", None)
+            slot = store.players[1].combat_state["slot"]
+            await engine.on_disconnect(1)
+            available = population.alive_count("wasteland_1")
+            mob = engine._get_or_recover_mob(store.players[1], None)
+            return slot, available, mob
+
+        slot, available, mob = asyncio.run(scenario())
+        assert available == 3
+        assert mob is not None and population.state[slot] == ENGAGED
+        assert population.engaged_by[slot] == 1
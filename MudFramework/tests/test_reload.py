@@ -0,0 +1,135 @@
+"""
+Tests for hot reloading the game content
+"""
+import asyncio
+import json
+import os
+import shutil
+import pytest
+from app.game.content import DATA_DIR, TABLES
+from app.game.engine import GameEngine
+from app.game.inventory_manager import inventory_manager
+from app.game.player_store import PlayerStateStore
+from app.game.population import DEAD, ENGAGED, RoomPopulation
+from app.game.quest_manager import quest_manager
+from app.game.reload import content_reloader
+from app.game.skills_manager import skills_manager
+from app.game.world import Room, world
+from app.models.base import Player
+from tests.test_population import MOBS, StubManager
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """The reloader pointed at a private copy of the content; the singletons are restored afterwards"""
+    for name in TABLES:
+        shutil.copy(os.path.join(DATA_DIR, f"{name}.json"), tmp_path / f"{name}.json")
+    monkeypatch.setattr(content_reloader, "data_dir", str(tmp_path))
+    for owner, attrs in ((world, ("rooms", "graph")), (inventory_manager, ("items", "shops")),
+                         (skills_manager, ("skills", "index")),
+                         (quest_manager, ("npcs", "npcs_by_room", "quests"))):
+        for attr in attrs:
+            monkeypatch.setattr(owner, attr, getattr(owner, attr))
+    return tmp_path
+
+def rewrite(data_dir, name, change):
+    path = data_dir / f"{name}.json"
+    table = json.loads(path.read_text())
+    change(table)
+    path.write_text(json.dumps(table))
+
+def make_engine():
+    manager = StubManager(online=[1, 2])
+    store = PlayerStateStore(session_factory=None, flush_interval=60)
+    for pid, room in ((1, "wasteland_1"), (2, "start_area")):
+        stats = {"hp": 500, "max_hp": 500, "flux": 100, "max_flux": 100, "str": 5, "dex": 5, "int": 5, "vit": 50}
+        store.players[pid] = Player(id=pid, user_id=pid, name=f"P{pid}", race="Terran", level=10, exp=0,
+                                    stats=stats, inventory=[], current_map=room, active_quests={},
+                                    transformation="Base", zeni=0, combat_state=None, learned_skills=[])
+    return GameEngine(manager, store=store), manager, store
+
+class TestCarryOver:
+    """Mob instances follow their room, mob and spawn point into a rebuilt population"""
+
+    def test_state_moves_with_the_spawn_point(self):
+        rooms = {"den": Room({"id": "den", "name": "", "description": "", "mobs": ["rat", "rat", "wolf"]})}
+        old = RoomPopulation(rooms, MOBS, respawn_ticks=10)
+        assert old.reengage(0, "rat", player_id=7)
+        assert old.reengage(1, "rat", player_id=8) and old.kill(1, player_id=8)
+        old.set_hp(2, 12)
+
+        # The wolf moves to the front and a new room appears
+        rooms = {
+            "den": Room({"id": "den", "name": "", "description": "", "mobs": ["wolf", "rat", "rat"]}),
+            "cave": Room({"id": "cave", "name": "", "description": "", "mobs": ["wolf"]}),
+        }
+        new = RoomPopulation(rooms, MOBS, respawn_ticks=10)
+        moved = new.slot_map(old)
+        assert moved == {0: 1, 1: 2, 2: 0}
+        new.carry_over(old, moved)
+        assert new.hp[0] == 12  # Wounded wolf
+        assert new.state[1] == ENGAGED and new.engaged_by[1] == 7
+        assert new.state[2] == DEAD and new.alive_count("den") == 1
+        assert new.respawn(old.now + 10) == ["den"]
+        assert new.alive_count("cave") == 1
+
+    def test_removed_spawn_points_detach_their_fights(self):
+        engine, manager, store = make_engine()
+        asyncio.run(engine.process_command(1, "hunt", None))
+        mob_id = store.players[1].combat_state["mob_id"]
+        rooms = {room_id: room for room_id, room in world.rooms.items() if room_id != "wasteland_1"}
+        assert engine.replace_population(RoomPopulation(rooms, engine.combat_system.mobs_data)) == 1
+        assert "slot" not in store.players[1].combat_state
+        assert engine._get_or_recover_mob(store.players[1], None).id == mob_id
+
+class TestReload:
+    """Reload through the engine while players are online and fighting"""
+
+    def test_reload_swaps_the_tables_and_keeps_fights(self, data_dir):
+        engine, manager, store = make_engine()
+        store.players[2].current_map = "gone"
+        rewrite(data_dir, "rooms", lambda rooms: rooms["wasteland_1"].update(
+            mobs=list(reversed(rooms["wasteland_1"]["mobs"]))))
+        rewrite(data_dir, "items", lambda items: items.update(
+            potion_test={"id": "potion_test", "name": "Test Potion", "type": "consumable", "description": ""}))
+
+        async def scenario():
+            await engine.process_command(1, "hunt", None)
+            state = dict(store.players[1].combat_state)
+            mob = engine.active_mobs[1]
+            result = await content_reloader.reload(engine)
+            await engine.process_command(1, "attack", None)
+            return state, mob, result
+
+        before, mob, result = asyncio.run(scenario())
+        player = store.players[1]
+        assert inventory_manager.get_item("potion_test").name == "Test Potion"
+        assert result["detached_fights"] == 0 and result["swap_ms"] < 1000
+        slot, slots = player.combat_state["slot"], engine.population.slots("wasteland_1")
+        assert slot - slots.start == slots.stop - 1 - before["slot"]  # Same instance, reversed spawn order
+        assert engine.population.mob_id(slot) == before["mob_id"]
+        assert engine.population.state[slot] == ENGAGED and engine.population.engaged_by[slot] == 1
+        assert engine.active_mobs[1] is mob and player.combat_state["round"] == 1  # The fight went on
+        assert store.players[2].current_map == "start_area"
+        assert manager.states[2]  # Everyone online got fresh state
+
+    def test_invalid_content_changes_nothing(self, data_dir, monkeypatch):
+        engine, manager, store = make_engine()
+
+        async def is_admin(player, db):
+            return True
+
+        monkeypatch.setattr(engine, "_is_admin", is_admin)
+        rooms, population = world.rooms, engine.population
+        rewrite(data_dir, "mobs", lambda mobs: mobs["dino"]["drops"].append({"item_id": "nothing", "rate": 0.5}))
+
+        asyncio.run(engine.process_command(2, "reload", None))
+        assert world.rooms is rooms and engine.population is population
+        assert "Content reload rejected" in manager.messages[2][-1]
+        assert "unknown item 'nothing'" in manager.messages[2][-1]
+
+    def test_reload_is_admin_only(self, data_dir):
+        engine, manager, store = make_engine()
+        rooms = world.rooms
+        asyncio.run(engine.process_command(2, "reload", None))  # No ADMIN_USERNAMES configured
+        assert world.rooms is rooms
+        assert manager.messages[2] == ["Unknown command."]
@@ -0,0 +1,93 @@
+"""
+Tests for seeded combat streams and the offline combat simulator
+"""
+import asyncio
+from app.game.combat import CombatSystem
+from app.game.commands import ParsedCommand
+from app.game import engine as engine_module
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.simulator import FightSpec, load_races, run_simulation, simulate_fight, stats_at_level
+from app.models.base import Player
+
+class StubManager:
+    """Connection manager stand-in that records combat chat lines"""
+
+    def __init__(self):
+        self.active_connections = {}
+        self.lines = []
+
+    async def send_personal_message(self, message, player_id):
+        if message.get("channel") == "channel-combat":
+            self.lines.append(message["content"])
+
+    async def send_state(self, state, player_id):
+        pass
+
+    def set_room(self, *args):
+        pass
+
+class TestCombatSeeds:
+    """Fights record a seed and replay round for round"""
+
+    def make_player(self):
+        stats = {"hp": 200, "max_hp": 200, "flux": 100, "max_flux": 100, "str": 12, "dex": 5, "int": 3, "vit": 20}
+        return Player(id=1, name="Seeded", race="Terran", level=3, exp=0, stats=stats, inventory=[],
+                      current_map="wasteland_1", transformation="Base", zeni=0, combat_state=None,
+                      learned_skills=[])
+
+    def fight(self):
+        store = PlayerStateStore(session_factory=None, flush_interval=60)
+        player = self.make_player()
+        store.players[player.id] = player
+        manager = StubManager()
+        engine = GameEngine(manager, store=store)
+
+        async def scenario():
+            await engine.cmd_hunt(player, ParsedCommand.parse("hunt"), None)
+            recorded = dict(player.combat_state)
+            for _ in range(3):
+                if player.combat_state:
+                    await engine.cmd_attack_round(player, ParsedCommand.parse("attack"), None)
+            return recorded
+
+        recorded = asyncio.run(scenario())
+        return recorded, player, manager.lines
+
+    def test_hunt_records_seed_and_rounds(self):
+        recorded, player, lines = self.fight()
+        assert recorded["round"] == 0 and isinstance(recorded["seed"], int)
+        assert player.combat_state is None or player.combat_state["round"] == 3
+
+    def test_same_seed_replays_fight(self, monkeypatch):
+        monkeypatch.setattr(engine_module, "new_combat_seed", lambda: 424242)
+        first, second = self.fight(), self.fight()
+        assert first[0]["seed"] == second[0]["seed"] == 424242
+        assert first[0]["mob_id"] == second[0]["mob_id"]
+        assert first[2] == second[2] and first[2]
+        assert first[1].stats["hp"] == second[1].stats["hp"]
+
+class TestSimulator:
+    """Offline fights are deterministic per seed"""
+
+    def test_stats_at_level_follow_scaling(self):
+        zenkai = load_races()["Zenkai"]
+        stats = stats_at_level(zenkai, 3)
+        assert stats["str"] == 14 and stats["vit"] == 10  # int() truncates 1.5 growth each level
+        assert stats["hp"] == stats["max_hp"] == 100
+        assert stats["int"] == 3 and stats["max_flux"] == 80 + 3 * 5
+
+    def test_fight_is_deterministic(self):
+        combat = CombatSystem(None)
+        spec = FightSpec("Glacial", 5, "frieza_soldier", policy="greedy", passives=True)
+        runs = [asyncio.run(simulate_fight(combat, spec, seed=99, log=[])) for _ in range(2)]
+        assert runs[0] == runs[1]
+
+    def test_run_simulation_aggregates(self):
+        kwargs = dict(races=["Zenkai", "Vitalis"], levels=[1], mobs=["saibaman"], fights=50, seed=3, chunk_size=20)
+        results = run_simulation(**kwargs)
+        assert results == run_simulation(**kwargs)
+        for (race, level, mob_id), r in results.items():
+            assert r["fights"] == 50
+            assert r["wins"] + r["losses"] + r["timeouts"] == 50
+            assert 0.0 <= r["win_rate"] <= 1.0
@@ -0,0 +1,105 @@
+"""
+Tests for versioned gamestate patches
+"""
+import asyncio
+import json
+from app.websockets.connection_manager import ConnectionManager
+from app.websockets.state_sync import StateSync, MAX_UNACKED_STATES, apply_merge_patch, merge_diff
+
+STATE = {
+    "room": {"id": "neon_city", "name": "Neon City", "exits": {"south": "start_area"}, "mobs": []},
+    "player": {"level": 3, "stats": {"hp": 50, "max_hp": 80, "skill_cooldowns": {"ki_blast": 2}},
+               "inventory": [{"item_id": "senzu_bean", "qty": 2}]},
+}
+
+def changed(**player):
+    state = json.loads(json.dumps(STATE))
+    for key, value in player.items():
+        if key in state["player"]["stats"]:
+            state["player"]["stats"][key] = value
+        else:
+            state["player"][key] = value
+    return state
+
+class TestMergePatch:
+    """Test diff/apply round trips"""
+
+    def test_round_trip(self):
+        new = changed(hp=42, inventory=[])
+        del new["player"]["stats"]["skill_cooldowns"]
+        new["room"]["mobs"] = ["dino"]
+        patch = merge_diff(STATE, new)
+        assert patch == {"room": {"mobs": ["dino"]},
+                         "player": {"stats": {"hp": 42, "skill_cooldowns": None}, "inventory": []}}
+        assert apply_merge_patch(STATE, patch) == new
+
+    def test_no_change_is_empty(self):
+        assert merge_diff(STATE, changed()) == {}
+
+class TestStateSync:
+    """Test snapshot/patch negotiation"""
+
+    def test_snapshots_until_first_ack(self):
+        sync = StateSync()
+        first = sync.message_for(STATE)
+        assert first["type"] == "gamestate" and first["v"] == 1 and first["room"] == STATE["room"]
+        assert sync.message_for(changed(hp=40))["type"] == "gamestate"
+
+        sync.ack(2)
+        patch = sync.message_for(changed(hp=30))
+        assert patch == {"type": "gamestate_patch", "v": 3, "base": 2, "patch": {"player": {"stats": {"hp": 30}}}}
+        assert sync.message_for(changed(hp=30)) is None
+
+    def test_lagging_client_gets_snapshot(self):
+        sync = StateSync()
+        sync.message_for(STATE)
+        sync.ack(1)
+        for hp in range(MAX_UNACKED_STATES):
+            assert sync.message_for(changed(hp=hp))["type"] == "gamestate_patch"
+        assert sync.message_for(changed(hp=999))["type"] == "gamestate"
+
+    def test_resync_resends_current_state(self):
+        sync = StateSync()
+        assert sync.resync() is None
+        sync.message_for(STATE)
+        sync.ack(1)
+        sync.message_for(changed(hp=1))
+        full = sync.resync()
+        assert full["type"] == "gamestate" and full["v"] == 3
+        assert full["player"]["stats"]["hp"] == 1
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+class TestManagerSync:
+    """Test the per-connection sync through the connection manager"""
+
+    def test_acked_client_receives_patches(self):
+        async def scenario():
+            manager = ConnectionManager(queue_size=8)
+            ws = RecordingWebSocket()
+            await manager.connect(ws, 1)
+            await manager.send_state(STATE, 1)
+            await manager.handle_control(1, '{"type": "ack", "v": 1}')
+            await manager.send_state(changed(level=4), 1)
+            await manager.send_state(changed(level=4), 1)
+            await manager.handle_control(1, "{not json")
+            await manager.handle_control(1, '{"type": "resync"}')
+            await asyncio.sleep(0.01)
+            return manager, ws
+
+        manager, ws = asyncio.run(scenario())
+        assert [m["type"] for m in ws.sent] == ["gamestate", "gamestate_patch", "gamestate"]
+        assert ws.sent[1]["patch"] == {"player": {"level": 4}}
+        stats = manager.get_stats()
+        assert (stats["state_snapshots"], stats["state_patches"], stats["state_unchanged"]) == (2, 1, 1)
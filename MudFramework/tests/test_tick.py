@@ -0,0 +1,93 @@
+"""
+Tests for the world tick scheduler and tick-driven regen
+"""
+import asyncio
+import time
+from app.game.tick import TickScheduler
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.models.base import Player
+
+class StubManager:
+    """Connection manager stand-in that records personal messages"""
+
+    def __init__(self, online):
+        self.active_connections = {pid: object() for pid in online}
+        self.sent = []
+
+    async def send_personal_message(self, message, player_id):
+        self.sent.append((player_id, message))
+
+    async def send_state(self, state, player_id):
+        self.sent.append((player_id, state))
+
+class TestTickScheduler:
+    """Test periods and overrun detection"""
+
+    def test_systems_run_on_their_period(self):
+        scheduler = TickScheduler(tick_interval=0.01)
+        runs = {"every": [], "third": []}
+
+        async def every(tick): runs["every"].append(tick)
+        async def third(tick): runs["third"].append(tick)
+
+        scheduler.add_system("every", every)
+        scheduler.add_system("third", third, every=3)
+
+        async def scenario():
+            for _ in range(6):
+                await scheduler.run_tick()
+
+        asyncio.run(scenario())
+        assert runs["every"] == [1, 2, 3, 4, 5, 6]
+        assert runs["third"] == [3, 6]
+        assert scheduler.get_stats()["tick_ms"]["count"] == 6
+
+    def test_overrun_skips_ticks(self):
+        scheduler = TickScheduler(tick_interval=0.01)
+
+        async def slow(tick):
+            time.sleep(0.035)
+
+        scheduler.add_system("slow", slow)
+
+        async def scenario():
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+        assert scheduler.overruns > 0
+        assert scheduler.skipped_ticks >= scheduler.overruns
+
+class TestTickRegen:
+    """Test out-of-combat regeneration"""
+
+    def make_player(self, player_id, **overrides):
+        stats = {"hp": 40, "max_hp": 100, "flux": 10, "max_flux": 100, "str": 5, "vit": 10}
+        player = Player(id=player_id, name=f"P{player_id}", race="Terran", level=1, exp=0,
+                        stats=stats, inventory=[], current_map="start_area",
+                        transformation="Base", zeni=0, combat_state=None)
+        for k, v in overrides.items():
+            setattr(player, k, v)
+        return player
+
+    def test_regen_only_idle_online_players(self):
+        store = PlayerStateStore(session_factory=None, flush_interval=60)
+        idle, fighting, offline = (
+            self.make_player(1),
+            self.make_player(2, combat_state={"mob_id": "dino"}),
+            self.make_player(3),
+        )
+        for p in (idle, fighting, offline):
+            store.players[p.id] = p
+        manager = StubManager(online=[1, 2])
+        engine = GameEngine(manager, store=store)
+
+        asyncio.run(engine.tick_regen(5))
+
+        assert idle.stats["hp"] == 45 and idle.stats["flux"] == 20
+        assert fighting.stats["hp"] == 40
+        assert offline.stats["hp"] == 40
+        assert store.get_stats()["dirty_players"] == 1
+        assert [pid for pid, msg in manager.sent] == [1]
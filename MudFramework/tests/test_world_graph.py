@@ -0,0 +1,99 @@
+"""
+Tests for the world graph index and shortest paths
+"""
+import random
+from collections import deque
+from app.game.world import Room, world
+from app.game.world_graph import WorldGraph
+
+def make_rooms(exits):
+    return {room_id: Room({"id": room_id, "name": room_id, "description": "", "exits": room_exits})
+            for room_id, room_exits in exits.items()}
+
+# a <-> b <-> c, c -> d (one-way), island e; a "ghost" exit leads nowhere
+ROOMS = make_rooms({
+    "a": {"east": "b", "up": "ghost"},
+    "b": {"west": "a", "east": "c"},
+    "c": {"west": "b", "down": "d"},
+    "d": {},
+    "e": {},
+})
+
+def random_rooms(count, seed):
+    rng = random.Random(seed)
+    exits = {f"r{i}": {} for i in range(count)}
+    for i in range(count):
+        for n, target in enumerate(rng.sample(range(count), 2)):
+            exits[f"r{i}"][f"exit{n}"] = f"r{target}"
+    return make_rooms(exits)
+
+def bfs_distance(rooms, src, dst):
+    seen = {src: 0}
+    queue = deque([src])
+    while queue:
+        u = queue.popleft()
+        for v in rooms[u].exits.values():
+            if v in rooms and v not in seen:
+                seen[v] = seen[u] + 1
+                queue.append(v)
+    return seen.get(dst)
+
+class TestIndex:
+    """Test adjacency, reverse edges and components"""
+
+    def test_adjacency(self):
+        graph = WorldGraph(ROOMS)
+        assert graph.neighbors("a") == [("east", "b")]
+        assert sorted(graph.entrances("b")) == [("a", "east"), ("c", "west")]
+        assert graph.entrances("d") == [("c", "down")]
+        assert graph.dangling_exits == 1
+        assert graph.same_component("a", "d") and not graph.same_component("a", "e")
+
+    def test_one_way_exits(self):
+        for all_pairs_max in (100, 0):
+            graph = WorldGraph(ROOMS, all_pairs_max=all_pairs_max)
+            assert graph.path("a", "d") == ["a", "b", "c", "d"]
+            assert graph.directions_to("a", "d") == ["east", "east", "down"]
+            assert graph.next_direction("a", "d") == "east"
+            assert graph.distance("d", "a") is None
+            assert graph.path("a", "e") is None
+            assert graph.path("a", "a") == ["a"] and graph.next_direction("a", "a") is None
+
+class TestShortestPaths:
+    """Test all-pairs and landmark search against plain BFS"""
+
+    def test_matches_bfs(self):
+        rooms = random_rooms(400, seed=3)
+        exact = WorldGraph(rooms)
+        alt = WorldGraph(rooms, landmarks=4, all_pairs_max=0)
+        assert exact.get_stats()["mode"] == "all_pairs" and alt.get_stats()["mode"] == "landmarks"
+        rng = random.Random(4)
+        for _ in range(200):
+            src, dst = rng.choice(list(rooms)), rng.choice(list(rooms))
+            want = bfs_distance(rooms, src, dst)
+            assert exact.distance(src, dst) == want
+            assert alt.distance(src, dst) == want
+            path = alt.path(src, dst)
+            if path:
+                assert all(b in rooms[a].exits.values() for a, b in zip(path, path[1:]))
+
+    def test_path_cache_is_bounded(self):
+        graph = WorldGraph(ROOMS, cache_size=2)
+        graph.path("a", "d")
+        graph.path("a", "d")
+        graph.path("a", "c")
+        graph.path("b", "d")
+        stats = graph.get_stats()
+        assert stats["cache_hits"] == 1 and stats["cache_misses"] == 3
+        assert stats["cached_paths"] == 2
+
+    def test_world_graph_built_at_load(self):
+        start = world.get_start_room().id
+        for room_id in world.rooms:
+            route = world.graph.directions_to(start, room_id)
+            if route is None:
+                continue
+            here = start
+            for direction in route:
+                here = world.rooms[here].exits[direction]
+            assert here == room_id
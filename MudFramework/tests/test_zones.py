@@ -0,0 +1,329 @@
+"""
+Tests for zone partitioning and zone worker processes
+"""
+import asyncio
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base, DatabaseExecutor
+from app.core.config import settings
+from app.game import engine as engine_module
+from app.game.engine import GameEngine
+from app.game.player_store import PlayerStateStore
+from app.game.simulator import RACES_PATH, stats_at_level
+from app.game.zone_cluster import ZoneCluster
+from app.game.zone_worker import RemoteManager, ZoneWorker
+from app.game.world import World
+from app.game.zones import ADOPT, BATCH, COMMAND, SEND, SET_ROOM, ZoneMap, assign_zones, load_room_data
+from app.models.base import Player, Race
+from app.websockets.connection_manager import ConnectionManager
+
+class RecordingSocket:
+    """Keeps every message, unpacking per-command batches"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        frame = json.loads(text)
+        self.messages.extend(frame["messages"] if frame["type"] == "batch" else [frame])
+
+    async def close(self, code=1000):
+        pass
+
+    def chat(self):
+        return [m["content"] for m in self.messages if m["type"] == "chat"]
+
+    def states(self):
+        return [m for m in self.messages if m["type"] == "gamestate"]
+
+def make_db(path):
+    """File database with two level 5 players: 1 in start_area (hurt), 2 in wasteland_1."""
+    db_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=db_engine)
+    with open(RACES_PATH) as f:
+        races = json.load(f)
+    with sessionmaker(bind=db_engine)() as db:
+        for race in races.values():
+            db.add(Race(**race))
+        for pid, room, hp in ((1, "start_area", 10), (2, "wasteland_1", None)):
+            stats = stats_at_level(races["Zenkai"], 5)
+            if hp is not None:
+                stats["hp"] = hp
+            db.add(Player(id=pid, name=f"Walker{pid}", race="Zenkai", level=5, exp=0, stats=stats,
+                          inventory=[], current_map=room, transformation="Base", zeni=0,
+                          learned_skills=[]))
+        db.commit()
+    db_engine.dispose()
+
+async def until(condition, timeout=20.0):
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+async def settle(*sockets, quiet=0.3):
+    """Wait until no socket has received anything for ``quiet`` seconds."""
+    counts = None
+    while True:
+        await asyncio.sleep(quiet)
+        now = [len(ws.messages) for ws in sockets]
+        if now == counts:
+            return
+        counts = now
+
+class TestZoneMap:
+    """Test partitioning and worker assignment"""
+
+    def test_partition_by_zone(self):
+        zone_map = ZoneMap(load_room_data(), workers=3)
+        assert set(zone_map.zones) == {"neon_city", "wasteland", "vanguard"}
+        assert ("neon_city", "east", "wasteland_1") in zone_map.border_exits
+        assert ("start_area", "north", "synth_lobby") not in zone_map.border_exits
+        owners = {zone_map.assignment[zone] for zone in zone_map.zones}
+        assert owners == {0, 1, 2}
+        assert zone_map.worker_for_room("nowhere") == zone_map.worker_for_room("start_area")
+
+    def test_assignment_balances_load(self):
+        assignment = assign_zones({"a": 10, "b": 6, "c": 5, "d": 1}, workers=2)
+        loads = [0, 0]
+        for zone, worker in assignment.items():
+            loads[worker] += {"a": 10, "b": 6, "c": 5, "d": 1}[zone]
+        assert sorted(loads) == [11, 11]
+
+    def test_more_workers_than_zones(self):
+        zone_map = ZoneMap(load_room_data(), workers=8)
+        assert zone_map.workers == 3
+
+class Outbox(list):
+    put = list.append
+
+class WaitingEngine:
+    """Engine stand-in whose commands wait on the database until released"""
+
+    def __init__(self):
+        self.manager = RemoteManager(Outbox())
+        self.released = {}
+        self.log = []
+
+    async def on_connect(self, player):
+        pass
+
+    async def process_command(self, player_id, text, db):
+        with self.manager.batch(player_id):
+            await self.manager.send_personal_message({"content": f"{text} start"}, player_id)
+            await self.released.setdefault(player_id, asyncio.Event()).wait()
+            self.log.append((player_id, text))
+            await self.manager.send_personal_message({"content": f"{text} done"}, player_id)
+
+class StubStore:
+    async def acquire_async(self, player_id):
+        return object()
+
+class TestZoneWorkerOps:
+    """Commands run as tasks: serial per player, concurrent across players"""
+
+    def test_waiting_command_holds_up_only_its_player(self):
+        engine = WaitingEngine()
+        worker = ZoneWorker(0, ["z"], engine, StubStore())
+        outbox = engine.manager.outbox
+
+        async def scenario():
+            for op in ((ADOPT, 1), (ADOPT, 2), (COMMAND, 1, "a"), (COMMAND, 1, "b"), (COMMAND, 2, "c")):
+                worker.submit(op, None)
+            await asyncio.sleep(0.01)
+            engine.released[2].set()
+            await asyncio.sleep(0.01)
+            assert engine.log == [(2, "c")]  # Player 1's wait held up only player 1
+
+            # A tick send made meanwhile goes straight out, not into player 1's batch
+            await engine.manager.send_personal_message({"content": "tick"}, 3)
+            assert outbox[-1] == (SEND, 3, {"content": "tick"})
+
+            engine.released[1].set()
+            await worker.drain()
+
+        asyncio.run(scenario())
+        assert engine.log == [(2, "c"), (1, "a"), (1, "b")]
+        assert [op[2] for op in outbox if op[0] == BATCH and op[1] == 2] == [
+            [(SEND, 2, {"content": "c start"}), (SEND, 2, {"content": "c done"})],
+        ]
+        assert [op[2] for op in outbox if op[0] == BATCH and op[1] == 1] == [
+            [(SEND, 1, {"content": "a start"}), (SEND, 1, {"content": "a done"})],
+            [(SEND, 1, {"content": "b start"}), (SEND, 1, {"content": "b done"})],
+        ]
+
+class TestStartRoom:
+    """Players with no room here go to the real start room, whichever worker owns it"""
+
+    def test_start_room_on_a_zone_worker(self):
+        wasteland = World(zones=["wasteland"])
+        assert wasteland.get_start_room_id() == "start_area"
+        assert wasteland.get_start_room() is None
+
+    def test_lost_player_handed_off(self, monkeypatch):
+        monkeypatch.setattr(engine_module, "world", World(zones=["wasteland"]))
+        store = PlayerStateStore(session_factory=None, flush_interval=60)
+        manager = RemoteManager(Outbox())
+        engine = GameEngine(manager, store=store)
+        player = Player(id=1, name="Lost", race="Zenkai", level=5, exp=0, stats={"hp": 100, "max_hp": 100},
+                        inventory={}, current_map="removed_room", transformation="Base")
+        store.players[1] = player
+        manager.active_connections[1] = True
+        handed = []
+
+        async def hand_off(player):
+            handed.append(player.current_map)
+
+        engine.on_zone_exit = hand_off
+        asyncio.run(engine.on_connect(player))
+        assert handed == ["start_area"]
+        assert [op[0] for op in manager.outbox] == [SET_ROOM]  # No state for a room of the wrong zone
+
+class TestZoneWorkers:
+    """Run one process per zone and walk a player across zone borders"""
+
+    def test_handoff_across_zone_workers(self, tmp_path):
+        db_path = tmp_path / "zones.db"
+        make_db(db_path)
+        zone_map = ZoneMap(load_room_data(), workers=3)
+        env = {"DATABASE_URL": f"sqlite:///{db_path}", "TICK_INTERVAL": "0.02", "PLAYER_FLUSH_INTERVAL": "0.5"}
+
+        async def scenario():
+            manager = ConnectionManager(queue_size=1000)
+            cluster = ZoneCluster(manager, zone_map, env=env)
+            await cluster.start()
+            walker, local = RecordingSocket(), RecordingSocket()
+            try:
+                await manager.connect(walker, 1)
+                await manager.connect(local, 2)
+                cluster.connect(1, "start_area")
+                cluster.connect(2, "wasteland_1")
+                assert await until(lambda: walker.states() and local.states())
+
+                # Regen runs on the neon_city worker's own tick loop
+                assert await until(lambda: walker.states()[-1]["player"]["stats"]["hp"] > 10)
+
+                cluster.send_command(1, "move east")  # start_area -> neon_city, same zone
+                cluster.send_command(1, "move east")  # neon_city -> wasteland_1, handoff
+                assert await until(lambda: walker.states()[-1]["room"]["id"] == "wasteland_1")
+                assert cluster.handoffs == 1
+
+                # Commands now go to the wasteland worker
+                seen = len(walker.chat())
+                cluster.send_command(1, "look")
+                assert await until(lambda: len(walker.chat()) > seen)
+                # Room chat crosses workers: the local player hears the arrival
+                assert await until(lambda: any("Walker1" in c for c in local.chat()))
+
+                cluster.send_command(1, "move east")
+                cluster.send_command(1, "move north")  # wasteland_2 -> vanguard_landing, handoff
+                assert await until(lambda: walker.states()[-1]["room"]["id"] == "vanguard_landing")
+                return cluster.get_stats(), cluster.owner[1]
+            finally:
+                cluster.disconnect(1)
+                cluster.disconnect(2)
+                await cluster.stop()
+
+        stats, owner = asyncio.run(scenario())
+        assert stats["handoffs"] == 2
+        assert owner == zone_map.worker_for_room("vanguard_landing")
+
+        # The last owner saved the player on disconnect
+        db_engine = create_engine(f"sqlite:///{db_path}")
+        with sessionmaker(bind=db_engine)() as db:
+            assert db.get(Player, 1).current_map == "vanguard_landing"
+        db_engine.dispose()
+
+# Two players, two zones: room chat, a zone handoff, level-up broadcast, combat,
+# and a defeat in the wasteland that revives player 2 in the start zone
+SCRIPT = [
+    (1, "say hi"), (1, "move east"), (1, "move east"), (1, "say hello"),
+    (1, "cheat_exp 600"), (2, "hunt"), (2, "attack"), (2, "cheat_defeat"), (2, "look"),
+    (1, "move west"), (1, "move west"), (1, "say home"),
+]
+
+class TestServerParity:
+    """The same session in single-process mode and with zone workers"""
+
+    async def play(self, manager, connect, command):
+        sockets = {1: RecordingSocket(), 2: RecordingSocket()}
+        for pid, ws in sockets.items():
+            await manager.connect(ws, pid)
+            await connect(pid)
+        await settle(*sockets.values())
+        transcript = []
+        for pid, line in SCRIPT:
+            seen = {p: len(ws.messages) for p, ws in sockets.items()}
+            await command(pid, line)
+            await settle(*sockets.values())
+            for p, ws in sockets.items():
+                for m in ws.messages[seen[p]:]:
+                    if m["type"] != "chat":
+                        continue
+                    if line in ("hunt", "attack"):
+                        # Rolls (and so how long a fight lasts) differ between runs; only check combat ran
+                        entry = (line, p, "Combat", "*")
+                        if m["sender"] == "Combat" and entry not in transcript:
+                            transcript.append(entry)
+                    else:
+                        transcript.append((line, p, m["sender"], m["content"]))
+        return transcript, sockets
+
+    def test_same_transcript(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "DEBUG_MODE", True)
+        zone_map = ZoneMap(load_room_data(), workers=3)
+
+        async def single():
+            make_db(tmp_path / "single.db")
+            db_engine = create_engine(f"sqlite:///{tmp_path / 'single.db'}")
+            factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+            manager = ConnectionManager(queue_size=1000)
+            db = DatabaseExecutor(factory)
+            store = PlayerStateStore(factory, flush_interval=3600, db=db)
+            engine = GameEngine(manager, store=store)
+
+            async def connect(pid):
+                await engine.on_connect(await store.acquire_async(pid))
+
+            async def command(pid, line):
+                await engine.process_command(pid, line, db)
+
+            try:
+                return await self.play(manager, connect, command)
+            finally:
+                db.shutdown()
+                db_engine.dispose()
+
+        async def workers():
+            make_db(tmp_path / "workers.db")
+            manager = ConnectionManager(queue_size=1000)
+            cluster = ZoneCluster(manager, zone_map, env={
+                "DATABASE_URL": f"sqlite:///{tmp_path / 'workers.db'}", "DEBUG_MODE": "true",
+            })
+            await cluster.start()
+
+            async def connect(pid):
+                cluster.connect(pid, "start_area" if pid == 1 else "wasteland_1")
+
+            async def command(pid, line):
+                cluster.send_command(pid, line)
+
+            try:
+                return await self.play(manager, connect, command)
+            finally:
+                await cluster.stop()
+
+        expected, _ = asyncio.run(single())
+        actual, sockets = asyncio.run(workers())
+        assert actual == expected
+        assert ("say hello", 2, "Walker1", "hello") in actual
+        assert ("cheat_exp 600", 2, "System", "Walker1 has reached Level 6!") in actual
+        assert ("attack", 2, "Combat", "*") in actual
+        start_name = load_room_data()["start_area"]["name"]
+        assert any(line == "look" and start_name in content for line, _, _, content in actual)  # Revived at the start
+        assert ("say home", 2, "Walker1", "home") in actual